@@ -1,3 +1,17 @@
-from .annotations import Concrete, DefaultQuerySet
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .annotations import Concrete, DefaultQuerySet
 
 __all__ = ["Concrete", "DefaultQuerySet"]
+
+
+def __getattr__(name: str) -> object:
+    # The annotations import Django, so they are only imported when they are used so that
+    # the parts of this package that don't need Django can be imported without it
+    if name in __all__:
+        from . import annotations
+
+        return getattr(annotations, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
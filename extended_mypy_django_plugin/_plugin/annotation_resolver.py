@@ -47,6 +47,7 @@ class AnnotationResolver:
         get_queryset_aliases: protocols.AliasGetter,
         plugin_lookup_fully_qualified: protocols.LookupFullyQualified,
         ctx: protocols.ValidContextForAnnotationResolver,
+        get_summarised_models: protocols.SummarisedModelsGetter | None = None,
     ) -> Self:
         """
         This classmethod constructor lets us normalise the ctx to satisfy the interface the
@@ -125,6 +126,7 @@ class AnnotationResolver:
                 raise FailedLookup(f"Expected only an instance or union for {alias}: got {target}")
 
         fail: protocols.FailFunc
+        note: protocols.NoteFunc
         defer: protocols.DeferFunc
         context: Context
         lookup_info: protocols.LookupInfo
@@ -137,6 +139,7 @@ class AnnotationResolver:
                 sem_api = api
                 defer = functools.partial(sem_defer, sem_api)
                 fail = functools.partial(sem_api.fail, ctx=context)
+                note = functools.partial(sem_api.note, ctx=context)
                 lookup_info = functools.partial(_lookup_info, sem_api)
                 lookup_alias = functools.partial(_lookup_alias, context.line)
                 named_type_or_none = sem_api.named_type_or_none
@@ -147,6 +150,7 @@ class AnnotationResolver:
                 sem_api = api.api
                 defer = functools.partial(sem_defer, sem_api)
                 fail = functools.partial(sem_api.fail, ctx=context)
+                note = functools.partial(sem_api.note, ctx=context)
                 lookup_info = functools.partial(_lookup_info, sem_api)
                 lookup_alias = functools.partial(_lookup_alias, context.line)
                 named_type_or_none = sem_api.named_type_or_none
@@ -159,6 +163,11 @@ class AnnotationResolver:
 
                 fail = checker_fail
 
+                def checker_note(msg: str, code: ErrorCode | None = None) -> None:
+                    api.msg.note(msg, context, code=code)
+
+                note = checker_note
+
                 lookup_info = functools.partial(_lookup_info, None)
                 lookup_alias = functools.partial(_lookup_alias, context.line)
                 named_type_or_none = checker_named_type_or_none
@@ -169,8 +178,10 @@ class AnnotationResolver:
             context=context,
             get_concrete_aliases=get_concrete_aliases,
             get_queryset_aliases=get_queryset_aliases,
+            get_summarised_models=get_summarised_models,
             defer=defer,
             fail=fail,
+            note=note,
             lookup_info=lookup_info,
             lookup_alias=lookup_alias,
             named_type_or_none=named_type_or_none,
@@ -183,7 +194,9 @@ class AnnotationResolver:
         get_concrete_aliases: protocols.AliasGetter,
         get_queryset_aliases: protocols.AliasGetter,
         fail: protocols.FailFunc,
+        note: protocols.NoteFunc,
         defer: protocols.DeferFunc,
+        get_summarised_models: protocols.SummarisedModelsGetter | None = None,
         lookup_alias: protocols.LookupAlias,
         lookup_info: protocols.LookupInfo,
         named_type_or_none: protocols.NamedTypeOrNone,
@@ -191,11 +204,13 @@ class AnnotationResolver:
         self._defer = defer
         self._named_type_or_none = named_type_or_none
         self.fail = fail
+        self.note = note
         self.context = context
         self.lookup_info = lookup_info
         self.lookup_alias = lookup_alias
         self.get_concrete_aliases = get_concrete_aliases
         self.get_queryset_aliases = get_queryset_aliases
+        self.get_summarised_models = get_summarised_models
 
     def _flatten_union(self, typ: ProperType) -> Iterator[ProperType]:
         """
@@ -258,6 +273,13 @@ class AnnotationResolver:
                 self.fail(f"No concrete models found for {names}")
             return None
 
+        if self.get_summarised_models is not None:
+            for name, count in self.get_summarised_models(*names).items():
+                self.note(
+                    f"Concrete annotations for '{name}' use that model rather than a union of its"
+                    f" {count} concrete models because that is more than max_concrete_union_width"
+                )
+
         return self._make_union(is_type, tuple(concrete))
 
     def _make_union(
@@ -288,11 +310,22 @@ class AnnotationResolver:
                 continue
 
             try:
-                yield from self.lookup_alias(alias)
+                found = list(self.lookup_alias(alias))
             except FailedLookup as error:
                 self.fail(
                     f"Failed to create concrete alias instance for '{model}' ({error}) (this is likely a bug in extended_mypy_django_plugin)"
                 )
+                continue
+
+            if any(isinstance(item, PlaceholderType) for item in found) and not self._defer():
+                # The virtual dependency with this alias isn't a dependency of this file
+                # which is the case when depending on it would make an import cycle
+                self.fail(
+                    f"Concrete alias for '{model}' is not available here ({alias} is not a dependency of this module)"
+                )
+                continue
+
+            yield from found
 
     def resolve(
         self, annotation: protocols.KnownAnnotations, model_type: ProperType
@@ -2,12 +2,13 @@ import configparser
 import dataclasses
 import pathlib
 import sys
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
+from typing import cast, get_args
 
 from mypy_django_plugin import config as django_stubs_config
 from typing_extensions import Self
 
-from ..django_analysis import ImportPath, protocols
+from ..django_analysis import ImportPath, protocols, virtual_dependencies
 from ..version import VERSION
 
 if sys.version_info >= (3, 11):
@@ -19,7 +20,10 @@ else:
 @dataclasses.dataclass(frozen=True)
 class ExtraOptions:
     """
-    The extended_mypy_django_plugin adds two options to the django-stubs configuration in the mypy configuration
+    The extended_mypy_django_plugin adds these options to the django-stubs configuration in the mypy configuration
+
+    The options from ``render_processes`` to ``fingerprint_env_vars`` change how virtual
+    dependencies are made and are kept together in ``virtual_dependency_options``
 
     scratch_path
         A folder where virtual dependencies are written to
@@ -30,11 +34,68 @@ class ExtraOptions:
 
     django_settings_module
         The option used to set DJANGO_SETTINGS_MODULE when loading django
+
+    render_processes
+        Optional. When more than one, the virtual dependencies are rendered across this many
+        processes. Defaults to 0, which renders them in the same process
+
+    significance_policy
+        Optional. Either "full" or "aliases-only". With "aliases-only" the summary of each virtual
+        dependency only changes when what the concrete and queryset aliases are made from changes,
+        rather than whenever a field changes. Defaults to "full"
+
+    virtual_dependency_layout
+        Optional. Either "module", "model", "abstract" or "acyclic". With "model" there is a
+        virtual dependency for each model rather than for each module with models, so a change to
+        one model only makes mypy check again the files that use that model. With "abstract" only
+        abstract models with concrete models in other modules get their own virtual dependency.
+        With "acyclic" only models whose aliases import modules that import the module of that
+        model, as found from the source of the modules in the project, get their own virtual
+        dependency. That module never depends on it, so the plugin doesn't join those modules
+        into one import cycle, which means using the annotations for that model in that module is
+        an error. Other files using the annotations for that model can still be joined into a
+        cycle when those modules import them. Defaults to "module"
+
+    virtual_dependency_format
+        Optional. Either "py" or "pyi". With "pyi" virtual dependencies are written as stubs
+        so mypy does less work to analyse them and tools that look at ``.py`` files ignore them.
+        Defaults to "py"
+
+    queryset_union_style
+        Optional. Either "expanded" or "collapsed". With "collapsed" the concrete models that use
+        the default django queryset are put in one ``QuerySet[A | B]`` rather than a union with a
+        ``QuerySet`` for each concrete model. Defaults to "expanded"
+
+    max_concrete_union_width
+        Optional. When more than 0, models with more concrete models than this have their
+        concrete annotations resolve to the model itself rather than a union of those concrete
+        models, and mypy notes the first time that happens for each model. Anything only the
+        concrete models have, like the ``objects`` manager when the model is abstract, is then
+        not available from those annotations. Defaults to 0, which has no maximum
+
+    virtual_namespace_layout
+        Optional. Either "flat" or "sharded". With "sharded" virtual dependencies are split
+        across subpackages of the virtual namespace rather than all being in one folder, which
+        is easier on filesystems that are slow with very large folders. Defaults to "flat"
+
+    fingerprint_env_vars
+        Optional. The names of environment variables the settings depend on, separated by commas
+        or whitespace. What Django is found to have is only reused while these and
+        DJANGO_SETTINGS_MODULE keep the values they had when it was stored. Defaults to none
+
+    import_graph_path
+        Optional. A file to record what each file imports and the dependencies this plugin adds
+        for it to. ``python -m extended_mypy_django_plugin.scripts.import_graph_report`` uses that
+        file to report the import cycles those dependencies made or made bigger
     """
 
     scratch_path: pathlib.Path
     project_root: pathlib.Path
     django_settings_module: protocols.ImportPath
+    virtual_dependency_options: virtual_dependencies.VirtualDependencyOptions = dataclasses.field(
+        default_factory=virtual_dependencies.VirtualDependencyOptions
+    )
+    import_graph_path: pathlib.Path | None = None
 
     @classmethod
     def from_config(cls, filepath: str | pathlib.Path | None) -> Self:
@@ -62,22 +123,87 @@ class ExtraOptions:
         assert django_settings_module_value is not None
         django_settings_module = ImportPath(django_settings_module_value)
 
+        render_processes = _sanitize_int(filepath, options, "render_processes")
+        significance_policy = _sanitize_choice(
+            filepath,
+            options,
+            "significance_policy",
+            choices=get_args(protocols.SignificancePolicy),
+        )
+        virtual_dependency_layout = _sanitize_choice(
+            filepath,
+            options,
+            "virtual_dependency_layout",
+            choices=get_args(protocols.VirtualDependencyLayout),
+        )
+        virtual_dependency_format = _sanitize_choice(
+            filepath,
+            options,
+            "virtual_dependency_format",
+            choices=get_args(protocols.VirtualDependencyFormat),
+        )
+        queryset_union_style = _sanitize_choice(
+            filepath,
+            options,
+            "queryset_union_style",
+            choices=get_args(protocols.QuerySetUnionStyle),
+        )
+        max_concrete_union_width = _sanitize_int(filepath, options, "max_concrete_union_width")
+        virtual_namespace_layout = _sanitize_choice(
+            filepath,
+            options,
+            "virtual_namespace_layout",
+            choices=get_args(protocols.VirtualNamespaceLayout),
+        )
+        fingerprint_env_vars = _sanitize_names(filepath, options, "fingerprint_env_vars")
+        import_graph_path = _sanitize_path(filepath, options, "import_graph_path")
+
         scratch_path.mkdir(parents=True, exist_ok=True)
 
         return cls(
             scratch_path=scratch_path,
             project_root=project_root,
             django_settings_module=django_settings_module,
+            virtual_dependency_options=virtual_dependencies.VirtualDependencyOptions(
+                render_processes=render_processes or 0,
+                significance_policy=cast(
+                    protocols.SignificancePolicy, significance_policy or "full"
+                ),
+                virtual_dependency_layout=cast(
+                    protocols.VirtualDependencyLayout, virtual_dependency_layout or "module"
+                ),
+                virtual_dependency_format=cast(
+                    protocols.VirtualDependencyFormat, virtual_dependency_format or "py"
+                ),
+                queryset_union_style=cast(
+                    protocols.QuerySetUnionStyle, queryset_union_style or "expanded"
+                ),
+                max_concrete_union_width=max_concrete_union_width or 0,
+                virtual_namespace_layout=cast(
+                    protocols.VirtualNamespaceLayout, virtual_namespace_layout or "flat"
+                ),
+                fingerprint_env_vars=fingerprint_env_vars,
+            ),
+            import_graph_path=import_graph_path,
         )
 
     def for_report(self) -> dict[str, str]:
         """
         Get the options that were found to be used for the mypy report_config_data hook
         """
+        options = self.virtual_dependency_options
         return {
             "scratch_path": str(self.scratch_path),
             "project_root": str(self.project_root),
             "django_settings_module": self.django_settings_module,
+            "significance_policy": options.significance_policy,
+            "virtual_dependency_layout": options.virtual_dependency_layout,
+            "virtual_dependency_format": options.virtual_dependency_format,
+            "queryset_union_style": options.queryset_union_style,
+            "max_concrete_union_width": str(options.max_concrete_union_width),
+            "virtual_namespace_layout": options.virtual_namespace_layout,
+            "fingerprint_env_vars": ",".join(options.fingerprint_env_vars),
+            "import_graph_path": str(self.import_graph_path or ""),
             "plugin_version": str(VERSION),
         }
 
@@ -147,6 +273,69 @@ def _sanitize_str(
     return value
 
 
+def _sanitize_int(
+    config_path: pathlib.Path, options: Mapping[str, object], option: str
+) -> int | None:
+    value = options.get(option)
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        value = _sanitize_str(config_path, options, option)
+        if value is not None and value.strip().isdigit():
+            value = int(value)
+
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError(
+            f"Please specify '{option}' as a number that is zero or more in the django-stubs section of your mypy configuration ({config_path})"
+        )
+
+    return value
+
+
+def _sanitize_choice(
+    config_path: pathlib.Path,
+    options: Mapping[str, object],
+    option: str,
+    *,
+    choices: Sequence[str],
+) -> str | None:
+    value = options.get(option)
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        value = _sanitize_str(config_path, options, option)
+        if value is not None and value.strip() in choices:
+            return value.strip()
+
+    raise ValueError(
+        f"Please specify '{option}' as one of {', '.join(choices)} in the django-stubs section of your mypy configuration ({config_path})"
+    )
+
+
+def _sanitize_names(
+    config_path: pathlib.Path, options: Mapping[str, object], option: str
+) -> tuple[str, ...]:
+    value = options.get(option)
+    if value is None:
+        return ()
+
+    if isinstance(value, str):
+        value = _sanitize_str(config_path, options, option)
+        if value is not None:
+            value = value.replace(",", " ").split()
+
+    if not isinstance(value, list) or not all(
+        isinstance(name, str) and name.strip() for name in value
+    ):
+        raise ValueError(
+            f"Please specify '{option}' as a list of names in the django-stubs section of your mypy configuration ({config_path})"
+        )
+
+    return tuple(name.strip() for name in value)
+
+
 def _sanitize_path(
     config_path: pathlib.Path,
     options: Mapping[str, object],
@@ -2,14 +2,20 @@ import pathlib
 import subprocess
 import sys
 import tempfile
-from collections.abc import MutableMapping
+from collections.abc import MutableMapping, Sequence
 from itertools import chain
 from typing import Generic
 
 from mypy.options import Options
 from mypy.plugin import Plugin as MypyPlugin
 
-from . import plugin, protocols
+from . import plugin, protocols, zygote
+
+DETERMINE_DJANGO_STATE = (
+    sys.executable,
+    "-m",
+    "extended_mypy_django_plugin.scripts.determine_django_state",
+)
 
 
 class PluginProvider(Generic[protocols.T_Report]):
@@ -38,6 +44,7 @@ class PluginProvider(Generic[protocols.T_Report]):
         self.instance: plugin.ExtendedMypyStubs[protocols.T_Report] | None = None
         self.virtual_dependency_handler = virtual_dependency_handler
         self.plugin_cls = plugin_cls
+        self.zygote = self.make_zygote()
 
     def __call__(self, version: str) -> type[MypyPlugin]:
         if self.instance is not None:
@@ -68,31 +75,50 @@ class PluginProvider(Generic[protocols.T_Report]):
             provider.set_new_version(instance.virtual_dependency_report.version)
             provider.instance = instance
 
+            if options.fine_grained_incremental and provider.zygote is not None:
+                # Only the daemon needs to determine the version again later
+                provider.zygote.start()
+
         return type("Plugin", (provider.plugin_cls,), {"__init__": __init__})
 
     def set_new_version(self, new_version: str) -> None:
         self.previous_version = new_version
         self.locals["__version__"] = new_version
 
+    def make_zygote(self) -> zygote.DjangoStateZygote | None:
+        """
+        Return the zygote used to run ``determine_django_state`` in a process that has
+        already imported Django.
+
+        Override this to return None to always run ``determine_django_state`` in a fresh
+        process.
+        """
+        return zygote.DjangoStateZygote()
+
+    def run_determine_django_state(
+        self, cmd: Sequence[str]
+    ) -> subprocess.CompletedProcess[str] | subprocess.CompletedProcess[bytes]:
+        """
+        Run the ``determine_django_state`` command, using the zygote when it's available
+        """
+        if self.zygote is not None:
+            result = self.zygote.run(cmd[len(DETERMINE_DJANGO_STATE) :])
+            if result is not None:
+                return result
+
+        return subprocess.run(cmd, capture_output=True)
+
     def determine_plugin_version(self, *, options: Options, previous_version: str) -> str:
         cmd = [
-            sys.executable,
-            "-m",
-            "extended_mypy_django_plugin.scripts.determine_django_state",
+            *DETERMINE_DJANGO_STATE,
             *(["--config-file", options.config_file] if options.config_file is not None else []),
             *chain.from_iterable(["--mypy-plugin", plugin] for plugin in options.plugins),
         ]
 
-        err: subprocess.CalledProcessError | None = None
-
         with tempfile.NamedTemporaryFile() as fle:
             cmd.extend(["--version-file", fle.name])
-
-            try:
-                subprocess.run(cmd, capture_output=True, check=True)
-            except subprocess.CalledProcessError as failed:
-                err = failed
-            else:
+            err = self.run_determine_django_state(cmd)
+            if err.returncode == 0:
                 return pathlib.Path(fle.name).read_text().strip()
 
         if err.returncode == 2:
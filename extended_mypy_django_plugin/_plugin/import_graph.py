@@ -0,0 +1,129 @@
+import dataclasses
+import json
+import pathlib
+from collections.abc import Iterable, Iterator, Mapping, Sequence, Set
+
+from typing_extensions import Self
+
+from ..django_analysis.graphs import strongly_connected_components
+
+# The files that have been recorded to in this process
+_started: set[pathlib.Path] = set()
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class ImportGraphRecorder:
+    """
+    Appends what each file imports and the dependencies the plugin adds for it to a file.
+
+    Every line is a json object for one file, and a later line for a file replaces
+    the earlier ones so that files checked again by the daemon are kept up to date.
+    The file is emptied the first time each process records to it.
+    """
+
+    path: pathlib.Path
+
+    def record(self, *, module: str, imports: Iterable[str], added: Iterable[str]) -> None:
+        line = json.dumps({"module": module, "imports": sorted(imports), "added": sorted(added)})
+
+        mode = "a"
+        if (location := self.path.absolute()) not in _started:
+            _started.add(location)
+            mode = "w"
+
+        with self.path.open(mode, encoding="utf-8") as f:
+            f.write(f"{line}\n")
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class ComponentImpact:
+    """
+    A strongly connected component that the dependencies added by the plugin made
+    or made bigger.
+    """
+
+    modules: Sequence[str]
+    largest_before: int
+    added_edges: Sequence[tuple[str, str]]
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class ImportGraph:
+    """
+    The import graph recorded by an ``ImportGraphRecorder``, with the edges mypy
+    finds from imports kept apart from the edges added by the plugin.
+    """
+
+    imports: Mapping[str, Set[str]]
+    added: Mapping[str, Set[str]]
+
+    @classmethod
+    def read(cls, path: pathlib.Path) -> Self:
+        found: dict[str, tuple[Sequence[str], Sequence[str]]] = {}
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    found[record["module"]] = (record["imports"], record["added"])
+
+        def resolve(names: Iterable[str]) -> set[str]:
+            # Imported names that aren't modules become edges to the modules they are
+            # found in, and like mypy each module depends on the packages above it
+            resolved: set[str] = set()
+            for name in names:
+                parts = name.split(".")
+                for i in range(1, len(parts) + 1):
+                    if (ancestor := ".".join(parts[:i])) in found:
+                        resolved.add(ancestor)
+            return resolved
+
+        imports: dict[str, Set[str]] = {}
+        added: dict[str, Set[str]] = {}
+        for module, (imported, extra) in found.items():
+            imports[module] = frozenset(resolve(imported) - {module})
+            added[module] = frozenset(resolve(extra) - imports[module] - {module})
+
+        return cls(imports=imports, added=added)
+
+    def components(self, *, with_added: bool) -> Iterator[Sequence[str]]:
+        """
+        Yield the strongly connected components of the graph, with or without the
+        edges added by the plugin.
+        """
+        edges: dict[str, Sequence[str]] = {
+            module: sorted(self.imports[module] | (self.added[module] if with_added else set()))
+            for module in self.imports
+        }
+        for component in strongly_connected_components(sorted(edges), edges.__getitem__):
+            yield sorted(component)
+
+    def impact(self) -> Sequence[ComponentImpact]:
+        """
+        Return the components the plugin made or made bigger, biggest first.
+        """
+        size_before: dict[str, int] = {}
+        for component in self.components(with_added=False):
+            for module in component:
+                size_before[module] = len(component)
+
+        found: list[ComponentImpact] = []
+        for component in self.components(with_added=True):
+            largest_before = max(size_before[module] for module in component)
+            if len(component) == largest_before:
+                continue
+
+            members = set(component)
+            found.append(
+                ComponentImpact(
+                    modules=component,
+                    largest_before=largest_before,
+                    added_edges=[
+                        (module, dep)
+                        for module in component
+                        for dep in sorted(self.added[module])
+                        if dep in members
+                    ],
+                )
+            )
+
+        return sorted(found, key=lambda impact: (-len(impact.modules), impact.modules))
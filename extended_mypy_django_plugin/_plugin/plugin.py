@@ -1,13 +1,28 @@
 import functools
+import pathlib
+import sys
+from collections.abc import Mapping
 from typing import Generic, TypeVar
 
+from mypy.modulefinder import mypy_path
 from mypy.nodes import Import, ImportAll, ImportFrom, MypyFile
 from mypy.options import Options
 from mypy.plugin import AnalyzeTypeContext, MethodContext, ReportConfigContext
 from mypy.types import Type as MypyType
 from mypy_django_plugin import main
-
-from . import analyze, annotation_resolver, config, hook, protocols, type_checker
+from mypy_django_plugin.config import DjangoPluginConfig
+from mypy_django_plugin.django.context import DjangoContext
+
+from ..django_analysis import replaced_env_vars_and_sys_path
+from . import (
+    analyze,
+    annotation_resolver,
+    config,
+    hook,
+    import_graph,
+    protocols,
+    type_checker,
+)
 
 T_Report = TypeVar("T_Report", bound=protocols.Report)
 
@@ -61,6 +76,7 @@ class ExtendedMypyStubs(Generic[T_Report], main.NewSemanalDjangoPlugin):
             project_root=extra_options.project_root,
             django_settings_module=extra_options.django_settings_module,
             virtual_deps_destination=extra_options.scratch_path,
+            options=extra_options.virtual_dependency_options,
         )
 
     def __init__(
@@ -76,26 +92,79 @@ class ExtendedMypyStubs(Generic[T_Report], main.NewSemanalDjangoPlugin):
         self.virtual_dependency_report = self.make_virtual_dependency_report(
             extra_options=self.extra_options, virtual_dependency_handler=virtual_dependency_handler
         )
+        self._noted_summarised_models: set[str] = set()
 
         make_resolver: protocols.ResolverMaker = functools.partial(
             annotation_resolver.make_resolver,
             get_concrete_aliases=self.virtual_dependency_report.report.get_concrete_aliases,
             get_queryset_aliases=self.virtual_dependency_report.report.get_queryset_aliases,
+            get_summarised_models=self._summarised_models_to_note,
             plugin_lookup_fully_qualified=self.lookup_fully_qualified,
         )
 
+        self.import_graph_recorder: import_graph.ImportGraphRecorder | None = None
+        if self.extra_options.import_graph_path is not None:
+            self.import_graph_recorder = import_graph.ImportGraphRecorder(
+                path=self.extra_options.import_graph_path
+            )
+
         self.analyzer = analyze.Analyzer(make_resolver=make_resolver)
         self.type_checker = type_checker.TypeChecking(make_resolver=make_resolver)
 
-        super().__init__(options)
+        # This is what NewSemanalDjangoPlugin.__init__ does, except django-stubs is given this
+        # context rather than making its own, so that Django is only set up once and with the
+        # project root on sys.path
+        super(main.NewSemanalDjangoPlugin, self).__init__(options)
+        self.plugin_config = DjangoPluginConfig(options.config_file)
+        sys.path.extend(mypy_path())
+        sys.path.extend(options.mypy_path)
+        self.django_context = self.make_django_context(
+            project_root=self.extra_options.project_root,
+            django_settings_module=self.extra_options.django_settings_module,
+        )
 
         self.extra_init()
 
+    def make_django_context(
+        self, *, project_root: pathlib.Path, django_settings_module: str
+    ) -> DjangoContext:
+        """
+        Return the ``DjangoContext`` used by django-stubs.
+
+        The app registry and settings are global to the process, so when Django was already
+        loaded to make the virtual dependency report this uses that registry and settings
+        rather than populating the apps again.
+
+        Otherwise, for example when discovery was restored from the cache, Django is loaded
+        here with the project root on ``sys.path`` like the virtual dependency handler
+        would have done.
+        """
+        with replaced_env_vars_and_sys_path(
+            additional_sys_path=[str(project_root)],
+            env_vars={"DJANGO_SETTINGS_MODULE": django_settings_module},
+        ):
+            return DjangoContext(django_settings_module)
+
     def extra_init(self) -> None:
         """
         Place to add extra logic after __init__
         """
 
+    def _summarised_models_to_note(self, *models: str) -> Mapping[str, int]:
+        """
+        Return the summarised models from these that mypy hasn't already been told about,
+        so that each is only mentioned once rather than wherever its annotations are used.
+        """
+        found = {
+            name: count
+            for name, count in self.virtual_dependency_report.report.get_summarised_models(
+                *models
+            ).items()
+            if name not in self._noted_summarised_models
+        }
+        self._noted_summarised_models.update(found)
+        return found
+
     def report_config_data(self, ctx: ReportConfigContext) -> dict[str, object]:
         """
         Add our extra options to the report config data, so that mypy knows to clear the cache
@@ -113,9 +182,13 @@ class ExtendedMypyStubs(Generic[T_Report], main.NewSemanalDjangoPlugin):
 
         We use a generated "report" to re-analyze a file if a new dependency
         is discovered after this file has been processed.
+
+        When ``import_graph_path`` is configured, what the file imports and the
+        dependencies added here are recorded to that file.
         """
         file_import = file.fullname
         full_imports: set[str] = set()
+        imported_modules: set[str] = set()
 
         self.virtual_dependency_report.ensure_virtual_dependency(module_import_path=file.fullname)
 
@@ -127,6 +200,7 @@ class ExtendedMypyStubs(Generic[T_Report], main.NewSemanalDjangoPlugin):
                 else:
                     prefix = imp.id
 
+                imported_modules.add(prefix)
                 if isinstance(imp, ImportAll):
                     # This is the best we can do unfortunately
                     full_imports.add(prefix)
@@ -145,16 +219,26 @@ class ExtendedMypyStubs(Generic[T_Report], main.NewSemanalDjangoPlugin):
                 self.options.incremental and self.options.cache_dir != "/dev/null"
             )
 
-        return list(
+        super_deps = super().get_additional_deps(file)
+        deps = list(
             self.virtual_dependency_report.report.additional_deps(
                 file_import_path=file_import,
                 imports=full_imports,
                 django_settings_module=self.extra_options.django_settings_module,
                 using_incremental_cache=using_incremental_cache,
-                super_deps=super().get_additional_deps(file),
+                super_deps=super_deps,
             )
         )
 
+        if self.import_graph_recorder is not None:
+            self.import_graph_recorder.record(
+                module=file_import,
+                imports=full_imports | imported_modules | {dep for _, dep, _ in super_deps},
+                added={dep for _, dep, _ in deps} - {dep for _, dep, _ in super_deps},
+            )
+
+        return deps
+
     @hook.hook
     class get_type_analyze_hook(
         HookWithExtra[protocols.Report, AnalyzeTypeContext, protocols.KnownAnnotations, MypyType]
@@ -92,6 +92,14 @@ class Report(Protocol):
         If concrete querysets cannot be found for a model it's entry will be given as None
         """
 
+    def get_summarised_models(self, *models: str) -> Mapping[str, int]:
+        """
+        Given import paths to some models, return a map of those that have more concrete models
+        than are allowed in a union to the number of concrete models they have
+
+        The aliases for these models refer to the model itself rather than its concrete models
+        """
+
 
 class FailFunc(Protocol):
     """
@@ -101,6 +109,14 @@ class FailFunc(Protocol):
     def __call__(self, msg: str, code: errorcodes.ErrorCode | None = None) -> None: ...
 
 
+class NoteFunc(Protocol):
+    """
+    Used to insert a note into the mypy output
+    """
+
+    def __call__(self, msg: str, code: errorcodes.ErrorCode | None = None) -> None: ...
+
+
 class DeferFunc(Protocol):
     """
     Used to tell mypy to defer and come back later
@@ -138,6 +154,15 @@ class AliasGetter(Protocol):
     def __call__(self, *models: str) -> Mapping[str, str | None]: ...
 
 
+class SummarisedModelsGetter(Protocol):
+    """
+    Given fullnames to zero or more models return a Mapping of the models that have too many
+    concrete models to be represented with a union to the number of concrete models they have.
+    """
+
+    def __call__(self, *models: str) -> Mapping[str, int]: ...
+
+
 class LookupAlias(Protocol):
     """
     Given an alias for the concrete of some model, return Instance of the models represented
@@ -23,15 +23,19 @@ class VirtualDependencyHandlerBase(
         return virtual_dependencies.Report
 
     def make_report_factory(
-        self, *, installed_apps_hash: str
+        self,
     ) -> d_protocols.ReportFactory[
         virtual_dependencies.VirtualDependency[d_protocols.T_Project], virtual_dependencies.Report
     ]:
         return virtual_dependencies.make_report_factory(
             hasher=self.hasher,
             report_maker=self.get_report_maker(),
-            installed_apps_hash=installed_apps_hash,
             make_differentiator=self.interface_differentiator,
+            render_processes=self.options.render_processes,
+            virtual_dependency_format=self.options.virtual_dependency_format,
+            queryset_union_style=self.options.queryset_union_style,
+            max_concrete_union_width=self.options.max_concrete_union_width,
+            virtual_namespace_layout=self.options.virtual_namespace_layout,
         )
 
     def virtual_dependency_maker(
@@ -43,6 +47,7 @@ class VirtualDependencyHandlerBase(
             virtual_dependencies.VirtualDependency.create,
             discovered_project=self.discovered,
             virtual_dependency_namer=virtual_dependency_namer,
+            significance_policy=self.options.significance_policy,
         )
 
 
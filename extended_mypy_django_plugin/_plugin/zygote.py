@@ -0,0 +1,129 @@
+import atexit
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+from collections.abc import Sequence
+from typing import Any
+
+
+class DjangoStateZygote:
+    """
+    Talks to a long lived ``extended_mypy_django_plugin.scripts.django_state_zygote`` process
+    that runs ``determine_django_state`` in children forked from a process that has already
+    imported Django and any other installed distributions that were needed.
+
+    If the zygote can't be used, or doesn't respond within ``timeout`` seconds, then ``run``
+    returns None and the caller should run ``determine_django_state`` in a fresh process instead.
+
+    The zygote asks to be restarted when an installed distribution it imported has changed,
+    so that children never run with code that is out of date.
+    """
+
+    def __init__(self, *, timeout: float = 120) -> None:
+        self.process: subprocess.Popen[bytes] | None = None
+        self.broken = not hasattr(os, "fork")
+        self.timeout = timeout
+
+    def start(self) -> None:
+        """
+        Start the zygote so that it can do it's imports before it is needed
+        """
+        if self.broken or self.process is not None:
+            return
+
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "extended_mypy_django_plugin.scripts.django_state_zygote"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                # So that children of the zygote can be stopped along with it
+                start_new_session=True,
+            )
+        except OSError:
+            self.broken = True
+        else:
+            atexit.register(self.close)
+
+    def run(self, argv: Sequence[str]) -> subprocess.CompletedProcess[str] | None:
+        """
+        Run determine_django_state with these arguments in a child of the zygote
+        """
+        for _ in range(2):
+            response = self._request(argv)
+            if response is None:
+                return None
+
+            if not response.get("restart"):
+                return subprocess.CompletedProcess(
+                    args=argv,
+                    returncode=response["returncode"],
+                    stdout=str(response["stdout"]),
+                    stderr=str(response["stderr"]),
+                )
+
+            self.close()
+
+        return None
+
+    def _request(self, argv: Sequence[str]) -> dict[str, Any] | None:
+        self.start()
+        if self.process is None or self.process.stdin is None or self.process.stdout is None:
+            return None
+
+        try:
+            self.process.stdin.write(json.dumps({"argv": list(argv)}).encode() + b"\n")
+            self.process.stdin.flush()
+            ready, _, _ = select.select([self.process.stdout], [], [], self.timeout)
+            if not ready:
+                # Leave it to a fresh process, which is what would happen without the zygote
+                self.close(kill=True)
+                return None
+
+            response = json.loads(self.process.stdout.readline())
+            if not isinstance(response, dict):
+                raise ValueError("Expected a json object from the zygote")
+        except (OSError, ValueError):
+            self.close(kill=True)
+            self.broken = True
+            return None
+
+        return response
+
+    def close(self, *, kill: bool = False) -> None:
+        """
+        Stop the zygote, which happens on exit if it isn't done before then.
+
+        The zygote exits once stdin is closed, and if it doesn't, or ``kill`` is True, then
+        the zygote and any child it is waiting on are killed.
+        """
+        if self.process is None:
+            return
+
+        process, self.process = self.process, None
+        atexit.unregister(self.close)
+
+        if process.stdin is not None:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+        if not kill:
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                kill = True
+
+        if kill:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                process.kill()
+            process.wait()
+
+        if process.stdout is not None:
+            process.stdout.close()
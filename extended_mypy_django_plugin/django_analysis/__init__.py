@@ -1,22 +1,44 @@
+import importlib
+from typing import TYPE_CHECKING
+
 from . import discovery, protocols, virtual_dependencies
+from .cache import DiscoveryCache, Fingerprint, VersionCache
 from .discovery.import_path import ImportPath
-from .fields import Field
 from .hasher import adler32_hash
-from .models import Model
-from .modules import Module
+from .installed_apps import InstalledApp
 from .project import Discovered, Loaded, Project, replaced_env_vars_and_sys_path
 
+if TYPE_CHECKING:
+    from .fields import Field
+    from .models import Model
+    from .modules import Module
+
 __all__ = [
     "Discovered",
+    "DiscoveryCache",
     "Field",
+    "Fingerprint",
     "ImportPath",
+    "InstalledApp",
     "Loaded",
     "Model",
     "Module",
     "Project",
+    "VersionCache",
     "adler32_hash",
     "discovery",
     "protocols",
     "replaced_env_vars_and_sys_path",
     "virtual_dependencies",
 ]
+
+# These import Django, so they are only imported when they are used so that the version
+# cache can tell whether anything changed without importing Django
+_NEEDS_DJANGO = {"Field": "fields", "Model": "models", "Module": "modules"}
+
+
+def __getattr__(name: str) -> object:
+    if name in _NEEDS_DJANGO:
+        return getattr(importlib.import_module(f"{__name__}.{_NEEDS_DJANGO[name]}"), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,601 @@
+from __future__ import annotations
+
+import dataclasses
+import functools
+import importlib.metadata
+import json
+import os
+import pathlib
+import sys
+import sysconfig
+import tempfile
+import types
+from collections.abc import Iterable, Mapping, Sequence
+from typing import TYPE_CHECKING, Generic, cast
+
+from typing_extensions import Self
+
+from ..version import VERSION
+from . import protocols
+from .discovery import module_specs
+from .discovery.import_path import ImportPath
+from .project import Discovered
+
+if TYPE_CHECKING:
+    from django.apps.registry import Apps
+    from django.conf import LazySettings
+
+# Changing this makes every existing cache invalid
+CACHE_FORMAT = "3"
+
+# Where the virtual dependency handler stores the discovery cache in the scratch path
+DISCOVERY_CACHE_NAME = "__discovery_cache__.json"
+
+
+def _write_json(location: pathlib.Path, data: Mapping[str, object]) -> None:
+    location.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=location.parent, prefix=f".{location.name}.", delete=False
+    ) as fle:
+        json.dump(data, fle)
+    os.replace(fle.name, location)
+
+
+def _read_json(location: pathlib.Path) -> dict[str, object] | None:
+    try:
+        data = json.loads(location.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("cache_format") != CACHE_FORMAT:
+        return None
+
+    return data
+
+
+def _is_relative_to_any(path: pathlib.Path, folders: set[pathlib.Path]) -> bool:
+    return any(path.is_relative_to(folder) for folder in folders)
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class FileFingerprint:
+    """
+    The state of a single file.
+
+    The mtime and size are used as a cheap check, with the hash of the content used
+    when those don't match.
+    """
+
+    mtime_ns: int
+    size: int
+    content_hash: str
+
+    @classmethod
+    def from_path(cls, path: pathlib.Path, *, hasher: protocols.Hasher) -> Self | None:
+        try:
+            stat = path.stat()
+            content = path.read_bytes()
+        except OSError:
+            return None
+        return cls(mtime_ns=stat.st_mtime_ns, size=stat.st_size, content_hash=hasher(content))
+
+    def matches(self, path: pathlib.Path, *, hasher: protocols.Hasher) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+
+        if stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size:
+            return True
+
+        try:
+            return hasher(path.read_bytes()) == self.content_hash
+        except OSError:
+            return False
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Fingerprint:
+    """
+    Represents the state of everything that went into loading a Django project.
+
+    Modules that come from installed distributions are represented by the version of that
+    distribution, and everything else is represented by the state of the file the module
+    was loaded from. Modules from the standard library are represented by the version
+    of python in ``extra``.
+
+    Modules that were looked for but not found are represented by the files that would
+    have been loaded if they existed, in ``absent``, and creating any of those files means
+    the fingerprint is no longer current.
+    """
+
+    extra: Mapping[str, str]
+    files: Mapping[str, FileFingerprint]
+    distributions: Mapping[str, str]
+    absent: Sequence[str] = ()
+
+    @classmethod
+    def from_modules(
+        cls,
+        *,
+        modules: Mapping[str, types.ModuleType],
+        project_root: pathlib.Path,
+        hasher: protocols.Hasher,
+        extra: Mapping[str, str],
+        absent: Iterable[pathlib.Path] = (),
+    ) -> Self:
+        return cls.from_locations(
+            locations={
+                name: pathlib.Path(filename)
+                for name, module in list(modules.items())
+                if isinstance(filename := getattr(module, "__file__", None), str)
+            },
+            project_root=project_root,
+            hasher=hasher,
+            extra=extra,
+            absent=absent,
+        )
+
+    @classmethod
+    def from_locations(
+        cls,
+        *,
+        locations: Mapping[str, pathlib.Path],
+        project_root: pathlib.Path,
+        hasher: protocols.Hasher,
+        extra: Mapping[str, str],
+        absent: Iterable[pathlib.Path] = (),
+    ) -> Self:
+        paths = sysconfig.get_paths()
+        site_packages = {pathlib.Path(paths[name]) for name in ("purelib", "platlib")}
+        stdlib = {pathlib.Path(paths[name]) for name in ("stdlib", "platstdlib")}
+        top_level_distributions = importlib.metadata.packages_distributions()
+        versions = installed_distributions()
+
+        files: dict[str, FileFingerprint] = {}
+        distributions: dict[str, str] = {}
+
+        for name, location in locations.items():
+            if not location.is_relative_to(project_root):
+                dists = top_level_distributions.get(name.split(".", 1)[0], [])
+                if dists and _is_relative_to_any(location, site_packages):
+                    for dist in dists:
+                        if (version := versions.get(dist.lower())) is not None:
+                            distributions[dist.lower()] = version
+                    continue
+
+                if _is_relative_to_any(location, stdlib) and not _is_relative_to_any(
+                    location, site_packages
+                ):
+                    continue
+
+            if str(location) not in files:
+                found = FileFingerprint.from_path(location, hasher=hasher)
+                if found is not None:
+                    files[str(location)] = found
+
+        # Anything that would be installed is covered by the version of its distribution
+        absent_files = {
+            str(location)
+            for location in absent
+            if location.is_relative_to(project_root)
+            or not _is_relative_to_any(location, site_packages | stdlib)
+        }
+
+        return cls(
+            extra=extra,
+            files=dict(sorted(files.items())),
+            distributions=dict(sorted(distributions.items())),
+            absent=sorted(absent_files),
+        )
+
+    def is_current(self, *, hasher: protocols.Hasher, extra: Mapping[str, str]) -> bool:
+        """
+        Return whether the state this fingerprint represents is still the state on disk
+        """
+        if dict(extra) != dict(self.extra):
+            return False
+
+        if self.distributions:
+            versions = installed_distributions()
+            for name, version in self.distributions.items():
+                if versions.get(name) != version:
+                    return False
+
+        for path, file_fingerprint in self.files.items():
+            if not file_fingerprint.matches(pathlib.Path(path), hasher=hasher):
+                return False
+
+        for path in self.absent:
+            if os.path.exists(path):
+                return False
+
+        return True
+
+    def merge(self, other: Fingerprint) -> Self:
+        """
+        Return a fingerprint that also represents the files and distributions from other
+        """
+        return dataclasses.replace(
+            self,
+            files=dict(sorted({**other.files, **self.files}.items())),
+            distributions=dict(sorted({**other.distributions, **self.distributions}.items())),
+            absent=sorted({*other.absent, *self.absent}),
+        )
+
+    def for_json(self) -> dict[str, object]:
+        return {
+            "extra": dict(self.extra),
+            "files": {
+                path: [found.mtime_ns, found.size, found.content_hash]
+                for path, found in self.files.items()
+            },
+            "distributions": dict(self.distributions),
+            "absent": list(self.absent),
+        }
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, object]) -> Self:
+        extra = cast(Mapping[str, str], data["extra"])
+        files = cast(Mapping[str, list[int | str]], data["files"])
+        distributions = cast(Mapping[str, str], data["distributions"])
+        absent = cast(list[str], data["absent"])
+        return cls(
+            extra=dict(extra),
+            files={
+                path: FileFingerprint(
+                    mtime_ns=int(mtime_ns), size=int(size), content_hash=str(content_hash)
+                )
+                for path, (mtime_ns, size, content_hash) in files.items()
+            },
+            distributions=dict(distributions),
+            absent=[str(path) for path in absent],
+        )
+
+
+def environment_fingerprint(
+    names: Iterable[str], *, env_vars: Mapping[str, str] | None = None
+) -> dict[str, str]:
+    """
+    Return the values of DJANGO_SETTINGS_MODULE and these environment variables as they
+    are when the project is loaded with ``env_vars``, for the ``extra`` of a fingerprint.
+
+    Variables that aren't set are left out, so setting one changes the fingerprint.
+    """
+    environ = {**os.environ, **(env_vars or {})}
+    return {
+        f"environ:{name}": environ[name]
+        for name in sorted({"DJANGO_SETTINGS_MODULE", *names})
+        if name in environ
+    }
+
+
+def installed_distributions() -> dict[str, str]:
+    """
+    Return a map of the lowercased name of every installed distribution to its version
+    """
+    result: dict[str, str] = {}
+    for dist in importlib.metadata.distributions():
+        if name := dist.metadata["Name"]:
+            result.setdefault(name.lower(), dist.version)
+    return result
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class DeferredLoaded(Generic[protocols.T_Project]):
+    """
+    Used to represent the loaded project for a discovery that was restored from a cache.
+
+    Django is only instantiated if the settings or apps are actually accessed.
+    """
+
+    project: protocols.T_Project
+
+    @property
+    def root_dir(self) -> pathlib.Path:
+        return self.project.root_dir
+
+    @property
+    def env_vars(self) -> Mapping[str, str]:
+        return self.project.env_vars
+
+    @functools.cached_property
+    def _loaded(self) -> protocols.Loaded[protocols.T_Project]:
+        return self.project.load_project()
+
+    @property
+    def settings(self) -> LazySettings:
+        return self._loaded.settings
+
+    @property
+    def apps(self) -> Apps:
+        return self._loaded.apps
+
+    def perform_discovery(self) -> protocols.Discovered[protocols.T_Project]:
+        return self._loaded.perform_discovery()
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class DiscoveryCache(Generic[protocols.T_Project]):
+    """
+    Stores the result of discovery on disk so that subsequent runs can avoid loading Django
+    when nothing that was imported when Django was last loaded has changed.
+
+    Note that the cache is invalidated as a whole when any of the recorded modules change,
+    because a change to one models module may change the reverse relations found on models
+    in any other module.
+
+    Settings may also depend on the environment, so the cache is invalidated when
+    DJANGO_SETTINGS_MODULE or any of the variables in ``env_var_names`` change.
+    """
+
+    location: pathlib.Path
+    hasher: protocols.Hasher
+    env_var_names: Sequence[str] = ()
+
+    def extra_fingerprint(self, *, project: protocols.T_Project) -> Mapping[str, str]:
+        """
+        Information outside of imported modules that would change the result of discovery
+        """
+        return {
+            "cache_format": CACHE_FORMAT,
+            "plugin_version": VERSION,
+            "python": sys.version,
+            "root_dir": str(project.root_dir),
+            "additional_sys_path": os.pathsep.join(project.additional_sys_path),
+            **{f"env:{k}": v for k, v in sorted(project.env_vars.items())},
+            **environment_fingerprint(self.env_var_names, env_vars=project.env_vars),
+        }
+
+    def read(
+        self, *, project: protocols.T_Project
+    ) -> protocols.Discovered[protocols.T_Project] | None:
+        data = _read_json(self.location)
+        if data is None:
+            return None
+
+        try:
+            fingerprint = Fingerprint.from_json(cast(Mapping[str, object], data["fingerprint"]))
+            if not fingerprint.is_current(
+                hasher=self.hasher, extra=self.extra_fingerprint(project=project)
+            ):
+                return None
+
+            return self._deserialize(project=project, data=data)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def write(self, *, discovered: protocols.Discovered[protocols.T_Project]) -> None:
+        project = discovered.loaded_project.project
+        locations = {
+            name: pathlib.Path(filename)
+            for name, module in list(sys.modules.items())
+            if isinstance(filename := getattr(module, "__file__", None), str)
+        }
+        absent: list[pathlib.Path] = []
+        with project.setup_sys_path_and_env_vars():
+            for name in self._referenced_modules(discovered):
+                if name not in locations:
+                    spec = module_specs.find_spec(name)
+                    if spec is None:
+                        absent.extend(module_specs.possible_locations(name))
+                    elif spec.origin is not None and spec.has_location:
+                        locations[name] = pathlib.Path(spec.origin)
+
+        fingerprint = Fingerprint.from_locations(
+            locations=locations,
+            project_root=project.root_dir,
+            hasher=self.hasher,
+            extra=self.extra_fingerprint(project=project),
+            absent=absent,
+        )
+
+        _write_json(
+            self.location,
+            {
+                "cache_format": CACHE_FORMAT,
+                "fingerprint": fingerprint.for_json(),
+                **self._serialize(discovered),
+            },
+        )
+
+    def read_fingerprint(self) -> Fingerprint | None:
+        """
+        Return the fingerprint in the cache without checking if it's current
+        """
+        data = _read_json(self.location)
+        if data is None:
+            return None
+
+        try:
+            return Fingerprint.from_json(cast(Mapping[str, object], data["fingerprint"]))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _referenced_modules(
+        self, discovered: protocols.Discovered[protocols.T_Project]
+    ) -> set[str]:
+        """
+        The modules that discovery depends on.
+
+        These may not have been imported if discovery was done without importing the
+        installed apps, and the ``apps`` and ``models`` modules of each installed app may
+        not exist at all.
+        """
+        names: set[str] = set()
+        for app in discovered.installed_apps:
+            names |= {app, f"{app}.apps", f"{app}.models", app.rpartition(".")[0]}
+
+        for installed in discovered.installed_app_configs.values():
+            names |= {installed.name, f"{installed.name}.apps", f"{installed.name}.models"}
+
+        for import_path, module in discovered.installed_models_modules.items():
+            names.add(import_path)
+            for model in module.defined_models.values():
+                names.add(model.module_import_path)
+                for path in [
+                    *model.models_in_mro,
+                    *(field.field_type for field in model.all_fields.values()),
+                    *([model.default_custom_queryset] if model.default_custom_queryset else []),
+                ]:
+                    names.add(path.rpartition(".")[0])
+
+        for name in list(names):
+            while "." in name:
+                name = name.rpartition(".")[0]
+                names.add(name)
+
+        names.discard("")
+        return names
+
+    def _serialize(
+        self, discovered: protocols.Discovered[protocols.T_Project]
+    ) -> dict[str, object]:
+        return {
+            "installed_apps": list(discovered.installed_apps),
+            "installed_app_configs": {
+                entry: {"name": installed.name, "models_modules": sorted(installed.models_modules)}
+                for entry, installed in discovered.installed_app_configs.items()
+            },
+            "settings_types": dict(discovered.settings_types),
+            "modules": {
+                import_path: [
+                    {
+                        "import_path": model.import_path,
+                        "model_name": model.model_name,
+                        "module_import_path": model.module_import_path,
+                        "is_abstract": model.is_abstract,
+                        "default_custom_queryset": model.default_custom_queryset,
+                        "models_in_mro": list(model.models_in_mro),
+                        "fields": {
+                            name: [field.field_type, field.related_model]
+                            for name, field in model.all_fields.items()
+                        },
+                    }
+                    for model in module.defined_models.values()
+                ]
+                for import_path, module in discovered.installed_models_modules.items()
+            },
+            "concrete_models": {
+                import_path: [model.import_path for model in concrete]
+                for import_path, concrete in discovered.concrete_models.items()
+            },
+        }
+
+    def _deserialize(
+        self, *, project: protocols.T_Project, data: Mapping[str, object]
+    ) -> protocols.Discovered[protocols.T_Project]:
+        from extended_mypy_django_plugin import django_analysis
+
+        modules_data = cast(Mapping[str, list[Mapping[str, object]]], data["modules"])
+        concrete_data = cast(Mapping[str, list[str]], data["concrete_models"])
+        app_configs_data = cast(Mapping[str, Mapping[str, object]], data["installed_app_configs"])
+
+        installed_models_modules: dict[protocols.ImportPath, protocols.Module] = {}
+        all_models: dict[protocols.ImportPath, protocols.Model] = {}
+
+        for module_import_path, models_data in modules_data.items():
+            defined_models: dict[protocols.ImportPath, protocols.Model] = {}
+            for model_data in models_data:
+                model_import_path = ImportPath(str(model_data["import_path"]))
+                default_custom_queryset = model_data["default_custom_queryset"]
+                fields = cast(Mapping[str, list[str | None]], model_data["fields"])
+                defined_models[model_import_path] = django_analysis.Model(
+                    model_name=str(model_data["model_name"]),
+                    module_import_path=ImportPath(str(model_data["module_import_path"])),
+                    import_path=model_import_path,
+                    is_abstract=bool(model_data["is_abstract"]),
+                    default_custom_queryset=(
+                        None
+                        if default_custom_queryset is None
+                        else ImportPath(str(default_custom_queryset))
+                    ),
+                    all_fields={
+                        name: django_analysis.Field(
+                            model_import_path=model_import_path,
+                            field_type=ImportPath(str(field_type)),
+                            related_model=(
+                                None if related_model is None else ImportPath(related_model)
+                            ),
+                        )
+                        for name, (field_type, related_model) in fields.items()
+                    },
+                    models_in_mro=[
+                        ImportPath(path) for path in cast(list[str], model_data["models_in_mro"])
+                    ],
+                )
+
+            module = django_analysis.Module(
+                import_path=ImportPath(module_import_path), defined_models=defined_models
+            )
+            installed_models_modules[module.import_path] = module
+            all_models.update(module.defined_models)
+
+        return Discovered(
+            loaded_project=DeferredLoaded(project=project),
+            all_models=all_models,
+            installed_apps=list(cast(list[str], data["installed_apps"])),
+            installed_app_configs={
+                entry: django_analysis.InstalledApp(
+                    name=str(app_data["name"]),
+                    models_modules=frozenset(
+                        ImportPath(path) for path in cast(list[str], app_data["models_modules"])
+                    ),
+                )
+                for entry, app_data in app_configs_data.items()
+            },
+            settings_types=dict(cast(Mapping[str, str], data["settings_types"])),
+            installed_models_modules=installed_models_modules,
+            concrete_models={
+                ImportPath(import_path): [all_models[ImportPath(path)] for path in concrete]
+                for import_path, concrete in concrete_data.items()
+            },
+        )
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class VersionCache:
+    """
+    Stores the version of a report along with a fingerprint of everything that went into
+    making that report, so that the version can be known without loading Django when
+    none of that has changed.
+    """
+
+    location: pathlib.Path
+    hasher: protocols.Hasher
+
+    def read(self, *, extra: Mapping[str, str]) -> str | None:
+        """
+        Return the stored version if the fingerprint it was stored with is still current
+        """
+        data = _read_json(self.location)
+        if data is None:
+            return None
+
+        try:
+            version = data["version"]
+            fingerprint = Fingerprint.from_json(cast(Mapping[str, object], data["fingerprint"]))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        if not isinstance(version, str) or not fingerprint.is_current(
+            hasher=self.hasher, extra=extra
+        ):
+            return None
+
+        return version
+
+    def write(self, *, version: str, fingerprint: Fingerprint) -> None:
+        _write_json(
+            self.location,
+            {
+                "cache_format": CACHE_FORMAT,
+                "version": version,
+                "fingerprint": fingerprint.for_json(),
+            },
+        )
+
+
+if TYPE_CHECKING:
+    _DL: protocols.P_Loaded = cast(DeferredLoaded[protocols.P_Project], None)
+    _DC: protocols.P_DiscoveryCache = cast(DiscoveryCache[protocols.P_Project], None)
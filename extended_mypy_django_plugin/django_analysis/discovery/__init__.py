@@ -1,15 +1,45 @@
+import importlib
+from typing import TYPE_CHECKING
+
+from . import module_specs
 from .concrete_models import ConcreteModelsDiscovery
-from .container import Discovery
 from .import_path import ImportPath, InvalidImportPath
-from .known_models import DefaultInstalledModulesDiscovery, make_module_creator
-from .settings_types import NaiveSettingsTypesDiscovery
+from .settings_types import VALUED_SETTINGS, NaiveSettingsTypesDiscovery
+
+if TYPE_CHECKING:
+    from .container import Discovery
+    from .installed_apps import DefaultInstalledAppsDiscovery
+    from .known_models import DefaultInstalledModulesDiscovery, make_module_creator
+    from .static_models import StaticInstalledModulesDiscovery, UnresolvableModules
 
 __all__ = [
+    "VALUED_SETTINGS",
     "ConcreteModelsDiscovery",
+    "DefaultInstalledAppsDiscovery",
     "DefaultInstalledModulesDiscovery",
     "Discovery",
     "ImportPath",
     "InvalidImportPath",
     "NaiveSettingsTypesDiscovery",
+    "StaticInstalledModulesDiscovery",
+    "UnresolvableModules",
     "make_module_creator",
+    "module_specs",
 ]
+
+# These import Django, so they are only imported when they are used
+_NEEDS_DJANGO = {
+    "Discovery": "container",
+    "DefaultInstalledAppsDiscovery": "installed_apps",
+    "DefaultInstalledModulesDiscovery": "known_models",
+    "make_module_creator": "known_models",
+    "StaticInstalledModulesDiscovery": "static_models",
+    "UnresolvableModules": "static_models",
+}
+
+
+def __getattr__(name: str) -> object:
+    if name in _NEEDS_DJANGO:
+        return getattr(importlib.import_module(f"{__name__}.{_NEEDS_DJANGO[name]}"), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,7 +2,7 @@ import dataclasses
 from typing import TYPE_CHECKING, Generic, cast
 
 from .. import protocols
-from . import concrete_models, known_models, settings_types
+from . import concrete_models, installed_apps, known_models, settings_types
 
 
 @dataclasses.dataclass
@@ -16,6 +16,9 @@ class Discovery(Generic[protocols.T_Project]):
     discover_concrete_models: protocols.ConcreteModelsDiscovery[protocols.T_Project] = (
         dataclasses.field(default_factory=concrete_models.ConcreteModelsDiscovery)
     )
+    discover_installed_apps: protocols.InstalledAppsDiscovery[protocols.T_Project] = (
+        dataclasses.field(default_factory=installed_apps.DefaultInstalledAppsDiscovery)
+    )
 
 
 if TYPE_CHECKING:
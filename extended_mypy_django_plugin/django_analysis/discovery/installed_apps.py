@@ -0,0 +1,96 @@
+import dataclasses
+from collections import defaultdict
+from typing import TYPE_CHECKING, Generic, cast
+
+from .. import protocols
+from . import static_models
+from .import_path import ImportPath
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class DefaultInstalledAppsDiscovery(Generic[protocols.T_Project]):
+    """
+    Uses the apps registry when it is populated. Otherwise the AppConfig for each entry is
+    found by parsing the source of the installed apps, and the registry is only populated
+    if that can't be understood.
+
+    Without the registry, a module with models belongs to the app with the longest name that
+    contains it, which is what Django does for models that don't set an ``app_label``.
+    """
+
+    def __call__(
+        self,
+        loaded_project: protocols.Loaded[protocols.T_Project],
+        installed_models_modules: protocols.ModelModulesMap,
+        /,
+    ) -> protocols.InstalledAppsMap:
+        installed_apps = list(loaded_project.settings.INSTALLED_APPS)
+        if not loaded_project.apps.ready:
+            with loaded_project.project.setup_sys_path_and_env_vars():
+                try:
+                    names = static_models.determine_app_names(
+                        settings=loaded_project.settings, installed_apps=installed_apps
+                    )
+                except static_models.UnresolvableModules:
+                    loaded_project.apps.populate(installed_apps)
+                else:
+                    return self.from_names(names, installed_models_modules)
+
+        return self.from_registry(loaded_project, installed_apps)
+
+    def from_registry(
+        self, loaded_project: protocols.Loaded[protocols.T_Project], installed_apps: list[str]
+    ) -> protocols.InstalledAppsMap:
+        from extended_mypy_django_plugin import django_analysis
+
+        result: dict[str, protocols.InstalledApp] = {}
+        # The registry has one AppConfig for each entry, in the order they are installed
+        for entry, config in zip(
+            installed_apps, loaded_project.apps.get_app_configs(), strict=True
+        ):
+            models_modules = {
+                ImportPath.cls_module(model)
+                for model in config.get_models(include_auto_created=True, include_swapped=True)
+            }
+            if config.models_module is not None:
+                models_modules.add(ImportPath.from_module(config.models_module))
+
+            result[entry] = django_analysis.InstalledApp(
+                name=config.name, models_modules=frozenset(models_modules)
+            )
+
+        return result
+
+    def from_names(
+        self, names: dict[str, str], installed_models_modules: protocols.ModelModulesMap
+    ) -> protocols.InstalledAppsMap:
+        from extended_mypy_django_plugin import django_analysis
+
+        models_modules: dict[str, set[protocols.ImportPath]] = defaultdict(set)
+        for import_path, module in installed_models_modules.items():
+            containing = [
+                name
+                for name in names.values()
+                if import_path.startswith(f"{name}.") or import_path == name
+            ]
+            if not containing:
+                continue
+
+            name = max(containing, key=len)
+            if import_path == f"{name}.models" or any(
+                not model.is_abstract for model in module.defined_models.values()
+            ):
+                models_modules[name].add(import_path)
+
+        return {
+            entry: django_analysis.InstalledApp(
+                name=name, models_modules=frozenset(models_modules[name])
+            )
+            for entry, name in names.items()
+        }
+
+
+if TYPE_CHECKING:
+    _IAD: protocols.P_InstalledAppsDiscovery = cast(
+        DefaultInstalledAppsDiscovery[protocols.P_Project], None
+    )
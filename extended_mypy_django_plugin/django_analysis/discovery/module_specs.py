@@ -0,0 +1,337 @@
+import ast
+import dataclasses
+import functools
+import importlib.machinery
+import os
+import pathlib
+import sys
+from collections.abc import Iterable, Iterator, Mapping, Sequence, Set
+
+
+def find_spec(import_path: str) -> importlib.machinery.ModuleSpec | None:
+    """
+    Return the spec for a module without importing it or any of its parents.
+
+    Parent packages that are already in ``sys.modules`` are used as they are, otherwise their
+    location is found using the path finder so that their ``__init__`` isn't executed, as that
+    may require Django to already be loaded.
+    """
+    search_locations: list[str] | None = None
+    parts = import_path.split(".")
+    spec: importlib.machinery.ModuleSpec | None = None
+    for i, part in enumerate(parts):
+        name = ".".join(parts[: i + 1])
+        module = sys.modules.get(name)
+        if module is not None:
+            spec = module.__spec__
+        else:
+            spec = importlib.machinery.PathFinder.find_spec(name, search_locations)
+
+        if spec is None:
+            return None
+
+        if i < len(parts) - 1:
+            if spec.submodule_search_locations is None:
+                return None
+            search_locations = list(spec.submodule_search_locations)
+
+    return spec
+
+
+def possible_locations(import_path: str) -> list[pathlib.Path]:
+    """
+    Return the files that would make a module that can't be found exist if they were created.
+
+    When the parent package can't be found either, the files that would make that package
+    exist are returned instead.
+    """
+    parent, _, name = import_path.rpartition(".")
+    search_locations: list[str] = sys.path
+    if parent:
+        spec = find_spec(parent)
+        if spec is None:
+            return possible_locations(parent)
+        if spec.submodule_search_locations is None:
+            return []
+        search_locations = list(spec.submodule_search_locations)
+
+    return [
+        pathlib.Path(location or ".").absolute() / filename
+        for location in search_locations
+        for filename in [
+            *(f"{name}{suffix}" for suffix in _SUFFIXES),
+            *(os.path.join(name, f"__init__{suffix}") for suffix in _SUFFIXES),
+        ]
+    ]
+
+
+def imports_in(import_path: str, *, within: pathlib.Path) -> Set[str]:
+    """
+    Return the modules that the source of a module imports, without importing it.
+
+    This includes the packages those modules are in, names imported from a package that are
+    modules themselves, and imports that are only for type checking or are inside functions,
+    as mypy follows all of those. Nothing is returned for modules that aren't a source file
+    inside ``within``.
+    """
+    spec = find_spec(import_path)
+    if spec is None or spec.origin is None or not spec.origin.endswith(".py"):
+        return frozenset()
+
+    location = pathlib.Path(spec.origin).resolve()
+    if not location.is_relative_to(within.resolve()):
+        return frozenset()
+
+    try:
+        tree = ast.parse(location.read_bytes(), filename=str(location))
+    except (OSError, SyntaxError, ValueError):
+        return frozenset()
+
+    package = _package_of(import_path, spec)
+
+    found: set[str] = set()
+
+    def add(name: str) -> None:
+        parts = name.split(".")
+        found.update(".".join(parts[: i + 1]) for i in range(len(parts)))
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                add(alias.name)
+
+        elif isinstance(node, ast.ImportFrom):
+            base = _imported_from(node, package)
+            if not base:
+                continue
+
+            add(base)
+            for alias in node.names:
+                if alias.name != "*" and module_exists(f"{base}.{alias.name}"):
+                    found.add(f"{base}.{alias.name}")
+
+    found.discard(import_path)
+    return found
+
+
+def imported_names(import_path: str, *, mentioning: Iterable[str] = ()) -> Mapping[str, str]:
+    """
+    Return what the names a module gets from its imports refer to, without importing it.
+
+    Keys are the names as they are in that module and values are the full name of what was
+    imported, so ``from one import two as three`` gives ``{"three": "one.two"}``. Imports
+    inside functions and classes don't make names on the module and star imports can't be
+    known, so neither are included.
+
+    When ``mentioning`` is given, nothing is returned for a module whose source doesn't
+    mention any of those strings, which avoids parsing modules that can't be interesting.
+    """
+    spec = find_spec(import_path)
+    if spec is None or spec.origin is None or not spec.origin.endswith((".py", ".pyi")):
+        return {}
+
+    try:
+        modified = os.stat(spec.origin).st_mtime_ns
+    except OSError:
+        return {}
+
+    return _imported_names(
+        spec.origin,
+        modified,
+        tuple(_package_of(import_path, spec)),
+        frozenset(mentioning),
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _imported_names(
+    origin: str, modified: int, package: tuple[str, ...], mentioning: frozenset[str]
+) -> Mapping[str, str]:
+    """
+    Cached by when the file was modified so that changes are seen by a long running process
+    """
+    try:
+        source = pathlib.Path(origin).read_bytes()
+    except OSError:
+        return {}
+
+    if mentioning and not any(want.encode() in source for want in mentioning):
+        return {}
+
+    try:
+        tree = ast.parse(source, filename=origin)
+    except (SyntaxError, ValueError):
+        return {}
+
+    found: dict[str, str] = {}
+    for node in _module_level(tree.body):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname is not None:
+                    found[alias.asname] = alias.name
+                else:
+                    top = alias.name.split(".")[0]
+                    found[top] = top
+
+        elif isinstance(node, ast.ImportFrom):
+            base = _imported_from(node, list(package))
+            if not base:
+                continue
+
+            for alias in node.names:
+                if alias.name != "*":
+                    found[alias.asname or alias.name] = f"{base}.{alias.name}"
+
+    return found
+
+
+def _module_level(body: Sequence[ast.stmt]) -> Iterator[ast.stmt]:
+    """
+    Yield the statements that run in the namespace of the module, including those inside
+    blocks like ``if TYPE_CHECKING:`` and ``try``
+    """
+    for node in body:
+        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef):
+            continue
+
+        yield node
+        for field in ("body", "orelse", "finalbody"):
+            yield from _module_level(getattr(node, field, []))
+        for handler in getattr(node, "handlers", []):
+            yield from _module_level(handler.body)
+
+
+def _package_of(import_path: str, spec: importlib.machinery.ModuleSpec) -> list[str]:
+    """
+    Return the parts of the package that relative imports in this module are relative to
+    """
+    package = import_path.split(".")
+    if spec.submodule_search_locations is None:
+        package = package[:-1]
+    return package
+
+
+def _imported_from(node: ast.ImportFrom, package: list[str]) -> str:
+    """
+    Return the full name of the module a ``from ... import`` imports from, or an empty
+    string if it is relative to further up than the package goes
+    """
+    if not node.level:
+        return node.module or ""
+
+    if node.level - 1 > len(package):
+        return ""
+
+    return ".".join([*package[: len(package) - (node.level - 1)], *filter(None, [node.module])])
+
+
+def module_exists(import_path: str) -> bool:
+    """
+    Return whether a module can be found without importing it or any of its parents.
+    """
+    return find_spec(import_path) is not None
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class ModuleIndex:
+    """
+    Answers whether modules exist by looking at listings of the folders they could be in,
+    where each folder is only listed once for the life of the index.
+
+    Nothing is imported and nothing is executed. Modules already in ``sys.modules`` and
+    builtin modules always exist, and anything that needs a location that isn't a folder,
+    like a zip file, is answered by ``module_exists`` instead.
+    """
+
+    search_path: Sequence[str] = dataclasses.field(default_factory=lambda: list(sys.path))
+
+    _listings: dict[str, frozenset[str] | None] = dataclasses.field(
+        init=False, default_factory=dict
+    )
+    _found: dict[str, bool] = dataclasses.field(init=False, default_factory=dict)
+
+    def __call__(self, import_path: str, /) -> bool:
+        if import_path not in self._found:
+            self._found[import_path] = self._exists(import_path)
+        return self._found[import_path]
+
+    def _exists(self, import_path: str) -> bool:
+        if import_path in sys.modules or import_path in sys.builtin_module_names:
+            return True
+
+        parts = import_path.split(".")
+        search_locations: Sequence[str] = self.search_path
+        for i, part in enumerate(parts):
+            name = ".".join(parts[: i + 1])
+            module = sys.modules.get(name)
+            if module is not None and module.__spec__ is not None:
+                found = module.__spec__.submodule_search_locations
+                if i == len(parts) - 1:
+                    return True
+                if found is None:
+                    return False
+                search_locations = list(found)
+                continue
+
+            package_locations = self._find(part, search_locations)
+            if package_locations is None:
+                # Could be somewhere only the path finder knows how to look
+                if any(self._listing(location) is None for location in search_locations):
+                    return module_exists(import_path)
+                return False
+
+            if i < len(parts) - 1:
+                if not package_locations:
+                    return False
+                search_locations = package_locations
+
+        return True
+
+    def _find(self, part: str, search_locations: Sequence[str]) -> list[str] | None:
+        """
+        Return None if this part can't be found in these locations.
+
+        Otherwise return where to find submodules, which is empty for a module that
+        isn't a package.
+        """
+        namespace: list[str] = []
+        for location in search_locations:
+            listing = self._listing(location)
+            if listing is None:
+                continue
+
+            if part in listing:
+                package = os.path.join(location, part)
+                if any(
+                    f"__init__{suffix}" in (self._listing(package) or ()) for suffix in _SUFFIXES
+                ):
+                    return [package]
+                if any(f"{part}{suffix}" in listing for suffix in _SUFFIXES):
+                    return []
+                if self._listing(package) is not None:
+                    namespace.append(package)
+                    continue
+
+            if any(f"{part}{suffix}" in listing for suffix in _SUFFIXES):
+                return []
+
+        if namespace:
+            return namespace
+
+        return None
+
+    def _listing(self, location: str) -> frozenset[str] | None:
+        """
+        Return what is in this folder, or None if it isn't a folder
+        """
+        if location not in self._listings:
+            try:
+                self._listings[location] = frozenset(os.listdir(location or "."))
+            except FileNotFoundError:
+                self._listings[location] = frozenset()
+            except OSError:
+                self._listings[location] = None
+        return self._listings[location]
+
+
+_SUFFIXES = tuple(importlib.machinery.all_suffixes())
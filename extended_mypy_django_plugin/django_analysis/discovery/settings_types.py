@@ -3,12 +3,17 @@ from typing import TYPE_CHECKING, Generic, cast
 
 from .. import protocols
 
+# django-stubs reads the values of these settings rather than only checking they exist
+VALUED_SETTINGS = frozenset({"AUTH_USER_MODEL", "DEFAULT_AUTO_FIELD"})
+
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class NaiveSettingsTypesDiscovery(Generic[protocols.T_Project]):
     """
     The default implementation is a little naive and is only able to rely on inspecting
     the values on the settings object.
+
+    The settings in ``VALUED_SETTINGS`` are represented by a ``Literal`` of their value.
     """
 
     def __call__(
@@ -35,6 +40,8 @@ class NaiveSettingsTypesDiscovery(Generic[protocols.T_Project]):
     def type_from_setting(
         self, *, loaded_project: protocols.Loaded[protocols.T_Project], name: str, value: object
     ) -> str:
+        if name in VALUED_SETTINGS and isinstance(value, str):
+            return f"Literal[{value!r}]"
         return str(type(value))
 
 
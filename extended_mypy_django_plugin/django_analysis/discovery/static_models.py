@@ -0,0 +1,1644 @@
+from __future__ import annotations
+
+import ast
+import builtins
+import dataclasses
+import itertools
+import pathlib
+import sys
+import types
+from collections import defaultdict
+from collections.abc import Iterator, Mapping, Sequence
+from typing import TYPE_CHECKING, Generic, Literal, cast
+
+from django.apps import AppConfig
+from django.conf import LazySettings
+from django.db import models
+from django.db.models.base import ModelBase
+from django.db.models.fields import related
+from django.db.models.manager import BaseManager
+
+from .. import protocols
+from . import known_models, module_specs
+from .import_path import ImportPath
+
+# Fields that are contributed to the model as private fields rather than local fields
+_PRIVATE_FIELDS = {"django.contrib.contenttypes.fields.GenericForeignKey"}
+
+
+class UnresolvableModules(Exception):
+    """
+    Raised when static discovery could not determine the models in some modules
+    """
+
+    def __init__(self, reasons: Mapping[str, str]) -> None:
+        self.reasons = reasons
+        super().__init__(
+            "Failed to statically discover models: "
+            + ", ".join(f"{name}: {reason}" for name, reason in sorted(reasons.items()))
+        )
+
+
+class _Unresolvable(Exception):
+    """
+    Raised when something can't be determined without executing the code it comes from
+    """
+
+
+class _NotAClass(_Unresolvable):
+    """
+    Raised when a name refers to something that is definitely not a class
+    """
+
+
+class _Missing(Exception):
+    """
+    Raised when a name is not defined in a module
+    """
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _ImportBinding:
+    module: str
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _ImportFromBinding:
+    module: str
+    name: str
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _ClassBinding:
+    node: ast.ClassDef
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _AssignBinding:
+    value: ast.expr
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _FunctionBinding:
+    pass
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _OpaqueBinding:
+    reason: str
+
+
+_Binding = (
+    _ImportBinding
+    | _ImportFromBinding
+    | _ClassBinding
+    | _AssignBinding
+    | _FunctionBinding
+    | _OpaqueBinding
+)
+
+
+def _is_type_checking(test: ast.expr) -> bool:
+    return (isinstance(test, ast.Name) and test.id == "TYPE_CHECKING") or (
+        isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING"
+    )
+
+
+def _flatten(body: Sequence[ast.stmt]) -> Iterator[ast.stmt]:
+    """
+    Yield the statements that are executed when this body is executed.
+
+    Both sides of an ``if`` are included unless it's a ``TYPE_CHECKING`` block, and only the
+    successful path of a ``try`` statement is included.
+    """
+    for stmt in body:
+        if isinstance(stmt, ast.If):
+            if not _is_type_checking(stmt.test):
+                yield from _flatten(stmt.body)
+            yield from _flatten(stmt.orelse)
+        elif isinstance(stmt, ast.Try):
+            yield from _flatten(stmt.body)
+            yield from _flatten(stmt.orelse)
+            yield from _flatten(stmt.finalbody)
+        elif isinstance(stmt, ast.With):
+            yield from _flatten(stmt.body)
+        else:
+            yield stmt
+
+
+def _target_names(target: ast.expr) -> Iterator[str]:
+    for node in ast.walk(target):
+        if isinstance(node, ast.Name):
+            yield node.id
+
+
+def _body_names(stmt: ast.stmt) -> set[str]:
+    if isinstance(stmt, ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef):
+        return {stmt.name}
+    elif isinstance(stmt, ast.Assign):
+        return {name for target in stmt.targets for name in _target_names(target)}
+    elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+        return set(_target_names(stmt.target))
+    return set()
+
+
+def _resolve_relative(import_path: str, *, is_package: bool, stmt: ast.ImportFrom) -> str:
+    if not stmt.level:
+        return stmt.module or ""
+    package = import_path if is_package else import_path.rpartition(".")[0]
+    for _ in range(stmt.level - 1):
+        package = package.rpartition(".")[0]
+    return f"{package}.{stmt.module}" if stmt.module else package
+
+
+def _c3(head: _ClassNode, sequences: list[list[_ClassNode]]) -> list[_ClassNode]:
+    result: list[_ClassNode] = [head]
+    sequences = [list(sequence) for sequence in sequences if sequence]
+    while sequences:
+        for sequence in sequences:
+            candidate = sequence[0]
+            if not any(candidate in other[1:] for other in sequences):
+                break
+        else:
+            raise _Unresolvable(f"Inconsistent method resolution order for {head}")
+
+        result.append(candidate)
+        sequences = [
+            remaining
+            for remaining in ((s[1:] if s[0] is candidate else s) for s in sequences)
+            if remaining
+        ]
+    return result
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class _ModuleScope:
+    """
+    The top level statements and names of a module that was parsed rather than imported
+    """
+
+    import_path: str
+    is_package: bool
+    location: pathlib.Path | None
+    statements: Sequence[ast.stmt]
+    bindings: Mapping[str, Sequence[tuple[int, _Binding]]]
+    star_imports: Sequence[tuple[int, str]]
+
+    @classmethod
+    def parse(
+        cls, *, import_path: str, is_package: bool, location: pathlib.Path | None
+    ) -> _ModuleScope:
+        statements: list[ast.stmt] = []
+        if location is not None:
+            try:
+                tree = ast.parse(location.read_bytes(), filename=str(location))
+            except (OSError, SyntaxError, ValueError) as error:
+                raise _Unresolvable(f"Failed to parse {location}: {error}") from error
+            statements = list(_flatten(tree.body))
+
+        bindings: dict[str, list[tuple[int, _Binding]]] = defaultdict(list)
+        star_imports: list[tuple[int, str]] = []
+
+        for index, stmt in enumerate(statements):
+            if isinstance(stmt, ast.Import):
+                for alias in stmt.names:
+                    if alias.asname:
+                        bindings[alias.asname].append((index, _ImportBinding(module=alias.name)))
+                    else:
+                        top = alias.name.split(".", 1)[0]
+                        bindings[top].append((index, _ImportBinding(module=top)))
+            elif isinstance(stmt, ast.ImportFrom):
+                module = _resolve_relative(import_path, is_package=is_package, stmt=stmt)
+                for alias in stmt.names:
+                    if alias.name == "*":
+                        star_imports.append((index, module))
+                    else:
+                        bindings[alias.asname or alias.name].append(
+                            (index, _ImportFromBinding(module=module, name=alias.name))
+                        )
+            elif isinstance(stmt, ast.ClassDef):
+                bindings[stmt.name].append((index, _ClassBinding(node=stmt)))
+            elif isinstance(stmt, ast.FunctionDef | ast.AsyncFunctionDef):
+                bindings[stmt.name].append((index, _FunctionBinding()))
+            elif isinstance(stmt, ast.Assign):
+                for target in stmt.targets:
+                    if isinstance(target, ast.Name):
+                        bindings[target.id].append((index, _AssignBinding(value=stmt.value)))
+                    else:
+                        for name in _target_names(target):
+                            bindings[name].append((index, _OpaqueBinding(reason="unpacking")))
+            elif isinstance(stmt, ast.AnnAssign):
+                if isinstance(stmt.target, ast.Name) and stmt.value is not None:
+                    bindings[stmt.target.id].append((index, _AssignBinding(value=stmt.value)))
+            elif isinstance(stmt, ast.AugAssign | ast.For | ast.AsyncFor):
+                for name in _target_names(stmt.target):
+                    bindings[name].append((index, _OpaqueBinding(reason="reassignment")))
+            elif isinstance(stmt, ast.Delete):
+                for target in stmt.targets:
+                    for name in _target_names(target):
+                        bindings[name].append((index, _OpaqueBinding(reason="deletion")))
+
+        return cls(
+            import_path=import_path,
+            is_package=is_package,
+            location=location,
+            statements=statements,
+            bindings=bindings,
+            star_imports=star_imports,
+        )
+
+    def resolve_relative(self, stmt: ast.ImportFrom) -> str:
+        return _resolve_relative(self.import_path, is_package=self.is_package, stmt=stmt)
+
+    def binding(self, name: str, *, before: int | None) -> tuple[int, _Binding] | None:
+        found: tuple[int, _Binding] | None = None
+        for index, binding in self.bindings.get(name, ()):
+            if before is not None and index >= before:
+                break
+            found = (index, binding)
+        return found
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class _StaticClass:
+    """
+    A class defined in a module that was parsed rather than imported
+    """
+
+    scope: _ModuleScope
+    node: ast.ClassDef
+    position: int
+    outer: _StaticClass | None = None
+
+    @property
+    def qualname(self) -> str:
+        if self.outer is None:
+            return self.node.name
+        return f"{self.outer.qualname}.{self.node.name}"
+
+    @property
+    def import_path(self) -> protocols.ImportPath:
+        return ImportPath(f"{self.scope.import_path}.{self.qualname}")
+
+    def body_binding(self, name: str, *, before: int | None = None) -> tuple[int, ast.stmt] | None:
+        found: tuple[int, ast.stmt] | None = None
+        for index, stmt in enumerate(self.node.body):
+            if before is not None and index >= before:
+                break
+            if name in _body_names(stmt):
+                found = (index, stmt)
+        return found
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class _Runtime:
+    value: object
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _ModuleRef:
+    import_path: str
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class _FromQuerySet:
+    """
+    The class made by ``Manager.from_queryset(QuerySet)``
+    """
+
+    base: _ClassNode
+    queryset: _Value
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class _AsManager:
+    """
+    The manager made by ``QuerySet.as_manager()``
+    """
+
+    queryset: _ClassNode
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class _Instance:
+    """
+    An instance of a class made in a parsed module
+    """
+
+    cls: _ClassNode
+    call: ast.Call
+    context: _Context
+
+
+_ClassNode = type | _StaticClass | _FromQuerySet
+_Value = _Runtime | _ModuleRef | _StaticClass | _FromQuerySet | _AsManager | _Instance
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _Context:
+    """
+    Where an expression is evaluated from
+    """
+
+    scope: _ModuleScope
+    position: int | None
+    local: _StaticClass | None = None
+    local_position: int | None = None
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _App:
+    name: str
+    label: str
+    default_auto_field: str | None
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class _Field:
+    """
+    A field that Django would add to a model
+    """
+
+    name: str
+    field_type: protocols.ImportPath
+    kind: Literal["field", "private", "fk", "o2o", "m2m"]
+    key: tuple[int, ...]
+    rel_class: type | None = None
+    primary_key: bool = False
+    to: str | _StaticClass | None = None
+    related_name: str | None = None
+    related_query_name: str | None = None
+    parent_link: bool = False
+    has_through: bool = False
+    symmetrical: bool | None = None
+
+    @property
+    def is_relation(self) -> bool:
+        return self.kind in ("fk", "o2o", "m2m")
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class _Declared:
+    """
+    The fields and managers in the body of a model class
+    """
+
+    fields: Sequence[_Field]
+    managers: Sequence[tuple[str, _Value]]
+    names: set[str]
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class _Local:
+    """
+    Equivalent to the local fields and parents on the ``_meta`` of a model
+    """
+
+    fields: Sequence[_Field]
+    many_to_many: Sequence[_Field]
+    private: Sequence[_Field]
+    contributed_many_to_many: Sequence[_Field]
+    parents: Mapping[_Model, _Field | None]
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class _Model:
+    cls: _StaticClass
+    is_abstract: bool
+    is_proxy: bool
+    app_label: str | None
+    meta: _StaticClass | None
+    model_bases: Sequence[_StaticClass]
+
+    @property
+    def object_name(self) -> str:
+        return self.cls.node.name
+
+    @property
+    def model_name(self) -> str:
+        return self.object_name.lower()
+
+    @property
+    def import_path(self) -> protocols.ImportPath:
+        return self.cls.import_path
+
+    @property
+    def module_import_path(self) -> protocols.ImportPath:
+        return ImportPath(self.cls.scope.import_path)
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class _Entry:
+    """
+    Something that would be returned from ``Model._meta.get_fields()``
+    """
+
+    name: str
+    field_type: protocols.ImportPath
+    related_model: protocols.ImportPath | None
+    parent_link: bool = False
+    on_model: _Model | None = None
+
+
+class _Analysis:
+    """
+    The state for a single run of static discovery
+    """
+
+    def __init__(self, *, settings: LazySettings) -> None:
+        self.settings = settings
+        self.apps: list[_App] = []
+        self.app_names: set[str] = set()
+        self.unresolved: dict[str, str] = {}
+
+        self._modules: dict[str, _ModuleScope | types.ModuleType | None] = {}
+        self._classes: dict[int, _StaticClass] = {}
+        self._values: dict[tuple[int, int], _Value] = {}
+        self._evaluating: set[tuple[int, int]] = set()
+        self._linearized: dict[int, list[_ClassNode]] = {}
+        self._counters: dict[_StaticClass, int] = {}
+        self._counter = itertools.count()
+        self._auto_counter = itertools.count()
+        self._models: dict[_StaticClass, _Model] = {}
+        self._declared: dict[_Model, _Declared] = {}
+        self._local: dict[_Model, _Local] = {}
+        self._executed: set[str] = set()
+        self._registered: dict[str, list[_Model]] = defaultdict(list)
+        self._registry: dict[tuple[str, str], _Model] = {}
+        self._relation_tree: dict[_Model, list[_Entry]] = defaultdict(list)
+        self._fields: dict[tuple[_Model, bool], list[_Entry]] = {}
+
+    def reset(self) -> None:
+        self._modules.clear()
+        self._classes.clear()
+        self._values.clear()
+        self._linearized.clear()
+
+    # Modules
+
+    def in_apps(self, import_path: str) -> bool:
+        return any(
+            import_path == name or import_path.startswith(f"{name}.") for name in self.app_names
+        )
+
+    def module(self, import_path: str) -> _ModuleScope | types.ModuleType | None:
+        """
+        Modules in installed apps are always parsed so that it doesn't matter if they have
+        already been imported. Other modules are used as they are if already imported, or
+        parsed otherwise.
+        """
+        if import_path in self._modules:
+            return self._modules[import_path]
+
+        found: _ModuleScope | types.ModuleType | None
+        if not self.in_apps(import_path) and import_path in sys.modules:
+            found = sys.modules[import_path]
+        elif (spec := module_specs.find_spec(import_path)) is None:
+            found = None
+        elif spec.origin is not None and spec.origin.endswith(".py"):
+            found = _ModuleScope.parse(
+                import_path=import_path,
+                is_package=spec.submodule_search_locations is not None,
+                location=pathlib.Path(spec.origin),
+            )
+        elif spec.submodule_search_locations is not None and spec.origin in (None, "namespace"):
+            found = _ModuleScope.parse(import_path=import_path, is_package=True, location=None)
+        elif import_path in sys.modules:
+            found = sys.modules[import_path]
+        else:
+            raise _Unresolvable(f"Can't parse {import_path}")
+
+        self._modules[import_path] = found
+        return found
+
+    def static_class(self, scope: _ModuleScope, node: ast.ClassDef) -> _StaticClass:
+        if (found := self._classes.get(id(node))) is None:
+            position = next(
+                (i for i, stmt in enumerate(scope.statements) if stmt is node),
+                len(scope.statements),
+            )
+            found = self._classes[id(node)] = _StaticClass(
+                scope=scope, node=node, position=position
+            )
+        return found
+
+    def nested_class(self, outer: _StaticClass, node: ast.ClassDef) -> _StaticClass:
+        if (found := self._classes.get(id(node))) is None:
+            found = self._classes[id(node)] = _StaticClass(
+                scope=outer.scope, node=node, position=outer.position, outer=outer
+            )
+        return found
+
+    def from_runtime(self, value: object) -> _Value:
+        if isinstance(value, types.ModuleType):
+            return _ModuleRef(import_path=value.__name__)
+
+        if isinstance(value, ModelBase) and value is not models.Model:
+            # Always use the definition so the result doesn't depend on what was imported
+            scope = self.module(value.__module__)
+            if isinstance(scope, _ModuleScope):
+                binding = scope.binding(value.__qualname__, before=None)
+                if binding is not None and isinstance(binding[1], _ClassBinding):
+                    return self.static_class(scope, binding[1].node)
+            raise _Unresolvable(f"Can't find where {ImportPath.from_cls(value)} is defined")
+
+        return _Runtime(value=value)
+
+    def resolve_from(self, module: str, name: str) -> _Value:
+        """
+        Resolve ``from {module} import {name}``
+        """
+        found = self.module(module)
+        if found is None:
+            raise _Unresolvable(f"Can't find {module}")
+
+        if isinstance(found, types.ModuleType):
+            if hasattr(found, name):
+                return self.from_runtime(getattr(found, name))
+        else:
+            binding = found.binding(name, before=None)
+            if binding is not None:
+                return self.evaluate_binding(found, *binding)
+
+            for _, star in reversed(found.star_imports):
+                try:
+                    return self.resolve_from(star, name)
+                except _Missing:
+                    pass
+
+        if module_specs.module_exists(f"{module}.{name}"):
+            return _ModuleRef(import_path=f"{module}.{name}")
+
+        raise _Missing(f"{module} has no {name}")
+
+    def resolve_dotted(self, path: str) -> _Value:
+        module, _, name = path.rpartition(".")
+        try:
+            return self.resolve_from(module, name)
+        except _Missing as error:
+            raise _Unresolvable(str(error)) from error
+
+    # Evaluation
+
+    def evaluate_binding(self, scope: _ModuleScope, index: int, binding: _Binding) -> _Value:
+        if isinstance(binding, _ImportBinding):
+            return _ModuleRef(import_path=binding.module)
+        elif isinstance(binding, _ImportFromBinding):
+            try:
+                return self.resolve_from(binding.module, binding.name)
+            except _Missing as error:
+                raise _Unresolvable(str(error)) from error
+        elif isinstance(binding, _ClassBinding):
+            return self.static_class(scope, binding.node)
+        elif isinstance(binding, _FunctionBinding):
+            raise _NotAClass(f"Can't statically evaluate functions in {scope.import_path}")
+        elif isinstance(binding, _OpaqueBinding):
+            raise _Unresolvable(f"Can't statically follow {binding.reason} in {scope.import_path}")
+
+        key = (id(scope), index)
+        if (found := self._values.get(key)) is not None:
+            return found
+
+        if key in self._evaluating:
+            raise _Unresolvable(f"Recursive definition in {scope.import_path}")
+        self._evaluating.add(key)
+        try:
+            found = self._values[key] = self.evaluate(
+                binding.value, _Context(scope=scope, position=index)
+            )
+        finally:
+            self._evaluating.discard(key)
+        return found
+
+    def lookup(self, name: str, context: _Context) -> _Value:
+        if context.local is not None:
+            found = context.local.body_binding(name, before=context.local_position)
+            if found is not None:
+                return self.class_body_value(context.local, *found)
+
+        scope = context.scope
+        binding = scope.binding(name, before=context.position)
+        if binding is not None:
+            return self.evaluate_binding(scope, *binding)
+
+        for index, star in reversed(scope.star_imports):
+            if context.position is not None and index >= context.position:
+                continue
+            try:
+                return self.resolve_from(star, name)
+            except _Missing:
+                pass
+
+        if hasattr(builtins, name):
+            return _Runtime(value=getattr(builtins, name))
+
+        raise _Unresolvable(f"Can't find {name} in {scope.import_path}")
+
+    def class_body_value(self, cls: _StaticClass, index: int, stmt: ast.stmt) -> _Value:
+        if isinstance(stmt, ast.ClassDef):
+            return self.nested_class(cls, stmt)
+        elif isinstance(stmt, ast.Assign | ast.AnnAssign) and stmt.value is not None:
+            if isinstance(stmt, ast.Assign) and not all(
+                isinstance(target, ast.Name) for target in stmt.targets
+            ):
+                raise _Unresolvable(f"Can't statically follow unpacking in {cls.import_path}")
+            return self.evaluate(
+                stmt.value,
+                _Context(scope=cls.scope, position=cls.position, local=cls, local_position=index),
+            )
+        raise _NotAClass(f"Can't statically evaluate functions in {cls.import_path}")
+
+    def evaluate(self, expr: ast.expr, context: _Context) -> _Value:
+        if isinstance(expr, ast.Constant):
+            return _Runtime(value=expr.value)
+        elif isinstance(expr, ast.Name):
+            return self.lookup(expr.id, context)
+        elif isinstance(expr, ast.Attribute):
+            return self.attribute(self.evaluate(expr.value, context), expr.attr)
+        elif isinstance(expr, ast.Subscript):
+            # Only generic classes are supported, and the type arguments don't matter
+            return self.evaluate(expr.value, context)
+        elif isinstance(expr, ast.Call):
+            return self.call(expr, context)
+        raise _Unresolvable(f"Can't statically evaluate {ast.unparse(expr)}")
+
+    def attribute(self, value: _Value, name: str) -> _Value:
+        if isinstance(value, _ModuleRef):
+            try:
+                return self.resolve_from(value.import_path, name)
+            except _Missing as error:
+                raise _Unresolvable(str(error)) from error
+        elif isinstance(value, _Runtime):
+            try:
+                return self.from_runtime(getattr(value.value, name))
+            except AttributeError as error:
+                raise _Unresolvable(str(error)) from error
+        elif isinstance(value, _StaticClass):
+            for node in self.linearize(value):
+                if isinstance(node, _StaticClass):
+                    if (found := node.body_binding(name)) is not None:
+                        return self.class_body_value(node, *found)
+                elif isinstance(node, type) and name in vars(node):
+                    return self.from_runtime(getattr(node, name))
+        raise _Unresolvable(f"Can't statically find {name}")
+
+    def call(self, expr: ast.Call, context: _Context) -> _Value:
+        func = expr.func
+        if isinstance(func, ast.Attribute) and func.attr in ("as_manager", "from_queryset"):
+            receiver = self.as_class(self.evaluate(func.value, context))
+            if func.attr == "as_manager" and self.is_subclass(receiver, models.QuerySet):
+                return _AsManager(queryset=receiver)
+            elif func.attr == "from_queryset" and self.is_manager_class(receiver) and expr.args:
+                return _FromQuerySet(base=receiver, queryset=self.evaluate(expr.args[0], context))
+
+        return _Instance(
+            cls=self.as_class(self.evaluate(func, context)), call=expr, context=context
+        )
+
+    def as_class(self, value: _Value) -> _ClassNode:
+        if isinstance(value, _Runtime) and isinstance(value.value, type):
+            return value.value
+        elif isinstance(value, _StaticClass | _FromQuerySet):
+            return value
+        raise _NotAClass("Expected a class")
+
+    def constant(self, value: _Value, *, name: str) -> object:
+        if not isinstance(value, _Runtime):
+            raise _Unresolvable(f"Expected {name} to be a constant")
+        return value.value
+
+    # Classes
+
+    def linearize(self, node: _ClassNode) -> list[_ClassNode]:
+        """
+        Return the method resolution order for this class
+        """
+        if isinstance(node, type):
+            return list(node.__mro__)
+        elif isinstance(node, _FromQuerySet):
+            return [node, *self.linearize(node.base)]
+
+        if (found := self._linearized.get(id(node))) is not None:
+            if not found:
+                raise _Unresolvable(f"{node.import_path} inherits from itself")
+            return found
+
+        self._linearized[id(node)] = []
+        try:
+            context = _Context(scope=node.scope, position=node.position, local=node.outer)
+            bases = [self.as_class(self.evaluate(base, context)) for base in node.node.bases]
+            if not bases:
+                bases = [object]
+            if any(keyword.arg == "metaclass" for keyword in node.node.keywords):
+                raise _Unresolvable(f"Can't statically follow metaclasses on {node.import_path}")
+            result = _c3(node, [*(self.linearize(base) for base in bases), bases])
+        except BaseException:
+            del self._linearized[id(node)]
+            raise
+
+        self._linearized[id(node)] = result
+        return result
+
+    def is_subclass(self, node: _ClassNode, parent: type) -> bool:
+        return any(
+            isinstance(found, type) and issubclass(found, parent) for found in self.linearize(node)
+        )
+
+    def is_model(self, node: _ClassNode) -> bool:
+        return isinstance(node, _StaticClass) and self.is_subclass(node, models.Model)
+
+    def is_manager_class(self, node: _ClassNode) -> bool:
+        return any(
+            isinstance(found, _FromQuerySet)
+            or (isinstance(found, type) and issubclass(found, BaseManager))
+            for found in self.linearize(node)
+        )
+
+    def class_path(self, node: _ClassNode) -> protocols.ImportPath:
+        if isinstance(node, type):
+            return ImportPath.from_cls(node)
+        elif isinstance(node, _StaticClass):
+            return node.import_path
+        raise _Unresolvable("Classes made by from_queryset have no import path")
+
+    def class_attribute(self, node: _ClassNode, name: str, default: object = None) -> object:
+        """
+        Return the constant value of a class attribute
+        """
+        for found in self.linearize(node):
+            if isinstance(found, _StaticClass):
+                if found.body_binding(name) is not None:
+                    return self.constant(self.attribute(found, name), name=name)
+            elif isinstance(found, type) and name in vars(found):
+                return vars(found)[name]
+        return default
+
+    def classes_in(self, module: _ModuleScope) -> Iterator[tuple[str, _ClassNode]]:
+        """
+        Yield the classes in a module in the same order as ``inspect.getmembers``
+        """
+        for name in sorted(module.bindings):
+            binding = module.binding(name, before=None)
+            if binding is None:
+                continue
+            try:
+                yield name, self.as_class(self.evaluate_binding(module, *binding))
+            except _NotAClass:
+                pass
+            except _Unresolvable:
+                if not isinstance(binding[1], _AssignBinding):
+                    raise
+
+    def counter(self, cls: _StaticClass) -> int:
+        if (found := self._counters.get(cls)) is None:
+            found = self._counters[cls] = next(self._counter)
+        return found
+
+    # Apps
+
+    def determine_apps(self, installed_apps: Sequence[str]) -> None:
+        # Make sure the apps modules are parsed even if they have already been imported
+        self.app_names = {entry for entry in installed_apps if module_specs.module_exists(entry)}
+
+        for entry in installed_apps:
+            try:
+                app = self.determine_app(entry)
+            except (_Unresolvable, _Missing) as error:
+                self.unresolved[entry] = str(error)
+            else:
+                self.apps.append(app)
+
+        # Anything looked at before the apps were known may not have been parsed
+        self.app_names = {app.name for app in self.apps}
+        self.reset()
+
+    def determine_app(self, entry: str) -> _App:
+        """
+        Equivalent to ``AppConfig.create``
+        """
+        config: _ClassNode | None = None
+        if module_specs.module_exists(entry):
+            apps_module_name = f"{entry}.apps"
+            if module_specs.module_exists(apps_module_name):
+                apps_module = self.module(apps_module_name)
+                candidates: list[_ClassNode] = []
+                if isinstance(apps_module, _ModuleScope):
+                    for _, node in self.classes_in(apps_module):
+                        if node is AppConfig or not self.is_subclass(node, AppConfig):
+                            continue
+                        if self.class_attribute(node, "default", True):
+                            candidates.append(node)
+
+                if len(candidates) == 1:
+                    config = candidates[0]
+                else:
+                    defaults = [c for c in candidates if self.class_attribute(c, "default", False)]
+                    if len(defaults) > 1:
+                        raise _Unresolvable(f"{apps_module_name} has multiple default configs")
+                    elif defaults:
+                        config = defaults[0]
+
+            if config is None:
+                return _App(name=entry, label=entry.rpartition(".")[2], default_auto_field=None)
+        else:
+            config = self.as_class(self.resolve_dotted(entry))
+            if not self.is_subclass(config, AppConfig):
+                raise _Unresolvable(f"{entry} isn't an AppConfig")
+
+        name = self.class_attribute(config, "name")
+        if not isinstance(name, str):
+            raise _Unresolvable(f"Can't determine the name of the app for {entry}")
+
+        label = self.class_attribute(config, "label", name.rpartition(".")[2])
+        if not isinstance(label, str):
+            raise _Unresolvable(f"Can't determine the label of the app for {entry}")
+
+        # AppConfig defines this with a cached_property that defers to settings
+        default_auto_field = self.class_attribute(config, "default_auto_field")
+        return _App(
+            name=name,
+            label=label,
+            default_auto_field=default_auto_field if isinstance(default_auto_field, str) else None,
+        )
+
+    def containing_app(self, import_path: str) -> _App | None:
+        candidates = [
+            app
+            for app in self.apps
+            if import_path == app.name or import_path.startswith(f"{app.name}.")
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda app: len(app.name))
+
+    # Executing modules
+
+    def execute(self, import_path: str) -> None:
+        """
+        Follow the imports that would happen if this module were imported and register the
+        models that would be created along the way.
+
+        Only modules inside installed apps are followed.
+        """
+        if import_path in self._executed:
+            return
+        self._executed.add(import_path)
+
+        if "." in import_path:
+            self.execute(import_path.rpartition(".")[0])
+
+        if not self.in_apps(import_path):
+            return
+
+        try:
+            scope = self.module(import_path)
+        except _Unresolvable as error:
+            self.unresolved[import_path] = str(error)
+            return
+
+        if not isinstance(scope, _ModuleScope):
+            return
+
+        for stmt in scope.statements:
+            if isinstance(stmt, ast.Import):
+                for alias in stmt.names:
+                    self.execute(alias.name)
+            elif isinstance(stmt, ast.ImportFrom):
+                base = scope.resolve_relative(stmt)
+                self.execute(base)
+                base_scope = self._modules.get(base)
+                for alias in stmt.names:
+                    if alias.name == "*":
+                        continue
+                    if isinstance(base_scope, _ModuleScope) and alias.name in base_scope.bindings:
+                        continue
+                    submodule = f"{base}.{alias.name}"
+                    if self.in_apps(submodule) and module_specs.module_exists(submodule):
+                        self.execute(submodule)
+            elif isinstance(stmt, ast.ClassDef):
+                self.create_class(self.static_class(scope, stmt))
+
+    def create_class(self, cls: _StaticClass) -> None:
+        try:
+            if not self.is_model(cls):
+                return
+            model = self.model(cls)
+        except (_Unresolvable, RecursionError) as error:
+            if self.might_be_model(cls):
+                self.unresolved[cls.scope.import_path] = str(error)
+            return
+
+        if model.is_abstract:
+            return
+
+        if model.app_label is None:
+            self.unresolved[cls.scope.import_path] = (
+                f"{model.import_path} isn't in an application in INSTALLED_APPS"
+            )
+            return
+
+        self._registered[model.app_label].append(model)
+        self._registry[(model.app_label, model.model_name)] = model
+
+    def might_be_model(self, cls: _StaticClass) -> bool:
+        """
+        Used to decide if a class that couldn't be understood could be a model.
+        """
+        path = cls.scope.import_path
+        return (
+            cls.body_binding("Meta") is not None or path.endswith(".models") or ".models." in path
+        )
+
+    # Models
+
+    def model(self, cls: _StaticClass) -> _Model:
+        if (found := self._models.get(cls)) is not None:
+            return found
+
+        mro = self.linearize(cls)
+        for base in reversed(mro[1:]):
+            if isinstance(base, _StaticClass) and self.is_model(base):
+                self.model(base)
+
+        context = _Context(scope=cls.scope, position=cls.position, local=cls.outer)
+        model_bases: list[_StaticClass] = []
+        for base_expr in cls.node.bases:
+            model_base = self.as_class(self.evaluate(base_expr, context))
+            if isinstance(model_base, _StaticClass) and self.is_model(model_base):
+                model_bases.append(model_base)
+
+        self.counter(cls)
+
+        own_meta: _StaticClass | None = None
+        if (found_meta := cls.body_binding("Meta")) is not None:
+            if not isinstance(found_meta[1], ast.ClassDef):
+                raise _Unresolvable(f"Expected Meta on {cls.import_path} to be a class")
+            own_meta = self.nested_class(cls, found_meta[1])
+
+        # Only the Meta in the body of the class decides if the model is abstract
+        is_abstract = False
+        if own_meta is not None and own_meta.body_binding("abstract") is not None:
+            is_abstract = bool(self.class_attribute(own_meta, "abstract", False))
+
+        # Otherwise the Meta is inherited from abstract parents
+        meta = own_meta
+        if meta is None:
+            for base in mro[1:]:
+                if isinstance(base, _StaticClass) and self.is_model(base):
+                    if (parent := self.model(base)).is_abstract and parent.meta is not None:
+                        meta = parent.meta
+                        break
+
+        app_label = self.meta_attribute(meta, "app_label")
+        if app_label is None:
+            app = self.containing_app(cls.scope.import_path)
+            app_label = None if app is None else app.label
+        elif not isinstance(app_label, str):
+            raise _Unresolvable(f"Expected app_label on {cls.import_path} to be a string")
+
+        model = self._models[cls] = _Model(
+            cls=cls,
+            is_abstract=is_abstract,
+            is_proxy=bool(self.meta_attribute(meta, "proxy", False)),
+            app_label=app_label,
+            meta=meta,
+            model_bases=model_bases,
+        )
+        return model
+
+    def meta_attribute(
+        self, meta: _StaticClass | None, name: str, default: object = None
+    ) -> object:
+        if meta is None:
+            return default
+        return self.class_attribute(meta, name, default)
+
+    def is_swapped(self, model: _Model) -> bool:
+        swappable = self.meta_attribute(model.meta, "swappable")
+        if not isinstance(swappable, str):
+            return False
+        swapped_for = getattr(self.settings, swappable, None)
+        if not isinstance(swapped_for, str):
+            return False
+        return swapped_for.lower() != f"{model.app_label}.{model.model_name}".lower()
+
+    def concrete(self, model: _Model) -> _Model:
+        if not model.is_proxy:
+            return model
+        for base in self.linearize(model.cls)[1:]:
+            if isinstance(base, _StaticClass) and self.is_model(base):
+                if not (found := self.model(base)).is_abstract:
+                    return self.concrete(found)
+        raise _Unresolvable(f"Proxy model {model.import_path} has no concrete parent")
+
+    def class_names(self, node: _ClassNode) -> set[str]:
+        if isinstance(node, type):
+            return set(vars(node))
+        elif isinstance(node, _StaticClass):
+            return {name for stmt in node.node.body for name in _body_names(stmt)}
+        return set()
+
+    def declared(self, model: _Model) -> _Declared:
+        if (found := self._declared.get(model)) is not None:
+            return found
+
+        cls = model.cls
+        class_counter = self.counter(cls)
+        fields: list[_Field] = []
+        managers: list[tuple[str, _Value]] = []
+        names: set[str] = set()
+
+        for index, stmt in enumerate(cls.node.body):
+            names |= _body_names(stmt)
+            if isinstance(stmt, ast.Assign):
+                if len(stmt.targets) != 1 or not isinstance(stmt.targets[0], ast.Name):
+                    continue
+                name, value_expr = stmt.targets[0].id, stmt.value
+            elif isinstance(stmt, ast.AnnAssign):
+                if not isinstance(stmt.target, ast.Name) or stmt.value is None:
+                    continue
+                name, value_expr = stmt.target.id, stmt.value
+            else:
+                continue
+
+            if not isinstance(value_expr, ast.Call):
+                continue
+
+            value = self.class_body_value(cls, index, stmt)
+            if isinstance(value, _AsManager):
+                managers.append((name, value))
+            elif isinstance(value, _Instance):
+                if self.is_manager_class(value.cls):
+                    managers.append((name, value))
+                elif self.is_subclass(value.cls, models.Field) or self.is_private_field(value.cls):
+                    fields.append(
+                        self.field(name=name, instance=value, key=(1, class_counter, index))
+                    )
+
+        found = self._declared[model] = _Declared(fields=fields, managers=managers, names=names)
+        return found
+
+    def is_private_field(self, node: _ClassNode) -> bool:
+        return any(
+            isinstance(found, type | _StaticClass) and self.class_path(found) in _PRIVATE_FIELDS
+            for found in self.linearize(node)
+        )
+
+    def field(self, *, name: str, instance: _Instance, key: tuple[int, ...]) -> _Field:
+        field_type = self.class_path(instance.cls)
+        if self.is_private_field(instance.cls):
+            return _Field(name=name, field_type=field_type, kind="private", key=key)
+
+        ancestor = next(
+            node
+            for node in self.linearize(instance.cls)
+            if isinstance(node, type) and issubclass(node, models.Field)
+        )
+
+        call = instance.call
+        keywords = {keyword.arg: keyword.value for keyword in call.keywords}
+        dynamic_arguments = None in keywords or any(
+            isinstance(arg, ast.Starred) for arg in call.args
+        )
+
+        def argument(arg: str, default: object = None) -> object:
+            if dynamic_arguments:
+                raise _Unresolvable(f"Can't statically determine arguments for {name}")
+            if arg not in keywords:
+                return default
+            return self.constant(self.evaluate(keywords[arg], instance.context), name=arg)
+
+        kind: Literal["fk", "o2o", "m2m"]
+        if issubclass(ancestor, related.ManyToManyField):
+            kind = "m2m"
+        elif issubclass(ancestor, related.OneToOneField):
+            kind = "o2o"
+        elif issubclass(ancestor, related.ForeignKey):
+            kind = "fk"
+        elif issubclass(ancestor, related.RelatedField):
+            raise _Unresolvable(f"Can't statically represent {field_type}")
+        else:
+            return _Field(
+                name=name,
+                field_type=field_type,
+                kind="field",
+                key=key,
+                primary_key=bool(argument("primary_key", False)),
+            )
+
+        to_expr = keywords.get("to", call.args[0] if call.args else None)
+        if dynamic_arguments or to_expr is None:
+            raise _Unresolvable(f"Can't determine what {name} is related to")
+
+        to = self.evaluate(to_expr, instance.context)
+        target: str | _StaticClass
+        if isinstance(to, _Runtime) and isinstance(to.value, str):
+            target = to.value
+        elif isinstance(to, _StaticClass) and self.is_model(to):
+            target = to
+        else:
+            raise _Unresolvable(f"Can't determine what {name} is related to")
+
+        related_name = argument("related_name")
+        related_query_name = argument("related_query_name")
+        if not isinstance(related_name, str | None) or not isinstance(
+            related_query_name, str | None
+        ):
+            raise _Unresolvable(f"Expected the related names for {name} to be strings")
+
+        symmetrical = argument("symmetrical")
+        return _Field(
+            name=name,
+            field_type=field_type,
+            kind=kind,
+            key=key,
+            rel_class=cast(type, ancestor.rel_class),
+            primary_key=bool(argument("primary_key", False)),
+            to=target,
+            related_name=related_name,
+            related_query_name=related_query_name,
+            parent_link=bool(argument("parent_link", False)),
+            has_through="through" in keywords,
+            symmetrical=symmetrical if isinstance(symmetrical, bool) else None,
+        )
+
+    def resolve_relation(self, model: _Model, to: str | _StaticClass) -> _Model:
+        if isinstance(to, _StaticClass):
+            return self.model(to)
+        elif to == "self":
+            return model
+
+        app_label, _, model_name = to.rpartition(".")
+        found = self._registry.get((app_label or model.app_label or "", model_name.lower()))
+        if found is None:
+            raise _Unresolvable(f"Can't find {to} as related to from {model.import_path}")
+        return found
+
+    def local(self, model: _Model) -> _Local:
+        """
+        Determine the fields that ``ModelBase`` would put on this model
+        """
+        if (found := self._local.get(model)) is not None:
+            return found
+
+        declared = self.declared(model)
+        field_names = {field.name for field in declared.fields}
+        blocked = set(declared.names)
+        inherited: set[str] = set()
+
+        fields = [field for field in declared.fields if field.kind in ("field", "fk", "o2o")]
+        many_to_many = [field for field in declared.fields if field.kind == "m2m"]
+        contributed = list(many_to_many)
+        private = [field for field in declared.fields if field.kind == "private"]
+        parents: dict[_Model, _Field | None] = {}
+
+        parent_links: dict[_Model, _Field] = {}
+        for cls in reversed([model.cls, *model.model_bases]):
+            cls_model = self.model(cls)
+            if cls is not model.cls and not cls_model.is_abstract:
+                continue
+            for field in fields if cls is model.cls else self.local(cls_model).fields:
+                if field.kind == "o2o" and field.parent_link and field.to is not None:
+                    parent_links[self.concrete(self.resolve_relation(model, field.to))] = field
+
+        for base in self.linearize(model.cls):
+            if not isinstance(base, _StaticClass) or base not in model.model_bases:
+                inherited |= self.class_names(base)
+                continue
+
+            base_model = self.model(base)
+            base_local = self.local(base_model)
+            if not base_model.is_abstract:
+                inherited |= {
+                    field.name for field in [*base_local.fields, *base_local.many_to_many]
+                }
+                concrete = self.concrete(base_model)
+                if concrete in parent_links:
+                    parents[concrete] = parent_links[concrete]
+                elif not model.is_proxy:
+                    ptr = _Field(
+                        name=f"{concrete.model_name}_ptr",
+                        field_type=ImportPath.from_cls(related.OneToOneField),
+                        kind="o2o",
+                        key=(0, -next(self._auto_counter)),
+                        rel_class=related.OneToOneField.rel_class,
+                        primary_key=True,
+                        to=concrete.cls,
+                        parent_link=True,
+                    )
+                    fields.append(ptr)
+                    parents[concrete] = ptr
+                else:
+                    parents[concrete] = None
+            else:
+                for field in [*base_local.fields, *base_local.many_to_many]:
+                    if (
+                        field.name not in field_names
+                        and field.name not in blocked
+                        and field.name not in inherited
+                    ):
+                        blocked.add(field.name)
+                        if field.kind == "m2m":
+                            many_to_many.append(field)
+                            contributed.append(field)
+                        else:
+                            fields.append(field)
+                parents.update(base_local.parents)
+
+            for field in base_local.private:
+                if field.name not in field_names:
+                    private.append(field)
+
+        if not model.is_abstract and not model.is_proxy and not parents:
+            if not any(field.primary_key for field in fields):
+                app = self.containing_app(model.cls.scope.import_path)
+                auto_field = (app and app.default_auto_field) or self.settings.DEFAULT_AUTO_FIELD
+                fields.append(
+                    _Field(
+                        name="id",
+                        field_type=self.class_path(self.as_class(self.resolve_dotted(auto_field))),
+                        kind="field",
+                        key=(0, -next(self._auto_counter)),
+                        primary_key=True,
+                    )
+                )
+
+        found = self._local[model] = _Local(
+            fields=sorted(fields, key=lambda field: field.key),
+            many_to_many=sorted(many_to_many, key=lambda field: field.key),
+            private=private,
+            contributed_many_to_many=contributed,
+            parents=parents,
+        )
+        return found
+
+    def related_name(self, field: _Field, model: _Model) -> str | None:
+        """
+        Equivalent to what ``RelatedField.contribute_to_class`` does with the related_name
+        """
+        related_name = field.related_name
+        if field.kind == "m2m":
+            symmetrical = (
+                field.symmetrical if field.symmetrical is not None else field.to == "self"
+            )
+            if symmetrical and field.to in ("self", model.object_name):
+                return f"{field.name}_rel_+"
+            elif related_name is not None and related_name.endswith("+"):
+                return f"_{model.app_label}_{model.object_name.lower()}_{field.name}_+"
+
+        if not related_name:
+            default_related_name = self.meta_attribute(model.meta, "default_related_name")
+            related_name = default_related_name if isinstance(default_related_name, str) else None
+
+        if related_name:
+            related_name %= {
+                "class": model.object_name.lower(),
+                "model_name": model.model_name,
+                "app_label": (model.app_label or "").lower(),
+            }
+        return related_name
+
+    def related_query_name(self, field: _Field, model: _Model) -> str:
+        related_query_name = field.related_query_name
+        if related_query_name:
+            related_query_name %= {
+                "class": model.object_name.lower(),
+                "app_label": (model.app_label or "").lower(),
+            }
+        return related_query_name or self.related_name(field, model) or model.model_name
+
+    def build_relation_tree(self) -> None:
+        """
+        Equivalent to ``Options._populate_directed_relation_graph``
+
+        Auto created through models for many to many fields are registered before the model
+        that defines the field.
+        """
+        many_to_one = ImportPath.from_cls(related.ForeignKey.rel_class)
+        for app in self.apps:
+            for model in self._registered[app.label]:
+                try:
+                    if self.is_swapped(model):
+                        continue
+
+                    local = self.local(model)
+                    for field in local.contributed_many_to_many:
+                        if field.has_through or field.to is None:
+                            continue
+                        target = self.resolve_relation(model, field.to)
+                        for side in (model, target):
+                            self._relation_tree[self.concrete(side)].append(
+                                _Entry(
+                                    name=f"{model.object_name}_{field.name}+",
+                                    field_type=many_to_one,
+                                    related_model=None,
+                                )
+                            )
+
+                    for field in [*local.fields, *local.many_to_many]:
+                        if not field.is_relation or field.to is None:
+                            continue
+                        target = self.concrete(self.resolve_relation(model, field.to))
+                        self._relation_tree[target].append(
+                            _Entry(
+                                name=self.related_query_name(field, model),
+                                field_type=ImportPath.from_cls(cast(type, field.rel_class)),
+                                related_model=model.import_path,
+                                parent_link=field.parent_link,
+                                on_model=target,
+                            )
+                        )
+                except (_Unresolvable, RecursionError) as error:
+                    self.unresolved[model.module_import_path] = str(error)
+
+    def get_fields(self, model: _Model, *, topmost: bool = True) -> list[_Entry]:
+        """
+        Equivalent to ``model._meta.get_fields(include_parents=True, include_hidden=True)``
+        """
+        if (found := self._fields.get((model, topmost))) is not None:
+            return found
+
+        local = self.local(model)
+        result: list[_Entry] = []
+        for parent in local.parents:
+            for entry in self.get_fields(parent, topmost=False):
+                if not entry.parent_link or entry.on_model is self.concrete(model):
+                    result.append(entry)
+
+        if not model.is_proxy and not model.is_abstract:
+            result.extend(self._relation_tree.get(model, []))
+
+        forward = [*local.fields, *local.many_to_many]
+        if topmost:
+            forward.extend(local.private)
+
+        for field in forward:
+            related_model: protocols.ImportPath | None = None
+            if field.is_relation and field.to is not None:
+                if not model.is_abstract:
+                    related_model = self.resolve_relation(model, field.to).import_path
+                elif isinstance(field.to, _StaticClass):
+                    related_model = field.to.import_path
+            result.append(
+                _Entry(name=field.name, field_type=field.field_type, related_model=related_model)
+            )
+
+        self._fields[(model, topmost)] = result
+        return result
+
+    def managers(self, model: _Model) -> list[tuple[str, _Value | None]]:
+        """
+        Equivalent to ``model._meta.managers`` where ``None`` represents the manager Django
+        adds when a concrete model has no managers.
+        """
+        found: list[tuple[int, int, str, _Value | None]] = []
+        seen: set[str] = set()
+        mro = [
+            self.model(node)
+            for node in self.linearize(model.cls)
+            if isinstance(node, _StaticClass) and self.is_model(node)
+        ]
+        for depth, parent in enumerate(mro):
+            local: Sequence[tuple[str, _Value | None]] = self.declared(parent).managers
+            if not local and parent is not model and not parent.is_abstract:
+                if not self.managers(parent):
+                    local = [("objects", None)]
+            for index, (name, manager) in enumerate(local):
+                if name not in seen:
+                    seen.add(name)
+                    found.append((depth, index, name, manager))
+
+        return [(name, manager) for _, _, name, manager in sorted(found, key=lambda m: m[:2])]
+
+    def default_custom_queryset(self, model: _Model) -> protocols.ImportPath | None:
+        """
+        Equivalent to finding the queryset class on ``model._meta.default_manager``
+        """
+        managers = self.managers(model)
+        default_manager_name = self.meta_attribute(model.meta, "default_manager_name")
+        if not default_manager_name and not self.declared(model).managers:
+            for node in self.linearize(model.cls)[1:]:
+                if isinstance(node, _StaticClass) and self.is_model(node):
+                    default_manager_name = self.meta_attribute(
+                        self.model(node).meta, "default_manager_name"
+                    )
+                    break
+
+        if default_manager_name:
+            found = [manager for name, manager in managers if name == default_manager_name]
+            if not found:
+                raise _Unresolvable(f"Can't find the default manager for {model.import_path}")
+            manager = found[0]
+        elif managers:
+            manager = managers[0][1]
+        else:
+            return None
+
+        queryset: _Value | None = None
+        if manager is None:
+            return None
+        elif isinstance(manager, _AsManager):
+            if isinstance(manager.queryset, type):
+                queryset = _Runtime(value=manager.queryset)
+            else:
+                queryset = manager.queryset
+        elif isinstance(manager, _Instance):
+            for node in self.linearize(manager.cls):
+                if isinstance(node, _FromQuerySet):
+                    queryset = node.queryset
+                elif isinstance(node, _StaticClass) and node.body_binding("_queryset_class"):
+                    queryset = self.attribute(node, "_queryset_class")
+                elif isinstance(node, type) and "_queryset_class" in vars(node):
+                    queryset = _Runtime(value=vars(node)["_queryset_class"])
+                else:
+                    continue
+                break
+
+        if queryset is None:
+            raise _Unresolvable(f"Can't find the default queryset for {model.import_path}")
+        elif isinstance(queryset, _Runtime):
+            if queryset.value is models.QuerySet or not isinstance(queryset.value, type):
+                return None
+            return ImportPath.from_cls(queryset.value)
+        elif isinstance(queryset, _StaticClass):
+            return queryset.import_path
+        raise _Unresolvable(f"Can't find the default queryset for {model.import_path}")
+
+    # Result
+
+    def models_in(self, import_path: str) -> list[_Model]:
+        """
+        Equivalent to finding models with ``dir()`` on the module
+        """
+        scope = self.module(import_path)
+        if not isinstance(scope, _ModuleScope):
+            raise _Unresolvable(f"Can't parse {import_path}")
+
+        found: dict[_StaticClass, _Model] = {}
+        for _, node in self.classes_in(scope):
+            if isinstance(node, _StaticClass) and node.scope is scope and self.is_model(node):
+                found[node] = self.model(node)
+        return list(found.values())
+
+    def discover(self, installed_apps: Sequence[str]) -> dict[str, list[_Model]]:
+        self.determine_apps(installed_apps)
+        for app in self.apps:
+            self.execute(app.name)
+            if module_specs.module_exists(f"{app.name}.apps"):
+                self.execute(f"{app.name}.apps")
+        for app in self.apps:
+            if module_specs.module_exists(f"{app.name}.models"):
+                self.execute(f"{app.name}.models")
+
+        self.build_relation_tree()
+        if self.unresolved:
+            return {}
+
+        found: dict[str, list[_Model]] = defaultdict(list)
+        for app in self.apps:
+            for model in self._registered[app.label]:
+                if not self.is_swapped(model):
+                    found[model.module_import_path].append(model)
+
+        result: dict[str, list[_Model]] = {}
+        for import_path, registered in found.items():
+            result[import_path] = [
+                *(model for model in self.models_in(import_path) if model.is_abstract),
+                *registered,
+            ]
+
+        for app in self.apps:
+            import_path = f"{app.name}.models"
+            if import_path not in result and module_specs.module_exists(import_path):
+                result[import_path] = [
+                    model for model in self.models_in(import_path) if model.is_abstract
+                ]
+
+        changed = True
+        while changed:
+            changed = False
+            for defined in list(result.values()):
+                for model in defined:
+                    for parent in self.models_in_mro(model):
+                        if (import_path := parent.module_import_path) not in result:
+                            changed = True
+                            result[import_path] = self.models_in(import_path)
+
+        return result
+
+    def models_in_mro(self, model: _Model) -> list[_Model]:
+        return [
+            self.model(node)
+            for node in self.linearize(model.cls)[1:]
+            if isinstance(node, _StaticClass) and self.is_model(node)
+        ]
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class StaticInstalledModulesDiscovery(Generic[protocols.T_Project]):
+    """
+    Used to discover installed models by parsing the source of the installed apps rather
+    than importing them, so that the apps don't need to be populated.
+
+    Django settings are still used to find the installed apps and some values on them, and
+    code outside of the installed apps that is already imported is used as it is.
+
+    If anything can't be understood without executing it, then Django is fully loaded and
+    ``fallback`` is used instead. Because reverse relations mean the fields on a model
+    depend on every installed models module, the fallback replaces the whole result rather
+    than only the modules that couldn't be understood.
+    """
+
+    fallback: protocols.InstalledModelsDiscovery[protocols.T_Project] = dataclasses.field(
+        default_factory=known_models.DefaultInstalledModulesDiscovery
+    )
+
+    def __call__(
+        self, loaded_project: protocols.Loaded[protocols.T_Project], /
+    ) -> protocols.ModelModulesMap:
+        with loaded_project.project.setup_sys_path_and_env_vars():
+            try:
+                return self.discover_statically(loaded_project)
+            except UnresolvableModules:
+                loaded_project.apps.populate(loaded_project.settings.INSTALLED_APPS)
+                return self.fallback(loaded_project)
+
+    def discover_statically(
+        self, loaded_project: protocols.Loaded[protocols.T_Project], /
+    ) -> protocols.ModelModulesMap:
+        """
+        Raises UnresolvableModules if anything couldn't be understood statically
+        """
+        from extended_mypy_django_plugin import django_analysis
+
+        analysis = _Analysis(settings=loaded_project.settings)
+        try:
+            found = analysis.discover(loaded_project.settings.INSTALLED_APPS)
+        except (_Unresolvable, _Missing, RecursionError) as error:
+            raise UnresolvableModules({**analysis.unresolved, "": str(error)}) from error
+
+        if analysis.unresolved:
+            raise UnresolvableModules(analysis.unresolved)
+
+        result: dict[protocols.ImportPath, protocols.Module] = {}
+        for import_path, defined in found.items():
+            defined_models: dict[protocols.ImportPath, protocols.Model] = {}
+            for model in defined:
+                try:
+                    defined_models[model.import_path] = django_analysis.Model(
+                        model_name=model.cls.qualname,
+                        module_import_path=model.module_import_path,
+                        import_path=model.import_path,
+                        is_abstract=model.is_abstract,
+                        default_custom_queryset=analysis.default_custom_queryset(model),
+                        all_fields={
+                            entry.name: django_analysis.Field(
+                                model_import_path=model.import_path,
+                                field_type=entry.field_type,
+                                related_model=entry.related_model,
+                            )
+                            for entry in analysis.get_fields(model)
+                        },
+                        models_in_mro=[
+                            parent.import_path for parent in analysis.models_in_mro(model)
+                        ],
+                    )
+                except (_Unresolvable, _Missing, RecursionError) as error:
+                    raise UnresolvableModules({import_path: str(error)}) from error
+
+            module = django_analysis.Module(
+                import_path=ImportPath(import_path), defined_models=defined_models
+            )
+            result[module.import_path] = module
+
+        return result
+
+
+def determine_app_names(
+    *, settings: LazySettings, installed_apps: Sequence[str]
+) -> dict[str, str]:
+    """
+    Return the ``AppConfig.name`` for each entry in INSTALLED_APPS without populating the apps.
+
+    Raises UnresolvableModules if the AppConfig for any entry couldn't be understood statically
+    """
+    analysis = _Analysis(settings=settings)
+    analysis.app_names = {entry for entry in installed_apps if module_specs.module_exists(entry)}
+
+    names: dict[str, str] = {}
+    for entry in installed_apps:
+        try:
+            names[entry] = analysis.determine_app(entry).name
+        except (_Unresolvable, _Missing, RecursionError) as error:
+            analysis.unresolved[entry] = str(error)
+
+    if analysis.unresolved:
+        raise UnresolvableModules(analysis.unresolved)
+
+    return names
+
+
+if TYPE_CHECKING:
+    _SIM: protocols.P_InstalledModelsDiscovery = cast(
+        StaticInstalledModulesDiscovery[protocols.P_Project], None
+    )
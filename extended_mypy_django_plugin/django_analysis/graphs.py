@@ -0,0 +1,62 @@
+from collections.abc import Callable, Container, Hashable, Iterable, Iterator, Sequence
+from typing import TypeVar
+
+T_Node = TypeVar("T_Node", bound=Hashable)
+
+
+def strongly_connected_components(
+    roots: Iterable[T_Node],
+    related: Callable[[T_Node], Sequence[T_Node]],
+    *,
+    known: Container[T_Node] = (),
+) -> Iterator[list[T_Node]]:
+    """
+    Yield the strongly connected components reachable from these roots.
+
+    Tarjan's algorithm without recursion, so each component is yielded after every component
+    it relates to. Nodes in ``known`` are treated as already yielded and aren't followed, and
+    ``known`` may be added to while components are yielded.
+    """
+    index: dict[T_Node, int] = {}
+    lowlink: dict[T_Node, int] = {}
+    stack: list[T_Node] = []
+    on_stack: set[T_Node] = set()
+
+    for root in roots:
+        if root in index or root in known:
+            continue
+
+        work: list[tuple[T_Node, int]] = [(root, 0)]
+        while work:
+            node, position = work.pop()
+            if position == 0:
+                index[node] = lowlink[node] = len(index)
+                stack.append(node)
+                on_stack.add(node)
+
+            edges = related(node)
+            while position < len(edges):
+                nxt = edges[position]
+                position += 1
+                if nxt in known:
+                    continue
+                if nxt not in index:
+                    work.append((node, position))
+                    work.append((nxt, 0))
+                    break
+                if nxt in on_stack:
+                    lowlink[node] = min(lowlink[node], index[nxt])
+            else:
+                if lowlink[node] == index[node]:
+                    component: list[T_Node] = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    yield component
+
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
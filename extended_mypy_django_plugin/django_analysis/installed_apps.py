@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Set
+from typing import TYPE_CHECKING, cast
+
+from extended_mypy_django_plugin.django_analysis import protocols
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class InstalledApp:
+    name: str
+    models_modules: Set[protocols.ImportPath]
+
+
+if TYPE_CHECKING:
+    _IA: protocols.InstalledApp = cast(InstalledApp, None)
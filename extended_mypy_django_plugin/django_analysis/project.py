@@ -9,12 +9,14 @@ import types
 from collections.abc import Iterator, Mapping, Sequence
 from typing import TYPE_CHECKING, Generic, cast
 
-from django.apps.registry import Apps
-from django.conf import LazySettings
 from typing_extensions import Self
 
 from . import protocols
 
+if TYPE_CHECKING:
+    from django.apps.registry import Apps
+    from django.conf import LazySettings
+
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class replaced_env_vars_and_sys_path:
@@ -70,6 +72,9 @@ class Project:
 
     discovery: protocols.Discovery[Self]
 
+    # Static discovery doesn't need the apps to be populated
+    populate_apps: bool = True
+
     @contextlib.contextmanager
     def setup_sys_path_and_env_vars(self) -> Iterator[None]:
         with replaced_env_vars_and_sys_path(
@@ -85,9 +90,11 @@ class Project:
 
             if not settings.configured:
                 settings._setup()  # type: ignore[misc]
-            apps.populate(settings.INSTALLED_APPS)
 
-            assert apps.apps_ready, "Apps are not ready"
+            if self.populate_apps:
+                apps.populate(settings.INSTALLED_APPS)
+                assert apps.apps_ready, "Apps are not ready"
+
             assert settings.configured, "Settings are not configured"
 
             yield Loaded(
@@ -125,6 +132,9 @@ class Loaded(Generic[protocols.T_Project]):
             loaded_project=self,
             all_models=all_models,
             installed_apps=self.settings.INSTALLED_APPS,
+            installed_app_configs=self.discovery.discover_installed_apps(
+                self, installed_models_modules
+            ),
             settings_types=self.discovery.discover_settings_types(self),
             installed_models_modules=installed_models_modules,
             concrete_models=self.discovery.discover_concrete_models(self, all_models),
@@ -133,10 +143,11 @@ class Loaded(Generic[protocols.T_Project]):
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class Discovered(Generic[protocols.T_Project]):
-    loaded_project: Loaded[protocols.T_Project]
+    loaded_project: protocols.Loaded[protocols.T_Project]
 
     all_models: protocols.ModelMap
     installed_apps: list[str]
+    installed_app_configs: protocols.InstalledAppsMap
     settings_types: protocols.SettingsTypesMap
     concrete_models: protocols.ConcreteModelsMap
     installed_models_modules: protocols.ModelModulesMap
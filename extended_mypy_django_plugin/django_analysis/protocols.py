@@ -2,16 +2,16 @@ from __future__ import annotations
 
 import contextlib
 import pathlib
-from collections.abc import Hashable, Iterator, Mapping, Sequence
+from collections.abc import Hashable, Iterator, Mapping, Sequence, Set
 from typing import TYPE_CHECKING, Any, Literal, NewType, Protocol, TypeVar, Union
 
-from django.apps.registry import Apps
-from django.conf import LazySettings
-from django.db import models
 from typing_extensions import Self
 
 if TYPE_CHECKING:
+    from django.apps.registry import Apps
+    from django.conf import LazySettings
     from django.contrib.contenttypes.fields import GenericForeignKey
+    from django.db import models
     from django.db.models.fields.related import ForeignObjectRel
 
 T_Project = TypeVar("T_Project", bound="P_Project")
@@ -37,9 +37,32 @@ ModelMap = Mapping[ImportPath, "Model"]
 ModelModulesMap = Mapping[ImportPath, "Module"]
 ConcreteModelsMap = Mapping[ImportPath, Sequence["Model"]]
 SettingsTypesMap = Mapping[str, str]
+InstalledAppsMap = Mapping[str, "InstalledApp"]
 VirtualDependencyMap = Mapping[ImportPath, T_CO_VirtualDependency]
 DjangoField = Union["models.fields.Field[Any, Any]", "ForeignObjectRel", "GenericForeignKey"]
 
+# What goes into the summary of each virtual dependency
+# "full" is everything about each model and its fields
+# "aliases-only" is only what the concrete and queryset aliases are made from
+SignificancePolicy = Literal["full", "aliases-only"]
+
+# Whether there is a virtual dependency for each module with models, for each model, or for
+# each module with abstract models that have concrete models elsewhere getting their own.
+# With "acyclic" the models whose aliases import modules that import the module of that
+# model get their own, which that module never depends on
+VirtualDependencyLayout = Literal["module", "model", "abstract", "acyclic"]
+
+# Whether virtual dependencies are written as source files or as stubs
+VirtualDependencyFormat = Literal["py", "pyi"]
+
+# Whether the queryset alias for a model has a member for each concrete model, or has one
+# member for each queryset class with the concrete models that use it collapsed together
+QuerySetUnionStyle = Literal["expanded", "collapsed"]
+
+# Whether virtual dependencies are all in the virtual namespace, or split across subpackages
+# of that namespace by the end of the hash in their name
+VirtualNamespaceLayout = Literal["flat", "sharded"]
+
 
 class Hasher(Protocol):
     def __call__(self, *parts: bytes) -> str:
@@ -64,6 +87,16 @@ class InstalledModelsDiscovery(Protocol[T_Project]):
     def __call__(self, loaded_project: Loaded[T_Project], /) -> ModelModulesMap: ...
 
 
+class InstalledAppsDiscovery(Protocol[T_Project]):
+    """
+    Used to determine the app for each entry in INSTALLED_APPS of a loaded project
+    """
+
+    def __call__(
+        self, loaded_project: Loaded[T_Project], installed_models_modules: ModelModulesMap, /
+    ) -> InstalledAppsMap: ...
+
+
 class ConcreteModelsDiscovery(Protocol[T_Project]):
     """
     Used to determine concrete models
@@ -97,6 +130,12 @@ class Discovery(Protocol[T_Project]):
         Used to determine the concrete models for any model
         """
 
+    @property
+    def discover_installed_apps(self) -> InstalledAppsDiscovery[T_Project]:
+        """
+        Used to determine the app for each entry in INSTALLED_APPS
+        """
+
 
 class Project(Protocol):
     """
@@ -203,6 +242,12 @@ class Discovered(Protocol[T_Project]):
         The value of the settings.INSTALLED_APPS setting.
         """
 
+    @property
+    def installed_app_configs(self) -> InstalledAppsMap:
+        """
+        The app for each entry in INSTALLED_APPS
+        """
+
     @property
     def settings_types(self) -> SettingsTypesMap:
         """
@@ -216,6 +261,41 @@ class Discovered(Protocol[T_Project]):
         """
 
 
+class DiscoveryCache(Protocol[T_Project]):
+    """
+    Used to store the result of discovery between runs so that Django doesn't need to be
+    loaded when nothing that affects discovery has changed
+    """
+
+    def read(self, *, project: T_Project) -> Discovered[T_Project] | None:
+        """
+        Return the discovered project from the cache if the cache is still valid for this project
+        """
+
+    def write(self, *, discovered: Discovered[T_Project]) -> None:
+        """
+        Store this discovered project in the cache
+        """
+
+
+class InstalledApp(Protocol, Hashable):
+    """
+    What is known about the AppConfig for an entry in INSTALLED_APPS
+    """
+
+    @property
+    def name(self) -> str:
+        """
+        The ``AppConfig.name`` of this app, which is the package the app is in
+        """
+
+    @property
+    def models_modules(self) -> Set[ImportPath]:
+        """
+        The modules with models that are registered with this app
+        """
+
+
 class Module(Protocol, Hashable):
     """
     The models contained within a specific module
@@ -330,8 +410,19 @@ class VirtualDependencyMaker(Protocol[T_Project, T_CO_VirtualDependency]):
     """
 
     def __call__(
-        self, *, discovered_project: Discovered[T_Project], module: Module
-    ) -> T_CO_VirtualDependency: ...
+        self,
+        *,
+        discovered_project: Discovered[T_Project],
+        module: Module,
+        model_import_path: ImportPath | None = None,
+        excluded_models: Set[ImportPath] = frozenset(),
+        closes_cycle: bool = False,
+    ) -> T_CO_VirtualDependency:
+        """
+        Make a virtual dependency for this module, or only for one model in that module
+
+        Any excluded models are left out because they have their own virtual dependency
+        """
 
 
 class VirtualDependencyGenerator(Protocol[T_Project, T_CO_VirtualDependency]):
@@ -353,14 +444,13 @@ class VirtualDependencyInstaller(Protocol[T_CO_VirtualDependency, T_Report]):
 
     Implementations should:
 
-    * Build the reports in the scratch root before installing in the final destination
+    * Only write reports to the destination that represent different information to what is there
     * Clear out reports in the final destination that represent modules that don't exist anymore
     """
 
     def __call__(
         self,
         *,
-        scratch_root: pathlib.Path,
         destination: pathlib.Path,
         virtual_namespace: ImportPath,
         report_factory: ReportFactory[T_CO_VirtualDependency, T_Report],
@@ -406,6 +496,12 @@ class VirtualDependency(Protocol):
     Represents the information held by a virtual dependency for a module
     """
 
+    @property
+    def import_path(self) -> ImportPath:
+        """
+        What this virtual dependency is for, which is either the module or one model in that module
+        """
+
     @property
     def module(self) -> Module:
         """
@@ -427,7 +523,14 @@ class VirtualDependency(Protocol):
     @property
     def concrete_models(self) -> ConcreteModelsMap:
         """
-        The models known by this module and their concrete children
+        The models this virtual dependency is for and their concrete children
+        """
+
+    @property
+    def closes_cycle(self) -> bool:
+        """
+        Whether the module of these models depending on this virtual dependency would close
+        an import cycle through the modules of their concrete models
         """
 
 
@@ -442,9 +545,13 @@ class Report(Protocol):
         *,
         module_import_path: ImportPath,
         virtual_import_path: ImportPath,
+        closes_cycle: bool = False,
     ) -> None:
         """
         Register a module to it's virtual path
+
+        When the virtual path closes a cycle then the module isn't made to depend on it,
+        even when that module may use the annotations
         """
 
     def register_model(
@@ -452,12 +559,20 @@ class Report(Protocol):
         *,
         model_import_path: ImportPath,
         virtual_import_path: ImportPath,
+        queryset_virtual_import_path: ImportPath,
         concrete_name: str,
         concrete_queryset_name: str,
         concrete_models: Sequence[Model],
+        summarised: bool = False,
     ) -> None:
         """
         Register details about a model
+
+        Where the concrete alias is found in the virtual dependency and the queryset alias is
+        found in the virtual dependency for querysets
+
+        The aliases are summarised when they refer to the model itself because it has more
+        concrete models than are allowed in a union
         """
 
 
@@ -520,6 +635,26 @@ class RenderedVirtualDependency(Protocol[T_CO_Report]):
         The import path to this virtual dependency
         """
 
+    @property
+    def module_import_path(self) -> ImportPath:
+        """
+        The import path to the module this virtual dependency is for
+        """
+
+    @property
+    def queryset_content(self) -> str | None:
+        """
+        The string representing the content of the virtual dependency for querysets
+
+        This is None if the queryset aliases are in the virtual dependency itself
+        """
+
+    @property
+    def queryset_virtual_import_path(self) -> ImportPath | None:
+        """
+        The import path to the virtual dependency for querysets
+        """
+
 
 class VirtualDependencyScribe(Protocol[T_COT_VirtualDependency, T_CO_Report]):
     """
@@ -563,31 +698,37 @@ class ReportInstaller(Protocol):
     def write_report(
         self,
         *,
-        scratch_root: pathlib.Path,
+        destination: pathlib.Path,
         virtual_import_path: ImportPath,
+        module_import_path: ImportPath,
         content: str,
         summary_hash: str | Literal[False] | None,
     ) -> bool:
         """
-        Write a single report to the scratch path
+        Write a single report for the module at module_import_path into the destination
 
-        If summary_hash is False, then only write if the virtual dep doesn't already exist
+        If summary_hash is False, then the module isn't installed and this only writes if the
+        virtual dep doesn't already exist.
+        Otherwise only write if the virtual dep in the destination has a different summary.
 
         Return whether a report was written
         """
 
+    def location_for(
+        self, *, destination: pathlib.Path, virtual_import_path: ImportPath
+    ) -> pathlib.Path:
+        """
+        Return where the report for this virtual import path is written to
+        """
+
     def install_reports(
         self,
         *,
-        scratch_root: pathlib.Path,
         destination: pathlib.Path,
         virtual_namespace: ImportPath,
     ) -> None:
         """
-        Copy reports from scratch_root into the destination when the reports on the destination
-        are different to the reports in the scratch path.
-
-        Also, delete redundant reports from destination
+        Called after every report has been written to delete redundant reports from destination
         """
 
 
@@ -652,6 +793,36 @@ class ReportFactory(Protocol[T_COT_VirtualDependency, T_Report]):
         """
 
 
+class VirtualDependencyOptions(Protocol):
+    """
+    The options from the mypy configuration that change how virtual dependencies are made
+    """
+
+    @property
+    def render_processes(self) -> int: ...
+
+    @property
+    def significance_policy(self) -> SignificancePolicy: ...
+
+    @property
+    def virtual_dependency_layout(self) -> VirtualDependencyLayout: ...
+
+    @property
+    def virtual_dependency_format(self) -> VirtualDependencyFormat: ...
+
+    @property
+    def queryset_union_style(self) -> QuerySetUnionStyle: ...
+
+    @property
+    def max_concrete_union_width(self) -> int: ...
+
+    @property
+    def virtual_namespace_layout(self) -> VirtualNamespaceLayout: ...
+
+    @property
+    def fingerprint_env_vars(self) -> Sequence[str]: ...
+
+
 class VirtualDependencyHandler(Protocol[T_CO_ReportUse]):
     """
     This is the interface required by the mypy plugin to create virtual dependencies and get a report
@@ -664,6 +835,7 @@ class VirtualDependencyHandler(Protocol[T_CO_ReportUse]):
         project_root: pathlib.Path,
         django_settings_module: str,
         virtual_deps_destination: pathlib.Path,
+        options: VirtualDependencyOptions | None = None,
     ) -> CombinedReport[T_CO_ReportUse]: ...
 
 
@@ -671,14 +843,17 @@ if TYPE_CHECKING:
     P_Model = Model
     P_Field = Field
     P_Module = Module
+    P_InstalledApp = InstalledApp
     P_Hasher = Hasher
     P_Project = Project
     P_Loaded = Loaded[P_Project]
     P_Discovery = Discovery[P_Project]
     P_Discovered = Discovered[P_Project]
+    P_DiscoveryCache = DiscoveryCache[P_Project]
     P_SettingsTypesDiscovery = SettingsTypesDiscovery[P_Project]
     P_ConcreteModelsDiscovery = ConcreteModelsDiscovery[P_Project]
     P_InstalledModelsDiscovery = InstalledModelsDiscovery[P_Project]
+    P_InstalledAppsDiscovery = InstalledAppsDiscovery[P_Project]
 
     P_Report = Report
     P_VirtualDependency = VirtualDependency
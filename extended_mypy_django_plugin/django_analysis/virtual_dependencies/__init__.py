@@ -2,24 +2,31 @@ from .dependency import VirtualDependency, VirtualDependencySummary
 from .folder import VirtualDependencyGenerator, VirtualDependencyInstaller
 from .handler import VirtualDependencyHandler
 from .namer import VirtualDependencyNamer
+from .options import VirtualDependencyOptions
 from .report import (
     CombinedReport,
+    ManifestEntry,
     RenderedVirtualDependency,
     Report,
     ReportCombiner,
     ReportFactory,
+    ReportImportPaths,
     ReportInstaller,
     ReportSummaryGetter,
     VirtualDependencyScribe,
     make_report_factory,
 )
+from .significance import ModuleSignificance
 
 __all__ = [
     "CombinedReport",
+    "ManifestEntry",
+    "ModuleSignificance",
     "RenderedVirtualDependency",
     "Report",
     "ReportCombiner",
     "ReportFactory",
+    "ReportImportPaths",
     "ReportInstaller",
     "ReportSummaryGetter",
     "VirtualDependency",
@@ -27,6 +34,7 @@ __all__ = [
     "VirtualDependencyHandler",
     "VirtualDependencyInstaller",
     "VirtualDependencyNamer",
+    "VirtualDependencyOptions",
     "VirtualDependencyScribe",
     "VirtualDependencySummary",
     "make_report_factory",
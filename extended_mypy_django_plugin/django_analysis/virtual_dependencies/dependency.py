@@ -1,6 +1,6 @@
 import dataclasses
 import functools
-from collections.abc import Iterator, Sequence
+from collections.abc import Iterator, Sequence, Set
 from typing import TYPE_CHECKING, Generic, TypedDict, cast
 
 from typing_extensions import Self
@@ -22,6 +22,14 @@ class VirtualDependency(Generic[protocols.T_Project]):
     summary: VirtualDependencySummary
     all_related_models: Sequence[protocols.ImportPath]
     concrete_models: protocols.ConcreteModelsMap
+    model_import_path: protocols.ImportPath | None = None
+    closes_cycle: bool = False
+
+    @property
+    def import_path(self) -> protocols.ImportPath:
+        if self.model_import_path is None:
+            return self.module.import_path
+        return self.model_import_path
 
     @classmethod
     def create(
@@ -30,14 +38,34 @@ class VirtualDependency(Generic[protocols.T_Project]):
         discovered_project: protocols.Discovered[protocols.T_Project],
         module: protocols.Module,
         virtual_dependency_namer: protocols.VirtualDependencyNamer,
+        model_import_path: protocols.ImportPath | None = None,
+        excluded_models: Set[protocols.ImportPath] = frozenset(),
+        closes_cycle: bool = False,
+        significance_policy: protocols.SignificancePolicy = "full",
     ) -> Self:
+        """
+        Create a virtual dependency for the models in this module, or for only one of them
+        if a ``model_import_path`` is provided.
+
+        Excluded models are left out because they have their own virtual dependency.
+        """
+        defined_models = module.defined_models
+        if model_import_path is not None:
+            defined_models = {model_import_path: defined_models[model_import_path]}
+        elif excluded_models:
+            defined_models = {
+                import_path: model
+                for import_path, model in defined_models.items()
+                if import_path not in excluded_models
+            }
+
         concrete_models = {
             import_path: discovered_project.concrete_models[import_path]
-            for import_path in module.defined_models
+            for import_path in defined_models
         }
 
         related_models: set[protocols.ImportPath] = set()
-        for model in module.defined_models.values():
+        for model in defined_models.values():
             related_models.add(model.import_path)
             for field in model.all_fields.values():
                 if field.related_model:
@@ -47,18 +75,23 @@ class VirtualDependency(Generic[protocols.T_Project]):
             module=module,
             summary=VirtualDependencySummary(
                 virtual_namespace=virtual_dependency_namer.namespace,
-                virtual_import_path=virtual_dependency_namer(module.import_path),
+                virtual_import_path=virtual_dependency_namer(
+                    model_import_path or module.import_path
+                ),
                 module_import_path=module.import_path,
                 significant_info=list(
                     cls.find_significant_info_from_module(
                         discovered_project=discovered_project,
                         module=module,
                         concrete_models=concrete_models,
+                        significance_policy=significance_policy,
                     )
                 ),
             ),
             all_related_models=sorted(related_models),
             concrete_models=concrete_models,
+            model_import_path=model_import_path,
+            closes_cycle=closes_cycle,
         )
 
     @classmethod
@@ -68,18 +101,70 @@ class VirtualDependency(Generic[protocols.T_Project]):
         discovered_project: protocols.Discovered[protocols.T_Project],
         module: protocols.Module,
         concrete_models: protocols.ConcreteModelsMap,
+        significance_policy: protocols.SignificancePolicy = "full",
     ) -> Iterator[str]:
         prefix = f"module:{module.import_path}"
         yield prefix
         for model_import_path, concrete_children in concrete_models.items():
             yield f"{prefix}>concrete:{model_import_path}={','.join(conc.import_path for conc in concrete_children)}"
 
-        for model in module.defined_models.values():
+        for app in cls.find_relevant_installed_apps(
+            discovered_project=discovered_project,
+            module=module,
+            concrete_models=concrete_models,
+            significance_policy=significance_policy,
+        ):
+            yield f"{prefix}>installed_app:{app}"
+
+        for model in (module.defined_models[name] for name in concrete_models):
             for info in cls.find_significant_info_from_model(
-                discovered_project=discovered_project, module=module, model=model
+                discovered_project=discovered_project,
+                module=module,
+                model=model,
+                significance_policy=significance_policy,
             ):
                 yield f"{prefix}>{info}"
 
+    @classmethod
+    def find_relevant_installed_apps(
+        cls,
+        *,
+        discovered_project: protocols.Discovered[protocols.T_Project],
+        module: protocols.Module,
+        concrete_models: protocols.ConcreteModelsMap,
+        significance_policy: protocols.SignificancePolicy = "full",
+    ) -> Iterator[str]:
+        """
+        Yield the entries in INSTALLED_APPS that own this module, the modules of its concrete
+        models, or the modules of the models its fields relate to when fields are significant.
+
+        These are in the order they are installed so changing unrelated apps changes nothing.
+        """
+        module_import_paths: set[protocols.ImportPath] = {module.import_path}
+        for concrete_children in concrete_models.values():
+            for conc in concrete_children:
+                module_import_paths.add(conc.module_import_path)
+
+        if significance_policy == "full":
+            for model in (module.defined_models[name] for name in concrete_models):
+                for field in model.all_fields.values():
+                    if field.related_model:
+                        related = discovered_project.all_models.get(field.related_model)
+                        if related is not None:
+                            module_import_paths.add(related.module_import_path)
+                        else:
+                            module_import_paths.add(
+                                protocols.ImportPath(field.related_model.rsplit(".", 1)[0])
+                            )
+
+        owners: set[str] = set()
+        for import_path in module_import_paths:
+            owners.update(_owning_apps(discovered_project.installed_app_configs, import_path))
+
+        for entry in discovered_project.installed_apps:
+            if entry in owners:
+                yield entry
+
     @classmethod
     def find_significant_info_from_model(
         cls,
@@ -87,7 +172,14 @@ class VirtualDependency(Generic[protocols.T_Project]):
         discovered_project: protocols.Discovered[protocols.T_Project],
         module: protocols.Module,
         model: protocols.Model,
+        significance_policy: protocols.SignificancePolicy = "full",
     ) -> Iterator[str]:
+        """
+        Yield what's significant about this model.
+
+        The fields are only significant with the "full" policy, as the concrete and queryset
+        aliases don't depend on them.
+        """
         model_prefix = f"model:{model.import_path}"
         yield f"{model_prefix}>is_abstract:{model.is_abstract}"
 
@@ -97,6 +189,9 @@ class VirtualDependency(Generic[protocols.T_Project]):
         for i, mro_import_path in enumerate(model.models_in_mro):
             yield f"{model_prefix}>mro_{i}:{mro_import_path}"
 
+        if significance_policy != "full":
+            return
+
         for name, field in model.all_fields.items():
             field_prefix = f"{model_prefix}>field:{name}"
             yield field_prefix
@@ -119,6 +214,28 @@ class VirtualDependency(Generic[protocols.T_Project]):
             yield f"related_model:{field.related_model}"
 
 
+def _owning_apps(apps: protocols.InstalledAppsMap, import_path: str) -> Iterator[str]:
+    """
+    Yield the entries in INSTALLED_APPS for the apps this module belongs to.
+
+    A module with models belongs to the apps those models are registered with. Otherwise, like
+    ``Apps.get_containing_app_config``, it belongs to the app with the longest name that
+    contains it.
+    """
+    registered = [entry for entry, app in apps.items() if import_path in app.models_modules]
+    if registered:
+        yield from registered
+        return
+
+    containing = [
+        (len(app.name), entry)
+        for entry, app in apps.items()
+        if import_path == app.name or import_path.startswith(f"{app.name}.")
+    ]
+    if containing:
+        yield max(containing)[1]
+
+
 if TYPE_CHECKING:
     C_VirtualDependency = VirtualDependency[project.C_Project]
 
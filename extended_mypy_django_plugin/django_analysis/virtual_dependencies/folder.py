@@ -1,28 +1,185 @@
 import dataclasses
 import functools
-import os
 import pathlib
+from collections.abc import Iterator, Mapping, Set
 from typing import TYPE_CHECKING, Generic, cast
 
+from typing_extensions import Self
+
 from .. import project, protocols
+from ..discovery import ImportPath, module_specs
 from . import dependency, report
 
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class VirtualDependencyGenerator(Generic[protocols.T_Project, protocols.T_VirtualDependency]):
+    """
+    Makes a virtual dependency for each module with installed models, or for each model
+    in those modules when the layout is "model".
+
+    When the layout is "abstract" then abstract models with concrete models in other modules
+    get their own virtual dependency, so the union of those concrete models is only in one
+    place that is only needed by what uses that abstract model.
+
+    When the layout is "acyclic" then models whose aliases import modules that import the
+    module of that model get their own virtual dependency, which that module never depends on.
+    The module depending on that virtual dependency would close an import cycle, and mypy would
+    then need to process every module in that cycle together. Which modules import each other
+    is found from the source of the modules in the project, the parents of each model and the
+    related models of each model. Other files that use the annotations for that model still
+    depend on that virtual dependency, which can join them into a cycle when the modules of the
+    concrete models import them.
+
+    Every module always gets a virtual dependency for the module, with the models that don't
+    have their own virtual dependency.
+    """
+
     virtual_dependency_maker: protocols.VirtualDependencyMaker[
         protocols.T_Project, protocols.T_VirtualDependency
     ]
+    layout: protocols.VirtualDependencyLayout = "module"
 
     def __call__(
         self, *, discovered_project: protocols.Discovered[protocols.T_Project]
     ) -> protocols.VirtualDependencyMap[protocols.T_VirtualDependency]:
-        return {
-            import_path: self.virtual_dependency_maker(
-                discovered_project=discovered_project, module=module
+        if self.layout == "module":
+            return {
+                import_path: self.virtual_dependency_maker(
+                    discovered_project=discovered_project, module=module
+                )
+                for import_path, module in discovered_project.installed_models_modules.items()
+            }
+
+        importers = (
+            _Importers.from_project(discovered_project) if self.layout == "acyclic" else None
+        )
+
+        result: dict[protocols.ImportPath, protocols.T_VirtualDependency] = {}
+        for import_path, module in discovered_project.installed_models_modules.items():
+            own: set[protocols.ImportPath] = set(module.defined_models)
+            if self.layout == "abstract":
+                own = {
+                    model_import_path
+                    for model_import_path, model in module.defined_models.items()
+                    if self._has_concrete_models_elsewhere(
+                        discovered_project=discovered_project, model=model
+                    )
+                }
+            elif importers is not None:
+                own = {
+                    model_import_path
+                    for model_import_path in module.defined_models
+                    if any(
+                        imported != import_path and imported in importers(import_path)
+                        for imported in self._imported_by_aliases(
+                            discovered_project=discovered_project,
+                            model_import_path=model_import_path,
+                        )
+                    )
+                }
+
+            # Every module gets a virtual dependency so that it's known as installed, even
+            # when that virtual dependency has no models because they all have their own
+            result[import_path] = self.virtual_dependency_maker(
+                discovered_project=discovered_project, module=module, excluded_models=own
             )
-            for import_path, module in discovered_project.installed_models_modules.items()
-        }
+
+            for model_import_path in sorted(own):
+                result[model_import_path] = self.virtual_dependency_maker(
+                    discovered_project=discovered_project,
+                    module=module,
+                    model_import_path=model_import_path,
+                    closes_cycle=self.layout == "acyclic",
+                )
+
+        return result
+
+    def _imported_by_aliases(
+        self,
+        *,
+        discovered_project: protocols.Discovered[protocols.T_Project],
+        model_import_path: protocols.ImportPath,
+    ) -> Iterator[protocols.ImportPath]:
+        """
+        Yield the modules the aliases for this model import, which are the modules of its
+        concrete models and of their default custom querysets
+        """
+        for concrete in discovered_project.concrete_models.get(model_import_path, ()):
+            yield concrete.module_import_path
+            if concrete.default_custom_queryset is not None:
+                yield ImportPath.split(concrete.default_custom_queryset)[0]
+
+    def _has_concrete_models_elsewhere(
+        self,
+        *,
+        discovered_project: protocols.Discovered[protocols.T_Project],
+        model: protocols.Model,
+    ) -> bool:
+        return model.is_abstract and any(
+            concrete.module_import_path != model.module_import_path
+            for concrete in discovered_project.concrete_models.get(model.import_path, ())
+        )
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class _Importers:
+    """
+    Finds the modules that import a module, directly or through other modules.
+
+    A module with a model imports the modules of the parents of that model, and django-stubs
+    makes it depend on the modules of its related models. Otherwise what each module imports
+    is read from its source, starting at the modules with models and following the imports
+    that are inside the project.
+    """
+
+    imported_by: Mapping[protocols.ImportPath, Set[protocols.ImportPath]]
+
+    _found: dict[protocols.ImportPath, frozenset[protocols.ImportPath]] = dataclasses.field(
+        default_factory=dict, init=False
+    )
+
+    @classmethod
+    def from_project(cls, discovered_project: protocols.Discovered[protocols.T_Project]) -> Self:
+        imported_by: dict[protocols.ImportPath, set[protocols.ImportPath]] = {}
+
+        def add(importer: protocols.ImportPath, imported: protocols.ImportPath) -> None:
+            if importer != imported:
+                imported_by.setdefault(imported, set()).add(importer)
+
+        all_models = discovered_project.all_models
+        for model in all_models.values():
+            for other in (
+                *model.models_in_mro,
+                *filter(None, (field.related_model for field in model.all_fields.values())),
+            ):
+                if other in all_models:
+                    add(model.module_import_path, all_models[other].module_import_path)
+
+        root_dir = discovered_project.loaded_project.root_dir
+        remaining = sorted({model.module_import_path for model in all_models.values()})
+        seen = set(remaining)
+        while remaining:
+            importer = remaining.pop()
+            for name in module_specs.imports_in(importer, within=root_dir):
+                imported = ImportPath(name)
+                add(importer, imported)
+                if imported not in seen:
+                    seen.add(imported)
+                    remaining.append(imported)
+
+        return cls(imported_by=imported_by)
+
+    def __call__(self, import_path: protocols.ImportPath, /) -> Set[protocols.ImportPath]:
+        if import_path not in self._found:
+            found: set[protocols.ImportPath] = set()
+            remaining = [import_path]
+            while remaining:
+                for importer in self.imported_by.get(remaining.pop(), ()):
+                    if importer not in found:
+                        found.add(importer)
+                        remaining.append(importer)
+            self._found[import_path] = frozenset(found)
+        return self._found[import_path]
 
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
@@ -34,28 +191,38 @@ class VirtualDependencyInstaller(Generic[protocols.T_VirtualDependency, protocol
     def __call__(
         self,
         *,
-        scratch_root: pathlib.Path,
         destination: pathlib.Path,
         virtual_namespace: protocols.ImportPath,
         report_factory: protocols.ReportFactory[protocols.T_VirtualDependency, protocols.T_Report],
     ) -> protocols.CombinedReport[protocols.T_Report]:
-        # Determine what would be written to represent the virtual dependencies
+        # Write whatever has changed about the virtual dependencies into the destination
         # And gather each report so we can later combine them into the final report
         reports: list[protocols.T_Report] = []
         written_dependencies: list[protocols.RenderedVirtualDependency[protocols.T_Report]] = []
         for rendered in report_factory.deploy_scribes(self.virtual_dependencies):
             report_factory.report_installer.write_report(
                 virtual_import_path=rendered.virtual_import_path,
+                module_import_path=rendered.module_import_path,
                 summary_hash=rendered.summary_hash,
                 content=rendered.content,
-                scratch_root=scratch_root,
+                destination=destination,
             )
+            if (
+                rendered.queryset_content is not None
+                and rendered.queryset_virtual_import_path is not None
+            ):
+                report_factory.report_installer.write_report(
+                    virtual_import_path=rendered.queryset_virtual_import_path,
+                    module_import_path=rendered.module_import_path,
+                    summary_hash=rendered.summary_hash,
+                    content=rendered.queryset_content,
+                    destination=destination,
+                )
             written_dependencies.append(rendered)
             reports.append(rendered.report)
 
-        # Install our on disk representation into the destination
+        # Remove anything in the destination that is no longer needed
         report_factory.report_installer.install_reports(
-            scratch_root=scratch_root,
             destination=destination,
             virtual_namespace=virtual_namespace,
         )
@@ -94,7 +261,9 @@ class VirtualDependencyInstaller(Generic[protocols.T_VirtualDependency, protocol
         in other parts of the codebase.
         """
         virtual_import_path = self.virtual_dependency_namer(module_import_path)
-        location = destination / f"{virtual_import_path.replace('.', os.sep)}.py"
+        location = report_factory.report_installer.location_for(
+            destination=destination, virtual_import_path=virtual_import_path
+        )
         if location.exists():
             return None
 
@@ -102,8 +271,9 @@ class VirtualDependencyInstaller(Generic[protocols.T_VirtualDependency, protocol
             module_import_path=module_import_path
         )
         if report_factory.report_installer.write_report(
-            scratch_root=destination,
+            destination=destination,
             virtual_import_path=virtual_import_path,
+            module_import_path=module_import_path,
             content=content,
             summary_hash=False,
         ):
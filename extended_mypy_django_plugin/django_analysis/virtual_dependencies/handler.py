@@ -1,17 +1,16 @@
 import abc
 import dataclasses
 import pathlib
-import tempfile
-import time
 from typing import TYPE_CHECKING, Generic
 
 from typing_extensions import Self
 
 from ...version import VERSION
-from .. import discovery, hasher, project, protocols
+from .. import cache, discovery, hasher, project, protocols
 from . import dependency, report
 from .folder import VirtualDependencyGenerator, VirtualDependencyInstaller
 from .namer import VirtualDependencyNamer
+from .options import VirtualDependencyOptions
 
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
@@ -22,29 +21,57 @@ class VirtualDependencyHandler(
     This brings together the project, virtual dependencies and the report such that given a project
     we can generate the virtual dependencies and a relevant report.
 
-    These three things are all customizable and this class is an orchestration mechanism.
-
     Usage is via the "create" and "create_report" classmethods, where "create_report" is a shortcut
-    to saying ``Handler.create().make_report()``.
-
-    And "create" is a shortcut to creating an instance of the Handler with the hasher and project
-    found using the "make_hasher" and "make_project" classmethods on this class.
+    to saying ``Handler.create().make_report()``. The methods on this class are the hooks for
+    customising each part, and the ``options`` from the mypy configuration are given to them.
     """
 
     hasher: protocols.Hasher
     discovered: protocols.Discovered[protocols.T_Project]
+    options: protocols.VirtualDependencyOptions = dataclasses.field(
+        default_factory=VirtualDependencyOptions
+    )
 
     @classmethod
-    def create(cls, *, project_root: pathlib.Path, django_settings_module: str) -> Self:
+    def create(
+        cls,
+        *,
+        project_root: pathlib.Path,
+        django_settings_module: str,
+        virtual_deps_destination: pathlib.Path | None = None,
+        options: protocols.VirtualDependencyOptions | None = None,
+    ) -> Self:
+        """
+        Make the handler for a project, restoring discovery from the cache given by
+        "make_discovery_cache" if nothing has changed since it was written
+        """
+        hasher = cls.make_hasher()
+        project = cls.make_project(
+            project_root=project_root, django_settings_module=django_settings_module
+        )
+
+        if options is None:
+            options = VirtualDependencyOptions()
+
+        discovery_cache: protocols.DiscoveryCache[protocols.T_Project] | None = None
+        if virtual_deps_destination is not None:
+            discovery_cache = cls.make_discovery_cache(
+                hasher=hasher, virtual_deps_destination=virtual_deps_destination, options=options
+            )
+
+        discovered: protocols.Discovered[protocols.T_Project] | None = None
+        if discovery_cache is not None:
+            discovered = discovery_cache.read(project=project)
+
+        if discovered is None:
+            discovered = project.load_project().perform_discovery()
+            if discovery_cache is not None:
+                discovery_cache.write(discovered=discovered)
+
         return cls(
-            hasher=cls.make_hasher(),
-            discovered=(
-                cls.make_project(
-                    project_root=project_root, django_settings_module=django_settings_module
-                )
-                .load_project()
-                .perform_discovery()
-            ),
+            hasher=hasher,
+            discovered=discovered,
+            options=options,
         )
 
     @classmethod
@@ -54,9 +81,13 @@ class VirtualDependencyHandler(
         project_root: pathlib.Path,
         django_settings_module: str,
         virtual_deps_destination: pathlib.Path,
+        options: protocols.VirtualDependencyOptions | None = None,
     ) -> protocols.CombinedReport[protocols.T_Report]:
         return cls.create(
-            project_root=project_root, django_settings_module=django_settings_module
+            project_root=project_root,
+            django_settings_module=django_settings_module,
+            virtual_deps_destination=virtual_deps_destination,
+            options=options,
         ).make_report(virtual_deps_destination=virtual_deps_destination)
 
     def make_report(
@@ -83,7 +114,7 @@ class VirtualDependencyHandler(
         all_virtual_dependencies = self.get_virtual_dependencies(
             virtual_dependency_maker=virtual_dependency_maker
         )
-        report_factory = self.make_report_factory(installed_apps_hash=installed_apps_hash)
+        report_factory = self.make_report_factory()
         project_version = f"plugin:{VERSION}:installed_apps:{installed_apps_hash}|settings_types:{settings_types_hash}"
         virtual_dependency_installer = self.make_virtual_dependency_installer(
             virtual_dependency_namer=virtual_dependency_namer,
@@ -91,13 +122,11 @@ class VirtualDependencyHandler(
             all_virtual_dependencies=all_virtual_dependencies,
         )
 
-        with tempfile.TemporaryDirectory() as scratch_root:
-            return virtual_dependency_installer(
-                scratch_root=pathlib.Path(scratch_root),
-                destination=virtual_deps_destination,
-                virtual_namespace=virtual_namespace,
-                report_factory=report_factory,
-            )
+        return virtual_dependency_installer(
+            destination=virtual_deps_destination,
+            virtual_namespace=virtual_namespace,
+            report_factory=report_factory,
+        )
 
     @classmethod
     @abc.abstractmethod
@@ -107,7 +136,7 @@ class VirtualDependencyHandler(
 
     @abc.abstractmethod
     def make_report_factory(
-        self, *, installed_apps_hash: str
+        self,
     ) -> protocols.ReportFactory[protocols.T_VirtualDependency, protocols.T_Report]: ...
 
     @abc.abstractmethod
@@ -132,23 +161,62 @@ class VirtualDependencyHandler(
     def make_hasher(cls) -> protocols.Hasher:
         return hasher.adler32_hash
 
-    def interface_differentiator(self) -> str:
-        return str(time.time()).replace(".", "_")
+    @classmethod
+    def make_discovery_cache(
+        cls,
+        *,
+        hasher: protocols.Hasher,
+        virtual_deps_destination: pathlib.Path,
+        options: protocols.VirtualDependencyOptions,
+    ) -> protocols.DiscoveryCache[protocols.T_Project] | None:
+        """
+        Return the cache used to avoid loading Django when nothing has changed since the
+        last time discovery was performed.
 
-    def hash_installed_apps(self) -> str:
-        return self.hasher(
-            *(app.encode() for app in self.discovered.loaded_project.settings.INSTALLED_APPS)
+        Override this to return None to always load Django.
+        """
+        return cache.DiscoveryCache(
+            location=virtual_deps_destination / cache.DISCOVERY_CACHE_NAME,
+            hasher=hasher,
+            env_var_names=options.fingerprint_env_vars,
         )
 
+    def interface_differentiator(self, summary_hash: str) -> str:
+        """
+        Used to give each virtual dependency an interface that changes when its summary changes
+        """
+        return self.hasher(summary_hash.encode())
+
+    def hash_installed_apps(self) -> str:
+        return self.hasher(*(app.encode() for app in self.discovered.installed_apps))
+
     def hash_settings_types(self) -> str:
+        """
+        django-stubs gets the type of a setting from the settings module and otherwise only
+        needs to know the setting exists, so only the names of settings and the values of
+        the settings django-stubs reads change this hash.
+        """
         return self.hasher(
-            *(f"{k}:{v}".encode() for k, v in sorted(self.discovered.settings_types.items()))
+            *(
+                (f"{name}:{value}" if self.is_significant_setting(name) else name).encode()
+                for name, value in sorted(self.discovered.settings_types.items())
+            )
         )
 
+    def is_significant_setting(self, name: str) -> bool:
+        """
+        Whether changes to the type of this setting should change the project version
+        """
+        return name in discovery.VALUED_SETTINGS
+
     def make_virtual_dependency_namer(
         self, *, virtual_namespace: protocols.ImportPath
     ) -> protocols.VirtualDependencyNamer:
-        return VirtualDependencyNamer(namespace=virtual_namespace, hasher=self.hasher)
+        return VirtualDependencyNamer(
+            namespace=virtual_namespace,
+            hasher=self.hasher,
+            layout=self.options.virtual_namespace_layout,
+        )
 
     def get_virtual_namespace(self) -> protocols.ImportPath:
         return discovery.ImportPath("__virtual_extended_mypy_django_plugin_report__")
@@ -160,9 +228,10 @@ class VirtualDependencyHandler(
             protocols.T_Project, protocols.T_VirtualDependency
         ],
     ) -> protocols.VirtualDependencyMap[protocols.T_VirtualDependency]:
-        return VirtualDependencyGenerator(virtual_dependency_maker=virtual_dependency_maker)(
-            discovered_project=self.discovered
-        )
+        return VirtualDependencyGenerator(
+            virtual_dependency_maker=virtual_dependency_maker,
+            layout=self.options.virtual_dependency_layout,
+        )(discovered_project=self.discovered)
 
 
 if TYPE_CHECKING:
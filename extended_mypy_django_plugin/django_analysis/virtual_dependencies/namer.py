@@ -7,11 +7,20 @@ from ..discovery.import_path import ImportPath
 
 @dataclasses.dataclass
 class VirtualDependencyNamer:
+    """
+    With the "sharded" layout each virtual dependency goes in a subpackage of the namespace
+    named for the last two characters of its hash, so no one folder ends up with all of them.
+    """
+
     namespace: protocols.ImportPath
     hasher: protocols.Hasher
+    layout: protocols.VirtualNamespaceLayout = "flat"
 
     def __call__(self, module: protocols.ImportPath, /) -> protocols.ImportPath:
-        return ImportPath(f"{self.namespace}.mod_{self.hasher(module.encode())}")
+        hashed = self.hasher(module.encode())
+        if self.layout == "sharded":
+            return ImportPath(f"{self.namespace}.shard_{hashed[-2:]}.mod_{hashed}")
+        return ImportPath(f"{self.namespace}.mod_{hashed}")
 
 
 if TYPE_CHECKING:
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from extended_mypy_django_plugin.django_analysis import protocols
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class VirtualDependencyOptions:
+    """
+    The options from the mypy configuration that change how virtual dependencies are made.
+
+    Each of these is explained with the rest of the configuration in the installation docs.
+    """
+
+    render_processes: int = 0
+    significance_policy: protocols.SignificancePolicy = "full"
+    virtual_dependency_layout: protocols.VirtualDependencyLayout = "module"
+    virtual_dependency_format: protocols.VirtualDependencyFormat = "py"
+    queryset_union_style: protocols.QuerySetUnionStyle = "expanded"
+    max_concrete_union_width: int = 0
+    virtual_namespace_layout: protocols.VirtualNamespaceLayout = "flat"
+    fingerprint_env_vars: Sequence[str] = ()
+
+
+if TYPE_CHECKING:
+    _VDO: protocols.VirtualDependencyOptions = cast(VirtualDependencyOptions, None)
@@ -1,20 +1,35 @@
 from __future__ import annotations
 
+import concurrent.futures
 import dataclasses
 import functools
-import importlib.util
+import json
 import operator
 import os
 import pathlib
+import pickle
 import re
 import shutil
+import tempfile
 import textwrap
-from collections.abc import Callable, Iterator, Mapping, MutableMapping, Sequence, Set
+from collections.abc import (
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSet,
+    Sequence,
+    Set,
+)
 from typing import TYPE_CHECKING, Generic, Literal, Protocol, TypeVar, cast
 
+from typing_extensions import Self
+
 from .. import protocols
-from ..discovery import ImportPath
+from ..discovery import ImportPath, module_specs
 from . import dependency
+from .significance import ModuleSignificance
 
 T_Report = TypeVar("T_Report", bound="Report")
 
@@ -23,6 +38,75 @@ regexes = {
     "summary_decl": re.compile(r'^summary = "(?P<summary>[^"]+)"$'),
 }
 
+# A file only needs virtual dependencies when it may use the annotations from this plugin
+ANNOTATIONS_PACKAGE = "extended_mypy_django_plugin"
+ANNOTATION_NAMES = frozenset({"Concrete", "DefaultQuerySet"})
+QUERYSET_ANNOTATION_NAME = "DefaultQuerySet"
+
+# Modules that don't mention any of these can't be giving access to our annotations
+_MENTIONS_ANNOTATIONS = frozenset({ANNOTATIONS_PACKAGE, *ANNOTATION_NAMES})
+
+# The summary of a virtual dependency for a module that isn't installed
+NOT_INSTALLED_SUMMARY = "||not_installed||"
+
+MANIFEST_NAME = "__virtual_dependencies_manifest__.json"
+MANIFEST_FORMAT = 1
+
+
+def _annotations_for(name: str, *, seen: frozenset[str]) -> Set[str]:
+    """
+    Return the names of our annotations that this imported name may give access to.
+
+    Anything from the package this plugin is in may give access to both annotations unless it
+    is one of them, otherwise the name is followed to what it was imported as in the source of
+    the module it is from. And if the name is a module, everything that module imports is
+    followed as well.
+    """
+    if name == ANNOTATIONS_PACKAGE or name.startswith(f"{ANNOTATIONS_PACKAGE}."):
+        imported = name.rsplit(".", 1)[-1]
+        if imported in ANNOTATION_NAMES:
+            return {imported}
+        return ANNOTATION_NAMES
+
+    if name in seen:
+        return set()
+    seen = seen | {name}
+
+    found: set[str] = set()
+    module, _, imported = name.rpartition(".")
+    if module:
+        target = module_specs.imported_names(module, mentioning=_MENTIONS_ANNOTATIONS).get(
+            imported
+        )
+        if target is not None:
+            found.update(_annotations_for(target, seen=seen))
+
+    for target in module_specs.imported_names(name, mentioning=_MENTIONS_ANNOTATIONS).values():
+        found.update(_annotations_for(target, seen=seen))
+
+    return found
+
+
+def _parse_report_summary(content: str) -> tuple[str | None, str | None]:
+    """
+    Return the "mod" and "summary" declared by the content of a virtual dependency
+    """
+    mod: str | None = None
+    summary: str | None = None
+    for line in content.splitlines():
+        m = regexes["mod_decl"].match(line)
+        if m:
+            mod = m.groupdict()["mod"]
+
+        m = regexes["summary_decl"].match(line)
+        if m:
+            summary = m.groupdict()["summary"]
+
+        if mod and summary:
+            break
+
+    return mod, summary
+
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class CombinedReport(Generic[protocols.T_Report]):
@@ -51,6 +135,80 @@ class CombinedReport(Generic[protocols.T_Report]):
             )
 
 
+class ReportImportPaths(MutableMapping[protocols.ImportPath, protocols.ImportPath]):
+    """
+    A mapping of module to the virtual dependency for that module that also knows which
+    modules each virtual dependency is for, so that finding out if a module is a virtual
+    dependency doesn't need to look at every module.
+    """
+
+    def __init__(
+        self,
+        items: Mapping[protocols.ImportPath, protocols.ImportPath]
+        | Iterable[tuple[protocols.ImportPath, protocols.ImportPath]] = (),
+    ) -> None:
+        self._modules: dict[protocols.ImportPath, protocols.ImportPath] = {}
+        self._virtual: dict[protocols.ImportPath, set[protocols.ImportPath]] = {}
+        self._packages: dict[str, set[protocols.ImportPath]] = {}
+        self.update(items)
+
+    def is_virtual(self, import_path: str) -> bool:
+        """
+        Return whether this is the import path of a virtual dependency
+        """
+        return import_path in self._virtual
+
+    def modules_under(self, package: str) -> Set[protocols.ImportPath]:
+        """
+        Return the modules with virtual dependencies that are inside this package
+        """
+        return self._packages.get(package, frozenset())
+
+    def __getitem__(self, module_import_path: protocols.ImportPath) -> protocols.ImportPath:
+        return self._modules[module_import_path]
+
+    def __setitem__(
+        self, module_import_path: protocols.ImportPath, virtual_import_path: protocols.ImportPath
+    ) -> None:
+        if module_import_path in self._modules:
+            self._forget(module_import_path)
+        self._modules[module_import_path] = virtual_import_path
+        self._virtual.setdefault(virtual_import_path, set()).add(module_import_path)
+        for package in self._packages_of(module_import_path):
+            self._packages.setdefault(package, set()).add(module_import_path)
+
+    def __delitem__(self, module_import_path: protocols.ImportPath) -> None:
+        self._forget(module_import_path)
+        del self._modules[module_import_path]
+
+    def __iter__(self) -> Iterator[protocols.ImportPath]:
+        return iter(self._modules)
+
+    def __len__(self) -> int:
+        return len(self._modules)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._modules!r})"
+
+    def _forget(self, module_import_path: protocols.ImportPath) -> None:
+        virtual_import_path = self._modules[module_import_path]
+        modules = self._virtual[virtual_import_path]
+        modules.discard(module_import_path)
+        if not modules:
+            del self._virtual[virtual_import_path]
+
+        for package in self._packages_of(module_import_path):
+            under = self._packages[package]
+            under.discard(module_import_path)
+            if not under:
+                del self._packages[package]
+
+    def _packages_of(self, module_import_path: str) -> Iterator[str]:
+        parts = module_import_path.split(".")
+        for i in range(1, len(parts)):
+            yield ".".join(parts[:i])
+
+
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class Report:
     concrete_annotations: MutableMapping[protocols.ImportPath, protocols.ImportPath] = (
@@ -60,25 +218,51 @@ class Report:
         dataclasses.field(default_factory=dict)
     )
     report_import_path: MutableMapping[protocols.ImportPath, protocols.ImportPath] = (
+        dataclasses.field(default_factory=ReportImportPaths)
+    )
+    queryset_import_path: MutableMapping[protocols.ImportPath, protocols.ImportPath] = (
         dataclasses.field(default_factory=dict)
     )
+    summarised_models: MutableMapping[protocols.ImportPath, int] = dataclasses.field(
+        default_factory=dict
+    )
+    closes_cycle: MutableSet[protocols.ImportPath] = dataclasses.field(default_factory=set)
+
+    def __post_init__(self) -> None:
+        # Make sure we can always cheaply tell if a module is a virtual dependency
+        if not isinstance(self.report_import_path, ReportImportPaths):
+            object.__setattr__(
+                self, "report_import_path", ReportImportPaths(self.report_import_path)
+            )
+
+    @property
+    def _report_import_paths(self) -> ReportImportPaths:
+        assert isinstance(self.report_import_path, ReportImportPaths)
+        return self.report_import_path
 
     def register_module(
         self,
         *,
         module_import_path: protocols.ImportPath,
         virtual_import_path: protocols.ImportPath,
+        closes_cycle: bool = False,
     ) -> None:
         self.report_import_path[module_import_path] = virtual_import_path
+        if closes_cycle:
+            self.closes_cycle.add(virtual_import_path)
+        else:
+            self.closes_cycle.discard(virtual_import_path)
 
     def register_model(
         self,
         *,
         model_import_path: protocols.ImportPath,
         virtual_import_path: protocols.ImportPath,
+        queryset_virtual_import_path: protocols.ImportPath,
         concrete_name: str,
         concrete_queryset_name: str,
         concrete_models: Sequence[protocols.Model],
+        summarised: bool = False,
     ) -> None:
         module_import_path, name = ImportPath.split(model_import_path)
 
@@ -86,8 +270,15 @@ class Report:
             f"{virtual_import_path}.{concrete_name}"
         )
         self.concrete_querysets[model_import_path] = ImportPath(
-            f"{virtual_import_path}.{concrete_queryset_name}"
+            f"{queryset_virtual_import_path}.{concrete_queryset_name}"
         )
+        if queryset_virtual_import_path != virtual_import_path:
+            self.queryset_import_path[virtual_import_path] = queryset_virtual_import_path
+
+        if summarised:
+            self.summarised_models[model_import_path] = len(concrete_models)
+        else:
+            self.summarised_models.pop(model_import_path, None)
 
     def get_concrete_aliases(self, *models: str) -> Mapping[str, str | None]:
         result: dict[str, str | None] = {}
@@ -101,6 +292,14 @@ class Report:
             result[model] = self.concrete_querysets.get(protocols.ImportPath(model))
         return result
 
+    def get_summarised_models(self, *models: str) -> Mapping[str, int]:
+        result: dict[str, int] = {}
+        for model in sorted(models):
+            count = self.summarised_models.get(protocols.ImportPath(model))
+            if count is not None:
+                result[model] = count
+        return result
+
     def additional_deps(
         self,
         *,
@@ -114,16 +313,55 @@ class Report:
             # Don't add additional deps to django itself
             return super_deps
 
-        report_names = set(self.report_import_path.values())
-        if file_import_path in report_names:
-            # Don't add additional deps to our virtual imports
-            # if things they depend on change, then the virtual dep also changes already
+        if (
+            self._report_import_paths.is_virtual(file_import_path)
+            or file_import_path in self.queryset_import_path.values()
+        ):
+            # Don't add additional deps to our virtual imports, including those with the
+            # queryset aliases, if things they depend on change, then the virtual dep also
+            # changes already
             return super_deps
 
-        # We need to include the virtual dependency so that we can find it and use
-        # The type aliases it provides to resolve concrete annotations
-        report_name = self.report_import_path.get(protocols.ImportPath(file_import_path))
-        if report_name:
+        # A module with models always depends on its own virtual dependencies so that the
+        # type aliases for its models are available anywhere those models end up being used
+        # Unless depending on that virtual dependency would close an import cycle
+        closes_cycle = {
+            report_name
+            for report_name in self._own_virtual_dependencies(file_import_path)
+            if report_name in self.closes_cycle
+        }
+        report_names: Sequence[protocols.ImportPath] = [
+            report_name
+            for report_name in self._own_virtual_dependencies(file_import_path)
+            if report_name not in closes_cycle
+        ]
+
+        # Files that can use our annotations also depend on the virtual dependencies for what
+        # they import so they are checked again when the concrete models for those change
+        used_annotations = self._annotations_used(imports)
+        uses_annotations = bool(used_annotations)
+        if uses_annotations:
+            report_names = [
+                report_name
+                for report_name in self._virtual_dependencies_for(
+                    file_import_path=file_import_path, imports=imports
+                )
+                if report_name not in closes_cycle
+            ]
+
+            # The queryset aliases are only needed by files that may use DefaultQuerySet
+            # because the modules those aliases import are often large
+            if QUERYSET_ANNOTATION_NAME in used_annotations:
+                report_names = [
+                    *report_names,
+                    *(
+                        self.queryset_import_path[report_name]
+                        for report_name in report_names
+                        if report_name in self.queryset_import_path
+                    ),
+                ]
+
+        for report_name in report_names:
             extra_dep = (25, report_name, -1)
             if extra_dep not in super_deps:
                 super_deps = [*super_deps, extra_dep]
@@ -132,13 +370,103 @@ class Report:
         # mypy understands there is a relationship between the file and the settings module
         # This isn't necessary in daemon mode cause changes to that will make us restart dmypy
         # And when there is no cache everything is from scratch anyways
-        if report_name and using_incremental_cache:
+        if uses_annotations and report_names and using_incremental_cache:
             settings_dep = (25, django_settings_module, -1)
             if settings_dep not in super_deps:
                 super_deps = [*super_deps, settings_dep]
 
         return super_deps
 
+    def _annotations_used(self, imports: Set[str]) -> Set[str]:
+        """
+        Return the names of our annotations that may be used by a file with these imports.
+
+        Names are resolved through the source of the modules they are imported from, so
+        annotations that are re-exported under another name, or used from a module that is
+        imported whole, are found without importing anything.
+        """
+        found: set[str] = set()
+        for name in imports:
+            if name.rsplit(".", 1)[-1] in ANNOTATION_NAMES:
+                found.add(name.rsplit(".", 1)[-1])
+            else:
+                found.update(_annotations_for(name, seen=frozenset()))
+
+            if found == ANNOTATION_NAMES:
+                break
+        return found
+
+    def _own_virtual_dependencies(self, file_import_path: str) -> list[protocols.ImportPath]:
+        """
+        Return the virtual dependency for this module and the virtual dependencies for any
+        model in this module that has its own virtual dependency.
+        """
+        found: list[protocols.ImportPath] = []
+        report_name = self.report_import_path.get(protocols.ImportPath(file_import_path))
+        if report_name is not None:
+            found.append(report_name)
+
+        for import_path in sorted(self._report_import_paths.modules_under(file_import_path)):
+            if import_path in self.concrete_annotations:
+                module_import_path, _ = ImportPath.split(import_path)
+                if module_import_path == file_import_path:
+                    report_name = self.report_import_path[import_path]
+                    if report_name not in found:
+                        found.append(report_name)
+        return found
+
+    def _virtual_dependencies_for(
+        self, *, file_import_path: str, imports: Set[str]
+    ) -> Sequence[protocols.ImportPath]:
+        """
+        Return the virtual dependencies for this file and the modules it imports.
+
+        Imported modules may be packages that re-export models from the modules inside
+        them, so the virtual dependencies for every module in that package are used as well.
+        When a name is imported from a module, that module is used, unless that name is a
+        model with its own virtual dependency. Other models in that module with their own
+        virtual dependency are not used in that case. When a name is imported from a package,
+        only the modules in that package that define a model with that name are used.
+        """
+        found: list[protocols.ImportPath] = []
+
+        def add(module_import_path: str) -> bool:
+            report_name = self.report_import_path.get(protocols.ImportPath(module_import_path))
+            if report_name is not None and report_name not in found:
+                found.append(report_name)
+            return report_name is not None
+
+        def add_package(package: str, *, skip_own_models: bool = False) -> bool:
+            added = add(package)
+            for module_import_path in sorted(self._report_import_paths.modules_under(package)):
+                if skip_own_models and module_import_path in self.concrete_annotations:
+                    if ImportPath.split(module_import_path)[0] == package:
+                        continue
+                added = add(module_import_path) or added
+            return added
+
+        for report_name in self._own_virtual_dependencies(file_import_path):
+            if report_name not in found:
+                found.append(report_name)
+
+        for name in sorted(imports):
+            if add_package(name) or "." not in name:
+                continue
+
+            parent, attr = name.rsplit(".", 1)
+            if parent in self.report_import_path:
+                add_package(parent, skip_own_models=True)
+                continue
+
+            # Otherwise every module in a package like the root of the project would be used
+            for module_import_path in sorted(self._report_import_paths.modules_under(parent)):
+                model_import_path = protocols.ImportPath(f"{module_import_path}.{attr}")
+                if model_import_path in self.concrete_annotations:
+                    if not add(model_import_path):
+                        add(module_import_path)
+
+        return found
+
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class RenderedVirtualDependency(Generic[protocols.T_Report]):
@@ -146,6 +474,9 @@ class RenderedVirtualDependency(Generic[protocols.T_Report]):
     summary_hash: str | None
     report: protocols.T_Report
     virtual_import_path: protocols.ImportPath
+    module_import_path: protocols.ImportPath
+    queryset_content: str | None = None
+    queryset_virtual_import_path: protocols.ImportPath | None = None
 
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
@@ -154,12 +485,12 @@ class VirtualDependencyScribe(Generic[protocols.T_VirtualDependency, protocols.T
     report_maker: protocols.ReportMaker[protocols.T_Report]
     virtual_dependency: protocols.T_VirtualDependency
     all_virtual_dependencies: protocols.VirtualDependencyMap[protocols.T_VirtualDependency]
-    make_differentiator: Callable[[], str]
-    installed_apps_hash: str
+    make_differentiator: Callable[[str], str]
+    queryset_union_style: protocols.QuerySetUnionStyle = "expanded"
+    max_concrete_union_width: int = 0
 
-    _summary_hashes: dict[protocols.ImportPath, str] = dataclasses.field(
-        default_factory=dict, init=False
-    )
+    # Should be shared between scribes for the same virtual dependencies
+    module_significance: ModuleSignificance[protocols.T_VirtualDependency] | None = None
 
     @classmethod
     def make_empty_virtual_dependency_content(
@@ -174,23 +505,29 @@ class VirtualDependencyScribe(Generic[protocols.T_VirtualDependency, protocols.T
         return (
             textwrap.dedent(f"""
         mod = "{module_import_path}"
-        summary = "||not_installed||"
+        summary = "{NOT_INSTALLED_SUMMARY}"
         """).strip()
             + "\n"
         )
 
     def render(self) -> RenderedVirtualDependency[protocols.T_Report]:
         report = self.report_maker()
-        summary_hash = self._get_summary_hash()
+        summary_hash = self.summary_hash()
 
-        module_import_path = self.virtual_dependency.summary.module_import_path
         virtual_import_path = self.virtual_dependency.summary.virtual_import_path
         report.register_module(
-            module_import_path=module_import_path, virtual_import_path=virtual_import_path
+            module_import_path=self.virtual_dependency.import_path,
+            virtual_import_path=virtual_import_path,
+            closes_cycle=self.virtual_dependency.closes_cycle,
         )
 
-        content = self._template_virtual_dependency(
-            report=report, virtual_import_path=virtual_import_path, summary_hash=summary_hash
+        queryset_virtual_import_path = ImportPath(f"{virtual_import_path}_querysets")
+
+        content, queryset_content = self._template_virtual_dependency(
+            report=report,
+            virtual_import_path=virtual_import_path,
+            queryset_virtual_import_path=queryset_virtual_import_path,
+            summary_hash=summary_hash,
         )
 
         return RenderedVirtualDependency(
@@ -198,10 +535,18 @@ class VirtualDependencyScribe(Generic[protocols.T_VirtualDependency, protocols.T
             summary_hash=summary_hash,
             report=report,
             virtual_import_path=virtual_import_path,
+            module_import_path=self.virtual_dependency.import_path,
+            queryset_content=queryset_content,
+            queryset_virtual_import_path=queryset_virtual_import_path,
         )
 
     @classmethod
-    def get_report_summary(cls, location: pathlib.Path) -> str | None:
+    def get_report_summary(
+        cls,
+        location: pathlib.Path,
+        *,
+        module_exists: Callable[[str], bool] = module_specs.module_exists,
+    ) -> str | None:
         """
         Given some location return the summary from that location.
 
@@ -210,108 +555,78 @@ class VirtualDependencyScribe(Generic[protocols.T_VirtualDependency, protocols.T
         if not location.is_file():
             return None
 
-        if location.suffix != ".py":
+        if location.suffix not in (".py", ".pyi"):
             return None
 
         # Look for 'mod = "{mod}"' and 'summary = "{summary}"' lines
-        mod: str | None = None
-        summary: str | None = None
-        for line in location.read_text().splitlines():
-            m = regexes["mod_decl"].match(line)
-            if m:
-                mod = m.groupdict()["mod"]
-
-            m = regexes["summary_decl"].match(line)
-            if m:
-                summary = m.groupdict()["summary"]
-
-            if mod and summary:
-                break
+        mod, summary = _parse_report_summary(location.read_text())
 
         if mod is None or summary is None:
             # either no mod or not summary, so dependency is corrupt or irrelevant
             return None
 
-        try:
-            importlib.util.find_spec(mod)
-        except ModuleNotFoundError:
-            # If we can't import the module this represents, we assume it doesn't exist
+        if not module_exists(mod):
+            # If we can't find the module this represents, we assume it doesn't exist
             return None
         else:
             return summary
 
-    def _get_summary_hash(self) -> str:
+    def summary_hash(self) -> str:
         summary = self.virtual_dependency.summary
 
-        significant = next(self._get_significant(self.virtual_dependency.module.import_path))
+        module_significance = self.module_significance
+        if module_significance is None:
+            module_significance = ModuleSignificance(
+                hasher=self.hasher, all_virtual_dependencies=self.all_virtual_dependencies
+            )
+
+        significant = module_significance(self.virtual_dependency.import_path)
 
         return "::".join(
             [
                 f"{summary.virtual_import_path}",
                 str(summary.module_import_path),
-                f"installed_apps={self.installed_apps_hash}",
                 f"significant={significant}",
-                "v2",
+                # Only mentioned when not the default so existing summaries don't change
+                *(
+                    [f"querysets={self.queryset_union_style}"]
+                    if self.queryset_union_style != "expanded"
+                    else []
+                ),
+                *(
+                    [f"max_union={self.max_concrete_union_width}"]
+                    if self.max_concrete_union_width
+                    else []
+                ),
+                "v5",
             ]
         )
 
-    def _get_significant(
-        self,
-        import_path: protocols.ImportPath,
-        /,
-        _visited: set[protocols.ImportPath] | None = None,
-    ) -> Iterator[str]:
-        if _visited is None:
-            _visited = set()
-
-        if import_path in _visited:
-            return
-
-        _visited.add(import_path)
-
-        if import_path not in self._summary_hashes:
-            if import_path not in self.all_virtual_dependencies:
-                return
-
-            dep = self.all_virtual_dependencies[import_path]
-
-            related: set[protocols.ImportPath] = set()
-            for _, concrete_models in dep.concrete_models.items():
-                for model in concrete_models:
-                    related.add(model.module_import_path)
-
-            info: list[bytes] = []
-            for related_mod in sorted(related):
-                if related_mod != import_path:
-                    info.extend(
-                        [
-                            sig.encode()
-                            for sig in self._get_significant(related_mod, _visited=_visited)
-                        ]
-                    )
-
-            info.extend([info.encode() for info in dep.summary.significant_info])
-            self._summary_hashes[import_path] = self.hasher(*info)
-
-        yield self._summary_hashes[import_path]
-
     def _template_virtual_dependency(
         self,
         *,
         report: protocols.T_Report,
         virtual_import_path: protocols.ImportPath,
+        queryset_virtual_import_path: protocols.ImportPath,
         summary_hash: str | None,
-    ) -> str:
+    ) -> tuple[str, str]:
+        """
+        Return the content for the virtual dependency and for the virtual dependency
+        that holds the queryset aliases.
+
+        The queryset aliases are kept apart so that the modules those querysets are defined in
+        are only imported by files that may use ``DefaultQuerySet``.
+        """
         module_import_path = self.virtual_dependency.summary.module_import_path
         summary = "None" if summary_hash is None else f'"{summary_hash}"'
 
         # mypy only considers a dependency as changed if it's public interface changes
         # Which is where either the static name or types change
-        # So we include a function that has a different name everytime we write to the file
-        # We rely on the contents of "summary" to not overwrite the same content with but
-        # with a different interface when installing the dependencies
-        content = textwrap.dedent(f"""
-        def interface__{self.make_differentiator()}() -> None:
+        # So we include a function with a name that comes from the summary, which means the
+        # interface changes whenever the summary does and the same summary is always
+        # written with the same interface
+        header = textwrap.dedent(f"""
+        def interface__{self.make_differentiator(summary_hash or "")}() -> None:
             return None
 
         mod = "{module_import_path}"
@@ -321,19 +636,39 @@ class VirtualDependencyScribe(Generic[protocols.T_VirtualDependency, protocols.T
 
         added_imports: set[protocols.ImportPath] = set()
         annotations: set[str] = set()
+        queryset_imports: set[protocols.ImportPath] = set()
+        queryset_annotations: set[str] = set()
 
         for model, concrete in self.virtual_dependency.concrete_models.items():
             querysets: list[str] = []
+            default_queryset_models: list[protocols.ImportPath] = []
 
             added_imports.add(model)
-            for conc in sorted(concrete, key=operator.attrgetter("import_path")):
+
+            # Past the maximum width the model itself is used so mypy doesn't need to check
+            # every expression using these aliases against a very large union
+            summarised = 0 < self.max_concrete_union_width < len(concrete)
+            if summarised:
+                queryset_imports.add(ImportPath("django.db.models.QuerySet"))
+                queryset_imports.add(model)
+                querysets.append(f"django.db.models.QuerySet[{model}]")
+
+            for conc in (
+                () if summarised else sorted(concrete, key=operator.attrgetter("import_path"))
+            ):
                 added_imports.add(conc.import_path)
                 if conc.default_custom_queryset:
-                    added_imports.add(conc.default_custom_queryset)
+                    queryset_imports.add(conc.default_custom_queryset)
                     queryset = str(conc.default_custom_queryset)
                 else:
-                    added_imports.add(ImportPath("django.db.models.QuerySet"))
-                    queryset = f"django.db.models.QuerySet[{conc.import_path}]"
+                    queryset_imports.add(ImportPath("django.db.models.QuerySet"))
+                    queryset_imports.add(conc.import_path)
+                    if self.queryset_union_style == "collapsed":
+                        # Given the concrete models once they have all been seen
+                        default_queryset_models.append(conc.import_path)
+                        queryset = "django.db.models.QuerySet"
+                    else:
+                        queryset = f"django.db.models.QuerySet[{conc.import_path}]"
 
                 # Check for existence instead of using a set
                 # So that the order of the querysets matches the order
@@ -341,35 +676,49 @@ class VirtualDependencyScribe(Generic[protocols.T_VirtualDependency, protocols.T
                 if queryset not in querysets:
                     querysets.append(queryset)
 
+            if default_queryset_models:
+                # mypy then only has one QuerySet to check against rather than one for each
+                # concrete model that uses the default queryset
+                querysets[querysets.index("django.db.models.QuerySet")] = (
+                    f"django.db.models.QuerySet[{' | '.join(default_queryset_models)}]"
+                )
+
             ns, name = ImportPath.split(model)
             concrete_name = f"Concrete__{name}"
             queryset_name = f"ConcreteQuerySet__{name}"
 
-            if concrete:
-                annotations.add(
-                    f"{concrete_name} = {' | '.join(conc.import_path for conc in concrete)}"
-                )
+            members = [model] if summarised else [conc.import_path for conc in concrete]
+            if members:
+                annotations.add(f"{concrete_name} = {' | '.join(members)}")
             if querysets:
-                annotations.add(f"{queryset_name} = {' | '.join(querysets)}")
+                queryset_annotations.add(f"{queryset_name} = {' | '.join(querysets)}")
 
             report.register_model(
                 model_import_path=model,
                 virtual_import_path=virtual_import_path,
+                queryset_virtual_import_path=queryset_virtual_import_path,
                 concrete_queryset_name=queryset_name,
                 concrete_name=concrete_name,
                 concrete_models=concrete,
+                summarised=summarised,
             )
 
-        sorted_added_imported_modules = sorted(
-            {".".join(imp.split(".")[:-1]) for imp in added_imports}
-        )
-
         # We add type aliases we use to resolve our concrete annotations to the dependency
         # This means that the mypy plugin relies completely on Django introspection to know
         # how to resolve the annotations, and we avoid problems around mypy not knowing about
         # relevant files when it analyses each file
+        return (
+            self._with_aliases(header, imports=added_imports, annotations=annotations),
+            self._with_aliases(header, imports=queryset_imports, annotations=queryset_annotations),
+        )
+
+    def _with_aliases(
+        self, content: str, *, imports: Set[protocols.ImportPath], annotations: Set[str]
+    ) -> str:
+        sorted_imported_modules = sorted({".".join(imp.split(".")[:-1]) for imp in imports})
+
         extra_lines = [
-            *(f"import {import_path}" for import_path in sorted_added_imported_modules),
+            *(f"import {import_path}" for import_path in sorted_imported_modules),
             *(f"{line}" for line in sorted(annotations)),
         ]
 
@@ -392,6 +741,10 @@ class ReportCombiner(Generic[T_Report]):
             final.concrete_annotations.update(report.concrete_annotations)
             final.concrete_querysets.update(report.concrete_querysets)
             final.report_import_path.update(report.report_import_path)
+            final.queryset_import_path.update(report.queryset_import_path)
+            final.summarised_models.update(report.summarised_models)
+            for virtual_import_path in report.closes_cycle:
+                final.closes_cycle.add(virtual_import_path)
 
         return CombinedReport(
             version=version, report=final, write_empty_virtual_dep=write_empty_virtual_dep
@@ -410,69 +763,157 @@ class ReportSummaryGetter(Protocol):
     def __call__(self, location: pathlib.Path, /) -> str | None: ...
 
 
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class ManifestEntry:
+    """
+    What the manifest knows about a virtual dependency on disk.
+
+    This is only trusted while the file still has the same modified time and size.
+    """
+
+    module_import_path: str | None
+    summary: str | None
+    mtime_ns: int
+    size: int
+
+    @classmethod
+    def for_location(
+        cls, location: pathlib.Path, *, module_import_path: str | None, summary: str | None
+    ) -> Self | None:
+        try:
+            stat = location.stat()
+        except OSError:
+            return None
+        return cls(
+            module_import_path=module_import_path,
+            summary=summary,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+
+    def matches(self, location: pathlib.Path) -> bool:
+        try:
+            stat = location.stat()
+        except OSError:
+            return False
+        return stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size
+
+
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class ReportInstaller:
+    """
+    Writes virtual dependencies into a destination and removes those that aren't needed anymore.
+
+    Virtual dependencies are written as ``.py`` files, or as ``.pyi`` stubs when that is the
+    ``virtual_dependency_format``. Any written in the other format are removed, as are any
+    that aren't where the ``virtual_namespace_layout`` would put them.
+
+    A manifest next to the virtual namespace remembers the module and summary of each virtual
+    dependency so that files only need to be read when they aren't in the manifest or have
+    changed since the manifest was written. If the manifest is missing or can't be read then
+    it is rebuilt from the files that are installed. Virtual dependencies written after they
+    were installed, like the empty ones written at mypy time, are added to the manifest as
+    they are written.
+    """
+
     _written: dict[pathlib.Path, str | Literal[False] | None] = dataclasses.field(
         init=False, default_factory=dict
     )
+    _manifests: dict[pathlib.Path, dict[protocols.ImportPath, ManifestEntry]] = dataclasses.field(
+        init=False, default_factory=dict
+    )
+    _installed: set[pathlib.Path] = dataclasses.field(init=False, default_factory=set)
     _get_report_summary: ReportSummaryGetter
+    _module_exists: Callable[[str], bool] = module_specs.module_exists
+    virtual_dependency_format: protocols.VirtualDependencyFormat = "py"
+    virtual_namespace_layout: protocols.VirtualNamespaceLayout = "flat"
+
+    def location_for(
+        self, *, destination: pathlib.Path, virtual_import_path: protocols.ImportPath
+    ) -> pathlib.Path:
+        return (
+            destination
+            / f"{virtual_import_path.replace('.', os.sep)}.{self.virtual_dependency_format}"
+        )
 
     def write_report(
         self,
         *,
-        scratch_root: pathlib.Path,
+        destination: pathlib.Path,
         summary_hash: str | Literal[False] | None,
         virtual_import_path: protocols.ImportPath,
+        module_import_path: protocols.ImportPath,
         content: str,
     ) -> bool:
-        location = scratch_root / f"{virtual_import_path.replace('.', os.sep)}.py"
-        if not location.is_relative_to(scratch_root):
+        location = self.location_for(
+            destination=destination, virtual_import_path=virtual_import_path
+        )
+        if not location.is_relative_to(destination):
             raise RuntimeError(
-                f"Virtual dependency ends up being outside of the scratch root: {virtual_import_path}"
+                f"Virtual dependency ends up being outside of the destination: {virtual_import_path}"
             )
 
-        if location.exists() and summary_hash is False:
+        exists = location.exists()
+        if exists and summary_hash is False:
             return False
 
-        location.parent.mkdir(parents=True, exist_ok=True)
-        location.write_text(content)
         self._written[location] = summary_hash
-        return True
+
+        manifest = self._read_manifest(destination)
+        written = True
+
+        # Leave alone anything that already represents the same information
+        if exists and summary_hash is not False:
+            entry = manifest.get(virtual_import_path)
+            if entry is not None and entry.matches(location):
+                found_summary = entry.summary
+            else:
+                found_summary = self._get_report_summary(location)
+            written = found_summary != summary_hash
+
+        if written:
+            location.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomically(location, content)
+
+        entry = ManifestEntry.for_location(
+            location,
+            module_import_path=module_import_path,
+            summary=NOT_INSTALLED_SUMMARY if summary_hash is False else summary_hash,
+        )
+        if entry is not None:
+            manifest[virtual_import_path] = entry
+            if destination in self._installed:
+                # Nothing else will write the manifest once the reports are installed
+                self._write_manifest(destination, manifest)
+
+        return written
 
     def install_reports(
         self,
         *,
-        scratch_root: pathlib.Path,
         destination: pathlib.Path,
         virtual_namespace: protocols.ImportPath,
     ) -> None:
         virtual_destination = destination / virtual_namespace
         virtual_destination.mkdir(parents=True, exist_ok=True)
 
-        seen: set[pathlib.Path] = set()
-
-        # For all the dependencies we have written to the filesystem, determine
-        # if they represent different information to what is already on the destination
-        # and move across those that are different
-        for location, summary in self._written.items():
-            relative_path = location.relative_to(scratch_root)
-            destination_path = destination / relative_path
-
-            seen.add(destination_path)
-            found_summary: str | None = None
-            if destination_path.exists():
-                found_summary = self._get_report_summary(destination_path)
-
-            if found_summary != summary:
-                destination_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.move(location, destination_path)
+        manifest = self._read_manifest(destination)
+        seen = set(self._written)
+        present: set[protocols.ImportPath] = set()
+        suffix = f".{self.virtual_dependency_format}"
+        sharded = self.virtual_namespace_layout == "sharded"
 
         # Then we go ahead and do some garbage collection on the destination
         # So that the destination is only ever dependencies for modules that exist
         # and we don't have an infinitely growing folder of virtual dependencies
         for root, dirs, files in os.walk(virtual_destination):
+            # With the sharded layout virtual dependencies are only found in the shards
+            in_shards = sharded and pathlib.Path(root) != virtual_destination
+
             for name in list(dirs):
                 location = pathlib.Path(root) / name
+                if sharded and not in_shards and name.startswith("shard_"):
+                    continue
                 if location not in seen:
                     if self._get_report_summary(location) is None:
                         shutil.rmtree(location)
@@ -480,9 +921,224 @@ class ReportInstaller:
 
             for name in files:
                 location = pathlib.Path(root) / name
+                virtual_import_path = ImportPath(
+                    ".".join(location.relative_to(destination).with_suffix("").parts)
+                )
+                if location.suffix in (".py", ".pyi") and location.suffix != suffix:
+                    # Left behind from when virtual dependencies were in the other format
+                    location.unlink(missing_ok=True)
+                    continue
+                if sharded and not in_shards:
+                    # Left behind from when virtual dependencies weren't sharded
+                    location.unlink(missing_ok=True)
+                    continue
                 if location not in seen:
-                    if self._get_report_summary(location) is None:
+                    if self._installed_summary(manifest, virtual_import_path, location) is None:
                         location.unlink(missing_ok=True)
+                        continue
+                present.add(virtual_import_path)
+
+        # Forget anything in this namespace that isn't on disk anymore
+        for virtual_import_path in list(manifest):
+            if (
+                virtual_import_path.startswith(f"{virtual_namespace}.")
+                and virtual_import_path not in present
+            ):
+                del manifest[virtual_import_path]
+
+        self._write_manifest(destination, manifest)
+        self._installed.add(destination)
+
+    def _installed_summary(
+        self,
+        manifest: Mapping[protocols.ImportPath, ManifestEntry],
+        virtual_import_path: protocols.ImportPath,
+        location: pathlib.Path,
+    ) -> str | None:
+        """
+        Return the summary of an installed virtual dependency, or None if it's not needed
+        """
+        entry = manifest.get(virtual_import_path)
+        if entry is None or not entry.matches(location):
+            return self._get_report_summary(location)
+
+        if entry.module_import_path is None or entry.summary is None:
+            return None
+
+        if not self._module_exists(entry.module_import_path):
+            return None
+
+        return entry.summary
+
+    def _read_manifest(
+        self, destination: pathlib.Path
+    ) -> dict[protocols.ImportPath, ManifestEntry]:
+        if destination in self._manifests:
+            return self._manifests[destination]
+
+        manifest: dict[protocols.ImportPath, ManifestEntry] = {}
+        self._manifests[destination] = manifest
+
+        try:
+            data = json.loads((destination / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return manifest
+
+        if not isinstance(data, dict) or data.get("manifest_format") != MANIFEST_FORMAT:
+            return manifest
+
+        entries = data.get("entries")
+        if not isinstance(entries, dict):
+            return manifest
+
+        for virtual_import_path, entry in entries.items():
+            match entry:
+                case [str() | None as mod, str() | None as summary, int() as mtime, int() as size]:
+                    manifest[ImportPath(virtual_import_path)] = ManifestEntry(
+                        module_import_path=mod, summary=summary, mtime_ns=mtime, size=size
+                    )
+
+        return manifest
+
+    def _write_manifest(
+        self, destination: pathlib.Path, manifest: Mapping[protocols.ImportPath, ManifestEntry]
+    ) -> None:
+        _write_atomically(
+            destination / MANIFEST_NAME,
+            json.dumps(
+                {
+                    "manifest_format": MANIFEST_FORMAT,
+                    "entries": {
+                        virtual_import_path: [
+                            entry.module_import_path,
+                            entry.summary,
+                            entry.mtime_ns,
+                            entry.size,
+                        ]
+                        for virtual_import_path, entry in sorted(manifest.items())
+                    },
+                },
+                indent="  ",
+            ),
+        )
+
+
+def _write_atomically(location: pathlib.Path, content: str) -> None:
+    """
+    Write to a temporary file next to the location and move it into place so that
+    nothing can see a partially written virtual dependency
+    """
+    fd, tmp = tempfile.mkstemp(dir=location.parent, prefix=f".{location.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as fle:
+            fle.write(content)
+        os.replace(tmp, location)
+    except BaseException:
+        pathlib.Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class ReportScribe(Generic[protocols.T_VirtualDependency]):
+    """
+    Renders virtual dependencies with the ``VirtualDependencyScribe`` such that the
+    significance of each module is only hashed once for all the virtual dependencies
+    """
+
+    hasher: protocols.Hasher
+    make_differentiator: Callable[[str], str]
+    queryset_union_style: protocols.QuerySetUnionStyle = "expanded"
+    max_concrete_union_width: int = 0
+
+    _module_significance: list[ModuleSignificance[protocols.T_VirtualDependency]] = (
+        dataclasses.field(default_factory=list, init=False)
+    )
+
+    def __call__(
+        self,
+        *,
+        virtual_dependency: protocols.T_VirtualDependency,
+        all_virtual_dependencies: protocols.VirtualDependencyMap[protocols.T_VirtualDependency],
+    ) -> protocols.RenderedVirtualDependency[Report]:
+        return VirtualDependencyScribe(
+            hasher=self.hasher,
+            report_maker=Report,
+            virtual_dependency=virtual_dependency,
+            all_virtual_dependencies=all_virtual_dependencies,
+            make_differentiator=self.make_differentiator,
+            queryset_union_style=self.queryset_union_style,
+            max_concrete_union_width=self.max_concrete_union_width,
+            module_significance=self.module_significance(all_virtual_dependencies),
+        ).render()
+
+    def module_significance(
+        self,
+        all_virtual_dependencies: protocols.VirtualDependencyMap[protocols.T_VirtualDependency],
+    ) -> ModuleSignificance[protocols.T_VirtualDependency]:
+        if (
+            not self._module_significance
+            or self._module_significance[0].all_virtual_dependencies
+            is not all_virtual_dependencies
+        ):
+            self._module_significance[:] = [
+                ModuleSignificance(
+                    hasher=self.hasher, all_virtual_dependencies=all_virtual_dependencies
+                )
+            ]
+        return self._module_significance[0]
+
+    def for_processes(
+        self,
+        all_virtual_dependencies: protocols.VirtualDependencyMap[protocols.T_VirtualDependency],
+    ) -> Self:
+        """
+        Return a scribe that can be sent to other processes to render these virtual dependencies.
+
+        The significance of every module is hashed before that happens, and the differentiator
+        for every summary is found so that ``make_differentiator`` doesn't need to be sent.
+        """
+        module_significance = self.module_significance(all_virtual_dependencies)
+        differentiators: dict[str, str] = {}
+        for virtual_dependency in all_virtual_dependencies.values():
+            summary_hash = VirtualDependencyScribe(
+                hasher=self.hasher,
+                report_maker=Report,
+                virtual_dependency=virtual_dependency,
+                all_virtual_dependencies=all_virtual_dependencies,
+                make_differentiator=self.make_differentiator,
+                queryset_union_style=self.queryset_union_style,
+                max_concrete_union_width=self.max_concrete_union_width,
+                module_significance=module_significance,
+            ).summary_hash()
+            differentiators[summary_hash] = self.make_differentiator(summary_hash)
+
+        scribe = dataclasses.replace(self, make_differentiator=differentiators.__getitem__)
+        scribe._module_significance.append(module_significance)
+        return scribe
+
+
+def _render_virtual_dependencies(
+    pickled: bytes, import_paths: Sequence[protocols.ImportPath]
+) -> list[tuple[protocols.ImportPath, protocols.RenderedVirtualDependency[protocols.T_Report]]]:
+    """
+    Used to render some of the virtual dependencies in another process, given the pickled
+    scribe and all the virtual dependencies
+    """
+    report_scribe: protocols.VirtualDependencyScribe[
+        protocols.P_VirtualDependency, protocols.T_Report
+    ]
+    all_virtual_dependencies: protocols.VirtualDependencyMap[protocols.P_VirtualDependency]
+    report_scribe, all_virtual_dependencies = pickle.loads(pickled)
+    return [
+        (
+            import_path,
+            report_scribe(
+                virtual_dependency=all_virtual_dependencies[import_path],
+                all_virtual_dependencies=all_virtual_dependencies,
+            ),
+        )
+        for import_path in import_paths
+    ]
 
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
@@ -497,15 +1153,57 @@ class ReportFactory(Generic[protocols.T_VirtualDependency, protocols.T_Report]):
         protocols.T_VirtualDependency, protocols.T_Report
     ]
 
+    # More than one means virtual dependencies are rendered in that many processes
+    render_processes: int = 0
+
     def deploy_scribes(
         self, virtual_dependencies: protocols.VirtualDependencyMap[protocols.T_VirtualDependency]
     ) -> Iterator[protocols.RenderedVirtualDependency[protocols.T_Report]]:
+        if self.render_processes > 1 and len(virtual_dependencies) > 1:
+            rendered = self._deploy_scribes_in_processes(virtual_dependencies)
+            if rendered is not None:
+                yield from rendered
+                return
+
         for virtual_dependency in virtual_dependencies.values():
             yield self.report_scribe(
                 virtual_dependency=virtual_dependency,
                 all_virtual_dependencies=virtual_dependencies,
             )
 
+    def _deploy_scribes_in_processes(
+        self, virtual_dependencies: protocols.VirtualDependencyMap[protocols.T_VirtualDependency]
+    ) -> Sequence[protocols.RenderedVirtualDependency[protocols.T_Report]] | None:
+        """
+        Render the virtual dependencies across a pool of processes.
+
+        Return None if the scribe or the virtual dependencies can't be pickled, so that they
+        are rendered in this process instead. They are pickled once before anything is given
+        to the pool, so any error from rendering in the pool is raised as it is.
+        """
+        report_scribe = self.report_scribe
+        if isinstance(report_scribe, ReportScribe):
+            report_scribe = report_scribe.for_processes(virtual_dependencies)
+
+        try:
+            pickled = pickle.dumps((report_scribe, virtual_dependencies))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            return None
+
+        import_paths = list(virtual_dependencies)
+        processes = min(self.render_processes, len(import_paths))
+        render = functools.partial(_render_virtual_dependencies, pickled)
+
+        rendered: dict[
+            protocols.ImportPath, protocols.RenderedVirtualDependency[protocols.T_Report]
+        ] = {}
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as pool:
+            for chunk in pool.map(render, [import_paths[i::processes] for i in range(processes)]):
+                rendered.update(chunk)
+
+        # Keep the same order as rendering in this process
+        return [rendered[import_path] for import_path in import_paths]
+
     def determine_version(
         self,
         *,
@@ -527,33 +1225,35 @@ def make_report_factory(
     *,
     hasher: protocols.Hasher,
     report_maker: protocols.ReportMaker[Report],
-    installed_apps_hash: str,
-    make_differentiator: Callable[[], str],
+    make_differentiator: Callable[[str], str],
+    render_processes: int = 0,
+    virtual_dependency_format: protocols.VirtualDependencyFormat = "py",
+    queryset_union_style: protocols.QuerySetUnionStyle = "expanded",
+    max_concrete_union_width: int = 0,
+    virtual_namespace_layout: protocols.VirtualNamespaceLayout = "flat",
 ) -> protocols.ReportFactory[protocols.T_VirtualDependency, Report]:
     """
     Make a ReportFactory that's specific to the our implementation of protocols.Report found here
     """
-
-    def report_scribe(
-        *,
-        virtual_dependency: protocols.T_VirtualDependency,
-        all_virtual_dependencies: protocols.VirtualDependencyMap[protocols.T_VirtualDependency],
-    ) -> protocols.RenderedVirtualDependency[Report]:
-        return VirtualDependencyScribe(
-            hasher=hasher,
-            report_maker=Report,
-            installed_apps_hash=installed_apps_hash,
-            virtual_dependency=virtual_dependency,
-            all_virtual_dependencies=all_virtual_dependencies,
-            make_differentiator=make_differentiator,
-        ).render()
+    module_exists = module_specs.ModuleIndex()
 
     return ReportFactory(
         hasher=hasher,
         report_maker=report_maker,
-        report_scribe=report_scribe,
+        report_scribe=ReportScribe(
+            hasher=hasher,
+            make_differentiator=make_differentiator,
+            queryset_union_style=queryset_union_style,
+            max_concrete_union_width=max_concrete_union_width,
+        ),
+        render_processes=render_processes,
         report_installer=ReportInstaller(
-            _get_report_summary=VirtualDependencyScribe.get_report_summary
+            _get_report_summary=functools.partial(
+                VirtualDependencyScribe.get_report_summary, module_exists=module_exists
+            ),
+            _module_exists=module_exists,
+            virtual_dependency_format=virtual_dependency_format,
+            virtual_namespace_layout=virtual_namespace_layout,
         ),
         report_combiner_maker=functools.partial(ReportCombiner, report_maker=report_maker),
         make_empty_virtual_dependency_content=VirtualDependencyScribe.make_empty_virtual_dependency_content,
@@ -577,6 +1277,9 @@ if TYPE_CHECKING:
         RenderedVirtualDependency[protocols.P_Report], None
     )
     _RI: protocols.P_ReportInstaller = cast(ReportInstaller, None)
+    _RS: protocols.P_VirtualDependencyScribe = cast(
+        ReportScribe[protocols.P_VirtualDependency], None
+    )
     _MEVDC: protocols.MakeEmptyVirtualDepContent = (
         VirtualDependencyScribe.make_empty_virtual_dependency_content
     )
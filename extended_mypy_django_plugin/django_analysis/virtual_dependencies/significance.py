@@ -0,0 +1,98 @@
+import dataclasses
+from collections.abc import Sequence
+from typing import Generic
+
+from .. import protocols
+from ..graphs import strongly_connected_components
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class ModuleSignificance(Generic[protocols.T_VirtualDependency]):
+    """
+    Hashes the significant information for each virtual dependency along with the
+    significant information of every virtual dependency it relates to.
+
+    Modules (or models) relate to the modules (or models) of their concrete models, and
+    those relations may form cycles. So each strongly connected component of those
+    relations is hashed once, from the significant information of its members and the
+    hashes of the components it relates to. Every module in a component gets the hash of
+    that component.
+
+    Hashes and relations are remembered so that one instance can be shared by every scribe,
+    which makes hashing every module linear in the number of modules and relations.
+    """
+
+    hasher: protocols.Hasher
+    all_virtual_dependencies: protocols.VirtualDependencyMap[protocols.T_VirtualDependency]
+
+    _hashes: dict[protocols.ImportPath, str] = dataclasses.field(default_factory=dict, init=False)
+    _related: dict[protocols.ImportPath, Sequence[protocols.ImportPath]] = dataclasses.field(
+        default_factory=dict, init=False
+    )
+
+    def __call__(self, import_path: protocols.ImportPath, /) -> str | None:
+        """
+        Return the hash for this module, or None if it has no virtual dependency
+        """
+        if import_path not in self.all_virtual_dependencies:
+            return None
+
+        if import_path not in self._hashes:
+            self._hash_components_from(import_path)
+
+        return self._hashes[import_path]
+
+    def related(self, import_path: protocols.ImportPath, /) -> Sequence[protocols.ImportPath]:
+        """
+        The other virtual dependencies for the concrete models of this virtual dependency.
+
+        That's the virtual dependency for the concrete model itself if there is one, otherwise
+        it's the virtual dependency for the module of that model.
+        """
+        if import_path in self._related:
+            return self._related[import_path]
+
+        related: set[protocols.ImportPath] = set()
+        for concrete_models in self.all_virtual_dependencies[import_path].concrete_models.values():
+            for model in concrete_models:
+                if model.import_path in self.all_virtual_dependencies:
+                    related.add(model.import_path)
+                else:
+                    related.add(model.module_import_path)
+
+        related.discard(import_path)
+        found = self._related[import_path] = sorted(
+            name for name in related if name in self.all_virtual_dependencies
+        )
+        return found
+
+    def _hash_components_from(self, root: protocols.ImportPath) -> None:
+        """
+        Components are found after every component they relate to, so those hashes are
+        always known by the time they're needed.
+        """
+        for component in strongly_connected_components([root], self.related, known=self._hashes):
+            self._hash_component(sorted(component))
+
+    def _hash_component(self, component: Sequence[protocols.ImportPath]) -> None:
+        members = set(component)
+
+        info: list[bytes] = []
+        seen: set[str] = set()
+        for import_path in component:
+            for related in self.related(import_path):
+                if related not in members:
+                    found = self._hashes[related]
+                    if found not in seen:
+                        seen.add(found)
+                        info.append(found.encode())
+
+        for import_path in component:
+            info.extend(
+                line.encode()
+                for line in self.all_virtual_dependencies[import_path].summary.significant_info
+            )
+
+        component_hash = self.hasher(*info)
+        for import_path in component:
+            self._hashes[import_path] = component_hash
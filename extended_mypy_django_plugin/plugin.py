@@ -1,12 +1,14 @@
 from ._plugin import hook, protocols
 from ._plugin.config import ExtraOptions
 from ._plugin.entry import PluginProvider
+from ._plugin.import_graph import ImportGraph
 from ._plugin.plugin import ExtendedMypyStubs
 from ._plugin.virtual_dependencies import VirtualDependencyHandler, VirtualDependencyHandlerBase
 
 __all__ = [
     "ExtendedMypyStubs",
     "ExtraOptions",
+    "ImportGraph",
     "PluginProvider",
     "VirtualDependencyHandler",
     "VirtualDependencyHandlerBase",
@@ -15,6 +15,11 @@ off `extended_mypy_django_plugin.plugin.PluginProvider` to find the `VirtualDepe
 object that will determine a "version" for the project. This number is written to a file that
 is specified on the command line to communicate back to the existing Mypy daemon process whether
 to consider Django as changed or not.
+
+That version is stored in the scratch path along with a fingerprint of every module that was used
+to make it, of the apps and models modules the installed apps don't have, and of the environment
+variables named by the ``fingerprint_env_vars`` option. The next run will use that version without
+loading the plugin or the Django project if none of those have changed or appeared.
 """
 
 import argparse
@@ -24,7 +29,9 @@ import pathlib
 import re
 import sys
 
-from extended_mypy_django_plugin.plugin import ExtraOptions, PluginProvider, protocols
+from extended_mypy_django_plugin._plugin.config import ExtraOptions
+from extended_mypy_django_plugin.django_analysis.cache import VersionCache, environment_fingerprint
+from extended_mypy_django_plugin.django_analysis.hasher import adler32_hash
 
 
 def make_parser() -> argparse.ArgumentParser:
@@ -49,6 +56,29 @@ def main(argv: list[str] | None = None) -> None:
         # An exit code of 2 tells the existing process to say the version hasn't changed
         sys.exit(2)
 
+    version_cache = VersionCache(
+        location=extra_options.scratch_path / "__django_state__.json", hasher=adler32_hash
+    )
+    extra = {
+        "python": sys.version,
+        "config_file": str(args.config_file),
+        "mypy_plugins": ",".join(args.mypy_plugin),
+        **extra_options.for_report(),
+        **environment_fingerprint(extra_options.virtual_dependency_options.fingerprint_env_vars),
+    }
+
+    version = version_cache.read(extra=extra)
+    if version is not None:
+        args.version_file.write_text(version)
+        return
+
+    # Only import what is needed to make the report when the stored version can't be used
+    from django.apps import apps
+
+    from extended_mypy_django_plugin.django_analysis import DiscoveryCache, Fingerprint, cache
+    from extended_mypy_django_plugin.django_analysis.discovery import module_specs
+    from extended_mypy_django_plugin.plugin import PluginProvider, protocols
+
     plugin_provider: PluginProvider[protocols.Report] | None = None
 
     for plugin in args.mypy_plugin:
@@ -69,6 +99,37 @@ def main(argv: list[str] | None = None) -> None:
     # by relying on filtering stdout or stderr
     args.version_file.write_text(report.version)
 
+    # The apps and models modules that installed apps don't have yet would change the
+    # report if they were created
+    absent = [
+        location
+        for app_config in (apps.get_app_configs() if apps.ready else [])
+        for name in (f"{app_config.name}.apps", f"{app_config.name}.models")
+        if name not in sys.modules and module_specs.find_spec(name) is None
+        for location in module_specs.possible_locations(name)
+    ]
+
+    fingerprint = Fingerprint.from_modules(
+        modules=sys.modules,
+        project_root=extra_options.project_root,
+        hasher=adler32_hash,
+        extra=extra,
+        absent=absent,
+    )
+
+    # Discovery may have been restored from the cache rather than loading the project
+    # in which case the modules it used are only known from that cache
+    discovery_fingerprint = DiscoveryCache(
+        location=extra_options.scratch_path / cache.DISCOVERY_CACHE_NAME, hasher=adler32_hash
+    ).read_fingerprint()
+
+    if discovery_fingerprint is not None:
+        version_cache.write(
+            version=report.version, fingerprint=fingerprint.merge(discovery_fingerprint)
+        )
+    elif apps.ready:
+        version_cache.write(version=report.version, fingerprint=fingerprint)
+
 
 def load_plugin(plugin_path: str, config_file: str) -> object | None:
     """
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+"""
+This is used by the Mypy plugin to make running ``determine_django_state`` cheaper.
+
+Running ``determine_django_state`` in a fresh process means importing python, mypy,
+Django and every third party Django app on every run of the Mypy daemon, just to get
+a version string.
+
+This script is started once by the Mypy daemon and imports those things before
+any settings are loaded. Each request from the daemon is then handled in a child that
+is forked from this process, so only the project's settings and models are imported
+in that child, and Django is never loaded more than once in any process.
+
+After each request, modules from installed distributions that the child imported are
+imported here as well so that they are already present for the next child. Modules
+that aren't from an installed distribution or the standard library are never imported
+here, as those are the modules that can change while the daemon is running.
+
+The version of each installed distribution that has been imported here is remembered, and
+if any of those change then the process asks to be restarted rather than forking children
+that would use the old code.
+
+Requests are read from stdin as json lines of ``{"argv": [...]}`` and responses are
+written to stdout as json lines of ``{"returncode": 0, "stdout": "", "stderr": ""}``, or
+``{"restart": true}`` before exiting when the process is out of date. The process exits
+when stdin is closed.
+"""
+
+import contextlib
+import importlib
+import importlib.metadata
+import io
+import json
+import os
+import pathlib
+import sys
+import sysconfig
+import tempfile
+import threading
+import traceback
+from collections.abc import Iterator, Sequence
+from typing import IO
+
+PRELOAD = (
+    "django",
+    "django.apps",
+    "django.conf",
+    "django.db.models",
+    "mypy.options",
+    "mypy_django_plugin.main",
+    "extended_mypy_django_plugin.plugin",
+    "extended_mypy_django_plugin.scripts.determine_django_state",
+)
+
+
+def installed_module_names(names: Sequence[str]) -> list[str]:
+    """
+    Return the modules from those provided that come from an installed distribution or
+    the standard library.
+    """
+    paths = sysconfig.get_paths()
+    site_packages = {pathlib.Path(paths[name]) for name in ("purelib", "platlib")}
+    stdlib = {pathlib.Path(paths[name]) for name in ("stdlib", "platstdlib")}
+    top_level_distributions = importlib.metadata.packages_distributions()
+
+    found: list[str] = []
+    for name in names:
+        module = sys.modules.get(name)
+        filename = getattr(module, "__file__", None)
+        if not isinstance(filename, str):
+            continue
+
+        location = pathlib.Path(filename)
+        if any(location.is_relative_to(folder) for folder in site_packages):
+            if name.split(".", 1)[0] in top_level_distributions:
+                found.append(name)
+        elif any(location.is_relative_to(folder) for folder in stdlib):
+            found.append(name)
+
+    return found
+
+
+def distribution_versions(names: Sequence[str]) -> dict[str, str]:
+    """
+    Return the version of each installed distribution that provides these modules
+    """
+    top_level_distributions = importlib.metadata.packages_distributions()
+
+    found: dict[str, str] = {}
+    for name in names:
+        for dist in top_level_distributions.get(name.split(".", 1)[0], []):
+            if dist not in found:
+                with contextlib.suppress(importlib.metadata.PackageNotFoundError):
+                    found[dist] = importlib.metadata.version(dist)
+
+    return found
+
+
+@contextlib.contextmanager
+def without_django_settings_module() -> Iterator[None]:
+    """
+    Make sure that nothing imported here can find the project's settings
+    """
+    previous = os.environ.pop("DJANGO_SETTINGS_MODULE", None)
+    try:
+        yield
+    finally:
+        if previous is not None:
+            os.environ["DJANGO_SETTINGS_MODULE"] = previous
+
+
+class Zygote:
+    def __init__(self) -> None:
+        self.unimportable: set[str] = set()
+        self.distributions: dict[str, str] = {}
+        self.distributions_from = 0
+
+    def preload(self, names: Sequence[str]) -> None:
+        with without_django_settings_module():
+            for name in names:
+                if name in sys.modules or name in self.unimportable:
+                    continue
+                try:
+                    importlib.import_module(name)
+                except Exception:
+                    self.unimportable.add(name)
+
+        if len(sys.modules) != self.distributions_from:
+            self.distributions_from = len(sys.modules)
+            self.distributions = distribution_versions(installed_module_names(list(sys.modules)))
+
+    def is_out_of_date(self) -> bool:
+        """
+        Whether an installed distribution imported here has changed since it was imported
+        """
+        for dist, version in self.distributions.items():
+            try:
+                if importlib.metadata.version(dist) != version:
+                    return True
+            except importlib.metadata.PackageNotFoundError:
+                return True
+        return False
+
+    def is_safe_to_fork(self) -> bool:
+        """
+        Forking is only useful while Django hasn't been set up in this process, and is only
+        safe while this process has one thread.
+        """
+        from django.apps import apps
+        from django.conf import settings
+
+        return not settings.configured and not apps.ready and threading.active_count() == 1
+
+    def handle(self, argv: Sequence[str]) -> dict[str, object]:
+        with tempfile.TemporaryDirectory() as tmp:
+            stdout = pathlib.Path(tmp) / "stdout"
+            stderr = pathlib.Path(tmp) / "stderr"
+            imported = pathlib.Path(tmp) / "imported"
+
+            pid = os.fork()
+            if pid == 0:
+                returncode = 1
+                try:
+                    returncode = self.probe(argv, stdout=stdout, stderr=stderr, imported=imported)
+                finally:
+                    os._exit(returncode)
+
+            _, status = os.waitpid(pid, 0)
+            returncode = os.waitstatus_to_exitcode(status)
+
+            names: list[str] = []
+            if imported.exists():
+                names = json.loads(imported.read_text())
+
+            response: dict[str, object] = {
+                "returncode": returncode,
+                "stdout": stdout.read_text() if stdout.exists() else "",
+                "stderr": stderr.read_text() if stderr.exists() else "",
+            }
+
+        self.preload(names)
+        return response
+
+    def probe(
+        self,
+        argv: Sequence[str],
+        *,
+        stdout: pathlib.Path,
+        stderr: pathlib.Path,
+        imported: pathlib.Path,
+    ) -> int:
+        """
+        Run determine_django_state in the forked child
+        """
+        from extended_mypy_django_plugin.scripts import determine_django_state
+
+        with open(os.devnull) as nothing, open(stdout, "w") as out, open(stderr, "w") as err:
+            os.dup2(nothing.fileno(), 0)
+            os.dup2(out.fileno(), 1)
+            os.dup2(err.fileno(), 2)
+
+        sys.stdin = open(0, closefd=False)
+        sys.stdout = io.TextIOWrapper(
+            open(1, "wb", buffering=0, closefd=False), write_through=True
+        )
+        sys.stderr = io.TextIOWrapper(
+            open(2, "wb", buffering=0, closefd=False), write_through=True
+        )
+
+        before = set(sys.modules)
+        try:
+            determine_django_state.main(list(argv))
+        except SystemExit as exc:
+            if exc.code is None or isinstance(exc.code, int):
+                returncode = exc.code or 0
+            else:
+                print(exc.code, file=sys.stderr)  # noqa: T201
+                returncode = 1
+        except Exception:
+            traceback.print_exc()
+            returncode = 1
+        else:
+            returncode = 0
+
+        imported.write_text(
+            json.dumps(
+                installed_module_names([name for name in sys.modules if name not in before])
+            )
+        )
+        return returncode
+
+    def serve(self, requests: IO[bytes], responses: IO[bytes]) -> None:
+        for line in requests:
+            if not self.is_safe_to_fork():
+                return
+
+            if self.is_out_of_date():
+                responses.write(json.dumps({"restart": True}).encode() + b"\n")
+                responses.flush()
+                return
+
+            request = json.loads(line)
+            responses.write(json.dumps(self.handle(request["argv"])).encode() + b"\n")
+            responses.flush()
+
+
+def main() -> None:
+    # Keep stdout for responses so that anything else that is printed can't corrupt them
+    responses = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    zygote = Zygote()
+    zygote.preload(PRELOAD)
+    zygote.serve(sys.stdin.buffer, responses)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+This reports the import cycles that the dependencies added by the Mypy plugin made or
+made bigger.
+
+Mypy checks the modules in an import cycle together, so a dependency that joins modules
+into one big cycle means a change to any of them makes mypy check all of them again.
+
+The plugin records the import graph when ``import_graph_path`` is set in the mypy
+configuration, and this script finds the strongly connected components of that graph with
+and without the dependencies added by the plugin. Each component that is bigger with those
+dependencies is reported with the dependencies that join it together, biggest first.
+"""
+
+import argparse
+import pathlib
+import sys
+
+from extended_mypy_django_plugin.plugin import ImportGraph
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "import_graph", help="The file recorded to by import_graph_path", type=pathlib.Path
+    )
+    parser.add_argument("--limit", help="How many components to report", type=int, default=10)
+    parser.add_argument(
+        "--output", help="File to write the report to instead of stdout", type=pathlib.Path
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = make_parser()
+    args = parser.parse_args(argv)
+
+    impacts = ImportGraph.read(args.import_graph).impact()
+
+    lines: list[str] = []
+    if not impacts:
+        lines.append("The plugin didn't make or enlarge any import cycles")
+
+    for impact in impacts[: args.limit]:
+        if impact.largest_before == 1:
+            lines.append(f"Made a cycle of {len(impact.modules)} modules")
+        else:
+            lines.append(
+                f"Made a cycle of {impact.largest_before} modules into {len(impact.modules)} modules"
+            )
+
+        lines.append("  Dependencies added by the plugin in this cycle:")
+        lines.extend(f"    {module} -> {dep}" for module, dep in impact.added_edges)
+        lines.append("  Modules:")
+        lines.extend(f"    {module}" for module in impact.modules)
+
+    if len(impacts) > args.limit:
+        lines.append(f"And {len(impacts) - args.limit} more")
+
+    report = "\n".join(lines) + "\n"
+    if args.output is None:
+        sys.stdout.write(report)
+    else:
+        args.output.write_text(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -177,7 +177,7 @@ class ScenarioBuilder(builders.ScenarioBuilder[Scenario, ScenarioFile]):
             from extended_mypy_django_plugin.plugin import VirtualDependencyHandler
 
             class DependencyHandler(VirtualDependencyHandler):
-                def interface_differentiator(self) -> str:
+                def interface_differentiator(self, summary_hash: str) -> str:
                     return "timestamp"
 
             DependencyHandler.create_report(
@@ -0,0 +1,47 @@
+from extended_mypy_django_plugin.django_analysis import (
+    ImportPath,
+    InstalledApp,
+    Project,
+    discovery,
+    protocols,
+)
+from extended_mypy_django_plugin.django_analysis.discovery import static_models
+
+
+class TestInstalledAppsDiscovery:
+    def test_it_finds_the_app_for_each_installed_app(
+        self,
+        loaded_django_example: protocols.Loaded[Project],
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        found = discovery.DefaultInstalledAppsDiscovery[Project]()(
+            loaded_django_example, discovered_django_example.installed_models_modules
+        )
+
+        assert list(found) == list(loaded_django_example.settings.INSTALLED_APPS)
+        assert found["djangoexample.relations1"] == InstalledApp(
+            name="djangoexample.relations1",
+            models_modules=frozenset([ImportPath("djangoexample.relations1.models")]),
+        )
+        assert found["djangoexample.no_models"] == InstalledApp(
+            name="djangoexample.no_models", models_modules=frozenset()
+        )
+        assert found["django.contrib.auth"] == InstalledApp(
+            name="django.contrib.auth",
+            models_modules=frozenset([ImportPath("django.contrib.auth.models")]),
+        )
+
+    def test_it_finds_the_same_apps_without_the_registry(
+        self,
+        loaded_django_example: protocols.Loaded[Project],
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        with loaded_django_example.project.setup_sys_path_and_env_vars():
+            names = static_models.determine_app_names(
+                settings=loaded_django_example.settings,
+                installed_apps=loaded_django_example.settings.INSTALLED_APPS,
+            )
+
+        assert discovery.DefaultInstalledAppsDiscovery[Project]().from_names(
+            names, discovered_django_example.installed_models_modules
+        ) == dict(discovered_django_example.installed_app_configs)
@@ -23,7 +23,7 @@ class TestSettingsTypesDiscovery:
             "APPEND_SLASH": "<class 'bool'>",
             "AUTHENTICATION_BACKENDS": "<class 'list'>",
             "AUTH_PASSWORD_VALIDATORS": "<class 'list'>",
-            "AUTH_USER_MODEL": "<class 'str'>",
+            "AUTH_USER_MODEL": "Literal['auth.User']",
             "BASE_DIR": Regex("<class 'pathlib.*.PosixPath'>"),
             "CACHES": "<class 'dict'>",
             "CACHE_MIDDLEWARE_ALIAS": "<class 'str'>",
@@ -52,7 +52,7 @@ class TestSettingsTypesDiscovery:
             "DEBUG": "<class 'bool'>",
             "DEBUG_PROPAGATE_EXCEPTIONS": "<class 'bool'>",
             "DECIMAL_SEPARATOR": "<class 'str'>",
-            "DEFAULT_AUTO_FIELD": "<class 'str'>",
+            "DEFAULT_AUTO_FIELD": "Literal['django.db.models.BigAutoField']",
             "DEFAULT_CHARSET": "<class 'str'>",
             "DEFAULT_EXCEPTION_REPORTER": "<class 'str'>",
             "DEFAULT_EXCEPTION_REPORTER_FILTER": "<class 'str'>",
@@ -0,0 +1,512 @@
+import inspect
+import pathlib
+import textwrap
+import types
+from unittest import mock
+
+import pytest
+
+from extended_mypy_django_plugin.django_analysis import Project, discovery, protocols
+from extended_mypy_django_plugin.django_analysis.project import Loaded
+
+project_root = pathlib.Path(__file__).parent.parent.parent.parent
+
+
+def static_discovery_matches_runtime_discovery() -> None:
+    """
+    Run in a subprocess by ``assert_matches_runtime`` against the project in PROJECT_ROOT
+    """
+    import os
+    import pathlib
+
+    from extended_mypy_django_plugin.django_analysis import Project, discovery
+
+    root_dir = pathlib.Path(os.environ["PROJECT_ROOT"])
+    project = Project(
+        root_dir=root_dir,
+        additional_sys_path=[str(root_dir)],
+        env_vars={"DJANGO_SETTINGS_MODULE": "settings"},
+        discovery=discovery.Discovery(),
+        populate_apps=False,
+    )
+    loaded = project.load_project()
+    with project.setup_sys_path_and_env_vars():
+        if os.environ.get("EXPECT_UNRESOLVABLE"):
+            try:
+                discovery.StaticInstalledModulesDiscovery[Project]().discover_statically(loaded)
+            except discovery.UnresolvableModules as error:
+                assert list(error.reasons) == [os.environ["EXPECT_UNRESOLVABLE"]]
+                return
+            raise AssertionError("Expected static discovery to not understand the models")
+
+        found = discovery.StaticInstalledModulesDiscovery[Project]().discover_statically(loaded)
+        loaded.apps.populate(loaded.settings.INSTALLED_APPS)
+        expected = discovery.DefaultInstalledModulesDiscovery[Project]()(loaded)
+
+    assert sorted(found) == sorted(expected)
+    for import_path, module in expected.items():
+        assert list(found[import_path].defined_models) == list(module.defined_models)
+        for model_import_path, model in module.defined_models.items():
+            static_model = found[import_path].defined_models[model_import_path]
+            assert static_model == model
+            assert list(static_model.all_fields) == list(model.all_fields)
+
+
+def assert_matches_runtime(
+    pytester: pytest.Pytester,
+    monkeypatch: pytest.MonkeyPatch,
+    files: dict[str, str],
+    *,
+    settings: str = "",
+    expect_unresolvable: str | None = None,
+) -> None:
+    """
+    Using pytester to make it easier to run a test in a subprocess so we don't poison the import space
+    """
+    root_dir = pytester.path / "project"
+    files = {
+        "settings.py": textwrap.dedent("""
+            SECRET_KEY = "secret"
+            INSTALLED_APPS = ["django.contrib.contenttypes", "django.contrib.auth", "app"]
+            DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
+            """)
+        + textwrap.dedent(settings),
+        "app/__init__.py": "",
+        **files,
+    }
+    for name, content in files.items():
+        location = root_dir / name
+        location.parent.mkdir(parents=True, exist_ok=True)
+        location.write_text(textwrap.dedent(content))
+
+    pytester.makepyfile(
+        textwrap.dedent(inspect.getsource(static_discovery_matches_runtime_discovery))
+        + "\n\ntest_it = static_discovery_matches_runtime_discovery\n"
+    )
+
+    monkeypatch.setenv("PROJECT_ROOT", str(root_dir))
+    if expect_unresolvable is not None:
+        monkeypatch.setenv("EXPECT_UNRESOLVABLE", expect_unresolvable)
+    result = pytester.runpytest_subprocess("-vvv")
+    result.assert_outcomes(passed=1)
+
+
+class TestStaticInstalledModulesDiscovery:
+    def test_it_finds_the_same_models_as_runtime_discovery(
+        self,
+        loaded_django_example: protocols.Loaded[Project],
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        found = discovery.StaticInstalledModulesDiscovery[Project]().discover_statically(
+            loaded_django_example
+        )
+        expected = discovered_django_example.installed_models_modules
+
+        assert list(found) == list(expected)
+        for import_path, module in expected.items():
+            assert found[import_path].import_path == module.import_path
+            assert list(found[import_path].defined_models) == list(module.defined_models)
+            for model_import_path, model in module.defined_models.items():
+                static_model = found[import_path].defined_models[model_import_path]
+                assert static_model == model
+                assert list(static_model.all_fields) == list(model.all_fields)
+
+    def test_it_falls_back_when_models_cannot_be_understood(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        (app := tmp_path / "dynamic_app").mkdir()
+        (app / "__init__.py").write_text("")
+        (app / "models.py").write_text(
+            textwrap.dedent("""
+            from django.db import models
+
+
+            def make_base() -> type[models.Model]:
+                raise NotImplementedError()
+
+
+            class Thing(make_base()):
+                class Meta:
+                    app_label = "dynamic_app"
+            """)
+        )
+
+        settings = types.SimpleNamespace(
+            INSTALLED_APPS=["dynamic_app"], DEFAULT_AUTO_FIELD="django.db.models.AutoField"
+        )
+        apps = mock.Mock(name="apps")
+        project_discovery = discovery.Discovery[Project]()
+        project = Project(
+            root_dir=tmp_path,
+            additional_sys_path=[str(tmp_path)],
+            env_vars={},
+            discovery=project_discovery,
+        )
+        loaded = Loaded(
+            project=project,
+            root_dir=project.root_dir,
+            env_vars=project.env_vars,
+            settings=settings,  # type: ignore[arg-type]
+            apps=apps,
+            discovery=project_discovery,
+        )
+
+        fallback_result: protocols.ModelModulesMap = {}
+        fallback = mock.Mock(name="fallback", return_value=fallback_result)
+        static = discovery.StaticInstalledModulesDiscovery[Project](fallback=fallback)
+
+        monkeypatch.syspath_prepend(str(tmp_path))
+        with pytest.raises(discovery.UnresolvableModules) as e:
+            static.discover_statically(loaded)
+        assert list(e.value.reasons) == ["dynamic_app.models"]
+
+        fallback.assert_not_called()
+        apps.populate.assert_not_called()
+        assert static(loaded) is fallback_result
+        apps.populate.assert_called_once_with(["dynamic_app"])
+        fallback.assert_called_once_with(loaded)
+
+    def test_it_does_not_import_models(
+        self, pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Using pytester to make it easier to run a test in a subprocess so we don't poison the import space
+        """
+
+        def test_discovering_without_importing() -> None:
+            import os
+            import pathlib
+            import sys
+
+            from extended_mypy_django_plugin.django_analysis import Project, discovery
+
+            root_dir = pathlib.Path(os.environ["PROJECT_ROOT"]) / "example"
+            project = Project(
+                root_dir=root_dir,
+                additional_sys_path=[str(root_dir)],
+                discovery=discovery.Discovery(
+                    discover_installed_models=discovery.StaticInstalledModulesDiscovery()
+                ),
+                env_vars={"DJANGO_SETTINGS_MODULE": "djangoexample.settings"},
+                populate_apps=False,
+            )
+
+            discovered = project.load_project().perform_discovery()
+
+            assert not discovered.loaded_project.apps.ready
+            assert "djangoexample.exampleapp.models" in discovered.installed_models_modules
+            assert "djangoexample.relations1.models.Concrete2" in discovered.all_models
+            assert [name for name in sys.modules if name.startswith("djangoexample")] == [
+                "djangoexample",
+                "djangoexample.settings",
+            ]
+
+        pytester.makepyfile(textwrap.dedent(inspect.getsource(test_discovering_without_importing)))
+
+        monkeypatch.setenv("PROJECT_ROOT", str(project_root))
+        result = pytester.runpytest_subprocess("-vvv")
+        result.assert_outcomes(passed=1)
+
+
+class TestStaticDiscoveryEdgeCases:
+    def test_proxy_models(
+        self, pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        assert_matches_runtime(
+            pytester,
+            monkeypatch,
+            {
+                "app/models.py": """
+                from django.db import models
+
+
+                class ThingQuerySet(models.QuerySet["Thing"]):
+                    pass
+
+
+                class Thing(models.Model):
+                    name = models.CharField(max_length=1)
+
+
+                class ProxyThing(Thing):
+                    objects = ThingQuerySet.as_manager()
+
+                    class Meta:
+                        proxy = True
+
+
+                class ProxyOfProxy(ProxyThing):
+                    class Meta:
+                        proxy = True
+                        ordering = ["name"]
+                """
+            },
+        )
+
+    def test_multi_table_inheritance(
+        self, pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        assert_matches_runtime(
+            pytester,
+            monkeypatch,
+            {
+                "app/models.py": """
+                from django.db import models
+
+
+                class Place(models.Model):
+                    name = models.CharField(max_length=1)
+
+
+                class Restaurant(Place):
+                    serves = models.BooleanField()
+
+
+                class Explicit(Place):
+                    place = models.OneToOneField(
+                        Place, parent_link=True, on_delete=models.CASCADE, related_name="explicit"
+                    )
+
+
+                class Bar(Restaurant):
+                    pass
+                """
+            },
+        )
+
+    def test_swappable_models(
+        self, pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        assert_matches_runtime(
+            pytester,
+            monkeypatch,
+            {
+                "app/models.py": """
+                from django.conf import settings
+                from django.contrib.auth.models import AbstractUser
+                from django.db import models
+
+
+                class User(AbstractUser):
+                    pass
+
+
+                class Profile(models.Model):
+                    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+
+
+                class Swappable(models.Model):
+                    class Meta:
+                        swappable = "APP_SWAPPED_MODEL"
+
+
+                class Replacement(models.Model):
+                    pass
+                """
+            },
+            settings="""
+            AUTH_USER_MODEL = "app.User"
+            APP_SWAPPED_MODEL = "app.Replacement"
+            """,
+        )
+
+    def test_abstract_meta_inheritance(
+        self, pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        assert_matches_runtime(
+            pytester,
+            monkeypatch,
+            {
+                "app/models.py": """
+                from django.db import models
+
+
+                class Base(models.Model):
+                    created = models.DateTimeField()
+
+                    class Meta:
+                        abstract = True
+                        ordering = ["created"]
+
+
+                class StillAbstract(Base):
+                    class Meta(Base.Meta):
+                        abstract = True
+
+
+                class NotAbstract(Base):
+                    class Meta(Base.Meta):
+                        db_table = "not_abstract"
+
+
+                class Inherits(StillAbstract):
+                    other = models.ForeignKey(
+                        "NotAbstract",
+                        on_delete=models.CASCADE,
+                        related_name="%(app_label)s_%(class)s_related",
+                    )
+
+
+                class MetaLess(Base):
+                    pass
+                """
+            },
+        )
+
+    def test_custom_managers(
+        self, pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        assert_matches_runtime(
+            pytester,
+            monkeypatch,
+            {
+                "app/models.py": """
+                from django.db import models
+
+
+                class ThingQuerySet(models.QuerySet["Thing"]):
+                    pass
+
+
+                class ThingManager(models.Manager["Thing"]):
+                    pass
+
+
+                FromQuerySet = ThingManager.from_queryset(ThingQuerySet)
+
+
+                class WithFromQuerySet(models.Model):
+                    objects = FromQuerySet()
+
+
+                class AbstractManaged(models.Model):
+                    things = ThingQuerySet.as_manager()
+
+                    class Meta:
+                        abstract = True
+
+
+                class InheritsManager(AbstractManaged):
+                    pass
+
+
+                class DefaultName(models.Model):
+                    plain = models.Manager()
+                    custom = ThingQuerySet.as_manager()
+
+                    class Meta:
+                        default_manager_name = "custom"
+
+
+                class Thing(models.Model):
+                    objects = ThingManager()
+                """
+            },
+        )
+
+    def test_relations(self, pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch) -> None:
+        assert_matches_runtime(
+            pytester,
+            monkeypatch,
+            {
+                "app/models.py": """
+                from django.contrib.contenttypes.fields import GenericForeignKey
+                from django.contrib.contenttypes.models import ContentType
+                from django.db import models
+
+
+                class Tag(models.Model):
+                    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+                    object_id = models.PositiveIntegerField()
+                    item = GenericForeignKey("content_type", "object_id")
+
+
+                class Person(models.Model):
+                    friends = models.ManyToManyField("self")
+                    followers = models.ManyToManyField(
+                        "self", symmetrical=False, related_name="following"
+                    )
+
+
+                class Group(models.Model):
+                    members = models.ManyToManyField(Person, through="Membership", related_name="+")
+                    owner = models.ForeignKey(
+                        "app.Person", on_delete=models.CASCADE, related_query_name="owned"
+                    )
+
+
+                class Membership(models.Model):
+                    person = models.ForeignKey(Person, on_delete=models.CASCADE)
+                    group = models.ForeignKey(Group, on_delete=models.CASCADE)
+                """
+            },
+        )
+
+    def test_models_package_with_an_app_config(
+        self, pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        assert_matches_runtime(
+            pytester,
+            monkeypatch,
+            {
+                "app/apps.py": """
+                from django.apps import AppConfig
+
+
+                class Config(AppConfig):
+                    name = "app"
+                    label = "labelled"
+                """,
+                "app/models/__init__.py": """
+                from .base import Base
+                from .things import Thing
+
+                __all__ = ["Base", "Thing"]
+                """,
+                "app/models/base.py": """
+                from django.db import models
+
+
+                class Base(models.Model):
+                    class Meta:
+                        abstract = True
+                """,
+                "app/models/things.py": """
+                from .base import Base
+
+
+                class Thing(Base):
+                    pass
+                """,
+            },
+            settings="""
+            INSTALLED_APPS = [
+                "django.contrib.contenttypes",
+                "django.contrib.auth",
+                "app.apps.Config",
+            ]
+            """,
+        )
+
+    def test_it_does_not_guess_at_fields_it_cannot_represent(
+        self, pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        assert_matches_runtime(
+            pytester,
+            monkeypatch,
+            {
+                "app/models.py": """
+                from django.contrib.contenttypes.fields import GenericRelation
+                from django.db import models
+
+
+                class Tag(models.Model):
+                    pass
+
+
+                class Person(models.Model):
+                    tags = GenericRelation(Tag)
+                """
+            },
+            expect_unresolvable="app.models",
+        )
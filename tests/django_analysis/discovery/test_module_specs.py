@@ -0,0 +1,217 @@
+import pathlib
+import sys
+import textwrap
+import zipfile
+
+import pytest
+
+from extended_mypy_django_plugin.django_analysis.discovery import module_specs
+
+
+class TestModuleIndex:
+    def test_it_finds_modules_without_importing_anything(self, tmp_path: pathlib.Path) -> None:
+        one = tmp_path / "one"
+        two = tmp_path / "two"
+
+        (one / "explodes").mkdir(parents=True)
+        (one / "explodes" / "__init__.py").write_text("raise ValueError('imported')")
+        (one / "explodes" / "models.py").write_text("")
+        (one / "explodes" / "sub").mkdir()
+        (one / "explodes" / "sub" / "__init__.py").write_text("")
+        (one / "explodes" / "data").mkdir()
+        (one / "standalone.py").write_text("")
+
+        (one / "spread").mkdir()
+        (one / "spread" / "first.py").write_text("")
+        (two / "spread").mkdir(parents=True)
+        (two / "spread" / "second.py").write_text("")
+
+        # Regular packages win over modules and namespace portions later on the path
+        (two / "explodes").mkdir()
+        (two / "explodes" / "__init__.py").write_text("")
+        (two / "explodes" / "shadowed.py").write_text("")
+
+        index = module_specs.ModuleIndex(search_path=[str(one), str(two), str(tmp_path / "nope")])
+
+        found = {
+            name: index(name)
+            for name in (
+                "explodes",
+                "explodes.models",
+                "explodes.sub",
+                "explodes.data",
+                "explodes.shadowed",
+                "explodes.nope",
+                "explodes.models.nope",
+                "standalone",
+                "standalone.nope",
+                "spread",
+                "spread.first",
+                "spread.second",
+                "spread.third",
+                "nope",
+                "sys",
+            )
+        }
+        assert found == {
+            "explodes": True,
+            "explodes.models": True,
+            "explodes.sub": True,
+            "explodes.data": True,
+            "explodes.shadowed": False,
+            "explodes.nope": False,
+            "explodes.models.nope": False,
+            "standalone": True,
+            "standalone.nope": False,
+            "spread": True,
+            "spread.first": True,
+            "spread.second": True,
+            "spread.third": False,
+            "nope": False,
+            "sys": True,
+        }
+        assert "explodes" not in sys.modules
+
+    def test_it_only_lists_each_folder_once(self, tmp_path: pathlib.Path) -> None:
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / "__init__.py").write_text("")
+
+        index = module_specs.ModuleIndex(search_path=[str(tmp_path)])
+        assert not index("pkg.later")
+
+        (tmp_path / "pkg" / "later.py").write_text("")
+        assert not index("pkg.later")
+        assert not index("pkg.later2")
+
+        assert module_specs.ModuleIndex(search_path=[str(tmp_path)])("pkg.later")
+
+    def test_it_uses_the_path_finder_for_locations_that_arent_folders(
+        self, tmp_path: pathlib.Path
+    ) -> None:
+        archive = tmp_path / "archive.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("zipped_module_for_index_test.py", "")
+
+        sys.path.insert(0, str(archive))
+        try:
+            index = module_specs.ModuleIndex(search_path=[str(archive)])
+            assert index("zipped_module_for_index_test")
+            assert not index("not_zipped_module_for_index_test")
+        finally:
+            sys.path.remove(str(archive))
+
+
+class TestPossibleLocations:
+    def test_it_returns_where_a_missing_module_would_be(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        (tmp_path / "possible_pkg").mkdir()
+        (tmp_path / "possible_pkg" / "__init__.py").write_text("")
+        monkeypatch.setattr(sys, "path", [str(tmp_path)])
+
+        locations = module_specs.possible_locations("possible_pkg.models")
+        assert tmp_path / "possible_pkg" / "models.py" in locations
+        assert tmp_path / "possible_pkg" / "models" / "__init__.py" in locations
+        assert all(location.is_relative_to(tmp_path / "possible_pkg") for location in locations)
+
+        # Without the parent package, it's the parent package that needs to appear
+        locations = module_specs.possible_locations("possible_nope.models")
+        assert tmp_path / "possible_nope.py" in locations
+        assert tmp_path / "possible_nope" / "__init__.py" in locations
+        assert "possible_pkg" not in sys.modules
+
+
+class TestImportsIn:
+    def test_it_finds_what_a_module_imports_without_importing_it(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        project = tmp_path / "project"
+        (project / "imports_pkg" / "sub").mkdir(parents=True)
+        (project / "imports_pkg" / "__init__.py").write_text("raise ValueError('imported')")
+        (project / "imports_pkg" / "sub" / "__init__.py").write_text("")
+        (project / "imports_pkg" / "sub" / "other.py").write_text("")
+        (project / "imports_pkg" / "helpers.py").write_text("")
+        (project / "imports_pkg" / "models.py").write_text(
+            textwrap.dedent("""
+            import os.path
+            from typing import TYPE_CHECKING
+
+            from . import helpers, not_a_module
+            from .sub import other
+            from .sub.other import Thing
+
+            if TYPE_CHECKING:
+                from imports_outside import Other
+
+
+            def later() -> None:
+                from imports_pkg.sub import *
+            """)
+        )
+        (tmp_path / "imports_outside.py").write_text("import imports_pkg.models")
+        monkeypatch.setattr(sys, "path", [str(project), str(tmp_path)])
+
+        assert module_specs.imports_in("imports_pkg.models", within=project) == {
+            "os",
+            "os.path",
+            "typing",
+            "imports_pkg",
+            "imports_pkg.helpers",
+            "imports_pkg.sub",
+            "imports_pkg.sub.other",
+            "imports_outside",
+        }
+
+        # Modules outside the folder aren't read
+        assert module_specs.imports_in("imports_outside", within=project) == set()
+        assert module_specs.imports_in("imports_pkg.nope", within=project) == set()
+        assert "imports_pkg" not in sys.modules
+
+
+class TestImportedNames:
+    def test_it_finds_what_the_names_a_module_imports_refer_to_without_importing_it(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        (tmp_path / "names_pkg" / "sub").mkdir(parents=True)
+        (tmp_path / "names_pkg" / "__init__.py").write_text("raise ValueError('imported')")
+        (tmp_path / "names_pkg" / "sub" / "__init__.py").write_text("")
+        (tmp_path / "names_pkg" / "sub" / "things.py").write_text(
+            textwrap.dedent("""
+            import os.path
+            import collections.abc as cabc
+            from typing import TYPE_CHECKING
+
+            from . import other as renamed
+            from ..helpers import *
+
+            if TYPE_CHECKING:
+                from typing import Protocol
+            else:
+                try:
+                    from json import dumps
+                except ImportError:
+                    from pickle import dumps as dumps
+
+
+            def later() -> None:
+                from sys import argv
+
+
+            class Thing:
+                from sys import path
+            """)
+        )
+        monkeypatch.setattr(sys, "path", [str(tmp_path)])
+
+        assert module_specs.imported_names("names_pkg.sub.things") == {
+            "os": "os",
+            "cabc": "collections.abc",
+            "TYPE_CHECKING": "typing.TYPE_CHECKING",
+            "renamed": "names_pkg.sub.other",
+            "Protocol": "typing.Protocol",
+            "dumps": "pickle.dumps",
+        }
+        assert module_specs.imported_names("names_pkg.sub.things", mentioning=["json"]) != {}
+        assert module_specs.imported_names("names_pkg.sub.things", mentioning=["nope"]) == {}
+        assert module_specs.imported_names("names_pkg.nope") == {}
+        assert "names_pkg" not in sys.modules
@@ -0,0 +1,376 @@
+import inspect
+import json
+import pathlib
+import sys
+import textwrap
+import types
+
+import django.db.models
+import pytest
+
+from extended_mypy_django_plugin.django_analysis import (
+    DiscoveryCache,
+    Fingerprint,
+    Project,
+    VersionCache,
+    adler32_hash,
+    cache,
+    protocols,
+)
+
+
+def new_models_module_is_a_cache_miss() -> None:
+    """
+    Run in a subprocess by ``TestDiscoveryCache`` against the project in PROJECT_ROOT
+    """
+    import os
+    import pathlib
+
+    from extended_mypy_django_plugin.django_analysis import (
+        DiscoveryCache,
+        Project,
+        adler32_hash,
+        discovery,
+    )
+
+    root_dir = pathlib.Path(os.environ["PROJECT_ROOT"])
+    project = Project(
+        root_dir=root_dir,
+        additional_sys_path=[str(root_dir)],
+        env_vars={"DJANGO_SETTINGS_MODULE": "settings"},
+        discovery=discovery.Discovery(),
+    )
+    discovered = project.load_project().perform_discovery()
+    assert list(discovered.installed_models_modules) == ["app1.models"]
+
+    discovery_cache = DiscoveryCache[Project](
+        location=root_dir / "cache.json", hasher=adler32_hash
+    )
+    discovery_cache.write(discovered=discovered)
+
+    restored = discovery_cache.read(project=project)
+    assert restored is not None
+    assert list(restored.installed_models_modules) == ["app1.models"]
+
+    (root_dir / "app2" / "models.py").write_text(
+        "from django.db import models\n\nclass Two(models.Model):\n    pass\n"
+    )
+    assert discovery_cache.read(project=project) is None
+
+
+def make_module(name: str, location: pathlib.Path | None) -> types.ModuleType:
+    module = types.ModuleType(name)
+    if location is not None:
+        module.__file__ = str(location)
+    return module
+
+
+class TestFingerprint:
+    def test_it_records_files_in_the_project_and_skips_modules_without_files(
+        self, tmp_path: pathlib.Path
+    ) -> None:
+        (one := tmp_path / "one.py").write_text("one")
+        (tmp_path / "pkg").mkdir()
+        (two := tmp_path / "pkg" / "__init__.py").write_text("two")
+
+        fingerprint = Fingerprint.from_modules(
+            modules={
+                "one": make_module("one", one),
+                "pkg": make_module("pkg", two),
+                "builtin": make_module("builtin", None),
+            },
+            project_root=tmp_path,
+            hasher=adler32_hash,
+            extra={"stuff": "things"},
+        )
+
+        assert fingerprint.extra == {"stuff": "things"}
+        assert fingerprint.distributions == {}
+        assert list(fingerprint.files) == [str(one), str(two)]
+        assert fingerprint.files[str(one)].content_hash == adler32_hash(b"one")
+        assert fingerprint.is_current(hasher=adler32_hash, extra={"stuff": "things"})
+
+    def test_it_records_distributions_for_installed_modules(self, tmp_path: pathlib.Path) -> None:
+        fingerprint = Fingerprint.from_modules(
+            modules={"django.db.models": django.db.models},
+            project_root=tmp_path,
+            hasher=adler32_hash,
+            extra={},
+        )
+        assert fingerprint.files == {}
+        assert fingerprint.distributions == {"django": cache.installed_distributions()["django"]}
+        assert fingerprint.is_current(hasher=adler32_hash, extra={})
+
+        different = Fingerprint.from_json(
+            {**fingerprint.for_json(), "distributions": {"django": "0.0.0"}}
+        )
+        assert not different.is_current(hasher=adler32_hash, extra={})
+
+    def test_it_is_not_current_if_extra_or_files_change(self, tmp_path: pathlib.Path) -> None:
+        (one := tmp_path / "one.py").write_text("one")
+        (two := tmp_path / "two.py").write_text("two")
+
+        fingerprint = Fingerprint.from_modules(
+            modules={"one": make_module("one", one), "two": make_module("two", two)},
+            project_root=tmp_path,
+            hasher=adler32_hash,
+            extra={"a": "b"},
+        )
+        assert fingerprint.is_current(hasher=adler32_hash, extra={"a": "b"})
+        assert not fingerprint.is_current(hasher=adler32_hash, extra={"a": "c"})
+
+        # Same content with a different mtime is still current
+        (one := tmp_path / "one.py").write_text("one")
+        assert fingerprint.is_current(hasher=adler32_hash, extra={"a": "b"})
+
+        two.write_text("changed")
+        assert not fingerprint.is_current(hasher=adler32_hash, extra={"a": "b"})
+
+        two.write_text("two")
+        assert fingerprint.is_current(hasher=adler32_hash, extra={"a": "b"})
+
+        two.unlink()
+        assert not fingerprint.is_current(hasher=adler32_hash, extra={"a": "b"})
+
+    def test_it_is_not_current_if_an_absent_file_appears(self, tmp_path: pathlib.Path) -> None:
+        (one := tmp_path / "one.py").write_text("one")
+        fingerprint = Fingerprint.from_modules(
+            modules={"one": make_module("one", one)},
+            project_root=tmp_path,
+            hasher=adler32_hash,
+            extra={},
+            absent=[two := tmp_path / "two.py", pathlib.Path(django.__path__[0])],
+        )
+
+        # Files that would belong to an installed distribution are covered by its version
+        assert fingerprint.absent == [str(two)]
+        assert fingerprint.is_current(hasher=adler32_hash, extra={})
+
+        two.write_text("two")
+        assert not fingerprint.is_current(hasher=adler32_hash, extra={})
+
+    def test_it_can_round_trip_through_json(self, tmp_path: pathlib.Path) -> None:
+        (one := tmp_path / "one.py").write_text("one")
+        fingerprint = Fingerprint.from_modules(
+            modules={"one": make_module("one", one)},
+            project_root=tmp_path,
+            hasher=adler32_hash,
+            extra={"a": "b"},
+            absent=[tmp_path / "two.py"],
+        )
+        assert Fingerprint.from_json(json.loads(json.dumps(fingerprint.for_json()))) == fingerprint
+
+
+class TestDiscoveryCache:
+    def test_it_can_restore_a_discovered_project(
+        self,
+        tmp_path: pathlib.Path,
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        location = tmp_path / "cache.json"
+        discovery_cache = DiscoveryCache[Project](location=location, hasher=adler32_hash)
+        project = discovered_django_example.loaded_project.project
+
+        assert discovery_cache.read(project=project) is None
+
+        discovery_cache.write(discovered=discovered_django_example)
+        assert location.exists()
+
+        restored = discovery_cache.read(project=project)
+        assert restored is not None
+        assert isinstance(restored.loaded_project, cache.DeferredLoaded)
+        assert restored.loaded_project.project is project
+        assert restored.loaded_project.root_dir == project.root_dir
+
+        assert restored.installed_apps == discovered_django_example.installed_apps
+        assert restored.settings_types == discovered_django_example.settings_types
+        assert restored.all_models == discovered_django_example.all_models
+        assert list(restored.all_models) == list(discovered_django_example.all_models)
+        assert (
+            restored.installed_models_modules == discovered_django_example.installed_models_modules
+        )
+        assert restored.concrete_models == discovered_django_example.concrete_models
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param("", id="empty"),
+            pytest.param("[]", id="not_a_dict"),
+            pytest.param('{"cache_format": "0"}', id="different_format"),
+            pytest.param(
+                json.dumps({"cache_format": cache.CACHE_FORMAT}), id="missing_fingerprint"
+            ),
+        ],
+    )
+    def test_it_ignores_invalid_caches(
+        self,
+        content: str,
+        tmp_path: pathlib.Path,
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        location = tmp_path / "cache.json"
+        location.write_text(content)
+        discovery_cache = DiscoveryCache[Project](location=location, hasher=adler32_hash)
+        assert (
+            discovery_cache.read(project=discovered_django_example.loaded_project.project) is None
+        )
+
+    def test_it_ignores_the_cache_if_the_fingerprint_changes(
+        self,
+        tmp_path: pathlib.Path,
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        location = tmp_path / "cache.json"
+        discovery_cache = DiscoveryCache[Project](location=location, hasher=adler32_hash)
+        project = discovered_django_example.loaded_project.project
+
+        discovery_cache.write(discovered=discovered_django_example)
+        assert discovery_cache.read(project=project) is not None
+
+        data = json.loads(location.read_text())
+        data["fingerprint"]["files"][str(tmp_path / "gone.py")] = [0, 0, "nope"]
+        location.write_text(json.dumps(data))
+        assert discovery_cache.read(project=project) is None
+
+    def test_it_ignores_the_cache_when_the_environment_changes(
+        self,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        location = tmp_path / "cache.json"
+        discovery_cache = DiscoveryCache[Project](
+            location=location, hasher=adler32_hash, env_var_names=("FEATURES",)
+        )
+        project = discovered_django_example.loaded_project.project
+
+        monkeypatch.delenv("FEATURES", raising=False)
+        monkeypatch.setenv("UNRELATED", "one")
+        discovery_cache.write(discovered=discovered_django_example)
+        assert discovery_cache.read(project=project) is not None
+
+        # Only the variables it was told about matter
+        monkeypatch.setenv("UNRELATED", "two")
+        assert discovery_cache.read(project=project) is not None
+
+        monkeypatch.setenv("FEATURES", "one")
+        assert discovery_cache.read(project=project) is None
+        discovery_cache.write(discovered=discovered_django_example)
+        assert discovery_cache.read(project=project) is not None
+
+        monkeypatch.setenv("FEATURES", "two")
+        assert discovery_cache.read(project=project) is None
+
+        # The settings module is always included, as the project would load it
+        monkeypatch.setenv("FEATURES", "one")
+        assert discovery_cache.read(project=project) is not None
+        assert project.env_vars["DJANGO_SETTINGS_MODULE"] == "djangoexample.settings"
+        extra = discovery_cache.extra_fingerprint(project=project)
+        assert extra["environ:DJANGO_SETTINGS_MODULE"] == "djangoexample.settings"
+
+    def test_it_records_modules_that_discovery_used_without_importing(
+        self,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        models_module = sys.modules["djangoexample.exampleapp.models"]
+        assert models_module.__file__ is not None
+        monkeypatch.delitem(sys.modules, "djangoexample.exampleapp.models")
+
+        location = tmp_path / "cache.json"
+        discovery_cache = DiscoveryCache[Project](location=location, hasher=adler32_hash)
+        discovery_cache.write(discovered=discovered_django_example)
+
+        data = json.loads(location.read_text())
+        assert models_module.__file__ in data["fingerprint"]["files"]
+
+    def test_it_ignores_the_cache_when_a_models_module_is_added(
+        self, pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Using pytester to make it easier to run a test in a subprocess so we don't poison the import space
+        """
+        root_dir = pytester.path / "project"
+        files = {
+            "settings.py": """
+                SECRET_KEY = "secret"
+                INSTALLED_APPS = ["app1", "app2"]
+                DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
+                """,
+            "app1/__init__.py": "",
+            "app1/models.py": """
+                from django.db import models
+
+                class One(models.Model):
+                    pass
+                """,
+            "app2/__init__.py": "",
+        }
+        for name, content in files.items():
+            location = root_dir / name
+            location.parent.mkdir(parents=True, exist_ok=True)
+            location.write_text(textwrap.dedent(content))
+
+        pytester.makepyfile(
+            textwrap.dedent(inspect.getsource(new_models_module_is_a_cache_miss))
+            + "\n\ntest_it = new_models_module_is_a_cache_miss\n"
+        )
+
+        monkeypatch.setenv("PROJECT_ROOT", str(root_dir))
+        result = pytester.runpytest_subprocess("-vvv")
+        result.assert_outcomes(passed=1)
+
+
+class TestVersionCache:
+    def test_it_remembers_the_version_while_the_fingerprint_is_current(
+        self, tmp_path: pathlib.Path
+    ) -> None:
+        (one := tmp_path / "one.py").write_text("one")
+        fingerprint = Fingerprint.from_modules(
+            modules={"one": make_module("one", one)},
+            project_root=tmp_path,
+            hasher=adler32_hash,
+            extra={"a": "b"},
+        )
+
+        version_cache = VersionCache(location=tmp_path / "version.json", hasher=adler32_hash)
+        assert version_cache.read(extra={"a": "b"}) is None
+
+        version_cache.write(version="the_version", fingerprint=fingerprint)
+        assert version_cache.read(extra={"a": "b"}) == "the_version"
+        assert version_cache.read(extra={"a": "c"}) is None
+
+        one.write_text("changed")
+        assert version_cache.read(extra={"a": "b"}) is None
+
+    def test_it_can_include_the_files_from_the_discovery_cache(
+        self,
+        tmp_path: pathlib.Path,
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        models_module = sys.modules["djangoexample.exampleapp.models"]
+        assert models_module.__file__ is not None
+
+        discovery_cache = DiscoveryCache[Project](
+            location=tmp_path / cache.DISCOVERY_CACHE_NAME, hasher=adler32_hash
+        )
+        assert discovery_cache.read_fingerprint() is None
+        discovery_cache.write(discovered=discovered_django_example)
+
+        discovery_fingerprint = discovery_cache.read_fingerprint()
+        assert discovery_fingerprint is not None
+
+        (one := tmp_path / "one.py").write_text("one")
+        fingerprint = Fingerprint.from_modules(
+            modules={"one": make_module("one", one)},
+            project_root=tmp_path,
+            hasher=adler32_hash,
+            extra={"a": "b"},
+        ).merge(discovery_fingerprint)
+
+        assert fingerprint.extra == {"a": "b"}
+        assert str(one) in fingerprint.files
+        assert models_module.__file__ in fingerprint.files
+        assert fingerprint.distributions == discovery_fingerprint.distributions
+        assert fingerprint.is_current(hasher=adler32_hash, extra={"a": "b"})
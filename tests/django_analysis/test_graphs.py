@@ -0,0 +1,38 @@
+from extended_mypy_django_plugin.django_analysis.graphs import strongly_connected_components
+
+
+class TestStronglyConnectedComponents:
+    def test_it_yields_each_component_after_those_it_relates_to(self) -> None:
+        edges = {
+            "a": ["b"],
+            "b": ["c", "d"],
+            "c": ["b"],
+            "d": ["e"],
+            "e": ["d"],
+            "f": ["a"],
+        }
+        found = [
+            sorted(component)
+            for component in strongly_connected_components(sorted(edges), edges.__getitem__)
+        ]
+        assert found == [["d", "e"], ["b", "c"], ["a"], ["f"]]
+
+    def test_it_follows_deep_graphs_without_recursion(self) -> None:
+        edges = {i: [i + 1] for i in range(5000)}
+        edges[5000] = [0]
+        found = list(strongly_connected_components([0], edges.__getitem__))
+        assert [sorted(component) for component in found] == [list(range(5001))]
+
+    def test_it_skips_nodes_that_are_known_including_those_added_while_yielding(
+        self,
+    ) -> None:
+        edges = {"a": ["b", "c"], "b": ["c"], "c": [], "d": ["a"]}
+        known = {"c"}
+        found: list[list[str]] = []
+        for component in strongly_connected_components(
+            ["a", "b", "d"], edges.__getitem__, known=known
+        ):
+            found.append(component)
+            known.update(component)
+
+        assert found == [["b"], ["a"], ["d"]]
@@ -68,7 +68,7 @@ class TestProject:
             from django.apps.registry import Apps
             from django.conf import LazySettings
 
-            from extended_mypy_django_plugin.django_analysis import Project
+            from extended_mypy_django_plugin.django_analysis import InstalledApp, Project
 
             @dataclasses.dataclass(frozen=True, kw_only=True)
             class FakeModel:
@@ -99,6 +99,9 @@ class TestProject:
 
             fake_model: protocols.Model = FakeModel()
             fake_module: protocols.Module = FakeModule()
+            fake_app: protocols.InstalledApp = InstalledApp(
+                name="somewhere", models_modules=frozenset([fake_module.import_path])
+            )
 
             class Discovery:
                 def discover_settings_types(
@@ -121,6 +124,15 @@ class TestProject:
                     assert models == {fake_model.import_path: fake_model}
                     return {fake_model.import_path: [fake_model]}
 
+                def discover_installed_apps(
+                    self,
+                    loaded_project: protocols.Loaded[Project],
+                    installed_models_modules: protocols.ModelModulesMap,
+                    /,
+                ) -> protocols.InstalledAppsMap:
+                    assert installed_models_modules == {fake_module.import_path: fake_module}
+                    return {"somewhere": fake_app}
+
             if TYPE_CHECKING:
                 _sta: protocols.Discovery[Project] = cast(Discovery, None)
 
@@ -160,6 +172,7 @@ class TestProject:
                 "djangoexample.relations2",
                 "djangoexample.empty_models",
             ]
+            assert discovered_project.installed_app_configs == {"somewhere": fake_app}
             assert discovered_project.settings_types == {"not": "accurate"}
             assert discovered_project.installed_models_modules == {
                 fake_module.import_path: fake_module
@@ -70,50 +70,84 @@ class TestRenamingQuerySet:
                     return None
 
                 mod = "django.contrib.contenttypes.models"
-                summary = "__virtual_extended_mypy_django_plugin_report__.mod_3961720227::django.contrib.contenttypes.models::installed_apps=3376484868::significant=438215680::v2"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_3961720227::django.contrib.contenttypes.models::significant=1472709940::v5"
+
+                import django.contrib.contenttypes.models
+                Concrete__ContentType = django.contrib.contenttypes.models.ContentType
+                """,
+            "mod_3961720227_querysets.py": """
+                def interface__timestamp() -> None:
+                    return None
+
+                mod = "django.contrib.contenttypes.models"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_3961720227::django.contrib.contenttypes.models::significant=1472709940::v5"
 
                 import django.contrib.contenttypes.models
                 import django.db.models
                 ConcreteQuerySet__ContentType = django.db.models.QuerySet[django.contrib.contenttypes.models.ContentType]
-                Concrete__ContentType = django.contrib.contenttypes.models.ContentType
                 """,
             "mod_566232296.py": """
                 def interface__timestamp() -> None:
                     return None
 
                 mod = "child1.models"
-                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::installed_apps=3376484868::significant=967422822::v2"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::significant=1002750756::v5"
 
                 import child1.models
+                Concrete__Child1 = child1.models.Child1
+                """,
+            "mod_566232296_querysets.py": """
+                def interface__timestamp() -> None:
+                    return None
+
+                mod = "child1.models"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::significant=1002750756::v5"
+
                 import parent.models
                 ConcreteQuerySet__Child1 = parent.models.ParentQuerySet
-                Concrete__Child1 = child1.models.Child1
                 """,
             "mod_566756585.py": """
                 def interface__timestamp() -> None:
                     return None
 
                 mod = "child2.models"
-                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::installed_apps=3376484868::significant=1344320379::v2"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::significant=1449640763::v5"
 
                 import child2.models
+                Concrete__Child2 = child2.models.Child2
+                """,
+            "mod_566756585_querysets.py": """
+                def interface__timestamp() -> None:
+                    return None
+
+                mod = "child2.models"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::significant=1449640763::v5"
+
                 import parent.models
                 ConcreteQuerySet__Child2 = parent.models.ParentQuerySet
-                Concrete__Child2 = child2.models.Child2
                 """,
             "mod_614729021.py": """
                 def interface__timestamp() -> None:
                     return None
 
                 mod = "parent.models"
-                summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::installed_apps=3376484868::significant=309881802::v2"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::significant=888839304::v5"
 
                 import child1.models
                 import child2.models
                 import parent.models
-                ConcreteQuerySet__Parent = parent.models.ParentQuerySet
                 Concrete__Parent = child1.models.Child1 | child2.models.Child2
                 """,
+            "mod_614729021_querysets.py": """
+                def interface__timestamp() -> None:
+                    return None
+
+                mod = "parent.models"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::significant=888839304::v5"
+
+                import parent.models
+                ConcreteQuerySet__Parent = parent.models.ParentQuerySet
+                """,
         }
 
         for fle in (deps_dest / "__virtual_extended_mypy_django_plugin_report__").iterdir():
@@ -172,39 +206,70 @@ class TestRenamingQuerySet:
                 return None
 
             mod = "child1.models"
-            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::installed_apps=3376484868::significant=2468262588::v2"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::significant=2503590522::v5"
 
             import child1.models
-            ConcreteQuerySet__Child1 = child1.models.Child1QuerySet
             Concrete__Child1 = child1.models.Child1
             """
 
+        expected["mod_566232296_querysets.py"] = """
+            def interface__timestamp() -> None:
+                return None
+
+            mod = "child1.models"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::significant=2503590522::v5"
+
+            import child1.models
+            ConcreteQuerySet__Child1 = child1.models.Child1QuerySet
+            """
+
         expected["mod_566756585.py"] = """
             def interface__timestamp() -> None:
                 return None
 
             mod = "child2.models"
-            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::installed_apps=3376484868::significant=2877928147::v2"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::significant=2983248531::v5"
 
             import child2.models
-            ConcreteQuerySet__Child2 = child2.models.Child2QuerySet
             Concrete__Child2 = child2.models.Child2
             """
 
+        expected["mod_566756585_querysets.py"] = """
+            def interface__timestamp() -> None:
+                return None
+
+            mod = "child2.models"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::significant=2983248531::v5"
+
+            import child2.models
+            ConcreteQuerySet__Child2 = child2.models.Child2QuerySet
+            """
+
         expected["mod_614729021.py"] = """
             def interface__timestamp() -> None:
                 return None
 
             mod = "parent.models"
-            summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::installed_apps=3376484868::significant=3300935593::v2"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::significant=4171986972::v5"
 
             import child1.models
             import child2.models
             import parent.models
-            ConcreteQuerySet__Parent = child1.models.Child1QuerySet | child2.models.Child2QuerySet
             Concrete__Parent = child1.models.Child1 | child2.models.Child2
             """
 
+        expected["mod_614729021_querysets.py"] = """
+            def interface__timestamp() -> None:
+                return None
+
+            mod = "parent.models"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::significant=4171986972::v5"
+
+            import child1.models
+            import child2.models
+            ConcreteQuerySet__Parent = child1.models.Child1QuerySet | child2.models.Child2QuerySet
+            """
+
         builder.populate_virtual_deps(deps_dest=deps_dest)
 
         for fle in sorted(
@@ -283,48 +348,85 @@ class TestRenamingQuerySet:
                     return None
 
                 mod = "django.contrib.contenttypes.models"
-                summary = "__virtual_extended_mypy_django_plugin_report__.mod_3961720227::django.contrib.contenttypes.models::installed_apps=3376484868::significant=438215680::v2"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_3961720227::django.contrib.contenttypes.models::significant=1472709940::v5"
+
+                import django.contrib.contenttypes.models
+                Concrete__ContentType = django.contrib.contenttypes.models.ContentType
+                """,
+            "mod_3961720227_querysets.py": """
+                def interface__timestamp() -> None:
+                    return None
+
+                mod = "django.contrib.contenttypes.models"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_3961720227::django.contrib.contenttypes.models::significant=1472709940::v5"
 
                 import django.contrib.contenttypes.models
                 import django.db.models
                 ConcreteQuerySet__ContentType = django.db.models.QuerySet[django.contrib.contenttypes.models.ContentType]
-                Concrete__ContentType = django.contrib.contenttypes.models.ContentType
                 """,
             "mod_566232296.py": """
                 def interface__timestamp() -> None:
                     return None
 
                 mod = "child1.models"
-                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::installed_apps=3376484868::significant=1784590644::v2"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::significant=4259496178::v5"
 
                 import child1.models
-                ConcreteQuerySet__Child = child1.models.ChildQuerySet
                 Concrete__Child = child1.models.Child
                 """,
+            "mod_566232296_querysets.py": """
+                def interface__timestamp() -> None:
+                    return None
+
+                mod = "child1.models"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::significant=4259496178::v5"
+
+                import child1.models
+                ConcreteQuerySet__Child = child1.models.ChildQuerySet
+                """,
             "mod_566756585.py": """
                 def interface__timestamp() -> None:
                     return None
 
                 mod = "child2.models"
-                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::installed_apps=3376484868::significant=2056565059::v2"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::significant=301187331::v5"
 
                 import child2.models
-                ConcreteQuerySet__Child = child2.models.ChildQuerySet
                 Concrete__Child = child2.models.Child
                 """,
+            "mod_566756585_querysets.py": """
+                def interface__timestamp() -> None:
+                    return None
+
+                mod = "child2.models"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::significant=301187331::v5"
+
+                import child2.models
+                ConcreteQuerySet__Child = child2.models.ChildQuerySet
+                """,
             "mod_614729021.py": """
                 def interface__timestamp() -> None:
                     return None
 
                 mod = "parent.models"
-                summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::installed_apps=3376484868::significant=1191855927::v2"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::significant=502626189::v5"
 
                 import child1.models
                 import child2.models
                 import parent.models
-                ConcreteQuerySet__Parent = child1.models.ChildQuerySet | child2.models.ChildQuerySet
                 Concrete__Parent = child1.models.Child | child2.models.Child
                 """,
+            "mod_614729021_querysets.py": """
+                def interface__timestamp() -> None:
+                    return None
+
+                mod = "parent.models"
+                summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::significant=502626189::v5"
+
+                import child1.models
+                import child2.models
+                ConcreteQuerySet__Parent = child1.models.ChildQuerySet | child2.models.ChildQuerySet
+                """,
         }
 
         for fle in (deps_dest / "__virtual_extended_mypy_django_plugin_report__").iterdir():
@@ -367,39 +469,70 @@ class TestRenamingQuerySet:
                 return None
 
             mod = "child1.models"
-            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::installed_apps=3376484868::significant=2733879748::v2"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::significant=1443021186::v5"
 
             import child1.models
-            ConcreteQuerySet__Child = child1.models._Child1QuerySet
             Concrete__Child = child1.models.Child
             """
 
+        expected["mod_566232296_querysets.py"] = """
+            def interface__timestamp() -> None:
+                return None
+
+            mod = "child1.models"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566232296::child1.models::significant=1443021186::v5"
+
+            import child1.models
+            ConcreteQuerySet__Child = child1.models._Child1QuerySet
+            """
+
         expected["mod_566756585.py"] = """
             def interface__timestamp() -> None:
                 return None
 
             mod = "child2.models"
-            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::installed_apps=3376484868::significant=3022762452::v2"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::significant=1795867028::v5"
 
             import child2.models
-            ConcreteQuerySet__Child = child2.models._Child2QuerySet
             Concrete__Child = child2.models.Child
             """
 
+        expected["mod_566756585_querysets.py"] = """
+            def interface__timestamp() -> None:
+                return None
+
+            mod = "child2.models"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_566756585::child2.models::significant=1795867028::v5"
+
+            import child2.models
+            ConcreteQuerySet__Child = child2.models._Child2QuerySet
+            """
+
         expected["mod_614729021.py"] = """
             def interface__timestamp() -> None:
                 return None
 
             mod = "parent.models"
-            summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::installed_apps=3376484868::significant=1197557559::v2"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::significant=1527019454::v5"
 
             import child1.models
             import child2.models
             import parent.models
-            ConcreteQuerySet__Parent = child1.models._Child1QuerySet | child2.models._Child2QuerySet
             Concrete__Parent = child1.models.Child | child2.models.Child
             """
 
+        expected["mod_614729021_querysets.py"] = """
+            def interface__timestamp() -> None:
+                return None
+
+            mod = "parent.models"
+            summary = "__virtual_extended_mypy_django_plugin_report__.mod_614729021::parent.models::significant=1527019454::v5"
+
+            import child1.models
+            import child2.models
+            ConcreteQuerySet__Parent = child1.models._Child1QuerySet | child2.models._Child2QuerySet
+            """
+
         pathlib.Path("/tmp/debug").write_text("")
         builder.populate_virtual_deps(deps_dest=deps_dest)
 
@@ -0,0 +1,9 @@
+def interface____differentiated__12() -> None:
+    return None
+
+mod = "django.contrib.sessions.base_session"
+summary = "__virtual__.mod_113708644::django.contrib.sessions.base_session::significant=757463356::v5"
+
+import django.contrib.sessions.models
+import django.db.models
+ConcreteQuerySet__AbstractBaseSession = django.db.models.QuerySet[django.contrib.sessions.models.Session]
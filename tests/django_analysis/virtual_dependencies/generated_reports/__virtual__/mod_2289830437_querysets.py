@@ -0,0 +1,13 @@
+def interface____differentiated__2() -> None:
+    return None
+
+mod = "django.contrib.auth.models"
+summary = "__virtual__.mod_2289830437::django.contrib.auth.models::significant=1989114555::v5"
+
+import django.contrib.auth.models
+import django.db.models
+ConcreteQuerySet__AbstractUser = django.db.models.QuerySet[django.contrib.auth.models.User]
+ConcreteQuerySet__Group = django.db.models.QuerySet[django.contrib.auth.models.Group]
+ConcreteQuerySet__Permission = django.db.models.QuerySet[django.contrib.auth.models.Permission]
+ConcreteQuerySet__PermissionsMixin = django.db.models.QuerySet[django.contrib.auth.models.User]
+ConcreteQuerySet__User = django.db.models.QuerySet[django.contrib.auth.models.User]
@@ -0,0 +1,9 @@
+def interface____differentiated__1() -> None:
+    return None
+
+mod = "django.contrib.admin.models"
+summary = "__virtual__.mod_2456226428::django.contrib.admin.models::significant=3472751154::v5"
+
+import django.contrib.admin.models
+import django.db.models
+ConcreteQuerySet__LogEntry = django.db.models.QuerySet[django.contrib.admin.models.LogEntry]
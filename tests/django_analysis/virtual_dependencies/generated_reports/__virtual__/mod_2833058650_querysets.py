@@ -0,0 +1,9 @@
+def interface____differentiated__11() -> None:
+    return None
+
+mod = "django.contrib.auth.base_user"
+summary = "__virtual__.mod_2833058650::django.contrib.auth.base_user::significant=2114669408::v5"
+
+import django.contrib.auth.models
+import django.db.models
+ConcreteQuerySet__AbstractBaseUser = django.db.models.QuerySet[django.contrib.auth.models.User]
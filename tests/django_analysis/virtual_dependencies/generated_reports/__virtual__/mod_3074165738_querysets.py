@@ -0,0 +1,9 @@
+def interface____differentiated__4() -> None:
+    return None
+
+mod = "django.contrib.sessions.models"
+summary = "__virtual__.mod_3074165738::django.contrib.sessions.models::significant=3323977236::v5"
+
+import django.contrib.sessions.models
+import django.db.models
+ConcreteQuerySet__Session = django.db.models.QuerySet[django.contrib.sessions.models.Session]
@@ -0,0 +1,15 @@
+def interface____differentiated__5() -> None:
+    return None
+
+mod = "djangoexample.exampleapp.models"
+summary = "__virtual__.mod_3347844205::djangoexample.exampleapp.models::significant=4089199267::v5"
+
+import django.db.models
+import djangoexample.exampleapp.models
+import djangoexample.exampleapp2.models
+ConcreteQuerySet__Child1 = django.db.models.QuerySet[djangoexample.exampleapp.models.Child1]
+ConcreteQuerySet__Child2 = djangoexample.exampleapp.models.Child2QuerySet
+ConcreteQuerySet__Child3 = django.db.models.QuerySet[djangoexample.exampleapp.models.Child3]
+ConcreteQuerySet__Child4 = djangoexample.exampleapp.models.Child4QuerySet
+ConcreteQuerySet__Parent = django.db.models.QuerySet[djangoexample.exampleapp.models.Child1] | djangoexample.exampleapp.models.Child2QuerySet | django.db.models.QuerySet[djangoexample.exampleapp.models.Child3] | djangoexample.exampleapp.models.Child4QuerySet | django.db.models.QuerySet[djangoexample.exampleapp2.models.ChildOther] | django.db.models.QuerySet[djangoexample.exampleapp2.models.ChildOther2]
+ConcreteQuerySet__Parent2 = django.db.models.QuerySet[djangoexample.exampleapp.models.Child3] | djangoexample.exampleapp.models.Child4QuerySet
@@ -0,0 +1,10 @@
+def interface____differentiated__6() -> None:
+    return None
+
+mod = "djangoexample.exampleapp2.models"
+summary = "__virtual__.mod_3537308831::djangoexample.exampleapp2.models::significant=3029174378::v5"
+
+import django.db.models
+import djangoexample.exampleapp2.models
+ConcreteQuerySet__ChildOther = django.db.models.QuerySet[djangoexample.exampleapp2.models.ChildOther]
+ConcreteQuerySet__ChildOther2 = django.db.models.QuerySet[djangoexample.exampleapp2.models.ChildOther2]
@@ -2,4 +2,4 @@ def interface____differentiated__10() -> None:
     return None
 
 mod = "djangoexample.empty_models.models"
-summary = "__virtual__.mod_3808300370::djangoexample.empty_models.models::installed_apps=__installed_apps_hash__::significant=1232670738::v2"
+summary = "__virtual__.mod_3808300370::djangoexample.empty_models.models::significant=2762027172::v5"
@@ -0,0 +1,5 @@
+def interface____differentiated__10() -> None:
+    return None
+
+mod = "djangoexample.empty_models.models"
+summary = "__virtual__.mod_3808300370::djangoexample.empty_models.models::significant=2762027172::v5"
@@ -2,6 +2,6 @@ def interface____differentiated__9() -> None:
     return None
 
 mod = "djangoexample.only_abstract.models"
-summary = "__virtual__.mod_4035906997::djangoexample.only_abstract.models::installed_apps=__installed_apps_hash__::significant=1262772787::v2"
+summary = "__virtual__.mod_4035906997::djangoexample.only_abstract.models::significant=802849675::v5"
 
 import djangoexample.only_abstract.models
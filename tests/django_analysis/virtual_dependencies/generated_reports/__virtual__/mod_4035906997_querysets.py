@@ -0,0 +1,5 @@
+def interface____differentiated__9() -> None:
+    return None
+
+mod = "djangoexample.only_abstract.models"
+summary = "__virtual__.mod_4035906997::djangoexample.only_abstract.models::significant=802849675::v5"
@@ -1,12 +1,19 @@
+import dataclasses
 import functools
 import os
 import pathlib
 import re
+from collections.abc import Callable
+from typing import Any
 
 import pytest
 
 from extended_mypy_django_plugin.django_analysis import (
+    Discovered,
+    Field,
     ImportPath,
+    Model,
+    Module,
     Project,
     protocols,
     virtual_dependencies,
@@ -21,6 +28,7 @@ def make_report(
     concrete_annotations: dict[str, str],
     concrete_querysets: dict[str, str],
     report_import_path: dict[str, str],
+    queryset_import_path: dict[str, str],
 ) -> virtual_dependencies.Report:
     """
     Helper to make the tests below easier to read
@@ -31,9 +39,131 @@ def make_report(
         },
         concrete_querysets={ImportPath(k): ImportPath(v) for k, v in concrete_querysets.items()},
         report_import_path={ImportPath(k): ImportPath(v) for k, v in report_import_path.items()},
+        queryset_import_path={
+            ImportPath(k): ImportPath(v) for k, v in queryset_import_path.items()
+        },
     )
 
 
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class VirtualDependencyHandler(
+    virtual_dependencies.VirtualDependencyHandler[
+        Project,
+        virtual_dependencies.VirtualDependency[Project],
+        virtual_dependencies.Report,
+    ]
+):
+    """
+    Makes virtual dependencies for the example project in the "__virtual__" namespace, with
+    whichever layout, processes and format options it is given
+    """
+
+    differentiator: Callable[[str], str] | None = None
+
+    @classmethod
+    def make_project(cls, *, project_root: pathlib.Path, django_settings_module: str) -> Project:
+        raise NotImplementedError()
+
+    def interface_differentiator(self, summary_hash: str) -> str:
+        if self.differentiator is not None:
+            return self.differentiator(summary_hash)
+        return super().interface_differentiator(summary_hash)
+
+    def get_virtual_namespace(self) -> protocols.ImportPath:
+        return ImportPath("__virtual__")
+
+    def hash_installed_apps(self) -> str:
+        return "__installed_apps_hash__"
+
+    def make_report_factory(
+        self,
+    ) -> protocols.ReportFactory[
+        virtual_dependencies.VirtualDependency[Project], virtual_dependencies.Report
+    ]:
+        return virtual_dependencies.make_report_factory(
+            hasher=self.hasher,
+            report_maker=virtual_dependencies.Report,
+            make_differentiator=self.interface_differentiator,
+            render_processes=self.options.render_processes,
+            virtual_dependency_format=self.options.virtual_dependency_format,
+            queryset_union_style=self.options.queryset_union_style,
+            max_concrete_union_width=self.options.max_concrete_union_width,
+            virtual_namespace_layout=self.options.virtual_namespace_layout,
+        )
+
+    def virtual_dependency_maker(
+        self, *, virtual_dependency_namer: protocols.VirtualDependencyNamer
+    ) -> protocols.VirtualDependencyMaker[
+        Project, virtual_dependencies.VirtualDependency[Project]
+    ]:
+        return functools.partial(
+            virtual_dependencies.VirtualDependency.create,
+            discovered_project=self.discovered,
+            virtual_dependency_namer=virtual_dependency_namer,
+            significance_policy=self.options.significance_policy,
+        )
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class PidRecordingScribe(virtual_dependencies.report.ReportScribe[Any]):
+    """
+    Adds the process each virtual dependency was rendered in to the end of its content
+    """
+
+    def __call__(
+        self,
+        *,
+        virtual_dependency: Any,
+        all_virtual_dependencies: protocols.VirtualDependencyMap[Any],
+    ) -> protocols.RenderedVirtualDependency[virtual_dependencies.Report]:
+        rendered = super().__call__(
+            virtual_dependency=virtual_dependency,
+            all_virtual_dependencies=all_virtual_dependencies,
+        )
+        assert isinstance(rendered, virtual_dependencies.RenderedVirtualDependency)
+        return dataclasses.replace(rendered, content=f"{rendered.content}# pid:{os.getpid()}\n")
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class PidRecordingHandler(VirtualDependencyHandler):
+    def make_report_factory(
+        self,
+    ) -> protocols.ReportFactory[
+        virtual_dependencies.VirtualDependency[Project], virtual_dependencies.Report
+    ]:
+        report_factory = super().make_report_factory()
+        assert isinstance(report_factory, virtual_dependencies.ReportFactory)
+        report_scribe = report_factory.report_scribe
+        assert isinstance(report_scribe, virtual_dependencies.report.ReportScribe)
+        return dataclasses.replace(
+            report_factory,
+            report_scribe=PidRecordingScribe(
+                **{
+                    field.name: getattr(report_scribe, field.name)
+                    for field in dataclasses.fields(report_scribe)
+                    if field.init
+                }
+            ),
+        )
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class FailingScribe:
+    """
+    Fails with the process it was asked to render in
+    """
+
+    unpicklable: Callable[[], None] | None = None
+
+    def __call__(
+        self,
+        *,
+        virtual_dependency: Any,
+        all_virtual_dependencies: protocols.VirtualDependencyMap[Any],
+    ) -> protocols.RenderedVirtualDependency[virtual_dependencies.Report]:
+        raise ValueError(os.getpid())
+
+
 class TestEnd2End:
     def test_works(
         self,
@@ -42,57 +172,17 @@ class TestEnd2End:
     ) -> None:
         count: int = 0
 
-        class VirtualDependencyHandler(
-            virtual_dependencies.VirtualDependencyHandler[
-                Project,
-                virtual_dependencies.VirtualDependency[Project],
-                virtual_dependencies.Report,
-            ]
-        ):
-            @classmethod
-            def make_project(
-                cls, *, project_root: pathlib.Path, django_settings_module: str
-            ) -> Project:
-                raise NotImplementedError()
-
-            def interface_differentiator(self) -> str:
-                nonlocal count
-                count += 1
-                return f"__differentiated__{count}"
-
-            def get_virtual_namespace(self) -> protocols.ImportPath:
-                return ImportPath("__virtual__")
-
-            def hash_installed_apps(self) -> str:
-                return "__installed_apps_hash__"
-
-            def make_report_factory(
-                self, *, installed_apps_hash: str
-            ) -> protocols.ReportFactory[
-                virtual_dependencies.VirtualDependency[Project], virtual_dependencies.Report
-            ]:
-                return virtual_dependencies.make_report_factory(
-                    hasher=self.hasher,
-                    report_maker=virtual_dependencies.Report,
-                    installed_apps_hash=installed_apps_hash,
-                    make_differentiator=self.interface_differentiator,
-                )
-
-            def virtual_dependency_maker(
-                self, *, virtual_dependency_namer: protocols.VirtualDependencyNamer
-            ) -> protocols.VirtualDependencyMaker[
-                Project, virtual_dependencies.VirtualDependency[Project]
-            ]:
-                return functools.partial(
-                    virtual_dependencies.VirtualDependency.create,
-                    discovered_project=self.discovered,
-                    virtual_dependency_namer=virtual_dependency_namer,
-                )
+        def differentiator(summary_hash: str) -> str:
+            nonlocal count
+            count += 1
+            return f"__differentiated__{count}"
 
         destination = tmp_path_factory.mktemp("destination")
 
         handler = VirtualDependencyHandler(
-            discovered=discovered_django_example, hasher=VirtualDependencyHandler.make_hasher()
+            discovered=discovered_django_example,
+            hasher=VirtualDependencyHandler.make_hasher(),
+            differentiator=differentiator,
         )
 
         report = handler.make_report(virtual_deps_destination=destination)
@@ -134,31 +224,31 @@ class TestEnd2End:
                 "django.contrib.sessions.base_session.AbstractBaseSession": "__virtual__.mod_113708644.Concrete__AbstractBaseSession",
             },
             concrete_querysets={
-                "django.contrib.admin.models.LogEntry": "__virtual__.mod_2456226428.ConcreteQuerySet__LogEntry",
-                "django.contrib.auth.models.AbstractUser": "__virtual__.mod_2289830437.ConcreteQuerySet__AbstractUser",
-                "django.contrib.auth.models.PermissionsMixin": "__virtual__.mod_2289830437.ConcreteQuerySet__PermissionsMixin",
-                "django.contrib.auth.models.Permission": "__virtual__.mod_2289830437.ConcreteQuerySet__Permission",
-                "django.contrib.auth.models.Group": "__virtual__.mod_2289830437.ConcreteQuerySet__Group",
-                "django.contrib.auth.models.User": "__virtual__.mod_2289830437.ConcreteQuerySet__User",
-                "django.contrib.contenttypes.models.ContentType": "__virtual__.mod_3961720227.ConcreteQuerySet__ContentType",
-                "django.contrib.sessions.models.Session": "__virtual__.mod_3074165738.ConcreteQuerySet__Session",
-                "djangoexample.exampleapp.models.Parent": "__virtual__.mod_3347844205.ConcreteQuerySet__Parent",
-                "djangoexample.exampleapp.models.Parent2": "__virtual__.mod_3347844205.ConcreteQuerySet__Parent2",
-                "djangoexample.exampleapp.models.Child1": "__virtual__.mod_3347844205.ConcreteQuerySet__Child1",
-                "djangoexample.exampleapp.models.Child2": "__virtual__.mod_3347844205.ConcreteQuerySet__Child2",
-                "djangoexample.exampleapp.models.Child3": "__virtual__.mod_3347844205.ConcreteQuerySet__Child3",
-                "djangoexample.exampleapp.models.Child4": "__virtual__.mod_3347844205.ConcreteQuerySet__Child4",
-                "djangoexample.exampleapp2.models.ChildOther": "__virtual__.mod_3537308831.ConcreteQuerySet__ChildOther",
-                "djangoexample.exampleapp2.models.ChildOther2": "__virtual__.mod_3537308831.ConcreteQuerySet__ChildOther2",
-                "djangoexample.relations1.models.Abstract": "__virtual__.mod_3327724610.ConcreteQuerySet__Abstract",
-                "djangoexample.relations1.models.Child1": "__virtual__.mod_3327724610.ConcreteQuerySet__Child1",
-                "djangoexample.relations1.models.Child2": "__virtual__.mod_3327724610.ConcreteQuerySet__Child2",
-                "djangoexample.relations1.models.Concrete1": "__virtual__.mod_3327724610.ConcreteQuerySet__Concrete1",
-                "djangoexample.relations1.models.Concrete2": "__virtual__.mod_3327724610.ConcreteQuerySet__Concrete2",
-                "djangoexample.relations2.models.Thing": "__virtual__.mod_3328248899.ConcreteQuerySet__Thing",
-                "djangoexample.only_abstract.models.AnAbstract": "__virtual__.mod_4035906997.ConcreteQuerySet__AnAbstract",
-                "django.contrib.auth.base_user.AbstractBaseUser": "__virtual__.mod_2833058650.ConcreteQuerySet__AbstractBaseUser",
-                "django.contrib.sessions.base_session.AbstractBaseSession": "__virtual__.mod_113708644.ConcreteQuerySet__AbstractBaseSession",
+                "django.contrib.admin.models.LogEntry": "__virtual__.mod_2456226428_querysets.ConcreteQuerySet__LogEntry",
+                "django.contrib.auth.models.AbstractUser": "__virtual__.mod_2289830437_querysets.ConcreteQuerySet__AbstractUser",
+                "django.contrib.auth.models.PermissionsMixin": "__virtual__.mod_2289830437_querysets.ConcreteQuerySet__PermissionsMixin",
+                "django.contrib.auth.models.Permission": "__virtual__.mod_2289830437_querysets.ConcreteQuerySet__Permission",
+                "django.contrib.auth.models.Group": "__virtual__.mod_2289830437_querysets.ConcreteQuerySet__Group",
+                "django.contrib.auth.models.User": "__virtual__.mod_2289830437_querysets.ConcreteQuerySet__User",
+                "django.contrib.contenttypes.models.ContentType": "__virtual__.mod_3961720227_querysets.ConcreteQuerySet__ContentType",
+                "django.contrib.sessions.models.Session": "__virtual__.mod_3074165738_querysets.ConcreteQuerySet__Session",
+                "djangoexample.exampleapp.models.Parent": "__virtual__.mod_3347844205_querysets.ConcreteQuerySet__Parent",
+                "djangoexample.exampleapp.models.Parent2": "__virtual__.mod_3347844205_querysets.ConcreteQuerySet__Parent2",
+                "djangoexample.exampleapp.models.Child1": "__virtual__.mod_3347844205_querysets.ConcreteQuerySet__Child1",
+                "djangoexample.exampleapp.models.Child2": "__virtual__.mod_3347844205_querysets.ConcreteQuerySet__Child2",
+                "djangoexample.exampleapp.models.Child3": "__virtual__.mod_3347844205_querysets.ConcreteQuerySet__Child3",
+                "djangoexample.exampleapp.models.Child4": "__virtual__.mod_3347844205_querysets.ConcreteQuerySet__Child4",
+                "djangoexample.exampleapp2.models.ChildOther": "__virtual__.mod_3537308831_querysets.ConcreteQuerySet__ChildOther",
+                "djangoexample.exampleapp2.models.ChildOther2": "__virtual__.mod_3537308831_querysets.ConcreteQuerySet__ChildOther2",
+                "djangoexample.relations1.models.Abstract": "__virtual__.mod_3327724610_querysets.ConcreteQuerySet__Abstract",
+                "djangoexample.relations1.models.Child1": "__virtual__.mod_3327724610_querysets.ConcreteQuerySet__Child1",
+                "djangoexample.relations1.models.Child2": "__virtual__.mod_3327724610_querysets.ConcreteQuerySet__Child2",
+                "djangoexample.relations1.models.Concrete1": "__virtual__.mod_3327724610_querysets.ConcreteQuerySet__Concrete1",
+                "djangoexample.relations1.models.Concrete2": "__virtual__.mod_3327724610_querysets.ConcreteQuerySet__Concrete2",
+                "djangoexample.relations2.models.Thing": "__virtual__.mod_3328248899_querysets.ConcreteQuerySet__Thing",
+                "djangoexample.only_abstract.models.AnAbstract": "__virtual__.mod_4035906997_querysets.ConcreteQuerySet__AnAbstract",
+                "django.contrib.auth.base_user.AbstractBaseUser": "__virtual__.mod_2833058650_querysets.ConcreteQuerySet__AbstractBaseUser",
+                "django.contrib.sessions.base_session.AbstractBaseSession": "__virtual__.mod_113708644_querysets.ConcreteQuerySet__AbstractBaseSession",
             },
             report_import_path={
                 "django.contrib.admin.models": "__virtual__.mod_2456226428",
@@ -174,6 +264,19 @@ class TestEnd2End:
                 "django.contrib.auth.base_user": "__virtual__.mod_2833058650",
                 "django.contrib.sessions.base_session": "__virtual__.mod_113708644",
             },
+            queryset_import_path={
+                "__virtual__.mod_2456226428": "__virtual__.mod_2456226428_querysets",
+                "__virtual__.mod_2289830437": "__virtual__.mod_2289830437_querysets",
+                "__virtual__.mod_3961720227": "__virtual__.mod_3961720227_querysets",
+                "__virtual__.mod_3074165738": "__virtual__.mod_3074165738_querysets",
+                "__virtual__.mod_3347844205": "__virtual__.mod_3347844205_querysets",
+                "__virtual__.mod_3537308831": "__virtual__.mod_3537308831_querysets",
+                "__virtual__.mod_3327724610": "__virtual__.mod_3327724610_querysets",
+                "__virtual__.mod_3328248899": "__virtual__.mod_3328248899_querysets",
+                "__virtual__.mod_4035906997": "__virtual__.mod_4035906997_querysets",
+                "__virtual__.mod_2833058650": "__virtual__.mod_2833058650_querysets",
+                "__virtual__.mod_113708644": "__virtual__.mod_113708644_querysets",
+            },
         )
 
         assert len(list(destination.iterdir())) != 0
@@ -187,6 +290,8 @@ class TestEnd2End:
                     location = pathlib.Path(root) / name
                     result[location.relative_to(path)] = location.read_text()
 
+        # The manifest is specific to when the files were written
+        assert found.pop(pathlib.Path(virtual_dependencies.report.MANIFEST_NAME))
         assert found == expected
 
         location = destination / handler.get_virtual_namespace() / "mod_3734901629.py"
@@ -203,3 +308,320 @@ class TestEnd2End:
             virtual_dependencies.VirtualDependencyScribe.get_report_summary(location)
             == "||not_installed||"
         )
+
+    def test_rendering_in_processes_gives_the_same_result(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        found: list[
+            tuple[protocols.CombinedReport[virtual_dependencies.Report], dict[str, str], set[int]]
+        ] = []
+        for render_processes in (0, 3):
+            destination = tmp_path_factory.mktemp("destination")
+            handler = PidRecordingHandler(
+                discovered=discovered_django_example,
+                hasher=PidRecordingHandler.make_hasher(),
+                options=virtual_dependencies.VirtualDependencyOptions(
+                    render_processes=render_processes
+                ),
+            )
+            report = handler.make_report(virtual_deps_destination=destination)
+            written: dict[str, str] = {}
+            pids: set[int] = set()
+            for path in sorted((destination / "__virtual__").rglob("*.py")):
+                content = path.read_text()
+                if (m := re.fullmatch(r"(.*)# pid:(\d+)\n", content, re.S)) is not None:
+                    content = m.group(1)
+                    pids.add(int(m.group(2)))
+                written[str(path.relative_to(destination))] = content
+            found.append((report, written, pids))
+
+        (
+            (sequential, sequential_written, sequential_pids),
+            (parallel, parallel_written, parallel_pids),
+        ) = found
+        assert len(sequential_written) > 1
+        assert sequential_pids == {os.getpid()}
+        assert parallel_pids and os.getpid() not in parallel_pids
+        assert parallel_written == sequential_written
+        assert parallel.version == sequential.version
+        assert parallel.report == sequential.report
+
+    def test_rendering_in_processes_only_falls_back_when_it_cannot_be_pickled(
+        self, discovered_django_example: protocols.Discovered[Project]
+    ) -> None:
+        handler = VirtualDependencyHandler(
+            discovered=discovered_django_example,
+            hasher=VirtualDependencyHandler.make_hasher(),
+            options=virtual_dependencies.VirtualDependencyOptions(render_processes=2),
+        )
+        all_virtual_dependencies = handler.get_virtual_dependencies(
+            virtual_dependency_maker=handler.virtual_dependency_maker(
+                virtual_dependency_namer=handler.make_virtual_dependency_namer(
+                    virtual_namespace=handler.get_virtual_namespace()
+                )
+            )
+        )
+        report_factory = handler.make_report_factory()
+        assert isinstance(report_factory, virtual_dependencies.ReportFactory)
+
+        # Errors from rendering in other processes aren't hidden
+        with pytest.raises(ValueError) as e:
+            list(
+                dataclasses.replace(report_factory, report_scribe=FailingScribe()).deploy_scribes(
+                    all_virtual_dependencies
+                )
+            )
+        assert e.value.args[0] != os.getpid()
+
+        # And a scribe that can't be pickled is used in this process instead
+        with pytest.raises(ValueError) as e:
+            list(
+                dataclasses.replace(
+                    report_factory, report_scribe=FailingScribe(unpicklable=lambda: None)
+                ).deploy_scribes(all_virtual_dependencies)
+            )
+        assert e.value.args[0] == os.getpid()
+
+    def test_it_can_make_a_virtual_dependency_for_each_model(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        def make_report(
+            discovered: protocols.Discovered[Project],
+        ) -> tuple[protocols.CombinedReport[virtual_dependencies.Report], dict[str, str]]:
+            destination = tmp_path_factory.mktemp("destination")
+            report = VirtualDependencyHandler(
+                discovered=discovered,
+                hasher=VirtualDependencyHandler.make_hasher(),
+                options=virtual_dependencies.VirtualDependencyOptions(
+                    virtual_dependency_layout="model"
+                ),
+            ).make_report(virtual_deps_destination=destination)
+            written = {
+                ".".join(path.relative_to(destination).with_suffix("").parts): path.read_text()
+                for path in (destination / "__virtual__").rglob("*.py")
+            }
+            return report, written
+
+        def deps(
+            report: protocols.CombinedReport[virtual_dependencies.Report],
+            file_import_path: str,
+            *imports: str,
+        ) -> list[str]:
+            return [
+                name
+                for _, name, _ in report.report.additional_deps(
+                    file_import_path=file_import_path,
+                    imports={"extended_mypy_django_plugin.Concrete", *imports},
+                    super_deps=[],
+                    django_settings_module="djangoexample.settings",
+                    using_incremental_cache=False,
+                )
+            ]
+
+        report, written = make_report(discovered_django_example)
+        import_path = report.report.report_import_path
+
+        concrete1 = import_path[ImportPath("djangoexample.relations1.models.Concrete1")]
+        concrete2 = import_path[ImportPath("djangoexample.relations1.models.Concrete2")]
+        assert concrete1 != concrete2
+
+        # The module still gets a virtual dependency, without any aliases
+        relations1_module = import_path[ImportPath("djangoexample.relations1.models")]
+        assert "Concrete__" not in written[relations1_module]
+
+        # As do modules without models
+        assert ImportPath("djangoexample.empty_models.models") in import_path
+
+        # So mypy doesn't make an empty virtual dependency for a module that is installed
+        before = dict(import_path)
+        report.ensure_virtual_dependency(module_import_path="djangoexample.relations1.models")
+        assert dict(import_path) == before
+
+        # The module defining the models depends on each of them
+        relations1 = deps(report, "djangoexample.relations1.models")
+        assert concrete1 in relations1
+        assert concrete2 in relations1
+
+        # And files that import a model only depend on that model
+        assert deps(
+            report, "djangoexample.views", "djangoexample.relations1.models.Concrete2"
+        ) == [concrete2]
+
+        # So changing one model doesn't change the virtual dependency of other models
+        assert isinstance(discovered_django_example, Discovered)
+        concrete1_model = discovered_django_example.all_models[
+            ImportPath("djangoexample.relations1.models.Concrete1")
+        ]
+        field = next(iter(concrete1_model.all_fields.values()))
+        assert isinstance(concrete1_model, Model)
+        assert isinstance(field, Field)
+        changed_model = dataclasses.replace(
+            concrete1_model,
+            all_fields={
+                **concrete1_model.all_fields,
+                "nope": dataclasses.replace(
+                    field,
+                    field_type=ImportPath("django.db.models.fields.CharField"),
+                ),
+            },
+        )
+        module = discovered_django_example.installed_models_modules[
+            ImportPath("djangoexample.relations1.models")
+        ]
+        assert isinstance(module, Module)
+        changed_module = dataclasses.replace(
+            module,
+            defined_models={**module.defined_models, changed_model.import_path: changed_model},
+        )
+        _, changed_written = make_report(
+            dataclasses.replace(
+                discovered_django_example,
+                installed_models_modules={
+                    **discovered_django_example.installed_models_modules,
+                    module.import_path: changed_module,
+                },
+                all_models={
+                    **discovered_django_example.all_models,
+                    changed_model.import_path: changed_model,
+                },
+            )
+        )
+        assert changed_written[concrete1] != written[concrete1]
+        assert changed_written[concrete2] == written[concrete2]
+
+    def test_it_can_give_abstract_models_their_own_virtual_dependency(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        destination = tmp_path_factory.mktemp("destination")
+        report = VirtualDependencyHandler(
+            discovered=discovered_django_example,
+            hasher=VirtualDependencyHandler.make_hasher(),
+            options=virtual_dependencies.VirtualDependencyOptions(
+                virtual_dependency_layout="abstract"
+            ),
+        ).make_report(virtual_deps_destination=destination)
+        written = {
+            ".".join(path.relative_to(destination).with_suffix("").parts): path.read_text()
+            for path in (destination / "__virtual__").rglob("*.py")
+        }
+
+        def deps(file_import_path: str, *imports: str) -> list[str]:
+            return [
+                name
+                for _, name, _ in report.report.additional_deps(
+                    file_import_path=file_import_path,
+                    imports={"extended_mypy_django_plugin.Concrete", *imports},
+                    super_deps=[],
+                    django_settings_module="djangoexample.settings",
+                    using_incremental_cache=False,
+                )
+            ]
+
+        import_path = report.report.report_import_path
+        exampleapp = import_path[ImportPath("djangoexample.exampleapp.models")]
+        exampleapp2 = import_path[ImportPath("djangoexample.exampleapp2.models")]
+
+        # Parent has concrete models in exampleapp2 so it gets its own virtual dependency
+        parent = import_path[ImportPath("djangoexample.exampleapp.models.Parent")]
+        assert parent != exampleapp
+
+        # Whereas Parent2 only has concrete models in the same module
+        assert ImportPath("djangoexample.exampleapp.models.Parent2") not in import_path
+        assert ImportPath("djangoexample.exampleapp.models.Child1") not in import_path
+
+        # The union for Parent is only defined in the virtual dependency for Parent
+        assert "ChildOther" in written[parent]
+        assert "Concrete__Parent " not in written[exampleapp]
+        assert "Concrete__Parent2 " in written[exampleapp]
+        assert all(
+            "Concrete__Parent " not in content
+            for name, content in written.items()
+            if name != parent
+        )
+
+        # The module defining Parent depends on both
+        assert deps("djangoexample.exampleapp.models") == [exampleapp, parent]
+
+        # Files that only import other models from that module don't depend on Parent
+        assert deps("djangoexample.views", "djangoexample.exampleapp.models.Child1") == [
+            exampleapp
+        ]
+
+        # And files that import Parent only depend on Parent
+        assert deps("djangoexample.views", "djangoexample.exampleapp.models.Parent") == [parent]
+
+        # And the module of the concrete models only depends on its own virtual dependency
+        assert deps("djangoexample.exampleapp2.models") == [exampleapp2]
+
+    def test_it_can_avoid_making_import_cycles(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        discovered_django_example: protocols.Discovered[Project],
+    ) -> None:
+        destination = tmp_path_factory.mktemp("destination")
+        report = VirtualDependencyHandler(
+            discovered=discovered_django_example,
+            hasher=VirtualDependencyHandler.make_hasher(),
+            options=virtual_dependencies.VirtualDependencyOptions(
+                virtual_dependency_layout="acyclic"
+            ),
+        ).make_report(virtual_deps_destination=destination)
+        written = {
+            ".".join(path.relative_to(destination).with_suffix("").parts): path.read_text()
+            for path in (destination / "__virtual__").rglob("*.py")
+        }
+
+        def deps(file_import_path: str, *imports: str) -> list[str]:
+            return [
+                name
+                for _, name, _ in report.report.additional_deps(
+                    file_import_path=file_import_path,
+                    imports=set(imports),
+                    super_deps=[],
+                    django_settings_module="djangoexample.settings",
+                    using_incremental_cache=False,
+                )
+            ]
+
+        import_path = report.report.report_import_path
+        exampleapp = import_path[ImportPath("djangoexample.exampleapp.models")]
+        exampleapp2 = import_path[ImportPath("djangoexample.exampleapp2.models")]
+
+        # exampleapp2 imports exampleapp to subclass Parent, so the aliases for Parent would
+        # make exampleapp depend on exampleapp2 if they were in the virtual dependency for
+        # exampleapp
+        parent = import_path[ImportPath("djangoexample.exampleapp.models.Parent")]
+        assert parent != exampleapp
+        assert "import djangoexample.exampleapp2.models" in written[parent]
+        assert "djangoexample.exampleapp2" not in written[exampleapp]
+        assert parent in report.report.closes_cycle
+        assert exampleapp not in report.report.closes_cycle
+
+        # Abstract models with concrete models only in the same module stay where they are
+        assert ImportPath("djangoexample.relations1.models.Abstract") not in import_path
+        assert ImportPath("djangoexample.exampleapp.models.Parent2") not in import_path
+
+        # So the module defining Parent doesn't depend on it, even when it uses the annotations
+        assert deps("djangoexample.exampleapp.models") == [exampleapp]
+        assert deps("djangoexample.exampleapp.models", "extended_mypy_django_plugin.Concrete") == [
+            exampleapp
+        ]
+        assert deps(
+            "djangoexample.exampleapp.models",
+            "extended_mypy_django_plugin.Concrete",
+            "djangoexample.exampleapp2.models.ChildOther",
+        ) == [exampleapp, exampleapp2]
+
+        # And files using Parent with the annotations still depend on it
+        assert deps(
+            "djangoexample.views",
+            "extended_mypy_django_plugin.Concrete",
+            "djangoexample.exampleapp.models.Parent",
+        ) == [parent]
+        assert deps("djangoexample.exampleapp2.models") == [exampleapp2]
@@ -28,6 +28,7 @@ class TestVirtualDependencyGenerator:
                 discovered_project: protocols.Discovered[Project],
                 module: protocols.Module,
                 concrete_models: protocols.ConcreteModelsMap,
+                significance_policy: protocols.SignificancePolicy = "full",
             ) -> Iterator[str]:
                 yield f"__significant__{module.import_path}__"
 
@@ -322,10 +323,9 @@ class TestVirtualDependencyGenerator:
 
 class TestVirtualDependencyInstaller:
     def test_it_uses_the_report_factory(self, tmp_path_factory: pytest.TempPathFactory) -> None:
-        scratch_root = tmp_path_factory.mktemp("scratch_root")
         destination = tmp_path_factory.mktemp("destination")
 
-        installed: list[tuple[pathlib.Path, pathlib.Path, protocols.ImportPath]] = []
+        installed: list[tuple[pathlib.Path, protocols.ImportPath]] = []
         written: dict[
             tuple[pathlib.Path, protocols.ImportPath], tuple[str, str | Literal[False] | None]
         ] = {}
@@ -349,6 +349,7 @@ class TestVirtualDependencyInstaller:
                 *,
                 module_import_path: protocols.ImportPath,
                 virtual_import_path: protocols.ImportPath,
+                closes_cycle: bool = False,
             ) -> None:
                 self.modules.add((module_import_path, virtual_import_path))
 
@@ -357,9 +358,11 @@ class TestVirtualDependencyInstaller:
                 *,
                 model_import_path: protocols.ImportPath,
                 virtual_import_path: protocols.ImportPath,
+                queryset_virtual_import_path: protocols.ImportPath,
                 concrete_name: str,
                 concrete_queryset_name: str,
                 concrete_models: Sequence[protocols.Model],
+                summarised: bool = False,
             ) -> None:
                 raise ValueError("not called")
 
@@ -383,12 +386,13 @@ class TestVirtualDependencyInstaller:
             def write_report(
                 self,
                 *,
-                scratch_root: pathlib.Path,
+                destination: pathlib.Path,
                 summary_hash: str | Literal[False] | None,
                 virtual_import_path: protocols.ImportPath,
+                module_import_path: protocols.ImportPath,
                 content: str,
             ) -> bool:
-                key = (scratch_root, virtual_import_path)
+                key = (destination, virtual_import_path)
                 exists = any(v == virtual_import_path for _, v in written)
                 if exists and summary_hash is False:
                     return False
@@ -396,14 +400,18 @@ class TestVirtualDependencyInstaller:
                 written[key] = (content, summary_hash)
                 return True
 
+            def location_for(
+                self, *, destination: pathlib.Path, virtual_import_path: protocols.ImportPath
+            ) -> pathlib.Path:
+                return destination / f"{virtual_import_path}.py"
+
             def install_reports(
                 self,
                 *,
-                scratch_root: pathlib.Path,
                 destination: pathlib.Path,
                 virtual_namespace: protocols.ImportPath,
             ) -> None:
-                installed.append((scratch_root, destination, virtual_namespace))
+                installed.append((destination, virtual_namespace))
 
         class ReportFactory:
             def __init__(self) -> None:
@@ -425,6 +433,7 @@ class TestVirtualDependencyInstaller:
                         summary_hash=f"SUMMARY__{virtual_dependency.summary.module_import_path}",
                         report=report,
                         virtual_import_path=virtual_dependency.summary.virtual_import_path,
+                        module_import_path=virtual_dependency.summary.module_import_path,
                     )
 
             def make_empty_virtual_dependency_content(
@@ -486,7 +495,6 @@ class TestVirtualDependencyInstaller:
         assert written == {}
         assert installed == []
         report = installer(
-            scratch_root=scratch_root,
             destination=destination,
             virtual_namespace=ImportPath("__virtual__"),
             report_factory=ReportFactory(),
@@ -502,13 +510,13 @@ class TestVirtualDependencyInstaller:
         )
 
         assert written == {
-            (scratch_root, ImportPath("__virtual__.mod_239797041")): (
+            (destination, ImportPath("__virtual__.mod_239797041")): (
                 "CONTENT__M1",
                 "SUMMARY__M1",
             ),
-            (scratch_root, ImportPath("__virtual__.M2")): ("CONTENT__M2", "SUMMARY__M2"),
+            (destination, ImportPath("__virtual__.M2")): ("CONTENT__M2", "SUMMARY__M2"),
         }
-        assert installed == [(scratch_root, destination, ImportPath("__virtual__"))]
+        assert installed == [(destination, ImportPath("__virtual__"))]
 
         report.ensure_virtual_dependency(module_import_path="E1.models")
         assert (
@@ -516,13 +524,12 @@ class TestVirtualDependencyInstaller:
             ImportPath("__virtual__.mod_235078441"),
         ) in report.report.modules
         assert written == {
-            (scratch_root, ImportPath("__virtual__.mod_239797041")): (
+            (destination, ImportPath("__virtual__.mod_239797041")): (
                 "CONTENT__M1",
                 "SUMMARY__M1",
             ),
-            (scratch_root, ImportPath("__virtual__.M2")): ("CONTENT__M2", "SUMMARY__M2"),
-            # The empty dep is written directly to the final destination
-            # cause it happens at mypy time
+            (destination, ImportPath("__virtual__.M2")): ("CONTENT__M2", "SUMMARY__M2"),
+            # The empty dep is also written to the final destination
             (destination, ImportPath("__virtual__.mod_235078441")): ("empty", False),
         }
 
@@ -530,11 +537,11 @@ class TestVirtualDependencyInstaller:
         report.ensure_virtual_dependency(module_import_path="M1.models")
         assert written == {
             # We want the content for M1 to have not been changed in destination
-            (scratch_root, ImportPath("__virtual__.mod_239797041")): (
+            (destination, ImportPath("__virtual__.mod_239797041")): (
                 "CONTENT__M1",
                 "SUMMARY__M1",
             ),
-            (scratch_root, ImportPath("__virtual__.M2")): ("CONTENT__M2", "SUMMARY__M2"),
+            (destination, ImportPath("__virtual__.M2")): ("CONTENT__M2", "SUMMARY__M2"),
             (destination, ImportPath("__virtual__.mod_235078441")): ("empty", False),
         }
         assert report.report.modules == {
@@ -0,0 +1,44 @@
+import dataclasses
+
+from extended_mypy_django_plugin.django_analysis import Discovered, Project, protocols
+from extended_mypy_django_plugin.plugin import VirtualDependencyHandler
+
+
+class TestHashSettingsTypes:
+    def test_it_only_cares_about_the_names_and_valued_settings(
+        self, discovered_django_example: protocols.Discovered[Project]
+    ) -> None:
+        assert isinstance(discovered_django_example, Discovered)
+
+        def hash_settings_types(settings_types: dict[str, str]) -> str:
+            return VirtualDependencyHandler(
+                discovered=dataclasses.replace(
+                    discovered_django_example, settings_types=settings_types
+                ),
+                hasher=VirtualDependencyHandler.make_hasher(),
+            ).hash_settings_types()
+
+        settings_types = dict(discovered_django_example.settings_types)
+        original = hash_settings_types(settings_types)
+
+        # django-stubs doesn't use the runtime type of most settings
+        assert hash_settings_types({**settings_types, "DEBUG": "<class 'str'>"}) == original
+
+        # But it does need to know which settings exist
+        assert hash_settings_types({**settings_types, "NEW_SETTING": "<class 'int'>"}) != original
+        assert (
+            hash_settings_types({k: v for k, v in settings_types.items() if k != "DEBUG"})
+            != original
+        )
+
+        # And it reads the value of some settings
+        assert (
+            hash_settings_types({**settings_types, "AUTH_USER_MODEL": "Literal['other.User']"})
+            != original
+        )
+        assert (
+            hash_settings_types(
+                {**settings_types, "DEFAULT_AUTO_FIELD": "Literal['django.db.models.AutoField']"}
+            )
+            != original
+        )
@@ -23,3 +23,11 @@ class TestVirtualDependencyNamer:
 
         assert namer(ImportPath("my.nice.model")) == "a.bad.place.mod___hashed__myDDniceDDmodel"
         assert namer(ImportPath("my.other.model")) == "a.bad.place.mod___hashed__myDDotherDDmodel"
+
+    def test_it_can_shard_virtual_dependencies(self) -> None:
+        namer = virtual_dependencies.VirtualDependencyNamer(
+            namespace=ImportPath("some.where.nice"), hasher=adler32_hash, layout="sharded"
+        )
+
+        assert namer(ImportPath("my.nice.model")) == "some.where.nice.shard_19.mod_577176819"
+        assert namer(ImportPath("my.other.model")) == "some.where.nice.shard_66.mod_685704566"
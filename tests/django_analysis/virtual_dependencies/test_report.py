@@ -1,4 +1,7 @@
 import dataclasses
+import pathlib
+import sys
+import textwrap
 
 import pytest
 
@@ -51,6 +54,8 @@ class TestCombiningReports:
             report_import_path={
                 ImportPath("M3"): ImportPath("VM3"),
             },
+            summarised_models={ImportPath("P2"): 300},
+            closes_cycle={ImportPath("VP2")},
         )
 
         def write_empty_virtual_dep(
@@ -85,6 +90,8 @@ class TestCombiningReports:
                 ImportPath("M2"): ImportPath("VM2"),
                 ImportPath("M3"): ImportPath("VM3"),
             },
+            summarised_models={ImportPath("P2"): 300},
+            closes_cycle={ImportPath("VP2")},
         )
 
     def test_it_can_ensure_empty_vritual_deps(self) -> None:
@@ -208,6 +215,48 @@ class TestBuildingReport:
             }
         )
 
+    def test_registering_a_module_that_closes_a_cycle(self) -> None:
+        report = virtual_dependencies.Report()
+        report.register_module(
+            module_import_path=ImportPath("one.two"),
+            virtual_import_path=ImportPath("virtual.one.two"),
+        )
+        report.register_module(
+            module_import_path=ImportPath("one.two.Parent"),
+            virtual_import_path=ImportPath("virtual.one.two.Parent"),
+            closes_cycle=True,
+        )
+        report.register_model(
+            model_import_path=ImportPath("one.two.Parent"),
+            virtual_import_path=ImportPath("virtual.one.two.Parent"),
+            queryset_virtual_import_path=ImportPath("virtual.one.two.Parent"),
+            concrete_name="Concrete__Parent",
+            concrete_queryset_name="QuerySet__Parent",
+            concrete_models=[],
+        )
+        assert report.closes_cycle == {ImportPath("virtual.one.two.Parent")}
+
+        def deps(*imports: str, file_import_path: str = "one.two") -> list[str]:
+            return [
+                name
+                for _, name, _ in report.additional_deps(
+                    file_import_path=file_import_path,
+                    imports=set(imports),
+                    super_deps=[],
+                    django_settings_module="my.settings",
+                    using_incremental_cache=False,
+                )
+            ]
+
+        # The module never depends on it, even when it may use the annotations
+        assert deps() == ["virtual.one.two"]
+        assert deps("extended_mypy_django_plugin.Concrete") == ["virtual.one.two"]
+
+        # But other modules using the annotations do
+        assert deps(
+            "extended_mypy_django_plugin.Concrete", "one.two.Parent", file_import_path="three"
+        ) == ["virtual.one.two.Parent"]
+
     @dataclasses.dataclass
     class BuildingScenario:
         parent: protocols.Model = dataclasses.field(
@@ -226,6 +275,9 @@ class TestBuildingReport:
             report.register_model(
                 model_import_path=self.parent.import_path,
                 virtual_import_path=ImportPath(f"virtual.{self.parent.module_import_path}"),
+                queryset_virtual_import_path=ImportPath(
+                    f"virtual.{self.parent.module_import_path}"
+                ),
                 concrete_name="Concrete__Parent",
                 concrete_queryset_name="QuerySet__Parent",
                 concrete_models=[self.model1, self.model2],
@@ -247,6 +299,9 @@ class TestBuildingReport:
             report.register_model(
                 model_import_path=self.model1.import_path,
                 virtual_import_path=ImportPath(f"virtual.{self.model1.module_import_path}"),
+                queryset_virtual_import_path=ImportPath(
+                    f"virtual.{self.model1.module_import_path}"
+                ),
                 concrete_name="Concrete__Model1",
                 concrete_queryset_name="QuerySet__Model1",
                 concrete_models=[self.model1],
@@ -279,6 +334,9 @@ class TestBuildingReport:
             report.register_model(
                 model_import_path=self.model2.import_path,
                 virtual_import_path=ImportPath(f"virtual.{self.model2.module_import_path}"),
+                queryset_virtual_import_path=ImportPath(
+                    f"virtual.{self.model2.module_import_path}"
+                ),
                 concrete_name="Concrete__Model2",
                 concrete_queryset_name="QuerySet__Model2",
                 concrete_models=[self.model2],
@@ -306,6 +364,9 @@ class TestBuildingReport:
             report.register_model(
                 model_import_path=self.model3.import_path,
                 virtual_import_path=ImportPath(f"virtual.{self.model3.module_import_path}"),
+                queryset_virtual_import_path=ImportPath(
+                    f"virtual.{self.model3.module_import_path}"
+                ),
                 concrete_name="Concrete__Model3",
                 concrete_queryset_name="QuerySet__Model3",
                 concrete_models=[self.model3],
@@ -326,6 +387,30 @@ class TestBuildingReport:
             },
         )
 
+    def test_registering_a_summarised_model(self) -> None:
+        scenario = self.BuildingScenario()
+
+        report = virtual_dependencies.Report()
+        report.register_model(
+            model_import_path=scenario.parent.import_path,
+            virtual_import_path=ImportPath("virtual.my.parents"),
+            queryset_virtual_import_path=ImportPath("virtual.my.parents"),
+            concrete_name="Concrete__Parent",
+            concrete_queryset_name="QuerySet__Parent",
+            concrete_models=[scenario.model1, scenario.model2],
+            summarised=True,
+        )
+        scenario.register_model1(report)
+
+        assert report.summarised_models == {ImportPath("my.parents.Parent"): 2}
+        assert report.get_summarised_models("my.parents.Parent", "my.models.Model1") == {
+            "my.parents.Parent": 2
+        }
+
+        # And registering it again without being summarised forgets that it was
+        scenario.register_parent(report)
+        assert report.get_summarised_models("my.parents.Parent") == {}
+
     def test_building_individually_model1(self) -> None:
         scenario = self.BuildingScenario()
 
@@ -453,8 +538,16 @@ class TestBuildingReport:
                     "twelve.thirteen": "v_twelve_thirteen",
                     "another.one": "v_another_one",
                     "more": "v_more",
+                    "fourteen.fifteen": "v_fourteen_fifteen",
+                    "fourteen.sixteen": "v_fourteen_sixteen",
                 }.items()
-            }
+            },
+            concrete_annotations={
+                ImportPath("six.seven.MyModel"): ImportPath("v_six_seven.Concrete__MyModel"),
+                ImportPath("fourteen.sixteen.MyModel"): ImportPath(
+                    "v_fourteen_sixteen.Concrete__MyModel"
+                ),
+            },
         )
 
         ##
@@ -507,41 +600,266 @@ class TestBuildingReport:
         )
         assert sorted(made) == sorted(super_deps)
 
-        # Also add from the file import itself
+        # Files that don't use our annotations only depend on their own virtual dependency
         made = report.additional_deps(
             file_import_path="another.one",
-            imports={"one.two"},
+            imports={"one.two", "one.two.MyModel"},
             super_deps=(super_deps := [(25, "hello.there", -1), (25, "typing.Protocol", 13)]),
             django_settings_module="my.settings",
             using_incremental_cache=using_incremental_cache,
         )
-        if using_incremental_cache:
-            assert sorted(made) == sorted(
-                [*super_deps, (25, "v_another_one", -1), (25, "my.settings", -1)]
-            )
-        else:
-            assert sorted(made) == sorted([*super_deps, (25, "v_another_one", -1)])
+        assert sorted(made) == sorted([*super_deps, (25, "v_another_one", -1)])
+
+        def with_settings(*deps: tuple[int, str, int]) -> list[tuple[int, str, int]]:
+            if using_incremental_cache:
+                return sorted([*deps, (25, "my.settings", -1)])
+            return sorted(deps)
 
+        # Otherwise also the settings
         made = report.additional_deps(
             file_import_path="another.one",
-            imports={"one.two.MyModel"},
+            imports={"extended_mypy_django_plugin.Concrete"},
             super_deps=(super_deps := [(25, "hello.there", -1), (25, "typing.Protocol", 13)]),
             django_settings_module="my.settings",
             using_incremental_cache=using_incremental_cache,
         )
-        if using_incremental_cache:
-            assert sorted(made) == sorted(
-                [*super_deps, (25, "v_another_one", -1), (25, "my.settings", -1)]
-            )
-        else:
-            assert sorted(made) == sorted([*super_deps, (25, "v_another_one", -1)])
+        assert sorted(made) == with_settings(*super_deps, (25, "v_another_one", -1))
+
+        # And from the modules it imports, including through re-exported annotations
+        made = report.additional_deps(
+            file_import_path="another.one",
+            imports={"one.two.MyModel", "three.four", "my.typing.Concrete", "typing.Protocol"},
+            super_deps=(super_deps := [(25, "hello.there", -1), (25, "typing.Protocol", 13)]),
+            django_settings_module="my.settings",
+            using_incremental_cache=using_incremental_cache,
+        )
+        assert sorted(made) == with_settings(
+            *super_deps,
+            (25, "v_another_one", -1),
+            (25, "v_one_two", -1),
+            (25, "v_three_four", -1),
+        )
+
+        # Packages that are imported use every module in that package
+        made = report.additional_deps(
+            file_import_path="some.place",
+            imports={"extended_mypy_django_plugin.annotations", "fourteen", "nope.Thing"},
+            super_deps=(super_deps := []),
+            django_settings_module="my.settings",
+            using_incremental_cache=using_incremental_cache,
+        )
+        assert sorted(made) == with_settings(
+            (25, "v_fourteen_fifteen", -1), (25, "v_fourteen_sixteen", -1)
+        )
+
+        # Models imported from a package only use the modules that define that model
+        made = report.additional_deps(
+            file_import_path="some.place",
+            imports={"extended_mypy_django_plugin.annotations", "six.MyModel", "fourteen.MyModel"},
+            super_deps=(super_deps := []),
+            django_settings_module="my.settings",
+            using_incremental_cache=using_incremental_cache,
+        )
+        assert sorted(made) == with_settings(
+            (25, "v_fourteen_sixteen", -1), (25, "v_six_seven", -1)
+        )
+
+        # And other names imported from a package don't use the modules in that package
+        made = report.additional_deps(
+            file_import_path="some.place",
+            imports={"extended_mypy_django_plugin.annotations", "six.helper", "fourteen.Thing"},
+            super_deps=(super_deps := []),
+            django_settings_module="my.settings",
+            using_incremental_cache=using_incremental_cache,
+        )
+        assert sorted(made) == sorted(super_deps)
+
+        # And files using annotations without any virtual dependencies don't get the settings
+        made = report.additional_deps(
+            file_import_path="some.place",
+            imports={"extended_mypy_django_plugin", "typing.Protocol"},
+            super_deps=(super_deps := [(25, "hello.there", -1)]),
+            django_settings_module="my.settings",
+            using_incremental_cache=using_incremental_cache,
+        )
+        assert sorted(made) == sorted(super_deps)
 
         # Also virtual_deps themselves don't add extra
         made = report.additional_deps(
             file_import_path="v_another_one",
-            imports={"one.two.MyModel"},
+            imports={"one.two.MyModel", "extended_mypy_django_plugin.Concrete"},
             super_deps=(super_deps := [(25, "hello.there", -1), (25, "typing.Protocol", 13)]),
             django_settings_module="my.settings",
             using_incremental_cache=using_incremental_cache,
         )
         assert sorted(made) == sorted(super_deps)
+
+    @pytest.mark.parametrize("using_incremental_cache", (True, False))
+    def test_additional_deps_only_include_querysets_when_they_may_be_used(
+        self, using_incremental_cache: bool
+    ) -> None:
+        report = virtual_dependencies.Report(
+            report_import_path={
+                ImportPath("one.two"): ImportPath("v_one_two"),
+                ImportPath("three.four"): ImportPath("v_three_four"),
+            },
+            queryset_import_path={
+                ImportPath("v_one_two"): ImportPath("v_one_two_querysets"),
+                ImportPath("v_three_four"): ImportPath("v_three_four_querysets"),
+            },
+        )
+
+        def deps(file_import_path: str, *imports: str) -> list[str]:
+            return sorted(
+                name
+                for _, name, _ in report.additional_deps(
+                    file_import_path=file_import_path,
+                    imports=set(imports),
+                    super_deps=[],
+                    django_settings_module="my.settings",
+                    using_incremental_cache=using_incremental_cache,
+                )
+                if name != "my.settings"
+            )
+
+        # A module with models doesn't need its querysets unless it uses them
+        assert deps("one.two") == ["v_one_two"]
+        assert deps("one.two", "extended_mypy_django_plugin.Concrete") == ["v_one_two"]
+
+        # Only using Concrete doesn't need the querysets
+        assert deps("some.place", "extended_mypy_django_plugin.Concrete", "three.four.Model") == [
+            "v_three_four"
+        ]
+
+        # But DefaultQuerySet does, including when it is re-exported
+        for annotations in (
+            "extended_mypy_django_plugin.DefaultQuerySet",
+            "my.typing.DefaultQuerySet",
+            "extended_mypy_django_plugin",
+            "extended_mypy_django_plugin.annotations",
+        ):
+            assert deps("some.place", annotations, "three.four.Model") == [
+                "v_three_four",
+                "v_three_four_querysets",
+            ]
+            assert deps("one.two", annotations) == ["v_one_two", "v_one_two_querysets"]
+
+        # The virtual dependencies themselves get nothing, including those for the querysets
+        for virtual in ("v_one_two", "v_one_two_querysets"):
+            assert deps(virtual, "extended_mypy_django_plugin", "three.four.Model") == []
+
+    @pytest.mark.parametrize("using_incremental_cache", (True, False))
+    def test_additional_deps_follow_annotations_through_the_modules_they_come_from(
+        self,
+        using_incremental_cache: bool,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        (tmp_path / "reexports_pkg").mkdir()
+        (tmp_path / "reexports_pkg" / "__init__.py").write_text("raise ValueError('imported')")
+        (tmp_path / "reexports_pkg" / "concrete.py").write_text(
+            "from extended_mypy_django_plugin import Concrete as Solid\n"
+        )
+        (tmp_path / "reexports_pkg" / "querysets.py").write_text(
+            textwrap.dedent("""
+            from typing import TYPE_CHECKING
+
+            if TYPE_CHECKING:
+                from extended_mypy_django_plugin.annotations import DefaultQuerySet as QS
+            """)
+        )
+        (tmp_path / "reexports_pkg" / "both.py").write_text(
+            "import extended_mypy_django_plugin as emdp\n"
+        )
+        (tmp_path / "reexports_pkg" / "again.py").write_text(
+            "from .concrete import Solid as Concrete\nfrom .querysets import QS\n"
+        )
+        (tmp_path / "reexports_pkg" / "unrelated.py").write_text(
+            "from typing import Protocol as Solid\n"
+        )
+        monkeypatch.setattr(sys, "path", [str(tmp_path), *sys.path])
+
+        report = virtual_dependencies.Report(
+            report_import_path={ImportPath("three.four"): ImportPath("v_three_four")},
+            queryset_import_path={
+                ImportPath("v_three_four"): ImportPath("v_three_four_querysets"),
+            },
+        )
+
+        def deps(*imports: str) -> list[str]:
+            return sorted(
+                name
+                for _, name, _ in report.additional_deps(
+                    file_import_path="some.place",
+                    imports={*imports, "three.four.Model"},
+                    super_deps=[],
+                    django_settings_module="my.settings",
+                    using_incremental_cache=using_incremental_cache,
+                )
+                if name != "my.settings"
+            )
+
+        # Importing the package under another name can use any annotation
+        assert deps("extended_mypy_django_plugin") == ["v_three_four", "v_three_four_querysets"]
+
+        # Annotations re-exported under another name
+        assert deps("reexports_pkg.concrete.Solid") == ["v_three_four"]
+        assert deps("reexports_pkg.querysets.QS") == ["v_three_four", "v_three_four_querysets"]
+        assert deps("reexports_pkg.again.QS") == ["v_three_four", "v_three_four_querysets"]
+
+        # And modules that are imported whole give access to what they import
+        assert deps("reexports_pkg.concrete") == ["v_three_four"]
+        assert deps("reexports_pkg.both") == ["v_three_four", "v_three_four_querysets"]
+        assert deps("reexports_pkg.both.emdp") == ["v_three_four", "v_three_four_querysets"]
+        assert deps("reexports_pkg.again") == ["v_three_four", "v_three_four_querysets"]
+
+        # Other names with the same alias don't use annotations
+        assert deps("reexports_pkg.unrelated.Solid") == []
+        assert deps("reexports_pkg.unrelated") == []
+        assert deps("reexports_pkg.concrete.nope") == []
+        assert "reexports_pkg" not in sys.modules
+
+
+class TestReportImportPaths:
+    def test_it_knows_which_import_paths_are_virtual(self) -> None:
+        paths = virtual_dependencies.ReportImportPaths(
+            {ImportPath("one"): ImportPath("v_one"), ImportPath("two"): ImportPath("v_shared")}
+        )
+        assert paths.is_virtual("v_one")
+        assert paths.is_virtual("v_shared")
+        assert not paths.is_virtual("one")
+
+        paths[ImportPath("three")] = ImportPath("v_shared")
+        paths[ImportPath("one")] = ImportPath("v_one_moved")
+        assert not paths.is_virtual("v_one")
+        assert paths.is_virtual("v_one_moved")
+
+        del paths[ImportPath("two")]
+        assert paths.is_virtual("v_shared")
+        del paths[ImportPath("three")]
+        assert not paths.is_virtual("v_shared")
+
+        assert paths == {ImportPath("one"): ImportPath("v_one_moved")}
+
+    def test_reports_always_index_their_import_paths(self) -> None:
+        report = virtual_dependencies.Report(
+            report_import_path={ImportPath("one"): ImportPath("v_one")}
+        )
+        assert isinstance(report.report_import_path, virtual_dependencies.ReportImportPaths)
+
+        combined = virtual_dependencies.ReportCombiner(
+            reports=[report], report_maker=virtual_dependencies.Report
+        ).combine(version="", write_empty_virtual_dep=lambda module_import_path: None)
+        combined.report.register_module(
+            module_import_path=ImportPath("two.models"), virtual_import_path=ImportPath("v_two")
+        )
+
+        for name in ("v_one", "v_two"):
+            made = combined.report.additional_deps(
+                file_import_path=name,
+                imports=set(),
+                super_deps=[],
+                django_settings_module="my.settings",
+                using_incremental_cache=True,
+            )
+            assert made == []
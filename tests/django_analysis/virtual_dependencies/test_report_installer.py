@@ -1,3 +1,4 @@
+import json
 import os
 import pathlib
 
@@ -16,13 +17,14 @@ class TestReportInstaller:
             content2 = "things\nstuff\n"
             content3 = "compelling\nexample\n"
 
-            scratch_root = tmp_path
+            destination = tmp_path
             assert list(tmp_path.iterdir()) == []
 
             installer.write_report(
-                scratch_root=scratch_root,
+                destination=destination,
                 summary_hash="__summary__",
                 virtual_import_path=ImportPath("mod_blah"),
+                module_import_path=ImportPath("mod"),
                 content=content,
             )
 
@@ -34,18 +36,19 @@ class TestReportInstaller:
 
             # With folders
             installer.write_report(
-                scratch_root=scratch_root,
+                destination=destination,
                 summary_hash="__summary2__",
                 virtual_import_path=ImportPath("forest.of.trees"),
+                module_import_path=ImportPath("mod"),
                 content=content2,
             )
 
             found: list[pathlib.Path] = []
-            for root, _, files in os.walk(scratch_root):
+            for root, _, files in os.walk(destination):
                 for name in files:
                     found.append(pathlib.Path(root) / name)
 
-            location2 = scratch_root / "forest" / "of" / "trees.py"
+            location2 = destination / "forest" / "of" / "trees.py"
             assert found == [location, location2]
             assert location.read_text() == content
             assert location2.read_text() == content2
@@ -54,18 +57,19 @@ class TestReportInstaller:
 
             # And with None summary hash
             installer.write_report(
-                scratch_root=scratch_root,
+                destination=destination,
                 summary_hash=None,
                 virtual_import_path=ImportPath("mod_other"),
+                module_import_path=ImportPath("mod"),
                 content=content3,
             )
 
             found = []
-            for root, _, files in os.walk(scratch_root):
+            for root, _, files in os.walk(destination):
                 for name in files:
                     found.append(pathlib.Path(root) / name)
 
-            location3 = scratch_root / "mod_other.py"
+            location3 = destination / "mod_other.py"
             assert sorted(found) == sorted([location, location3, location2])
             assert location.read_text() == content
             assert location2.read_text() == content2
@@ -77,6 +81,54 @@ class TestReportInstaller:
                 location3: None,
             }
 
+        def test_only_writes_when_the_summary_is_different(self, tmp_path: pathlib.Path) -> None:
+            summaries: dict[pathlib.Path, str | None] = {}
+
+            def _get_report_summary(location: pathlib.Path) -> str | None:
+                return summaries[location]
+
+            installer = virtual_dependencies.ReportInstaller(
+                _get_report_summary=_get_report_summary
+            )
+
+            location = tmp_path / "mod_blah.py"
+            location.write_text("existing")
+
+            summaries[location] = "__summary__"
+            assert not installer.write_report(
+                destination=tmp_path,
+                summary_hash="__summary__",
+                virtual_import_path=ImportPath("mod_blah"),
+                module_import_path=ImportPath("mod"),
+                content="new",
+            )
+            assert location.read_text() == "existing"
+            assert installer._written == {location: "__summary__"}
+
+            location.write_text("older existing")
+            summaries[location] = "__old_summary__"
+            assert installer.write_report(
+                destination=tmp_path,
+                summary_hash="__summary__",
+                virtual_import_path=ImportPath("mod_blah"),
+                module_import_path=ImportPath("mod"),
+                content="new",
+            )
+            assert location.read_text() == "new"
+
+            # Existing files are never replaced when there is no summary hash
+            assert not installer.write_report(
+                destination=tmp_path,
+                summary_hash=False,
+                virtual_import_path=ImportPath("mod_blah"),
+                module_import_path=ImportPath("mod"),
+                content="empty",
+            )
+            assert location.read_text() == "new"
+
+            # And nothing is left behind from writing
+            assert list(tmp_path.iterdir()) == [location]
+
         @pytest.mark.parametrize(
             "bad_path",
             [
@@ -84,68 +136,92 @@ class TestReportInstaller:
                 pytest.param("../somewhere", id="relative_path"),
             ],
         )
-        def test_complains_if_would_write_outside_scratch_folder(
+        def test_complains_if_would_write_outside_destination(
             self, bad_path: str, tmp_path: pathlib.Path
         ) -> None:
             installer = virtual_dependencies.ReportInstaller(_get_report_summary=lambda path: None)
             assert installer._written == {}
 
-            scratch_root = tmp_path
+            destination = tmp_path
 
             with pytest.raises(
-                RuntimeError, match="Virtual dependency ends up being outside of the scratch root"
+                RuntimeError, match="Virtual dependency ends up being outside of the destination"
             ):
                 installer.write_report(
-                    scratch_root=scratch_root,
+                    destination=destination,
                     summary_hash="__summary__",
                     virtual_import_path=protocols.ImportPath(bad_path),
+                    module_import_path=ImportPath("mod"),
                     content="stuff",
                 )
 
+        def test_can_write_stubs(self, tmp_path: pathlib.Path) -> None:
+            installer = virtual_dependencies.ReportInstaller(
+                _get_report_summary=lambda path: None, virtual_dependency_format="pyi"
+            )
+
+            installer.write_report(
+                destination=tmp_path,
+                summary_hash="__summary__",
+                virtual_import_path=ImportPath("forest.of.trees"),
+                module_import_path=ImportPath("mod"),
+                content="trees",
+            )
+
+            location = tmp_path / "forest" / "of" / "trees.pyi"
+            assert location.read_text() == "trees"
+            assert not (tmp_path / "forest" / "of" / "trees.py").exists()
+            assert installer._written == {location: "__summary__"}
+            assert (
+                installer.location_for(
+                    destination=tmp_path, virtual_import_path=ImportPath("forest.of.trees")
+                )
+                == location
+            )
+
     class TestInstallReports:
         def test_it_works_on_empty_folder(self, tmp_path_factory: pytest.TempPathFactory) -> None:
-            scratch_root = tmp_path_factory.mktemp("scratch_root")
             destination_holder = tmp_path_factory.mktemp("destination")
             destination = destination_holder / "__virtual__"
 
             installer = virtual_dependencies.ReportInstaller(_get_report_summary=lambda path: None)
             installer.install_reports(
-                scratch_root=scratch_root,
                 destination=destination_holder,
                 virtual_namespace=ImportPath("__virtual__"),
             )
             assert len(list(destination.iterdir())) == 0
 
-        def test_it_copies_over_everything_that_was_written(
+        def test_it_keeps_everything_that_was_written(
             self, tmp_path_factory: pytest.TempPathFactory
         ) -> None:
-            scratch_root = tmp_path_factory.mktemp("scratch_root")
             destination_holder = tmp_path_factory.mktemp("destination")
             destination = destination_holder / "__virtual__"
 
             installer = virtual_dependencies.ReportInstaller(_get_report_summary=lambda path: None)
 
             installer.write_report(
-                scratch_root=scratch_root,
+                destination=destination_holder,
                 summary_hash="s1",
                 virtual_import_path=ImportPath("__virtual__.mod_one"),
+                module_import_path=ImportPath("mod"),
                 content="1",
             )
             installer.write_report(
-                scratch_root=scratch_root,
+                destination=destination_holder,
                 summary_hash="s2",
                 virtual_import_path=ImportPath("__virtual__.mod_two"),
+                module_import_path=ImportPath("mod"),
                 content="2",
             )
             installer.write_report(
-                scratch_root=scratch_root,
+                destination=destination_holder,
                 summary_hash="s3",
                 virtual_import_path=ImportPath("__virtual__.mod_three"),
+                module_import_path=ImportPath("mod"),
                 content="3",
             )
 
             installer.install_reports(
-                scratch_root=scratch_root,
                 destination=destination_holder,
                 virtual_namespace=ImportPath("__virtual__"),
             )
@@ -155,10 +231,86 @@ class TestReportInstaller:
             assert (destination / "mod_two.py").read_text() == "2"
             assert (destination / "mod_three.py").read_text() == "3"
 
+        def test_it_deletes_virtual_dependencies_in_the_other_format(
+            self, tmp_path_factory: pytest.TempPathFactory
+        ) -> None:
+            destination_holder = tmp_path_factory.mktemp("destination")
+            destination = destination_holder / "__virtual__"
+            destination.mkdir()
+
+            (destination / "mod_one.py").write_text("old")
+            (destination / "mod_two.py").write_text("old")
+
+            installer = virtual_dependencies.ReportInstaller(
+                _get_report_summary=lambda path: "summary", virtual_dependency_format="pyi"
+            )
+            installer.write_report(
+                destination=destination_holder,
+                summary_hash="s1",
+                virtual_import_path=ImportPath("__virtual__.mod_one"),
+                module_import_path=ImportPath("mod"),
+                content="1",
+            )
+            installer.install_reports(
+                destination=destination_holder,
+                virtual_namespace=ImportPath("__virtual__"),
+            )
+
+            assert sorted(p.name for p in destination.iterdir()) == ["mod_one.pyi"]
+            assert (destination / "mod_one.pyi").read_text() == "1"
+
+        def test_it_deletes_virtual_dependencies_from_the_other_layout(
+            self, tmp_path_factory: pytest.TempPathFactory
+        ) -> None:
+            destination_holder = tmp_path_factory.mktemp("destination")
+            destination = destination_holder / "__virtual__"
+            destination.mkdir()
+
+            (destination / "mod_123.py").write_text("flat")
+            (destination / "shard_56").mkdir()
+            (destination / "shard_56" / "mod_456.py").write_text("sharded")
+
+            installer = virtual_dependencies.ReportInstaller(
+                _get_report_summary=lambda path: "summary", virtual_namespace_layout="sharded"
+            )
+            installer.write_report(
+                destination=destination_holder,
+                summary_hash="s1",
+                virtual_import_path=ImportPath("__virtual__.shard_23.mod_123"),
+                module_import_path=ImportPath("mod"),
+                content="1",
+            )
+            installer.install_reports(
+                destination=destination_holder,
+                virtual_namespace=ImportPath("__virtual__"),
+            )
+
+            assert sorted(str(p.relative_to(destination)) for p in destination.rglob("*.py")) == [
+                os.path.join("shard_23", "mod_123.py"),
+                os.path.join("shard_56", "mod_456.py"),
+            ]
+            assert (destination / "shard_56" / "mod_456.py").read_text() == "sharded"
+
+            installer = virtual_dependencies.ReportInstaller(
+                _get_report_summary=lambda path: None if path.is_dir() else "summary"
+            )
+            installer.write_report(
+                destination=destination_holder,
+                summary_hash="s1",
+                virtual_import_path=ImportPath("__virtual__.mod_123"),
+                module_import_path=ImportPath("mod"),
+                content="1",
+            )
+            installer.install_reports(
+                destination=destination_holder,
+                virtual_namespace=ImportPath("__virtual__"),
+            )
+
+            assert sorted(p.name for p in destination.iterdir()) == ["mod_123.py"]
+
         def test_it_deletes_anything_that_gets_none_summary_and_wasnt_written(
             self, tmp_path_factory: pytest.TempPathFactory
         ) -> None:
-            scratch_root = tmp_path_factory.mktemp("scratch_root")
             destination_holder = tmp_path_factory.mktemp("destination")
             destination = destination_holder / "__virtual__"
             destination.mkdir()
@@ -205,38 +357,42 @@ class TestReportInstaller:
             )
 
             installer.write_report(
-                scratch_root=scratch_root,
+                destination=destination_holder,
                 summary_hash="s1",
                 virtual_import_path=ImportPath("__virtual__.mod_one"),
+                module_import_path=ImportPath("mod"),
                 content="1",
             )
             installer.write_report(
-                scratch_root=scratch_root,
+                destination=destination_holder,
                 summary_hash="s2",
                 virtual_import_path=ImportPath("__virtual__.mod_two"),
+                module_import_path=ImportPath("mod"),
                 content="2",
             )
             installer.write_report(
-                scratch_root=scratch_root,
+                destination=destination_holder,
                 summary_hash="s3",
                 virtual_import_path=ImportPath("__virtual__.mod_three"),
+                module_import_path=ImportPath("mod"),
                 content="3",
             )
             installer.write_report(
-                scratch_root=scratch_root,
+                destination=destination_holder,
                 summary_hash="__nested_hash__",
                 virtual_import_path=ImportPath("__virtual__.nested.mc.nestface"),
+                module_import_path=ImportPath("mod"),
                 content="deep",
             )
             installer.write_report(
-                scratch_root=scratch_root,
+                destination=destination_holder,
                 summary_hash="__deep_hash__",
                 virtual_import_path=ImportPath("__virtual__.hidden.down.here"),
+                module_import_path=ImportPath("mod"),
                 content="hiding",
             )
 
             installer.install_reports(
-                scratch_root=scratch_root,
                 destination=destination_holder,
                 virtual_namespace=ImportPath("__virtual__"),
             )
@@ -262,3 +418,160 @@ class TestReportInstaller:
 
             # And _get_report_summary was called exactly as many times as our report_summaries had entries before
             assert report_summaries == {}
+
+    class TestManifest:
+        def write(
+            self,
+            installer: virtual_dependencies.ReportInstaller,
+            destination: pathlib.Path,
+            name: str,
+            *,
+            mod: str,
+            summary: str,
+            content: str = "",
+        ) -> bool:
+            return installer.write_report(
+                destination=destination,
+                summary_hash=summary,
+                virtual_import_path=ImportPath(f"__virtual__.{name}"),
+                module_import_path=ImportPath(mod),
+                content=f'{content}\nmod = "{mod}"\nsummary = "{summary}"\n',
+            )
+
+        def test_it_uses_the_manifest_instead_of_reading_files(
+            self, tmp_path: pathlib.Path
+        ) -> None:
+            def fail(location: pathlib.Path) -> str | None:
+                raise AssertionError(f"Shouldn't read {location}")
+
+            installer = virtual_dependencies.ReportInstaller(_get_report_summary=fail)
+            assert self.write(installer, tmp_path, "mod_one", mod="one", summary="s1")
+            assert self.write(installer, tmp_path, "mod_two", mod="two", summary="s2")
+            assert self.write(installer, tmp_path, "mod_three", mod="three", summary="s3")
+            installer.install_reports(
+                destination=tmp_path, virtual_namespace=ImportPath("__virtual__")
+            )
+
+            manifest = tmp_path / virtual_dependencies.report.MANIFEST_NAME
+            assert manifest.exists()
+
+            existing = {"one", "two"}
+            installer = virtual_dependencies.ReportInstaller(
+                _get_report_summary=fail, _module_exists=existing.__contains__
+            )
+
+            # Unchanged summary means no write, changed summary means a write
+            assert not self.write(
+                installer, tmp_path, "mod_one", mod="one", summary="s1", content="# new"
+            )
+            assert self.write(installer, tmp_path, "mod_two", mod="two", summary="s2.1")
+            installer.install_reports(
+                destination=tmp_path, virtual_namespace=ImportPath("__virtual__")
+            )
+
+            destination = tmp_path / "__virtual__"
+            assert sorted(path.name for path in destination.iterdir()) == [
+                "mod_one.py",
+                "mod_two.py",
+            ]
+            assert "# new" not in (destination / "mod_one.py").read_text()
+            assert 'summary = "s2.1"' in (destination / "mod_two.py").read_text()
+
+            found = json.loads(manifest.read_text())
+            assert sorted(found["entries"]) == ["__virtual__.mod_one", "__virtual__.mod_two"]
+            assert found["entries"]["__virtual__.mod_two"][:2] == ["two", "s2.1"]
+
+        def test_it_adds_virtual_dependencies_written_after_installing(
+            self, tmp_path: pathlib.Path
+        ) -> None:
+            def fail(location: pathlib.Path) -> str | None:
+                raise AssertionError(f"Shouldn't read {location}")
+
+            installer = virtual_dependencies.ReportInstaller(
+                _get_report_summary=fail, _module_exists=lambda mod: True
+            )
+            assert self.write(installer, tmp_path, "mod_one", mod="one", summary="s1")
+            installer.install_reports(
+                destination=tmp_path, virtual_namespace=ImportPath("__virtual__")
+            )
+
+            # Like the empty virtual dependencies written at mypy time
+            content = (
+                virtual_dependencies.VirtualDependencyScribe.make_empty_virtual_dependency_content(
+                    module_import_path=ImportPath("two")
+                )
+            )
+            assert installer.write_report(
+                destination=tmp_path,
+                summary_hash=False,
+                virtual_import_path=ImportPath("__virtual__.mod_two"),
+                module_import_path=ImportPath("two"),
+                content=content,
+            )
+
+            manifest = tmp_path / virtual_dependencies.report.MANIFEST_NAME
+            found = json.loads(manifest.read_text())
+            assert sorted(found["entries"]) == ["__virtual__.mod_one", "__virtual__.mod_two"]
+            assert found["entries"]["__virtual__.mod_two"][:2] == [
+                "two",
+                virtual_dependencies.report.NOT_INSTALLED_SUMMARY,
+            ]
+
+            # So the next run doesn't need to read it
+            installer = virtual_dependencies.ReportInstaller(
+                _get_report_summary=fail, _module_exists=lambda mod: True
+            )
+            assert self.write(installer, tmp_path, "mod_one", mod="one", summary="s1.1")
+            installer.install_reports(
+                destination=tmp_path, virtual_namespace=ImportPath("__virtual__")
+            )
+            assert sorted(path.name for path in (tmp_path / "__virtual__").iterdir()) == [
+                "mod_one.py",
+                "mod_two.py",
+            ]
+
+        def test_it_reads_files_that_changed_or_when_manifest_is_missing(
+            self, tmp_path: pathlib.Path
+        ) -> None:
+            installer = virtual_dependencies.ReportInstaller(
+                _get_report_summary=virtual_dependencies.VirtualDependencyScribe.get_report_summary,
+                _module_exists=lambda mod: True,
+            )
+            assert self.write(installer, tmp_path, "mod_one", mod="os", summary="s1")
+            assert self.write(installer, tmp_path, "mod_two", mod="json", summary="s2")
+            installer.install_reports(
+                destination=tmp_path, virtual_namespace=ImportPath("__virtual__")
+            )
+
+            # Change a file behind the manifest's back
+            (tmp_path / "__virtual__" / "mod_one.py").write_text("not a virtual dependency")
+
+            read: list[pathlib.Path] = []
+
+            def _get_report_summary(location: pathlib.Path) -> str | None:
+                read.append(location)
+                return virtual_dependencies.VirtualDependencyScribe.get_report_summary(location)
+
+            installer = virtual_dependencies.ReportInstaller(
+                _get_report_summary=_get_report_summary, _module_exists=lambda mod: True
+            )
+            installer.install_reports(
+                destination=tmp_path, virtual_namespace=ImportPath("__virtual__")
+            )
+            assert read == [tmp_path / "__virtual__" / "mod_one.py"]
+            assert not (tmp_path / "__virtual__" / "mod_one.py").exists()
+
+            # And the manifest is rebuilt if it can't be used
+            manifest = tmp_path / virtual_dependencies.report.MANIFEST_NAME
+            manifest.write_text("{")
+            read.clear()
+
+            installer = virtual_dependencies.ReportInstaller(
+                _get_report_summary=_get_report_summary, _module_exists=lambda mod: True
+            )
+            assert not self.write(installer, tmp_path, "mod_two", mod="json", summary="s2")
+            installer.install_reports(
+                destination=tmp_path, virtual_namespace=ImportPath("__virtual__")
+            )
+            assert read == [tmp_path / "__virtual__" / "mod_two.py"]
+            assert list(json.loads(manifest.read_text())["entries"]) == ["__virtual__.mod_two"]
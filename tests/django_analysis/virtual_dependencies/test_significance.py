@@ -0,0 +1,153 @@
+from collections.abc import Mapping, Sequence
+
+from extended_mypy_django_plugin.django_analysis import (
+    ImportPath,
+    Model,
+    Module,
+    Project,
+    adler32_hash,
+    protocols,
+    virtual_dependencies,
+)
+
+
+def make_virtual_dependencies(
+    relations: Mapping[str, Sequence[str]], *, info: Mapping[str, str] | None = None
+) -> dict[protocols.ImportPath, virtual_dependencies.VirtualDependency[Project]]:
+    """
+    Make a virtual dependency for each module where an abstract model in that module
+    has a concrete child in each of the related modules
+    """
+
+    def make_model(module_import_path: str, name: str, *, is_abstract: bool) -> Model:
+        return Model(
+            model_name=name,
+            module_import_path=ImportPath(module_import_path),
+            import_path=ImportPath(f"{module_import_path}.{name}"),
+            is_abstract=is_abstract,
+            default_custom_queryset=None,
+            all_fields={},
+            models_in_mro=[],
+        )
+
+    result: dict[protocols.ImportPath, virtual_dependencies.VirtualDependency[Project]] = {}
+    for module_import_path, related in relations.items():
+        abstract = make_model(module_import_path, "Abstract", is_abstract=True)
+        result[ImportPath(module_import_path)] = virtual_dependencies.VirtualDependency(
+            module=Module(
+                import_path=ImportPath(module_import_path),
+                defined_models={abstract.import_path: abstract},
+            ),
+            summary=virtual_dependencies.VirtualDependencySummary(
+                virtual_namespace=ImportPath("__virtual__"),
+                virtual_import_path=ImportPath(f"__virtual__.{module_import_path}"),
+                module_import_path=ImportPath(module_import_path),
+                significant_info=[(info or {}).get(module_import_path, module_import_path)],
+            ),
+            all_related_models=[],
+            concrete_models={
+                abstract.import_path: [
+                    make_model(other, "Concrete", is_abstract=False) for other in related
+                ]
+            },
+        )
+    return result
+
+
+class TestModuleSignificance:
+    def test_it_gives_modules_in_a_cycle_the_same_hash(self) -> None:
+        called: list[tuple[bytes, ...]] = []
+
+        def hasher(*parts: bytes) -> str:
+            called.append(parts)
+            return adler32_hash(*parts)
+
+        all_virtual_dependencies = make_virtual_dependencies(
+            {"a": ["b"], "b": ["a", "c"], "c": [], "d": ["a"]}
+        )
+        significance = virtual_dependencies.ModuleSignificance[
+            virtual_dependencies.VirtualDependency[Project]
+        ](hasher=hasher, all_virtual_dependencies=all_virtual_dependencies)
+
+        assert significance(ImportPath("nope")) is None
+
+        hashes = {name: significance(ImportPath(name)) for name in ("d", "a", "b", "c", "d", "a")}
+        c_hash = adler32_hash(b"c")
+        ab_hash = adler32_hash(c_hash.encode(), b"a", b"b")
+        assert hashes == {
+            "a": ab_hash,
+            "b": ab_hash,
+            "c": c_hash,
+            "d": adler32_hash(ab_hash.encode(), b"d"),
+        }
+
+        # Each component is only hashed once
+        assert called == [(b"c",), (c_hash.encode(), b"a", b"b"), (ab_hash.encode(), b"d")]
+
+    def test_it_doesnt_depend_on_the_order_modules_are_asked_for(self) -> None:
+        relations = {"a": ["b", "c"], "b": ["c"], "c": ["a", "e"], "d": ["c"], "e": []}
+
+        found: list[dict[str, str | None]] = []
+        for order in (["a", "b", "c", "d", "e"], ["e", "d", "c", "b", "a"], ["c", "a", "e"]):
+            significance = virtual_dependencies.ModuleSignificance[
+                virtual_dependencies.VirtualDependency[Project]
+            ](hasher=adler32_hash, all_virtual_dependencies=make_virtual_dependencies(relations))
+            for name in order:
+                significance(ImportPath(name))
+            found.append({name: significance(ImportPath(name)) for name in sorted(relations)})
+
+        assert found[0] == found[1] == found[2]
+        assert found[0]["a"] == found[0]["b"] == found[0]["c"]
+        assert len({found[0]["a"], found[0]["d"], found[0]["e"]}) == 3
+
+    def test_it_sees_changes_in_anything_related(self) -> None:
+        relations = {"a": ["b"], "b": ["c"], "c": [], "other": []}
+
+        def hashes(info: Mapping[str, str]) -> dict[str, str | None]:
+            significance = virtual_dependencies.ModuleSignificance[
+                virtual_dependencies.VirtualDependency[Project]
+            ](
+                hasher=adler32_hash,
+                all_virtual_dependencies=make_virtual_dependencies(relations, info=info),
+            )
+            return {name: significance(ImportPath(name)) for name in relations}
+
+        before = hashes({})
+        after = hashes({"c": "changed"})
+        assert [name for name in relations if before[name] != after[name]] == ["a", "b", "c"]
+
+    def test_it_can_handle_long_chains(self) -> None:
+        count = 5000
+        relations = {f"m{i}": [f"m{i + 1}"] for i in range(count)}
+        relations[f"m{count}"] = ["m0"]
+        relations["tail"] = ["m0"]
+
+        significance = virtual_dependencies.ModuleSignificance[
+            virtual_dependencies.VirtualDependency[Project]
+        ](hasher=adler32_hash, all_virtual_dependencies=make_virtual_dependencies(relations))
+
+        assert significance(ImportPath("tail")) is not None
+        assert significance(ImportPath("m0")) == significance(ImportPath(f"m{count}"))
+
+    def test_it_only_finds_the_relations_of_each_module_once(self) -> None:
+        relations = {"a": ["b", "c", "d"], "b": ["a", "c"], "c": ["d"], "d": [], "e": ["a"]}
+        all_virtual_dependencies = make_virtual_dependencies(relations)
+
+        looked_at: list[str] = []
+
+        class Tracked(dict[protocols.ImportPath, virtual_dependencies.VirtualDependency[Project]]):
+            def __getitem__(
+                self, key: protocols.ImportPath
+            ) -> virtual_dependencies.VirtualDependency[Project]:
+                looked_at.append(key)
+                return super().__getitem__(key)
+
+        significance = virtual_dependencies.ModuleSignificance[
+            virtual_dependencies.VirtualDependency[Project]
+        ](hasher=adler32_hash, all_virtual_dependencies=Tracked(all_virtual_dependencies))
+
+        for name in relations:
+            significance(ImportPath(name))
+
+        # Once to find what each module relates to and once for its significant info
+        assert sorted(looked_at) == sorted([*relations, *relations])
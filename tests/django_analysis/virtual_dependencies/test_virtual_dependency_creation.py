@@ -1,7 +1,10 @@
 import dataclasses
 
 from extended_mypy_django_plugin.django_analysis import (
+    Discovered,
     ImportPath,
+    InstalledApp,
+    Module,
     Project,
     protocols,
     virtual_dependencies,
@@ -45,6 +48,8 @@ class TestVirtualDependency:
             "module:djangoexample.exampleapp.models>concrete:djangoexample.exampleapp.models.Child2=djangoexample.exampleapp.models.Child2",
             "module:djangoexample.exampleapp.models>concrete:djangoexample.exampleapp.models.Child3=djangoexample.exampleapp.models.Child3",
             "module:djangoexample.exampleapp.models>concrete:djangoexample.exampleapp.models.Child4=djangoexample.exampleapp.models.Child4",
+            "module:djangoexample.exampleapp.models>installed_app:djangoexample.exampleapp",
+            "module:djangoexample.exampleapp.models>installed_app:djangoexample.exampleapp2",
             "module:djangoexample.exampleapp.models>model:djangoexample.exampleapp.models.Parent>is_abstract:True",
             "module:djangoexample.exampleapp.models>model:djangoexample.exampleapp.models.Parent>field:one",
             "module:djangoexample.exampleapp.models>model:djangoexample.exampleapp.models.Parent>field:one>field_type:django.db.models.fields.CharField",
@@ -167,6 +172,8 @@ class TestVirtualDependency:
             "module:djangoexample.relations1.models>concrete:djangoexample.relations1.models.Child2=djangoexample.relations1.models.Child2",
             "module:djangoexample.relations1.models>concrete:djangoexample.relations1.models.Concrete1=djangoexample.relations1.models.Concrete1",
             "module:djangoexample.relations1.models>concrete:djangoexample.relations1.models.Concrete2=djangoexample.relations1.models.Concrete2",
+            "module:djangoexample.relations1.models>installed_app:djangoexample.relations1",
+            "module:djangoexample.relations1.models>installed_app:djangoexample.relations2",
             "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Abstract>is_abstract:True",
             "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Child1>is_abstract:False",
             "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Child1>custom_queryset:djangoexample.relations1.models.Child1QuerySet",
@@ -204,3 +211,158 @@ class TestVirtualDependency:
             "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Concrete2>field:children>field_type:django.db.models.fields.related.ManyToManyField",
             "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Concrete2>field:children>related_model:djangoexample.relations1.models.Child1",
         ]
+
+    def test_significant_info_only_depends_on_relevant_installed_apps(
+        self, discovered_django_example: protocols.Discovered[Project]
+    ) -> None:
+        import djangoexample.relations1.models
+
+        assert isinstance(discovered_django_example, Discovered)
+        module = discovered_django_example.installed_models_modules[
+            ImportPath.from_module(djangoexample.relations1.models)
+        ]
+
+        def significant_info(
+            installed_apps: list[str], app_configs: protocols.InstalledAppsMap | None = None
+        ) -> list[str]:
+            return [
+                info
+                for info in virtual_dependencies.VirtualDependency.create(
+                    discovered_project=dataclasses.replace(
+                        discovered_django_example,
+                        installed_apps=installed_apps,
+                        installed_app_configs=(
+                            discovered_django_example.installed_app_configs
+                            if app_configs is None
+                            else app_configs
+                        ),
+                    ),
+                    module=module,
+                    virtual_dependency_namer=Namer(),
+                ).summary.significant_info
+                if ">installed_app:" in info
+            ]
+
+        original = significant_info(list(discovered_django_example.installed_apps))
+        assert original == [
+            "module:djangoexample.relations1.models>installed_app:djangoexample.relations1",
+            "module:djangoexample.relations1.models>installed_app:djangoexample.relations2",
+        ]
+
+        # Unrelated apps can be added, removed and reordered
+        unrelated = [
+            app
+            for app in discovered_django_example.installed_apps
+            if not app.startswith("djangoexample.relations")
+        ]
+        assert (
+            significant_info(
+                [
+                    "djangoexample.relations1",
+                    *reversed(unrelated[1:]),
+                    "djangoexample.relations2",
+                    "some.other_app",
+                ]
+            )
+            == original
+        )
+
+        # Apps may be installed with the path to their AppConfig
+        app_configs = dict(discovered_django_example.installed_app_configs)
+        app_configs["djangoexample.relations1.apps.ExampleappConfig"] = app_configs.pop(
+            "djangoexample.relations1"
+        )
+        assert significant_info(
+            ["djangoexample.relations2", "djangoexample.relations1.apps.ExampleappConfig"],
+            app_configs,
+        ) == [
+            "module:djangoexample.relations1.models>installed_app:djangoexample.relations2",
+            "module:djangoexample.relations1.models>installed_app:djangoexample.relations1.apps.ExampleappConfig",
+        ]
+
+    def test_installed_apps_own_modules_by_their_app_config(
+        self, discovered_django_example: protocols.Discovered[Project]
+    ) -> None:
+        assert isinstance(discovered_django_example, Discovered)
+        app_configs: dict[str, protocols.InstalledApp] = {
+            "myapp.apps.MyConfig": InstalledApp(
+                name="myapp", models_modules=frozenset([ImportPath("myapp.models")])
+            ),
+            "myapp.sub.apps.SubConfig": InstalledApp(
+                name="myapp.sub", models_modules=frozenset([ImportPath("myapp.sub.models")])
+            ),
+            "other": InstalledApp(
+                name="other",
+                models_modules=frozenset([ImportPath("other.models"), ImportPath("elsewhere")]),
+            ),
+        }
+        discovered_project = dataclasses.replace(
+            discovered_django_example,
+            installed_apps=list(app_configs),
+            installed_app_configs=app_configs,
+        )
+
+        def owners(module_import_path: str) -> list[str]:
+            return list(
+                virtual_dependencies.VirtualDependency.find_relevant_installed_apps(
+                    discovered_project=discovered_project,
+                    module=Module(import_path=ImportPath(module_import_path), defined_models={}),
+                    concrete_models={},
+                )
+            )
+
+        # Modules in a nested app belong to that app rather than the app around it
+        assert owners("myapp.sub.models") == ["myapp.sub.apps.SubConfig"]
+        assert owners("myapp.sub.things.models") == ["myapp.sub.apps.SubConfig"]
+
+        # And the path to an AppConfig doesn't make modules beside it belong to that app
+        assert owners("myapp.models") == ["myapp.apps.MyConfig"]
+        assert owners("myapp.other.models") == ["myapp.apps.MyConfig"]
+
+        # Modules with models registered with an app belong to that app wherever they are
+        assert owners("elsewhere") == ["other"]
+        assert owners("unrelated.models") == []
+
+    def test_aliases_only_significance_ignores_fields(
+        self, discovered_django_example: protocols.Discovered[Project]
+    ) -> None:
+        import djangoexample.relations1.models
+
+        module = discovered_django_example.installed_models_modules[
+            ImportPath.from_module(djangoexample.relations1.models)
+        ]
+
+        virtual_dependency = virtual_dependencies.VirtualDependency.create(
+            discovered_project=discovered_django_example,
+            module=module,
+            virtual_dependency_namer=Namer(),
+            significance_policy="aliases-only",
+        )
+
+        assert virtual_dependency.summary.significant_info == [
+            "module:djangoexample.relations1.models",
+            "module:djangoexample.relations1.models>concrete:djangoexample.relations1.models.Abstract=djangoexample.relations1.models.Child1,djangoexample.relations1.models.Child2",
+            "module:djangoexample.relations1.models>concrete:djangoexample.relations1.models.Child1=djangoexample.relations1.models.Child1",
+            "module:djangoexample.relations1.models>concrete:djangoexample.relations1.models.Child2=djangoexample.relations1.models.Child2",
+            "module:djangoexample.relations1.models>concrete:djangoexample.relations1.models.Concrete1=djangoexample.relations1.models.Concrete1",
+            "module:djangoexample.relations1.models>concrete:djangoexample.relations1.models.Concrete2=djangoexample.relations1.models.Concrete2",
+            "module:djangoexample.relations1.models>installed_app:djangoexample.relations1",
+            "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Abstract>is_abstract:True",
+            "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Child1>is_abstract:False",
+            "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Child1>custom_queryset:djangoexample.relations1.models.Child1QuerySet",
+            "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Child1>mro_0:djangoexample.relations1.models.Abstract",
+            "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Child2>is_abstract:False",
+            "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Child2>mro_0:djangoexample.relations1.models.Abstract",
+            "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Concrete1>is_abstract:False",
+            "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Concrete1>custom_queryset:djangoexample.relations1.models.Concrete1QuerySet",
+            "module:djangoexample.relations1.models>model:djangoexample.relations1.models.Concrete2>is_abstract:False",
+        ]
+
+        # The related models are still known
+        assert virtual_dependency.all_related_models == (
+            virtual_dependencies.VirtualDependency.create(
+                discovered_project=discovered_django_example,
+                module=module,
+                virtual_dependency_namer=Namer(),
+            ).all_related_models
+        )
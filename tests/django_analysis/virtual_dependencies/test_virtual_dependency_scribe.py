@@ -42,6 +42,11 @@ class TestVirtualDependencyScribe:
 
             assert get_report_summary(with_extension) == "stuff"
 
+            stub = tmp_path / "one.pyi"
+            shutil.move(with_extension, stub)
+
+            assert get_report_summary(stub) == "stuff"
+
         def test_it_says_yes_to_files_and_links(
             self, tmp_path: pathlib.Path, get_report_summary: ReportSummaryGetter
         ) -> None:
@@ -112,8 +117,10 @@ class TestVirtualDependencyScribe:
                 *,
                 hasher: protocols.Hasher,
                 virtual_dependency: virtual_dependencies.VirtualDependency[Project],
+                queryset_union_style: protocols.QuerySetUnionStyle = "expanded",
+                max_concrete_union_width: int = 0,
             ) -> virtual_dependencies.RenderedVirtualDependency[virtual_dependencies.Report]:
-                def make_differentiator() -> str:
+                def make_differentiator(summary_hash: str) -> str:
                     self.count += 1
                     return f"__differentiated__{self.count}"
 
@@ -122,8 +129,9 @@ class TestVirtualDependencyScribe:
                     report_maker=virtual_dependencies.Report,
                     virtual_dependency=virtual_dependency,
                     all_virtual_dependencies=self.all_virtual_dependencies,
-                    installed_apps_hash="__installed_apps_hash__",
                     make_differentiator=make_differentiator,
+                    queryset_union_style=queryset_union_style,
+                    max_concrete_union_width=max_concrete_union_width,
                 ).render()
 
             def make_report(
@@ -132,6 +140,7 @@ class TestVirtualDependencyScribe:
                 concrete_annotations: dict[str, str],
                 concrete_querysets: dict[str, str],
                 report_import_path: dict[str, str],
+                queryset_import_path: dict[str, str],
             ) -> virtual_dependencies.Report:
                 """
                 Helper to make the tests below easier to read
@@ -146,6 +155,9 @@ class TestVirtualDependencyScribe:
                     report_import_path={
                         ImportPath(k): ImportPath(v) for k, v in report_import_path.items()
                     },
+                    queryset_import_path={
+                        ImportPath(k): ImportPath(v) for k, v in queryset_import_path.items()
+                    },
                 )
 
         def test_writing_virtual_dependencies_1(
@@ -161,6 +173,7 @@ class TestVirtualDependencyScribe:
                     b"module:djangoexample.exampleapp2.models",
                     b"module:djangoexample.exampleapp2.models>concrete:djangoexample.exampleapp2.models.ChildOther=djangoexample.exampleapp2.models.ChildOther",
                     b"module:djangoexample.exampleapp2.models>concrete:djangoexample.exampleapp2.models.ChildOther2=djangoexample.exampleapp2.models.ChildOther2",
+                    b"module:djangoexample.exampleapp2.models>installed_app:djangoexample.exampleapp2",
                     b"module:djangoexample.exampleapp2.models>model:djangoexample.exampleapp2.models.ChildOther>is_abstract:False",
                     b"module:djangoexample.exampleapp2.models>model:djangoexample.exampleapp2.models.ChildOther>mro_0:djangoexample.exampleapp.models.Parent",
                     b"module:djangoexample.exampleapp2.models>model:djangoexample.exampleapp2.models.ChildOther>field:id",
@@ -189,22 +202,32 @@ class TestVirtualDependencyScribe:
                 return None
 
             mod = "djangoexample.exampleapp2.models"
-            summary = "__virtual__.mod_3537308831::djangoexample.exampleapp2.models::installed_apps=__installed_apps_hash__::significant=__hashed_for_great_good__::v2"
+            summary = "__virtual__.mod_3537308831::djangoexample.exampleapp2.models::significant=__hashed_for_great_good__::v5"
+
+            import djangoexample.exampleapp2.models
+            Concrete__ChildOther = djangoexample.exampleapp2.models.ChildOther
+            Concrete__ChildOther2 = djangoexample.exampleapp2.models.ChildOther2
+            """).strip()
+
+            queryset_content = textwrap.dedent("""
+            def interface____differentiated__1() -> None:
+                return None
+
+            mod = "djangoexample.exampleapp2.models"
+            summary = "__virtual__.mod_3537308831::djangoexample.exampleapp2.models::significant=__hashed_for_great_good__::v5"
 
             import django.db.models
             import djangoexample.exampleapp2.models
             ConcreteQuerySet__ChildOther = django.db.models.QuerySet[djangoexample.exampleapp2.models.ChildOther]
             ConcreteQuerySet__ChildOther2 = django.db.models.QuerySet[djangoexample.exampleapp2.models.ChildOther2]
-            Concrete__ChildOther = djangoexample.exampleapp2.models.ChildOther
-            Concrete__ChildOther2 = djangoexample.exampleapp2.models.ChildOther2
             """).strip()
 
             summary_hash = (
                 "__virtual__.mod_3537308831"
                 "::djangoexample.exampleapp2.models"
-                "::installed_apps=__installed_apps_hash__"
+                ""
                 "::significant=__hashed_for_great_good__"
-                "::v2"
+                "::v5"
             )
 
             written = scenario.scribe(hasher=hasher, virtual_dependency=virtual_dependency)
@@ -217,14 +240,22 @@ class TestVirtualDependencyScribe:
                         "djangoexample.exampleapp2.models.ChildOther2": "__virtual__.mod_3537308831.Concrete__ChildOther2",
                     },
                     concrete_querysets={
-                        "djangoexample.exampleapp2.models.ChildOther": "__virtual__.mod_3537308831.ConcreteQuerySet__ChildOther",
-                        "djangoexample.exampleapp2.models.ChildOther2": "__virtual__.mod_3537308831.ConcreteQuerySet__ChildOther2",
+                        "djangoexample.exampleapp2.models.ChildOther": "__virtual__.mod_3537308831_querysets.ConcreteQuerySet__ChildOther",
+                        "djangoexample.exampleapp2.models.ChildOther2": "__virtual__.mod_3537308831_querysets.ConcreteQuerySet__ChildOther2",
                     },
                     report_import_path={
                         "djangoexample.exampleapp2.models": "__virtual__.mod_3537308831"
                     },
+                    queryset_import_path={
+                        "__virtual__.mod_3537308831": "__virtual__.mod_3537308831_querysets"
+                    },
                 ),
                 virtual_import_path=virtual_dependency.summary.virtual_import_path,
+                module_import_path=virtual_dependency.summary.module_import_path,
+                queryset_content=queryset_content + "\n",
+                queryset_virtual_import_path=ImportPath(
+                    f"{virtual_dependency.summary.virtual_import_path}_querysets"
+                ),
             )
 
             assert hasher_called == [1]
@@ -245,6 +276,8 @@ class TestVirtualDependencyScribe:
                     b"module:djangoexample.relations1.models>concrete:djangoexample.relations1.models.Child2=djangoexample.relations1.models.Child2",
                     b"module:djangoexample.relations1.models>concrete:djangoexample.relations1.models.Concrete1=djangoexample.relations1.models.Concrete1",
                     b"module:djangoexample.relations1.models>concrete:djangoexample.relations1.models.Concrete2=djangoexample.relations1.models.Concrete2",
+                    b"module:djangoexample.relations1.models>installed_app:djangoexample.relations1",
+                    b"module:djangoexample.relations1.models>installed_app:djangoexample.relations2",
                     b"module:djangoexample.relations1.models>model:djangoexample.relations1.models.Abstract>is_abstract:True",
                     b"module:djangoexample.relations1.models>model:djangoexample.relations1.models.Child1>is_abstract:False",
                     b"module:djangoexample.relations1.models>model:djangoexample.relations1.models.Child1>custom_queryset:djangoexample.relations1.models.Child1QuerySet",
@@ -293,7 +326,22 @@ class TestVirtualDependencyScribe:
                 return None
 
             mod = "djangoexample.relations1.models"
-            summary = "__virtual__.mod_3327724610::djangoexample.relations1.models::installed_apps=__installed_apps_hash__::significant=__hashed_for_greater_good__::v2"
+            summary = "__virtual__.mod_3327724610::djangoexample.relations1.models::significant=__hashed_for_greater_good__::v5"
+
+            import djangoexample.relations1.models
+            Concrete__Abstract = djangoexample.relations1.models.Child1 | djangoexample.relations1.models.Child2
+            Concrete__Child1 = djangoexample.relations1.models.Child1
+            Concrete__Child2 = djangoexample.relations1.models.Child2
+            Concrete__Concrete1 = djangoexample.relations1.models.Concrete1
+            Concrete__Concrete2 = djangoexample.relations1.models.Concrete2
+            """).strip()
+
+            queryset_content = textwrap.dedent("""
+            def interface____differentiated__1() -> None:
+                return None
+
+            mod = "djangoexample.relations1.models"
+            summary = "__virtual__.mod_3327724610::djangoexample.relations1.models::significant=__hashed_for_greater_good__::v5"
 
             import django.db.models
             import djangoexample.relations1.models
@@ -302,19 +350,14 @@ class TestVirtualDependencyScribe:
             ConcreteQuerySet__Child2 = django.db.models.QuerySet[djangoexample.relations1.models.Child2]
             ConcreteQuerySet__Concrete1 = djangoexample.relations1.models.Concrete1QuerySet
             ConcreteQuerySet__Concrete2 = django.db.models.QuerySet[djangoexample.relations1.models.Concrete2]
-            Concrete__Abstract = djangoexample.relations1.models.Child1 | djangoexample.relations1.models.Child2
-            Concrete__Child1 = djangoexample.relations1.models.Child1
-            Concrete__Child2 = djangoexample.relations1.models.Child2
-            Concrete__Concrete1 = djangoexample.relations1.models.Concrete1
-            Concrete__Concrete2 = djangoexample.relations1.models.Concrete2
             """).strip()
 
             summary_hash = (
                 "__virtual__.mod_3327724610"
                 "::djangoexample.relations1.models"
-                "::installed_apps=__installed_apps_hash__"
+                ""
                 "::significant=__hashed_for_greater_good__"
-                "::v2"
+                "::v5"
             )
 
             written = scenario.scribe(hasher=hasher, virtual_dependency=virtual_dependency)
@@ -330,17 +373,25 @@ class TestVirtualDependencyScribe:
                         "djangoexample.relations1.models.Concrete2": "__virtual__.mod_3327724610.Concrete__Concrete2",
                     },
                     concrete_querysets={
-                        "djangoexample.relations1.models.Abstract": "__virtual__.mod_3327724610.ConcreteQuerySet__Abstract",
-                        "djangoexample.relations1.models.Child1": "__virtual__.mod_3327724610.ConcreteQuerySet__Child1",
-                        "djangoexample.relations1.models.Child2": "__virtual__.mod_3327724610.ConcreteQuerySet__Child2",
-                        "djangoexample.relations1.models.Concrete1": "__virtual__.mod_3327724610.ConcreteQuerySet__Concrete1",
-                        "djangoexample.relations1.models.Concrete2": "__virtual__.mod_3327724610.ConcreteQuerySet__Concrete2",
+                        "djangoexample.relations1.models.Abstract": "__virtual__.mod_3327724610_querysets.ConcreteQuerySet__Abstract",
+                        "djangoexample.relations1.models.Child1": "__virtual__.mod_3327724610_querysets.ConcreteQuerySet__Child1",
+                        "djangoexample.relations1.models.Child2": "__virtual__.mod_3327724610_querysets.ConcreteQuerySet__Child2",
+                        "djangoexample.relations1.models.Concrete1": "__virtual__.mod_3327724610_querysets.ConcreteQuerySet__Concrete1",
+                        "djangoexample.relations1.models.Concrete2": "__virtual__.mod_3327724610_querysets.ConcreteQuerySet__Concrete2",
                     },
                     report_import_path={
                         "djangoexample.relations1.models": "__virtual__.mod_3327724610"
                     },
+                    queryset_import_path={
+                        "__virtual__.mod_3327724610": "__virtual__.mod_3327724610_querysets"
+                    },
                 ),
                 virtual_import_path=virtual_dependency.summary.virtual_import_path,
+                module_import_path=virtual_dependency.summary.module_import_path,
+                queryset_content=queryset_content + "\n",
+                queryset_virtual_import_path=ImportPath(
+                    f"{virtual_dependency.summary.virtual_import_path}_querysets"
+                ),
             )
 
             assert hasher_called == [1]
@@ -354,7 +405,10 @@ class TestVirtualDependencyScribe:
 
             def hasher(*parts: bytes) -> str:
                 hasher_called.append(1)
-                assert parts == (b"module:djangoexample.empty_models.models",)
+                assert parts == (
+                    b"module:djangoexample.empty_models.models",
+                    b"module:djangoexample.empty_models.models>installed_app:djangoexample.empty_models",
+                )
                 return "__hashed_for_bad__"
 
             virtual_dependency = scenario.all_virtual_dependencies[
@@ -366,15 +420,23 @@ class TestVirtualDependencyScribe:
                 return None
 
             mod = "djangoexample.empty_models.models"
-            summary = "__virtual__.mod_3808300370::djangoexample.empty_models.models::installed_apps=__installed_apps_hash__::significant=__hashed_for_bad__::v2"
+            summary = "__virtual__.mod_3808300370::djangoexample.empty_models.models::significant=__hashed_for_bad__::v5"
+            """).strip()
+
+            queryset_content = textwrap.dedent("""
+            def interface____differentiated__1() -> None:
+                return None
+
+            mod = "djangoexample.empty_models.models"
+            summary = "__virtual__.mod_3808300370::djangoexample.empty_models.models::significant=__hashed_for_bad__::v5"
             """).strip()
 
             summary_hash = (
                 "__virtual__.mod_3808300370"
                 "::djangoexample.empty_models.models"
-                "::installed_apps=__installed_apps_hash__"
+                ""
                 "::significant=__hashed_for_bad__"
-                "::v2"
+                "::v5"
             )
 
             written = scenario.scribe(hasher=hasher, virtual_dependency=virtual_dependency)
@@ -389,6 +451,145 @@ class TestVirtualDependencyScribe:
                     }
                 ),
                 virtual_import_path=virtual_dependency.summary.virtual_import_path,
+                module_import_path=virtual_dependency.summary.module_import_path,
+                queryset_content=queryset_content + "\n",
+                queryset_virtual_import_path=ImportPath(
+                    f"{virtual_dependency.summary.virtual_import_path}_querysets"
+                ),
             )
 
             assert hasher_called == [1]
+
+        def test_it_can_collapse_concrete_models_using_the_default_queryset(
+            self, discovered_django_example: protocols.Discovered[Project]
+        ) -> None:
+            scenario = self.Scenario(discovered_django_example)
+
+            def hasher(*parts: bytes) -> str:
+                return "__hashed__"
+
+            virtual_dependency = scenario.all_virtual_dependencies[
+                ImportPath("djangoexample.exampleapp.models")
+            ]
+
+            queryset_content = textwrap.dedent("""
+            def interface____differentiated__1() -> None:
+                return None
+
+            mod = "djangoexample.exampleapp.models"
+            summary = "__virtual__.mod_3347844205::djangoexample.exampleapp.models::significant=__hashed__::querysets=collapsed::v5"
+
+            import django.db.models
+            import djangoexample.exampleapp.models
+            import djangoexample.exampleapp2.models
+            ConcreteQuerySet__Child1 = django.db.models.QuerySet[djangoexample.exampleapp.models.Child1]
+            ConcreteQuerySet__Child2 = djangoexample.exampleapp.models.Child2QuerySet
+            ConcreteQuerySet__Child3 = django.db.models.QuerySet[djangoexample.exampleapp.models.Child3]
+            ConcreteQuerySet__Child4 = djangoexample.exampleapp.models.Child4QuerySet
+            ConcreteQuerySet__Parent = django.db.models.QuerySet[djangoexample.exampleapp.models.Child1 | djangoexample.exampleapp.models.Child3 | djangoexample.exampleapp2.models.ChildOther | djangoexample.exampleapp2.models.ChildOther2] | djangoexample.exampleapp.models.Child2QuerySet | djangoexample.exampleapp.models.Child4QuerySet
+            ConcreteQuerySet__Parent2 = django.db.models.QuerySet[djangoexample.exampleapp.models.Child3] | djangoexample.exampleapp.models.Child4QuerySet
+            """).strip()
+
+            written = scenario.scribe(
+                hasher=hasher,
+                virtual_dependency=virtual_dependency,
+                queryset_union_style="collapsed",
+            )
+            assert written.queryset_content == queryset_content + "\n"
+
+            # The summary only mentions the style when it isn't the default
+            expanded = scenario.scribe(hasher=hasher, virtual_dependency=virtual_dependency)
+            assert written.summary_hash is not None
+            assert expanded.summary_hash == written.summary_hash.replace(
+                "::querysets=collapsed", ""
+            )
+
+        def test_it_uses_the_model_itself_past_the_maximum_union_width(
+            self, discovered_django_example: protocols.Discovered[Project]
+        ) -> None:
+            scenario = self.Scenario(discovered_django_example)
+
+            def hasher(*parts: bytes) -> str:
+                return "__hashed__"
+
+            virtual_dependency = scenario.all_virtual_dependencies[
+                ImportPath("djangoexample.exampleapp.models")
+            ]
+
+            summary = "__virtual__.mod_3347844205::djangoexample.exampleapp.models::significant=__hashed__::max_union=2::v5"
+
+            content = textwrap.dedent(f"""
+            def interface____differentiated__1() -> None:
+                return None
+
+            mod = "djangoexample.exampleapp.models"
+            summary = "{summary}"
+
+            import djangoexample.exampleapp.models
+            Concrete__Child1 = djangoexample.exampleapp.models.Child1
+            Concrete__Child2 = djangoexample.exampleapp.models.Child2
+            Concrete__Child3 = djangoexample.exampleapp.models.Child3
+            Concrete__Child4 = djangoexample.exampleapp.models.Child4
+            Concrete__Parent = djangoexample.exampleapp.models.Parent
+            Concrete__Parent2 = djangoexample.exampleapp.models.Child3 | djangoexample.exampleapp.models.Child4
+            """).strip()
+
+            queryset_content = textwrap.dedent(f"""
+            def interface____differentiated__1() -> None:
+                return None
+
+            mod = "djangoexample.exampleapp.models"
+            summary = "{summary}"
+
+            import django.db.models
+            import djangoexample.exampleapp.models
+            ConcreteQuerySet__Child1 = django.db.models.QuerySet[djangoexample.exampleapp.models.Child1]
+            ConcreteQuerySet__Child2 = djangoexample.exampleapp.models.Child2QuerySet
+            ConcreteQuerySet__Child3 = django.db.models.QuerySet[djangoexample.exampleapp.models.Child3]
+            ConcreteQuerySet__Child4 = djangoexample.exampleapp.models.Child4QuerySet
+            ConcreteQuerySet__Parent = django.db.models.QuerySet[djangoexample.exampleapp.models.Parent]
+            ConcreteQuerySet__Parent2 = django.db.models.QuerySet[djangoexample.exampleapp.models.Child3] | djangoexample.exampleapp.models.Child4QuerySet
+            """).strip()
+
+            written = scenario.scribe(
+                hasher=hasher, virtual_dependency=virtual_dependency, max_concrete_union_width=2
+            )
+            assert written.content == content + "\n"
+            assert written.queryset_content == queryset_content + "\n"
+            assert written.report.summarised_models == {
+                ImportPath("djangoexample.exampleapp.models.Parent"): 6
+            }
+
+        def test_differentiator_is_made_from_the_summary_hash(
+            self, discovered_django_example: protocols.Discovered[Project]
+        ) -> None:
+            scenario = self.Scenario(discovered_django_example)
+            virtual_dependency = scenario.all_virtual_dependencies[
+                ImportPath("djangoexample.exampleapp2.models")
+            ]
+
+            def render(
+                hashed: str,
+            ) -> virtual_dependencies.RenderedVirtualDependency[virtual_dependencies.Report]:
+                return virtual_dependencies.VirtualDependencyScribe(
+                    hasher=lambda *parts: hashed,
+                    report_maker=virtual_dependencies.Report,
+                    virtual_dependency=virtual_dependency,
+                    all_virtual_dependencies=scenario.all_virtual_dependencies,
+                    make_differentiator=lambda summary_hash: str(
+                        adler32_hash(summary_hash.encode())
+                    ),
+                ).render()
+
+            first = render("one")
+            assert first.summary_hash is not None
+            differentiator = adler32_hash(first.summary_hash.encode())
+            assert f"def interface__{differentiator}() -> None:" in first.content
+
+            # The same state always renders the same file
+            assert render("one") == first
+
+            # And the interface changes when the summary does
+            second = render("two")
+            assert second.summary_hash != first.summary_hash
+            assert f"def interface__{differentiator}() -> None:" not in second.content
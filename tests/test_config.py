@@ -4,6 +4,9 @@ import textwrap
 import pytest
 
 from extended_mypy_django_plugin.django_analysis import ImportPath
+from extended_mypy_django_plugin.django_analysis.virtual_dependencies import (
+    VirtualDependencyOptions,
+)
 from extended_mypy_django_plugin.plugin import ExtraOptions
 
 
@@ -144,6 +147,488 @@ class TestGetExtraOptions:
             ):
                 ExtraOptions.from_config(config)
 
+    def test_it_can_get_render_processes(self, tmp_path: pathlib.Path) -> None:
+        versions = (
+            (
+                "mypy.ini",
+                """
+                [mypy.plugins.django-stubs]
+                scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+                django_settings_module = my.settings
+                render_processes = 4
+                """,
+            ),
+            (
+                "pyproject.toml",
+                """
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                render_processes = 4
+                """,
+            ),
+        )
+
+        for name, content in versions:
+            config = tmp_path / name
+            config.write_text(textwrap.dedent(content))
+
+            assert ExtraOptions.from_config(config) == ExtraOptions(
+                project_root=tmp_path,
+                scratch_path=tmp_path / "scratch",
+                django_settings_module=ImportPath("my.settings"),
+                virtual_dependency_options=VirtualDependencyOptions(render_processes=4),
+            )
+
+    def test_complains_if_render_processes_is_not_valid(self, tmp_path: pathlib.Path) -> None:
+        for value in ("-1", '"lots"', '"-2"', "true", "1.5"):
+            config = tmp_path / "pyproject.toml"
+            config.write_text(
+                textwrap.dedent(f"""
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                render_processes = {value}
+                """)
+            )
+
+            with pytest.raises(
+                ValueError,
+                match="Please specify 'render_processes' as a number that is zero or more",
+            ):
+                ExtraOptions.from_config(config)
+
+    def test_it_can_get_max_concrete_union_width(self, tmp_path: pathlib.Path) -> None:
+        versions = (
+            (
+                "mypy.ini",
+                """
+                [mypy.plugins.django-stubs]
+                scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+                django_settings_module = my.settings
+                max_concrete_union_width = 200
+                """,
+            ),
+            (
+                "pyproject.toml",
+                """
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                max_concrete_union_width = 200
+                """,
+            ),
+        )
+
+        for name, content in versions:
+            config = tmp_path / name
+            config.write_text(textwrap.dedent(content))
+
+            extra_options = ExtraOptions.from_config(config)
+            assert extra_options == ExtraOptions(
+                project_root=tmp_path,
+                scratch_path=tmp_path / "scratch",
+                django_settings_module=ImportPath("my.settings"),
+                virtual_dependency_options=VirtualDependencyOptions(max_concrete_union_width=200),
+            )
+            assert extra_options.for_report()["max_concrete_union_width"] == "200"
+
+    def test_complains_if_max_concrete_union_width_is_not_valid(
+        self, tmp_path: pathlib.Path
+    ) -> None:
+        for value in ("-1", '"lots"', '"-2"', "true", "1.5"):
+            config = tmp_path / "pyproject.toml"
+            config.write_text(
+                textwrap.dedent(f"""
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                max_concrete_union_width = {value}
+                """)
+            )
+
+            with pytest.raises(
+                ValueError,
+                match="Please specify 'max_concrete_union_width' as a number that is zero or more",
+            ):
+                ExtraOptions.from_config(config)
+
+    def test_it_can_get_import_graph_path(self, tmp_path: pathlib.Path) -> None:
+        versions = (
+            (
+                "mypy.ini",
+                """
+                [mypy.plugins.django-stubs]
+                scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+                django_settings_module = my.settings
+                import_graph_path = $MYPY_CONFIG_FILE_DIR/import_graph.jsonl
+                """,
+            ),
+            (
+                "pyproject.toml",
+                """
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                import_graph_path = "$MYPY_CONFIG_FILE_DIR/import_graph.jsonl"
+                """,
+            ),
+        )
+
+        for name, content in versions:
+            config = tmp_path / name
+            config.write_text(textwrap.dedent(content))
+
+            extra_options = ExtraOptions.from_config(config)
+            assert extra_options == ExtraOptions(
+                project_root=tmp_path,
+                scratch_path=tmp_path / "scratch",
+                django_settings_module=ImportPath("my.settings"),
+                import_graph_path=tmp_path / "import_graph.jsonl",
+            )
+            assert extra_options.for_report()["import_graph_path"] == str(
+                tmp_path / "import_graph.jsonl"
+            )
+
+    def test_it_can_get_significance_policy(self, tmp_path: pathlib.Path) -> None:
+        versions = (
+            (
+                "mypy.ini",
+                """
+                [mypy.plugins.django-stubs]
+                scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+                django_settings_module = my.settings
+                significance_policy = aliases-only
+                """,
+            ),
+            (
+                "pyproject.toml",
+                """
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                significance_policy = "aliases-only"
+                """,
+            ),
+        )
+
+        for name, content in versions:
+            config = tmp_path / name
+            config.write_text(textwrap.dedent(content))
+
+            extra_options = ExtraOptions.from_config(config)
+            assert extra_options == ExtraOptions(
+                project_root=tmp_path,
+                scratch_path=tmp_path / "scratch",
+                django_settings_module=ImportPath("my.settings"),
+                virtual_dependency_options=VirtualDependencyOptions(
+                    significance_policy="aliases-only"
+                ),
+            )
+            assert extra_options.for_report()["significance_policy"] == "aliases-only"
+
+    def test_complains_if_significance_policy_is_not_valid(self, tmp_path: pathlib.Path) -> None:
+        for value in ('"some"', "2", '""'):
+            config = tmp_path / "pyproject.toml"
+            config.write_text(
+                textwrap.dedent(f"""
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                significance_policy = {value}
+                """)
+            )
+
+            with pytest.raises(
+                ValueError,
+                match="Please specify 'significance_policy' as one of full, aliases-only",
+            ):
+                ExtraOptions.from_config(config)
+
+    def test_it_can_get_virtual_dependency_layout(self, tmp_path: pathlib.Path) -> None:
+        versions = (
+            (
+                "mypy.ini",
+                """
+                [mypy.plugins.django-stubs]
+                scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+                django_settings_module = my.settings
+                virtual_dependency_layout = model
+                """,
+            ),
+            (
+                "pyproject.toml",
+                """
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                virtual_dependency_layout = "model"
+                """,
+            ),
+        )
+
+        for name, content in versions:
+            config = tmp_path / name
+            config.write_text(textwrap.dedent(content))
+
+            extra_options = ExtraOptions.from_config(config)
+            assert extra_options == ExtraOptions(
+                project_root=tmp_path,
+                scratch_path=tmp_path / "scratch",
+                django_settings_module=ImportPath("my.settings"),
+                virtual_dependency_options=VirtualDependencyOptions(
+                    virtual_dependency_layout="model"
+                ),
+            )
+            assert extra_options.for_report()["virtual_dependency_layout"] == "model"
+
+    def test_complains_if_virtual_dependency_layout_is_not_valid(
+        self, tmp_path: pathlib.Path
+    ) -> None:
+        for value in ('"package"', "2", '""'):
+            config = tmp_path / "pyproject.toml"
+            config.write_text(
+                textwrap.dedent(f"""
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                virtual_dependency_layout = {value}
+                """)
+            )
+
+            with pytest.raises(
+                ValueError,
+                match="Please specify 'virtual_dependency_layout' as one of module, model, abstract, acyclic",
+            ):
+                ExtraOptions.from_config(config)
+
+    def test_it_can_get_virtual_dependency_format(self, tmp_path: pathlib.Path) -> None:
+        versions = (
+            (
+                "mypy.ini",
+                """
+                [mypy.plugins.django-stubs]
+                scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+                django_settings_module = my.settings
+                virtual_dependency_format = pyi
+                """,
+            ),
+            (
+                "pyproject.toml",
+                """
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                virtual_dependency_format = "pyi"
+                """,
+            ),
+        )
+
+        for name, content in versions:
+            config = tmp_path / name
+            config.write_text(textwrap.dedent(content))
+
+            extra_options = ExtraOptions.from_config(config)
+            assert extra_options == ExtraOptions(
+                project_root=tmp_path,
+                scratch_path=tmp_path / "scratch",
+                django_settings_module=ImportPath("my.settings"),
+                virtual_dependency_options=VirtualDependencyOptions(
+                    virtual_dependency_format="pyi"
+                ),
+            )
+            assert extra_options.for_report()["virtual_dependency_format"] == "pyi"
+
+    def test_complains_if_virtual_dependency_format_is_not_valid(
+        self, tmp_path: pathlib.Path
+    ) -> None:
+        for value in ('"pyc"', "2", '""'):
+            config = tmp_path / "pyproject.toml"
+            config.write_text(
+                textwrap.dedent(f"""
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                virtual_dependency_format = {value}
+                """)
+            )
+
+            with pytest.raises(
+                ValueError,
+                match="Please specify 'virtual_dependency_format' as one of py, pyi",
+            ):
+                ExtraOptions.from_config(config)
+
+    def test_it_can_get_queryset_union_style(self, tmp_path: pathlib.Path) -> None:
+        versions = (
+            (
+                "mypy.ini",
+                """
+                [mypy.plugins.django-stubs]
+                scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+                django_settings_module = my.settings
+                queryset_union_style = collapsed
+                """,
+            ),
+            (
+                "pyproject.toml",
+                """
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                queryset_union_style = "collapsed"
+                """,
+            ),
+        )
+
+        for name, content in versions:
+            config = tmp_path / name
+            config.write_text(textwrap.dedent(content))
+
+            extra_options = ExtraOptions.from_config(config)
+            assert extra_options == ExtraOptions(
+                project_root=tmp_path,
+                scratch_path=tmp_path / "scratch",
+                django_settings_module=ImportPath("my.settings"),
+                virtual_dependency_options=VirtualDependencyOptions(
+                    queryset_union_style="collapsed"
+                ),
+            )
+            assert extra_options.for_report()["queryset_union_style"] == "collapsed"
+
+    def test_complains_if_queryset_union_style_is_not_valid(self, tmp_path: pathlib.Path) -> None:
+        for value in ('"flattened"', "2", '""'):
+            config = tmp_path / "pyproject.toml"
+            config.write_text(
+                textwrap.dedent(f"""
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                queryset_union_style = {value}
+                """)
+            )
+
+            with pytest.raises(
+                ValueError,
+                match="Please specify 'queryset_union_style' as one of expanded, collapsed",
+            ):
+                ExtraOptions.from_config(config)
+
+    def test_it_can_get_virtual_namespace_layout(self, tmp_path: pathlib.Path) -> None:
+        versions = (
+            (
+                "mypy.ini",
+                """
+                [mypy.plugins.django-stubs]
+                scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+                django_settings_module = my.settings
+                virtual_namespace_layout = sharded
+                """,
+            ),
+            (
+                "pyproject.toml",
+                """
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                virtual_namespace_layout = "sharded"
+                """,
+            ),
+        )
+
+        for name, content in versions:
+            config = tmp_path / name
+            config.write_text(textwrap.dedent(content))
+
+            extra_options = ExtraOptions.from_config(config)
+            assert extra_options == ExtraOptions(
+                project_root=tmp_path,
+                scratch_path=tmp_path / "scratch",
+                django_settings_module=ImportPath("my.settings"),
+                virtual_dependency_options=VirtualDependencyOptions(
+                    virtual_namespace_layout="sharded"
+                ),
+            )
+            assert extra_options.for_report()["virtual_namespace_layout"] == "sharded"
+
+    def test_complains_if_virtual_namespace_layout_is_not_valid(
+        self, tmp_path: pathlib.Path
+    ) -> None:
+        for value in ('"nested"', "2", '""'):
+            config = tmp_path / "pyproject.toml"
+            config.write_text(
+                textwrap.dedent(f"""
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                virtual_namespace_layout = {value}
+                """)
+            )
+
+            with pytest.raises(
+                ValueError,
+                match="Please specify 'virtual_namespace_layout' as one of flat, sharded",
+            ):
+                ExtraOptions.from_config(config)
+
+    def test_it_can_get_fingerprint_env_vars(self, tmp_path: pathlib.Path) -> None:
+        versions = (
+            (
+                "mypy.ini",
+                """
+                [mypy.plugins.django-stubs]
+                scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+                django_settings_module = my.settings
+                fingerprint_env_vars = DATABASE_URL, FEATURES
+                    DEBUG
+                """,
+            ),
+            (
+                "pyproject.toml",
+                """
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                fingerprint_env_vars = ["DATABASE_URL", "FEATURES", "DEBUG"]
+                """,
+            ),
+        )
+
+        for name, content in versions:
+            config = tmp_path / name
+            config.write_text(textwrap.dedent(content))
+
+            extra_options = ExtraOptions.from_config(config)
+            assert extra_options == ExtraOptions(
+                project_root=tmp_path,
+                scratch_path=tmp_path / "scratch",
+                django_settings_module=ImportPath("my.settings"),
+                virtual_dependency_options=VirtualDependencyOptions(
+                    fingerprint_env_vars=("DATABASE_URL", "FEATURES", "DEBUG")
+                ),
+            )
+            assert (
+                extra_options.for_report()["fingerprint_env_vars"] == "DATABASE_URL,FEATURES,DEBUG"
+            )
+
+    def test_complains_if_fingerprint_env_vars_is_not_valid(self, tmp_path: pathlib.Path) -> None:
+        for value in ("2", '[""]', "[1]", "true"):
+            config = tmp_path / "pyproject.toml"
+            config.write_text(
+                textwrap.dedent(f"""
+                [tool.django-stubs]
+                scratch_path = "$MYPY_CONFIG_FILE_DIR/scratch"
+                django_settings_module = "my.settings"
+                fingerprint_env_vars = {value}
+                """)
+            )
+
+            with pytest.raises(
+                ValueError,
+                match="Please specify 'fingerprint_env_vars' as a list of names",
+            ):
+                ExtraOptions.from_config(config)
+
     def test_complains_if_config_file_is_none(self) -> None:
         with pytest.raises(SystemExit):
             ExtraOptions.from_config(None)
@@ -0,0 +1,220 @@
+import os
+import pathlib
+import subprocess
+import sys
+import textwrap
+
+project_root = pathlib.Path(__file__).parent.parent
+
+
+class TestDetermineDjangoState:
+    def test_it_only_loads_django_when_something_changed(self, tmp_path: pathlib.Path) -> None:
+        loads = tmp_path / "loads"
+        plugin = tmp_path / "plugin.py"
+
+        def write_plugin(comment: str) -> None:
+            plugin.write_text(
+                textwrap.dedent(f"""
+                # {comment}
+                import pathlib
+
+                from extended_mypy_django_plugin.django_analysis import Project
+                from extended_mypy_django_plugin.plugin import PluginProvider, VirtualDependencyHandler, ExtendedMypyStubs
+
+
+                class VirtualDependencyHandler(VirtualDependencyHandler):
+                    @classmethod
+                    def make_project(
+                        cls, *, project_root: pathlib.Path, django_settings_module: str
+                    ) -> Project:
+                        with open("{loads}", "a") as fle:
+                            fle.write("load\\n")
+                        return super().make_project(
+                            project_root=project_root, django_settings_module=django_settings_module
+                        )
+
+
+                plugin = PluginProvider(ExtendedMypyStubs, VirtualDependencyHandler.create_report, locals())
+                """)
+            )
+
+        config = tmp_path / "mypy.ini"
+        config.write_text(
+            textwrap.dedent(f"""
+            [mypy.plugins.django-stubs]
+            project_root = {project_root / "example"}
+            scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+            django_settings_module = djangoexample.settings
+            """)
+        )
+
+        version_file = tmp_path / "version"
+
+        def determine_django_state() -> str:
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "extended_mypy_django_plugin.scripts.determine_django_state",
+                    "--config-file",
+                    str(config),
+                    "--mypy-plugin",
+                    str(plugin),
+                    "--version-file",
+                    str(version_file),
+                ],
+                check=True,
+            )
+            return version_file.read_text()
+
+        write_plugin("one")
+        version = determine_django_state()
+        assert loads.read_text().splitlines() == ["load"]
+        assert (tmp_path / "scratch" / "__django_state__.json").exists()
+
+        assert determine_django_state() == version
+        assert loads.read_text().splitlines() == ["load"]
+
+        # Changing a module that was used to make the report means it is made again
+        write_plugin("two")
+        assert determine_django_state() == version
+        assert loads.read_text().splitlines() == ["load", "load"]
+
+        assert determine_django_state() == version
+        assert loads.read_text().splitlines() == ["load", "load"]
+
+    def test_it_loads_django_again_when_an_app_gets_a_models_module(
+        self, tmp_path: pathlib.Path
+    ) -> None:
+        root_dir = tmp_path / "project"
+        (root_dir / "app").mkdir(parents=True)
+        (root_dir / "app" / "__init__.py").write_text("")
+        (root_dir / "settings.py").write_text(
+            textwrap.dedent("""
+            SECRET_KEY = "secret"
+            INSTALLED_APPS = ["app"]
+            DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
+            """)
+        )
+
+        config = tmp_path / "mypy.ini"
+        config.write_text(
+            textwrap.dedent(f"""
+            [mypy.plugins.django-stubs]
+            project_root = {root_dir}
+            scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+            django_settings_module = settings
+            """)
+        )
+
+        version_file = tmp_path / "version"
+
+        def determine_django_state() -> tuple[str, list[str]]:
+            """
+            Return the version and which of the modules for making a report were imported
+            """
+            script = textwrap.dedent(f"""
+            import sys
+
+            from extended_mypy_django_plugin.scripts import determine_django_state
+
+            determine_django_state.main([
+                "--config-file", {str(config)!r},
+                "--mypy-plugin", "extended_mypy_django_plugin.main",
+                "--version-file", {str(version_file)!r},
+            ])
+            for name in ("django", "mypy.build", "extended_mypy_django_plugin.plugin"):
+                if name in sys.modules:
+                    print(name)
+            """)
+            result = subprocess.run(
+                [sys.executable, "-c", script], check=True, capture_output=True, text=True
+            )
+            return version_file.read_text(), result.stdout.splitlines()
+
+        version, imported = determine_django_state()
+        assert imported == ["django", "mypy.build", "extended_mypy_django_plugin.plugin"]
+
+        assert determine_django_state() == (version, [])
+
+        (root_dir / "app" / "models.py").write_text(
+            textwrap.dedent("""
+            from django.db import models
+
+            class Thing(models.Model):
+                pass
+            """)
+        )
+        changed, imported = determine_django_state()
+        assert changed != version
+        assert imported == ["django", "mypy.build", "extended_mypy_django_plugin.plugin"]
+
+    def test_it_loads_django_again_when_a_named_environment_variable_changes(
+        self, tmp_path: pathlib.Path
+    ) -> None:
+        root_dir = tmp_path / "project"
+        for app in ("app", "other"):
+            (root_dir / app).mkdir(parents=True)
+            (root_dir / app / "__init__.py").write_text("")
+        (root_dir / "settings.py").write_text(
+            textwrap.dedent("""
+            import os
+
+            SECRET_KEY = "secret"
+            INSTALLED_APPS = ["app", *os.environ.get("EXTRA_APPS", "").split()]
+            DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
+            """)
+        )
+
+        config = tmp_path / "mypy.ini"
+        config.write_text(
+            textwrap.dedent(f"""
+            [mypy.plugins.django-stubs]
+            project_root = {root_dir}
+            scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+            django_settings_module = settings
+            fingerprint_env_vars = EXTRA_APPS
+            """)
+        )
+
+        version_file = tmp_path / "version"
+
+        def determine_django_state(**env: str) -> tuple[str, bool]:
+            """
+            Return the version and whether Django was loaded to find it
+            """
+            script = textwrap.dedent(f"""
+            import sys
+
+            from extended_mypy_django_plugin.scripts import determine_django_state
+
+            determine_django_state.main([
+                "--config-file", {str(config)!r},
+                "--mypy-plugin", "extended_mypy_django_plugin.main",
+                "--version-file", {str(version_file)!r},
+            ])
+            print("django" in sys.modules)
+            """)
+            environ = {k: v for k, v in os.environ.items() if k != "EXTRA_APPS"}
+            result = subprocess.run(
+                [sys.executable, "-c", script],
+                check=True,
+                capture_output=True,
+                text=True,
+                env={**environ, **env},
+            )
+            return version_file.read_text(), result.stdout.strip() == "True"
+
+        version, loaded = determine_django_state()
+        assert loaded
+        assert determine_django_state() == (version, False)
+
+        with_other, loaded = determine_django_state(EXTRA_APPS="other")
+        assert loaded
+        assert with_other != version
+        assert determine_django_state(EXTRA_APPS="other") == (with_other, False)
+
+        # Other variables don't matter
+        assert determine_django_state(EXTRA_APPS="other", UNRELATED="1") == (with_other, False)
+
+        assert determine_django_state() == (version, True)
@@ -0,0 +1,147 @@
+import json
+import pathlib
+import textwrap
+
+import pytest
+
+from extended_mypy_django_plugin._plugin.import_graph import (
+    ComponentImpact,
+    ImportGraph,
+    ImportGraphRecorder,
+)
+from extended_mypy_django_plugin.scripts import import_graph_report
+
+
+@pytest.fixture
+def recorded(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "import_graph.jsonl"
+    recorder = ImportGraphRecorder(path=path)
+
+    # leaf.models and other.models import each other without the plugin
+    # and the plugin joins app.models, leaf.models and the virtual dependency
+    recorder.record(module="app", imports=[], added=[])
+    recorder.record(module="app.models", imports=["django.db.models"], added=[])
+    recorder.record(
+        module="leaf.models",
+        imports=["app.models.Parent", "other.models.Thing"],
+        added=["__virtual__.mod_1"],
+    )
+    recorder.record(module="other.models", imports=["leaf.models.Child"], added=[])
+    recorder.record(module="__virtual__.mod_1", imports=["app.models", "leaf.models"], added=[])
+    recorder.record(module="app.models", imports=[], added=["__virtual__.mod_1"])
+    return path
+
+
+class TestImportGraphRecorder:
+    def test_it_appends_a_line_for_each_file(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "import_graph.jsonl"
+        recorder = ImportGraphRecorder(path=path)
+
+        recorder.record(module="one", imports={"two", "three.Thing"}, added=set())
+        recorder.record(module="two", imports=set(), added={"__virtual__.mod_1"})
+
+        assert [json.loads(line) for line in path.read_text().splitlines()] == [
+            {"module": "one", "imports": ["three.Thing", "two"], "added": []},
+            {"module": "two", "imports": [], "added": ["__virtual__.mod_1"]},
+        ]
+
+    def test_it_empties_the_file_once_per_process(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "import_graph.jsonl"
+        path.write_text('{"module": "stale", "imports": [], "added": []}\n')
+
+        ImportGraphRecorder(path=path).record(module="one", imports=[], added=[])
+        ImportGraphRecorder(path=path).record(module="two", imports=[], added=[])
+
+        assert [json.loads(line)["module"] for line in path.read_text().splitlines()] == [
+            "one",
+            "two",
+        ]
+
+
+class TestImportGraph:
+    def test_it_reads_edges_between_recorded_modules(self, recorded: pathlib.Path) -> None:
+        graph = ImportGraph.read(recorded)
+
+        assert graph == ImportGraph(
+            imports={
+                "app": frozenset(),
+                "app.models": frozenset(),
+                "leaf.models": frozenset({"app", "app.models", "other.models"}),
+                "other.models": frozenset({"leaf.models"}),
+                "__virtual__.mod_1": frozenset({"app", "app.models", "leaf.models"}),
+            },
+            added={
+                "app": frozenset(),
+                "app.models": frozenset({"__virtual__.mod_1"}),
+                "leaf.models": frozenset({"__virtual__.mod_1"}),
+                "other.models": frozenset(),
+                "__virtual__.mod_1": frozenset(),
+            },
+        )
+
+    def test_it_finds_components_with_and_without_added_edges(
+        self, recorded: pathlib.Path
+    ) -> None:
+        graph = ImportGraph.read(recorded)
+
+        assert sorted(map(list, graph.components(with_added=False))) == [
+            ["__virtual__.mod_1"],
+            ["app"],
+            ["app.models"],
+            ["leaf.models", "other.models"],
+        ]
+        assert sorted(map(list, graph.components(with_added=True))) == [
+            ["__virtual__.mod_1", "app.models", "leaf.models", "other.models"],
+            ["app"],
+        ]
+
+    def test_it_reports_the_components_made_bigger(self, recorded: pathlib.Path) -> None:
+        assert ImportGraph.read(recorded).impact() == [
+            ComponentImpact(
+                modules=["__virtual__.mod_1", "app.models", "leaf.models", "other.models"],
+                largest_before=2,
+                added_edges=[
+                    ("app.models", "__virtual__.mod_1"),
+                    ("leaf.models", "__virtual__.mod_1"),
+                ],
+            )
+        ]
+
+    def test_it_handles_long_chains(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "import_graph.jsonl"
+        recorder = ImportGraphRecorder(path=path)
+        for i in range(5000):
+            recorder.record(module=f"mod_{i}", imports=[f"mod_{i + 1}"], added=[])
+        recorder.record(module="mod_5000", imports=[], added=["mod_0"])
+
+        (impact,) = ImportGraph.read(path).impact()
+        assert len(impact.modules) == 5001
+        assert impact.largest_before == 1
+        assert impact.added_edges == [("mod_5000", "mod_0")]
+
+
+class TestImportGraphReport:
+    def test_it_writes_a_report(
+        self, recorded: pathlib.Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        import_graph_report.main([str(recorded)])
+
+        assert capsys.readouterr().out == textwrap.dedent("""\
+            Made a cycle of 2 modules into 4 modules
+              Dependencies added by the plugin in this cycle:
+                app.models -> __virtual__.mod_1
+                leaf.models -> __virtual__.mod_1
+              Modules:
+                __virtual__.mod_1
+                app.models
+                leaf.models
+                other.models
+            """)
+
+    def test_it_says_when_there_is_nothing_to_report(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "import_graph.jsonl"
+        ImportGraphRecorder(path=path).record(module="one", imports=[], added=["two"])
+
+        output = tmp_path / "report.txt"
+        import_graph_report.main([str(path), "--output", str(output)])
+        assert output.read_text() == "The plugin didn't make or enlarge any import cycles\n"
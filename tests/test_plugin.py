@@ -0,0 +1,120 @@
+import inspect
+import pathlib
+import textwrap
+
+import pytest
+
+project_root = pathlib.Path(__file__).parent.parent
+
+
+class TestDjangoContext:
+    def test_it_only_sets_up_django_once(
+        self, pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Using pytester to make it easier to run a test in a subprocess so we don't poison the import space
+        """
+
+        def test_setting_up_django() -> None:
+            import os
+            import pathlib
+            import textwrap
+            from typing import Any
+            from unittest import mock
+
+            from django.apps import AppConfig, apps
+            from django.conf import settings
+            from mypy.options import Options
+            from mypy_django_plugin.django import context as django_stubs_context
+
+            from extended_mypy_django_plugin.plugin import (
+                ExtendedMypyStubs,
+                VirtualDependencyHandler,
+            )
+
+            config = pathlib.Path("mypy.ini")
+            config.write_text(
+                textwrap.dedent(f"""
+                [mypy.plugins.django-stubs]
+                project_root = {os.environ["PROJECT_ROOT"]}/example
+                scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+                django_settings_module = djangoexample.settings
+                """)
+            )
+            options = Options()
+            options.config_file = str(config)
+
+            ready_for_stubs: list[bool] = []
+            make_django_context = ExtendedMypyStubs.make_django_context
+
+            def record_ready(self: ExtendedMypyStubs[Any], **kwargs: object) -> object:
+                ready_for_stubs.append(apps.ready)
+                return make_django_context(self, **kwargs)  # type: ignore[arg-type]
+
+            with (
+                mock.patch.object(
+                    AppConfig, "import_models", autospec=True, side_effect=AppConfig.import_models
+                ) as import_models,
+                mock.patch.object(ExtendedMypyStubs, "make_django_context", record_ready),
+                mock.patch.object(
+                    django_stubs_context,
+                    "initialize_django",
+                    side_effect=django_stubs_context.initialize_django,
+                ) as initialize_django,
+            ):
+                plugin = ExtendedMypyStubs(
+                    options,
+                    mypy_version_tuple=(1, 19),
+                    virtual_dependency_handler=VirtualDependencyHandler.create_report,
+                )
+
+            assert plugin.django_context.apps_registry is apps
+            assert plugin.django_context.settings is settings
+            assert apps.ready
+            assert (
+                "Child1" in plugin.django_context.model_modules["djangoexample.exampleapp.models"]
+            )
+
+            # Whichever of the handler or django-stubs loads Django, the apps are only populated once
+            imported = [call.args[0].name for call in import_models.call_args_list]
+            assert sorted(imported) == sorted(app.name for app in apps.get_app_configs())
+            assert ready_for_stubs == [os.environ["DJANGO_LOADED_BY"] == "handler"]
+
+            # And django-stubs uses the one context rather than making another
+            assert initialize_django.call_count == 1
+
+        pytester.makepyfile(textwrap.dedent(inspect.getsource(test_setting_up_django)))
+
+        monkeypatch.setenv("PROJECT_ROOT", str(project_root))
+
+        # The first run has no cache for discovery, so Django is loaded by the handler
+        monkeypatch.setenv("DJANGO_LOADED_BY", "handler")
+        result = pytester.runpytest_subprocess("-vvv")
+        result.assert_outcomes(passed=1)
+
+        # The second run restores discovery from the cache, so Django is only loaded for django-stubs
+        monkeypatch.setenv("DJANGO_LOADED_BY", "stubs")
+        result = pytester.runpytest_subprocess("-vvv")
+        result.assert_outcomes(passed=1)
+
+
+class TestDjangoStubsInit:
+    def test_it_does_what_django_stubs_does_when_it_is_made(self) -> None:
+        """
+        ExtendedMypyStubs.__init__ does what NewSemanalDjangoPlugin.__init__ does, other than
+        making the DjangoContext, so this needs to change whenever django-stubs changes that
+        """
+        from mypy_django_plugin import main
+
+        assert textwrap.dedent(inspect.getsource(main.NewSemanalDjangoPlugin.__init__)) == (
+            textwrap.dedent("""
+            def __init__(self, options: Options) -> None:
+                super().__init__(options)
+                self.plugin_config = DjangoPluginConfig(options.config_file)
+                # Add paths from MYPYPATH env var
+                sys.path.extend(mypy_path())
+                # Add paths from mypy_path config option
+                sys.path.extend(options.mypy_path)
+                self.django_context = DjangoContext(self.plugin_config.django_settings_module)
+            """).lstrip()
+        )
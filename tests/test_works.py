@@ -1,4 +1,6 @@
-from extended_mypy_django_plugin_test_driver import ScenarioBuilder
+from extended_mypy_django_plugin_test_driver import Scenario, ScenarioBuilder
+
+from extended_mypy_django_plugin.plugin import ImportGraph
 
 
 def test_works(builder: ScenarioBuilder) -> None:
@@ -68,3 +70,293 @@ def test_works(builder: ScenarioBuilder) -> None:
             # ^ REVEAL ^ myapp.models.Child2QuerySet | django.db.models.query.QuerySet[myapp.models.Child1, myapp.models.Child1]
             """,
         )
+
+
+def test_works_with_stub_virtual_dependencies(
+    builder: ScenarioBuilder, scenario: Scenario
+) -> None:
+    scenario.info.additional_mypy_configuration_content = "virtual_dependency_format = pyi"
+
+    builder.set_and_copy_installed_apps("myapp", "myapp2")
+    builder.on("main.py").set(
+        """
+        from extended_mypy_django_plugin import Concrete, DefaultQuerySet
+
+        from myapp.models import Parent, Child2
+
+
+        def make_any_queryset(child: type[Concrete[Parent]]) -> DefaultQuerySet[Parent]:
+            return child.objects.all()
+
+
+        def make_child2_queryset() -> DefaultQuerySet[Child2]:
+            return Child2.objects.all()
+
+
+        make_any_queryset(Child2)
+        # ^ REVEAL ^ django.db.models.query.QuerySet[myapp.models.Child1, myapp.models.Child1] | myapp.models.Child2QuerySet | django.db.models.query.QuerySet[myapp.models.Child3, myapp.models.Child3] | django.db.models.query.QuerySet[myapp2.models.ChildOther, myapp2.models.ChildOther]
+
+        make_child2_queryset()
+        # ^ REVEAL ^ myapp.models.Child2QuerySet
+        """,
+    )
+    builder.run_and_check()
+
+    virtual_deps = scenario.root_dir / ".mypy_django_scratch" / "test"
+    assert list(virtual_deps.rglob("mod_*.pyi"))
+    assert not list(virtual_deps.rglob("mod_*.py"))
+
+
+def test_works_with_collapsed_queryset_unions(
+    builder: ScenarioBuilder, scenario: Scenario
+) -> None:
+    scenario.info.additional_mypy_configuration_content = "queryset_union_style = collapsed"
+
+    builder.set_and_copy_installed_apps("myapp", "myapp2")
+    builder.on("main.py").set(
+        """
+        from extended_mypy_django_plugin import Concrete, DefaultQuerySet
+
+        from myapp.models import Parent, Child1, Child2
+
+
+        def make_any_queryset(child: type[Concrete[Parent]]) -> DefaultQuerySet[Parent]:
+            return child.objects.all()
+
+
+        def make_child1_queryset() -> DefaultQuerySet[Child1]:
+            return Child1.objects.all()
+
+
+        make_any_queryset(Child2)
+        # ^ REVEAL ^ django.db.models.query.QuerySet[myapp.models.Child1 | myapp.models.Child3 | myapp2.models.ChildOther, myapp.models.Child1 | myapp.models.Child3 | myapp2.models.ChildOther] | myapp.models.Child2QuerySet
+
+        make_child1_queryset()
+        # ^ REVEAL ^ django.db.models.query.QuerySet[myapp.models.Child1, myapp.models.Child1]
+        """,
+    )
+    builder.run_and_check()
+
+
+def test_works_with_a_maximum_concrete_union_width(
+    builder: ScenarioBuilder, scenario: Scenario
+) -> None:
+    scenario.info.additional_mypy_configuration_content = "max_concrete_union_width = 2"
+
+    builder.set_and_copy_installed_apps("myapp", "myapp2")
+    builder.on("main.py").set(
+        """
+        from extended_mypy_django_plugin import Concrete, DefaultQuerySet
+
+        from myapp.models import Parent, Parent2
+
+
+        def get_parent(parent: Concrete[Parent]) -> Concrete[Parent]:
+            # ^ NOTE ^ Concrete annotations for 'myapp.models.Parent' use that model rather than a union of its 4 concrete models because that is more than max_concrete_union_width
+            return parent
+
+
+        def get_parent2(parent2: Concrete[Parent2]) -> Concrete[Parent2]:
+            return parent2
+
+
+        # Only mentioned the first time
+        def get_another_parent(parent: Concrete[Parent]) -> Concrete[Parent]:
+            return parent
+
+
+        # The model is abstract, so what only the concrete models have isn't available
+        def get_parent_objects(model: type[Concrete[Parent]]) -> None:
+            model.objects
+            # ^ ERROR(attr-defined) ^ "type[Parent]" has no attribute "objects"
+
+
+        get_parent
+        # ^ REVEAL ^ def (parent: myapp.models.Parent) -> myapp.models.Parent
+
+        get_parent2
+        # ^ REVEAL ^ def (parent2: myapp.models.Child3) -> myapp.models.Child3
+        """,
+    )
+    builder.run_and_check()
+
+
+def test_works_with_the_acyclic_layout(builder: ScenarioBuilder, scenario: Scenario) -> None:
+    scenario.info.additional_mypy_configuration_content = "virtual_dependency_layout = acyclic"
+
+    builder.set_and_copy_installed_apps("myapp", "myapp2")
+    builder.on("main.py").set(
+        """
+        from extended_mypy_django_plugin import Concrete, DefaultQuerySet
+
+        from myapp.models import Parent
+
+
+        def get_parent(parent: Concrete[Parent]) -> Concrete[Parent]:
+            return parent
+
+
+        def make_any_queryset(child: type[Concrete[Parent]]) -> DefaultQuerySet[Parent]:
+            return child.objects.all()
+
+
+        get_parent
+        # ^ REVEAL ^ def (parent: myapp.models.Child1 | myapp.models.Child2 | myapp.models.Child3 | myapp2.models.ChildOther) -> myapp.models.Child1 | myapp.models.Child2 | myapp.models.Child3 | myapp2.models.ChildOther
+        """,
+    )
+    builder.run_and_check()
+
+
+def test_works_when_recording_the_import_graph(
+    builder: ScenarioBuilder, scenario: Scenario
+) -> None:
+    scenario.info.additional_mypy_configuration_content = (
+        "import_graph_path = $MYPY_CONFIG_FILE_DIR/import_graph.jsonl"
+    )
+
+    builder.set_and_copy_installed_apps("myapp", "myapp2")
+    builder.on("main.py").set(
+        """
+        from extended_mypy_django_plugin import Concrete
+
+        from myapp.models import Parent
+
+
+        def get_parent(parent: Concrete[Parent]) -> Concrete[Parent]:
+            return parent
+        """,
+    )
+    builder.run_and_check()
+
+    graph = ImportGraph.read(scenario.root_dir / "import_graph.jsonl")
+    assert "myapp.models" in graph.imports["main"]
+    assert graph.added["main"]
+    assert {dep.split(".")[0] for dep in graph.added["main"]} == {
+        "__virtual_extended_mypy_django_plugin_report__"
+    }
+
+
+def test_works_with_a_sharded_virtual_namespace(
+    builder: ScenarioBuilder, scenario: Scenario
+) -> None:
+    scenario.info.additional_mypy_configuration_content = "virtual_namespace_layout = sharded"
+
+    builder.set_and_copy_installed_apps("myapp", "myapp2")
+    builder.on("main.py").set(
+        """
+        from extended_mypy_django_plugin import Concrete, DefaultQuerySet
+
+        from myapp.models import Parent
+
+
+        def get_parent(parent: Concrete[Parent]) -> Concrete[Parent]:
+            return parent
+
+
+        def make_any_queryset(child: type[Concrete[Parent]]) -> DefaultQuerySet[Parent]:
+            return child.objects.all()
+
+
+        get_parent
+        # ^ REVEAL ^ def (parent: myapp.models.Child1 | myapp.models.Child2 | myapp.models.Child3 | myapp2.models.ChildOther) -> myapp.models.Child1 | myapp.models.Child2 | myapp.models.Child3 | myapp2.models.ChildOther
+        """,
+    )
+    builder.run_and_check()
+
+    virtual_namespace = (
+        scenario.root_dir
+        / ".mypy_django_scratch"
+        / "test"
+        / "__virtual_extended_mypy_django_plugin_report__"
+    )
+    assert all(path.name.startswith("shard_") for path in virtual_namespace.iterdir())
+
+
+def test_the_acyclic_layout_does_not_let_a_module_close_a_cycle(
+    builder: ScenarioBuilder, scenario: Scenario
+) -> None:
+    scenario.info.additional_mypy_configuration_content = "virtual_dependency_layout = acyclic"
+
+    builder.set_and_copy_installed_apps("myapp", "myapp2")
+    builder.on("myapp/models.py").append(
+        """
+
+        from extended_mypy_django_plugin import Concrete
+
+
+        def get_parent(parent: Concrete[Parent]) -> Concrete[Parent]:
+            # ^ ERROR(misc) ^ Concrete alias for 'myapp.models.Parent' is not available here (__virtual_extended_mypy_django_plugin_report__.mod_1256064882.Concrete__Parent is not a dependency of this module)
+            # ^ ERROR(misc) ^ No concrete models found for ['myapp.models.Parent']
+            return parent
+
+
+        def get_child(child: Concrete[Parent2]) -> Concrete[Parent2]:
+            return child
+        """,
+    )
+    builder.on("main.py").set(
+        """
+        from myapp.models import get_child
+
+        get_child
+        # ^ REVEAL ^ def (child: myapp.models.Child3) -> myapp.models.Child3
+        """,
+    )
+    builder.run_and_check()
+
+
+def test_the_acyclic_layout_follows_imports_from_the_source(
+    builder: ScenarioBuilder, scenario: Scenario
+) -> None:
+    scenario.info.additional_mypy_configuration_content = "virtual_dependency_layout = acyclic"
+
+    builder.set_and_copy_installed_apps("myapp", "myapp2")
+    builder.on("myapp/querysets.py").set(
+        """
+        from typing import TYPE_CHECKING
+
+        from django.db import models
+
+        if TYPE_CHECKING:
+            from myapp.models import Thing
+
+
+        class ThingQuerySet(models.QuerySet["Thing"]):
+            pass
+        """
+    )
+    builder.on("myapp/models.py").append(
+        """
+
+        from extended_mypy_django_plugin import DefaultQuerySet
+
+        from myapp.querysets import ThingQuerySet
+
+
+        class Thing(models.Model):
+            objects = models.Manager.from_queryset(ThingQuerySet)()
+
+
+        # The aliases for Thing import myapp.querysets, which imports this module
+        def get_things(things: DefaultQuerySet[Thing]) -> DefaultQuerySet[Thing]:
+            # ^ ERROR(misc) ^ Concrete alias for 'myapp.models.Thing' is not available here (__virtual_extended_mypy_django_plugin_report__.mod_1133250306_querysets.ConcreteQuerySet__Thing is not a dependency of this module)
+            # ^ ERROR(misc) ^ No concrete models found for ['myapp.models.Thing']
+            return things
+        """,
+    )
+    builder.on("main.py").set(
+        """
+        from extended_mypy_django_plugin import DefaultQuerySet
+
+        from myapp.models import Thing
+
+
+        def get_things(things: DefaultQuerySet[Thing]) -> DefaultQuerySet[Thing]:
+            return things
+
+
+        get_things
+        # ^ REVEAL ^ def (things: myapp.querysets.ThingQuerySet) -> myapp.querysets.ThingQuerySet
+        """,
+    )
+    builder.run_and_check()
@@ -0,0 +1,243 @@
+import atexit
+import importlib.metadata
+import io
+import pathlib
+import subprocess
+import sys
+import textwrap
+from collections.abc import Iterator
+
+import pytest
+
+from extended_mypy_django_plugin._plugin.zygote import DjangoStateZygote
+from extended_mypy_django_plugin.scripts.django_state_zygote import Zygote
+
+project_root = pathlib.Path(__file__).parent.parent
+
+
+@pytest.fixture
+def zygote() -> Iterator[DjangoStateZygote]:
+    zygote = DjangoStateZygote()
+    try:
+        yield zygote
+    finally:
+        zygote.close()
+
+
+@pytest.fixture
+def config_file(tmp_path: pathlib.Path) -> pathlib.Path:
+    config = tmp_path / "mypy.ini"
+    config.write_text(
+        textwrap.dedent(f"""
+        [mypy.plugins.django-stubs]
+        project_root = {project_root / "example"}
+        scratch_path = $MYPY_CONFIG_FILE_DIR/scratch
+        django_settings_module = djangoexample.settings
+        """)
+    )
+    return config
+
+
+class TestDjangoStateZygote:
+    def test_it_gets_the_same_version_as_a_fresh_process(
+        self, zygote: DjangoStateZygote, config_file: pathlib.Path, tmp_path: pathlib.Path
+    ) -> None:
+        if zygote.broken:
+            pytest.skip("The zygote needs os.fork")
+
+        loads = tmp_path / "loads"
+        plugin = tmp_path / "plugin.py"
+        plugin.write_text(
+            textwrap.dedent(f"""
+            import pathlib
+
+            from extended_mypy_django_plugin.django_analysis import Project
+            from extended_mypy_django_plugin.plugin import PluginProvider, VirtualDependencyHandler, ExtendedMypyStubs
+
+
+            class VirtualDependencyHandler(VirtualDependencyHandler):
+                @classmethod
+                def make_project(
+                    cls, *, project_root: pathlib.Path, django_settings_module: str
+                ) -> Project:
+                    with open("{loads}", "a") as fle:
+                        fle.write("load\\n")
+                    return super().make_project(
+                        project_root=project_root, django_settings_module=django_settings_module
+                    )
+
+
+            plugin = PluginProvider(ExtendedMypyStubs, VirtualDependencyHandler.create_report, locals())
+            """)
+        )
+
+        version_file = tmp_path / "version"
+        django_state = tmp_path / "scratch" / "__django_state__.json"
+        args = [
+            "--config-file",
+            str(config_file),
+            "--mypy-plugin",
+            str(plugin),
+            "--version-file",
+            str(version_file),
+        ]
+
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "extended_mypy_django_plugin.scripts.determine_django_state",
+                *args,
+            ],
+            check=True,
+        )
+        expected = version_file.read_text()
+        version_file.unlink()
+        assert loads.read_text().splitlines() == ["load"]
+
+        for i in range(2):
+            # Otherwise the stored version is used without making the report
+            django_state.unlink()
+
+            result = zygote.run(args)
+            assert result is not None
+            assert result.returncode == 0, result.stderr
+            assert version_file.read_text() == expected
+            version_file.unlink()
+
+            # The report was made in the child of the zygote
+            assert loads.read_text().splitlines() == ["load"] * (i + 2)
+            assert django_state.exists()
+
+        (tmp_path / "scratch" / "__assume_django_state_unchanged__").write_text("")
+        result = zygote.run(args)
+        assert result is not None
+        assert result.returncode == 2
+        assert not version_file.exists()
+
+    def test_it_reports_failures_and_keeps_working(
+        self, zygote: DjangoStateZygote, config_file: pathlib.Path, tmp_path: pathlib.Path
+    ) -> None:
+        if zygote.broken:
+            pytest.skip("The zygote needs os.fork")
+
+        plugin = tmp_path / "plugin.py"
+        plugin.write_text(
+            textwrap.dedent("""
+            import pathlib
+
+            from extended_mypy_django_plugin.django_analysis import Project
+            from extended_mypy_django_plugin.plugin import PluginProvider, VirtualDependencyHandler, ExtendedMypyStubs
+
+
+            class VirtualDependencyHandler(VirtualDependencyHandler):
+                @classmethod
+                def make_project(
+                    cls, *, project_root: pathlib.Path, django_settings_module: str
+                ) -> Project:
+                    print("making project")
+                    raise ValueError("Computer says no")
+
+
+            plugin = PluginProvider(ExtendedMypyStubs, VirtualDependencyHandler.create_report, locals())
+            """)
+        )
+
+        version_file = tmp_path / "version"
+        args = ["--config-file", str(config_file), "--version-file", str(version_file)]
+
+        result = zygote.run([*args, "--mypy-plugin", str(plugin)])
+        assert result is not None
+        assert result.returncode == 1
+        assert result.stdout == "making project\n"
+        assert "ValueError: Computer says no" in result.stderr
+        assert not version_file.exists()
+
+        result = zygote.run([*args, "--mypy-plugin", "extended_mypy_django_plugin.main"])
+        assert result is not None
+        assert result.returncode == 0, result.stderr
+        assert version_file.read_text()
+
+    def test_it_can_be_restarted(self, zygote: DjangoStateZygote, tmp_path: pathlib.Path) -> None:
+        if zygote.broken:
+            pytest.skip("The zygote needs os.fork")
+
+        args = ["--config-file", str(tmp_path / "nope.ini"), "--version-file", "nope"]
+        for _ in range(2):
+            result = zygote.run(args)
+            assert result is not None
+            assert "could not load configuration file" in result.stderr
+            zygote.close()
+            assert zygote.process is None
+
+    def test_it_gives_up_and_kills_the_zygote_after_the_timeout(
+        self, config_file: pathlib.Path, tmp_path: pathlib.Path
+    ) -> None:
+        zygote = DjangoStateZygote(timeout=0.001)
+        try:
+            zygote.start()
+            if zygote.broken:
+                pytest.skip("The zygote needs os.fork")
+
+            process = zygote.process
+            assert process is not None
+
+            args = ["--config-file", str(config_file), "--version-file", str(tmp_path / "v")]
+            assert zygote.run([*args, "--mypy-plugin", "extended_mypy_django_plugin.main"]) is None
+            assert zygote.process is None
+            assert process.returncode is not None
+        finally:
+            zygote.close()
+
+    def test_it_starts_a_new_zygote_when_asked_to_restart(
+        self, zygote: DjangoStateZygote, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        responses: list[dict[str, object]] = [
+            {"restart": True},
+            {"returncode": 0, "stdout": "out", "stderr": ""},
+        ]
+        closed: list[bool] = []
+        monkeypatch.setattr(zygote, "_request", lambda argv: responses.pop(0))
+        monkeypatch.setattr(zygote, "close", lambda: closed.append(True))
+
+        result = zygote.run(["one"])
+        assert result is not None
+        assert result.stdout == "out"
+        assert closed == [True]
+        assert responses == []
+
+    def test_it_closes_the_zygote_on_exit(
+        self, zygote: DjangoStateZygote, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        registered: list[object] = []
+        monkeypatch.setattr(atexit, "register", registered.append)
+        monkeypatch.setattr(atexit, "unregister", registered.remove)
+
+        zygote.start()
+        if zygote.broken:
+            pytest.skip("The zygote needs os.fork")
+
+        assert registered == [zygote.close]
+        zygote.close()
+        assert registered == []
+
+
+class TestZygote:
+    def test_it_asks_to_be_restarted_when_a_preloaded_distribution_changes(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        zygote = Zygote()
+        # Other tests in this process may have loaded Django settings
+        monkeypatch.setattr(zygote, "is_safe_to_fork", lambda: True)
+        zygote.preload(["mypy"])
+        assert zygote.distributions["mypy"] == importlib.metadata.version("mypy")
+        assert not zygote.is_out_of_date()
+
+        responses = io.BytesIO()
+        zygote.distributions = {**zygote.distributions, "mypy": "0.0.0"}
+        assert zygote.is_out_of_date()
+        zygote.serve(io.BytesIO(b'{"argv": []}\n'), responses)
+        assert responses.getvalue() == b'{"restart": true}\n'
+
+        zygote.distributions = {"not-a-distribution-that-exists": "1.0"}
+        assert zygote.is_out_of_date()